@@ -26,6 +26,17 @@
 #    \code
 #    splot 'workspace.dat' using 4:5:6, 'workspace.dat' using 7:8:9, 'workspace.dat' using 10:11:12
 #    \endcode
+#
+#    For fine grids use the \c --output option instead: the finger tip
+#    positions are then computed in parallel by the sdh.workspace module
+#    and stored in binary, memory mapped files in a directory. An
+#    interrupted computation is resumed by starting the script with the
+#    same options again. Optionally a voxel grid of the reachable space
+#    (\c --voxel_size) and the convex hull of each finger (\c --hull,
+#    requires scipy) are computed and stored in the same directory:
+#    \code
+#    demo-calc-workspace.py --s0=1 --s1=1 --s2=1 --output=ws-1deg --voxel_size=2 --hull
+#    \endcode
 #    
 #    Start the script with \c "-h" or \c "--help" command line option
 #    to see the online help.
@@ -61,6 +72,8 @@
 #  @{
 '''
 Output a data file with xyz fingertip positions for all possible angles
+(or with --output: compute them in parallel into binary files, see
+the html/pdf documentation of sdh.workspace)
 '''
 
 __author__    = "Dirk Osswald: dirk.osswald@de.schunk.com"
@@ -76,8 +89,13 @@ __copyright__ = "Copyright (c) 2007 SCHUNK GmbH & Co. KG"
 ######################################################################
 # Import the needed modules
 
+import sys
+import os
+import time
+
 # Import the sdh.py python import module:
 import sdh
+import sdh.workspace  # pylint: disable-msg=E0611,F0401
 
 
 #
@@ -87,58 +105,86 @@ import sdh
 ######################################################################
 # Command line option handling:
 
-## Create an option parser object to parse common command line options:
-parser = sdh.cSDHOptionParser( usage    =  __doc__ + "\nusage: %prog [options]",
-                               revision = __version__ )
-
-types = dict( all=0, contour=1 )
-# Add an option to set step widths
-parser.add_option( "--s0",
-                   dest="step0", default=5, type=int, metavar="STEP",
-                   help="Set step width for finger axis angle 0 to STEP, default=5.")
-parser.add_option( "--s1",
-                   dest="step1", default=5, type=int, metavar="STEP",
-                   help="Set step width for finger axis angle 1 (axis angles 1/3/5) to STEP, default=5.")
-parser.add_option( "--s2",
-                   dest="step2", default=5, type=int, metavar="STEP",
-                   help="Set step width for finger axis angle 2 (axis angles 2/4/6) to STEP, default=5.")
-
-parser.add_option( "-t", "--type",
-                   dest="type", default="all", type=str, metavar="TYPE",
-                   help="The type of points to generate: 'all' : full workspace, 'surface' only the surface")
-
-# Parse (and handle, if possible) the command line options of the script:
-(options, args) = parser.parse_args()
-
-# The parsed command line options are now stored in the options
-# object. E.g. options.port is the communication port to use, either
-# the default one or the one read from the -p | --port command line
-# option
-
-## An object to print script-level debug messages, if requested.
-dbg = sdh.dbg.tDBG( flag=options.debug_level>0, fd=options.debug_output )
-dbg << "Debug messages of script are printed like this.\n" # pylint: disable-msg=W0104
-
-# reduce debug level for subsystems
-options.debug_level-=1
-
+def CreateOptionParser():
+    '''Create an option parser specifically for this demo program.
+    '''
+    ## Create an option parser object to parse common command line options:
+    parser = sdh.cSDHOptionParser( usage    =  __doc__ + "\nusage: %prog [options]",
+                                   revision = __version__ )
+
+    types = dict( all=0, contour=1 )
+    # Add an option to set step widths
+    parser.add_option( "--s0",
+                       dest="step0", default=5, type=int, metavar="STEP",
+                       help="Set step width for finger axis angle 0 to STEP, default=5.")
+    parser.add_option( "--s1",
+                       dest="step1", default=5, type=int, metavar="STEP",
+                       help="Set step width for finger axis angle 1 (axis angles 1/3/5) to STEP, default=5.")
+    parser.add_option( "--s2",
+                       dest="step2", default=5, type=int, metavar="STEP",
+                       help="Set step width for finger axis angle 2 (axis angles 2/4/6) to STEP, default=5.")
+
+    parser.add_option( "-t", "--type",
+                       dest="type", default="all", type=str, metavar="TYPE",
+                       help="The type of points to generate: 'all' : full workspace, 'surface' only the surface")
+
+    parser.add_option( "--output",
+                       dest="output", default=None, type=str, metavar="DIRECTORY",
+                       help="Compute the full workspace in parallel and store it in binary files in DIRECTORY instead of printing it. If DIRECTORY contains an interrupted computation with the same step widths then the computation is resumed. Requires numpy.")
+    parser.add_option( "--processes",
+                       dest="processes", default=None, type=int, metavar="N",
+                       help="Number of processes to use with --output. Default is one per core.")
+    parser.add_option( "--voxel_size",
+                       dest="voxel_size", default=None, type=float, metavar="MM",
+                       help="With --output: also compute a grid of the voxels with edges of MM mm that the finger tips reach and store it in DIRECTORY/voxels.npz.")
+    parser.add_option( "--hull",
+                       dest="hull", default=False, action="store_true",
+                       help="With --output: also compute the convex hull of the finger tip positions of each finger and store their vertices in DIRECTORY/hulls.npz. Requires scipy.")
+    return parser
 
 #
 ######################################################################
 
 
-######################################################################
-# The actual script code:
-
-# make shure we are using the 'virutal' port
-options.port = -1
-
-## Create a global instance "hand" of the class cSDH according to the given options:
-hand = sdh.cSDH( options=options.__dict__ )
-dbg << "Successfully created cSDH instance\n"  # pylint: disable-msg=W0104
-
-
-def Print( a0,a1,a2 ):
+def PrintProgress( done, total ):
+    '''Print the progress of the computation with --output.
+    '''
+    sys.stderr.write( "\r%d of %d slabs done" % (done, total) )
+    if ( done == total ):
+        sys.stderr.write( "\n" )
+
+
+def ComputeBinary( options, hand ):
+    '''Compute the workspace into the directory options.output with the
+    sdh.workspace module, and the voxels and hulls if requested.
+    '''
+    start = time.time()
+    ws = sdh.workspace.Compute( options.output, hand.l1, hand.l2, hand.offset,
+                                hand.f_min_angle_a[:3], hand.f_max_angle_a[:3],
+                                [ options.step0, options.step1, options.step2 ],
+                                processes=options.processes, progress=PrintProgress )
+    print "%d poses computed into %s in %.1f s" % (ws.points.size / 9, options.output, time.time() - start)
+
+    if ( options.voxel_size is not None ):
+        voxels = ws.Voxels( options.voxel_size )
+        sdh.workspace.numpy.savez_compressed( os.path.join( options.output, "voxels.npz" ),
+                                              origin=voxels.origin, voxel_size=voxels.voxel_size, reached=voxels.reached )
+        for fi in (0,1,2):
+            print "finger %d reaches %d voxels of %g mm" % (fi, voxels.reached[ fi ].sum(), options.voxel_size)
+
+    if ( options.hull ):
+        hulls = ws.ConvexHulls()
+        arrays = {}
+        for (fi, hull) in enumerate( hulls ):
+            arrays[ "vertices_%d" % fi ] = hull.points[ hull.vertices ]
+            arrays[ "dims_%d" % fi ] = hull.dims
+            print "finger %d: convex hull with %d vertices, volume %f (coordinates %r)" % (fi, len( hull.vertices ), hull.volume, hull.dims)
+        sdh.workspace.numpy.savez_compressed( os.path.join( options.output, "hulls.npz" ), **arrays )
+
+
+def Print( hand, a0,a1,a2 ):
+    '''Print the finger axis angles and the xyz finger tip positions of all fingers as text.
+    '''
     print "%f %f %f  " % (a0,a1,a2),
     for fi in (0,1,2):
         if (fi==1):
@@ -148,55 +194,93 @@ def Print( a0,a1,a2 ):
 
         print "%f %f %f  " % (x,y,z),
     print
-    
 
-if (options.type == "all"):
-    for a2 in range(-90,91,options.step2):
-        for a1 in range(-90,91,options.step1):
-            for a0 in range(0,91,options.step0):
-                Print( a0, a1, a2 )
-        print
-        
-if (options.type =="contour"):
-
-    phi = 90.0 - 2.0 * sdh.RadToDeg( sdh.math.atan( hand.l2 / hand.l1 ) )
-
-    # a1 from 'out' to 'in' -90 --> 90
-    for a1 in range(-90,91,options.step1):
-        if (a1 == -90):
-            for a2 in range(-90,1,options.step2):
-                for a0 in range(0,90,options.step0):
-                    Print( a0, a1, a2 )
-                print
-
-        elif (-90 < a1  and  a1 < 90):
-            for a2 in [0]:
-                for a0 in range(0,90,options.step0):
-                    Print( a0, a1, a2 )
-                print
 
-        else:
-            for a2 in range(0,91,options.step2):
-                for a0 in range(0,90,options.step0):
-                    Print( a0, a1, a2 )
-                print
+######################################################################
+# The main function
+def main():
+    '''Main function of demo script.
+    Parses command line and reacts accordingly.
+    '''
+    parser = CreateOptionParser()
+
+    # Parse (and handle, if possible) the command line options of the script:
+    (options, args) = parser.parse_args()
 
-    # a1 back from 'in' to 'out'  -90 --> 90
-    for a1 in range(90,-91,-options.step1):
-            for a2 in [90]:
-                for a0 in range(0,90,options.step0):
-                    Print( a0, a1, a2 )
+    # The parsed command line options are now stored in the options
+    # object. E.g. options.port is the communication port to use, either
+    # the default one or the one read from the -p | --port command line
+    # option
 
-                print
+    ## An object to print script-level debug messages, if requested.
+    dbg = sdh.dbg.tDBG( flag=options.debug_level>0, fd=options.debug_output )
+    dbg << "Debug messages of script are printed like this.\n" # pylint: disable-msg=W0104
 
-    # missing part from a1=phi to -90 with a2=-90
-    for a1 in range(-int(phi+0.5), -91, -options.step1):
-            for a2 in [-90]:
-                for a0 in range(0,90,options.step0):
-                    Print( a0, a1, a2 )
+    # reduce debug level for subsystems
+    options.debug_level-=1
 
-                print
+    # make shure we are using the 'virutal' port
+    options.port = -1
 
+    ## Create an instance "hand" of the class cSDH according to the given options:
+    hand = sdh.cSDH( options=options.__dict__ )
+    dbg << "Successfully created cSDH instance\n"  # pylint: disable-msg=W0104
 
-    
+    if (options.output is not None):
+        ComputeBinary( options, hand )
 
+    elif (options.type == "all"):
+        for a2 in range(-90,91,options.step2):
+            for a1 in range(-90,91,options.step1):
+                for a0 in range(0,91,options.step0):
+                    Print( hand, a0, a1, a2 )
+            print
+
+    elif (options.type =="contour"):
+
+        phi = 90.0 - 2.0 * sdh.RadToDeg( sdh.math.atan( hand.l2 / hand.l1 ) )
+
+        # a1 from 'out' to 'in' -90 --> 90
+        for a1 in range(-90,91,options.step1):
+            if (a1 == -90):
+                for a2 in range(-90,1,options.step2):
+                    for a0 in range(0,90,options.step0):
+                        Print( hand, a0, a1, a2 )
+                    print
+
+            elif (-90 < a1  and  a1 < 90):
+                for a2 in [0]:
+                    for a0 in range(0,90,options.step0):
+                        Print( hand, a0, a1, a2 )
+                    print
+
+            else:
+                for a2 in range(0,91,options.step2):
+                    for a0 in range(0,90,options.step0):
+                        Print( hand, a0, a1, a2 )
+                    print
+
+        # a1 back from 'in' to 'out'  -90 --> 90
+        for a1 in range(90,-91,-options.step1):
+                for a2 in [90]:
+                    for a0 in range(0,90,options.step0):
+                        Print( hand, a0, a1, a2 )
+
+                    print
+
+        # missing part from a1=phi to -90 with a2=-90
+        for a1 in range(-int(phi+0.5), -91, -options.step1):
+                for a2 in [-90]:
+                    for a0 in range(0,90,options.step0):
+                        Print( hand, a0, a1, a2 )
+
+                    print
+
+#
+######################################################################
+
+if __name__ == "__main__":
+    main()
+
+#
+######################################################################
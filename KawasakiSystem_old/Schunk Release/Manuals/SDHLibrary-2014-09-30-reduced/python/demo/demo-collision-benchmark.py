@@ -0,0 +1,206 @@
+#!/usr/bin/env python
+# -*- coding: latin-1 -*-
+## \addtogroup sdh_library_python_demo_scripts_group
+#  @{
+
+#######################################################################
+## \file
+#  \section sdhlibrary_python_demo_collision_benchmark_py_general General file information
+#
+#    \brief
+#      Microbenchmark for the internal collision checks of the SDH
+#      fingers, no hardware needed.
+#      See demo-collision-benchmark.__doc__ and the online help ("-h" or "--help")
+#      for a list of available options.
+#
+#  \section sdhlibrary_python_demo_collision_benchmark_py_copyright Copyright
+#
+#  - Copyright (c) 2007 SCHUNK GmbH & Co. KG
+#
+#######################################################################
+
+##
+#  @}
+
+
+#######################################################################
+## \anchor sdhlibrary_python_demo_collision_benchmark_python_vars
+#  \name   Python specific variables
+#
+#  Some definitions that describe the script for python
+#
+#  @{
+
+# pylint: disable-msg=W0622
+## The docstring describing the purpose of the script:
+__doc__ = '''Microbenchmark for the internal collision checks of the SDH fingers:
+Random poses and random movements within the axis limits are checked
+offline with a sdh.cSDH object (no communication with an SDH).
+The time per check is printed for:
+- the target pose check of MoveAxis() with the scalar implementation
+  and with numpy (sdh.collision.cFingerHulls)
+- a batch of poses checked with one call of CheckFingerCollisionsMany()
+- the path check of CheckPathCollisions() (as done by MoveAxis() if
+  check_path_collisions is set), and of cFingerHulls.CheckPath() with
+  all poses of the path checked at once and with the poses checked in
+  chunks of growing size, stopping at the first colliding chunk
+  (the early exit does not pay off for paths this short)
+No hardware is needed, but numpy is.
+
+- Example usage:
+  - Check 2000 poses and movements:
+    > demo-collision-benchmark.py --nb_poses=2000
+'''
+
+__url__       = "http://www.schunk.com"
+__copyright__ = "Copyright (c) 2007 SCHUNK GmbH & Co. KG"
+
+#  end of doxygen name group sdhlibrary_python_demo_collision_benchmark_python_vars
+#  @}
+######################################################################
+
+import math
+import random
+import time
+
+import sdh
+import sdh.collision  # pylint: disable-msg=E0611,F0401
+
+######################################################################
+# Command line option handling:
+
+
+def CreateOptionParser():
+    '''Create an option parser specifically for this demo program.
+    '''
+    ## Create an option parser object to parse common command line options:
+    parser = sdh.cSDHOptionParser( usage    =  __doc__ + "\nusage: %prog [options]",
+                                   revision = sdh.__version__ )
+    parser.add_option( "--nb_poses",
+                       dest="nb_poses", default=1000, type=int, metavar="N",
+                       help="Number of random poses and movements to check. Default is 1000." )
+    parser.add_option( "--step",
+                       dest="step", default=2.0, type=float, metavar="DEG",
+                       help="Maximum change of an axis angle in degrees between two poses checked on a path. Default is 2.0." )
+    parser.add_option( "--seed",
+                       dest="seed", default=42, type=int, metavar="SEED",
+                       help="Seed of the random numbers. Default is 42." )
+    return parser
+
+#
+######################################################################
+
+
+def ScalarCheck( hand, fingers_angles ):
+    '''Check \a fingers_angles (in degrees) with the scalar implementation
+    like CheckFingerCollisions() does without numpy.
+    '''
+    r_angles = [ hand._AnglesToRad( fa ) for fa in fingers_angles ] # pylint: disable-msg=W0212
+    hulls = [ hand._GetFingerSphereHull( fi, r_angles[fi] ) for fi in range( 0, 3 ) ] # pylint: disable-msg=W0212
+    cxy = False
+    for (fi, fj) in sdh.collision.FINGER_PAIRS:
+        (cij, dij) = hand._GetFingerHullCollision( hulls[ fi ], hulls[ fj ] ) # pylint: disable-msg=W0212,W0612
+        cxy = cxy or cij
+    return cxy
+
+
+def ChunkedCheckPath( finger_hulls, r_start, r_end, step, chunk ):
+    '''Like cFingerHulls.CheckPath() but the poses are checked in chunks, the
+    first one with \a chunk poses, each following one twice as large, stopping
+    at the first chunk with a collision (the former implementation), for comparison.
+    '''
+    numpy = sdh.collision.numpy
+    r_start = numpy.asarray( r_start, dtype=float )
+    delta = numpy.asarray( r_end, dtype=float ) - r_start
+    nb_samples = max( 1, int( math.ceil( numpy.abs( delta ).max() / step ) ) )
+    first = 1
+    while ( first <= nb_samples ):
+        s = numpy.arange( first, min( first + chunk, nb_samples + 1 ) ) / float( nb_samples )
+        first += chunk
+        chunk *= 2
+        (cxy, c, d) = finger_hulls.Check( r_start + s[ :, numpy.newaxis, numpy.newaxis ] * delta ) # pylint: disable-msg=W0612
+        if ( cxy.any() ):
+            return float( s[ int( cxy.argmax() ) ] )
+    return None
+
+
+def Benchmark( name, function, items ):
+    '''Call \a function for each of the \a items and print the time per call.
+    Return the list of results.
+    '''
+    start = time.time()
+    results = [ function( item ) for item in items ]
+    elapsed = time.time() - start
+    print "%-44s %8.1f us/check" % (name, elapsed / len( items ) * 1e6)
+    return results
+
+
+######################################################################
+# The main function
+def main():
+    '''Main function of demo script.
+    Parses command line and reacts accordingly.
+    '''
+
+    # Parse (and handle, if possible) the command line options of the script:
+    parser = CreateOptionParser()
+    (options, args) = parser.parse_args()
+
+    ## An object to print script-level debug messages, if requested.
+    _dbg = sdh.dbg.tDBG( flag=options.debug_level>0, fd=options.debug_output )
+    _dbg << "Debug messages of script are printed like this.\n" # pylint: disable-msg=W0104
+    _dbg << sdh.PrettyStruct( "options", options )  # pylint: disable-msg=W0104
+
+    if ( sdh.collision.numpy is None ):
+        print "This demo needs numpy."
+        return
+
+    hand = sdh.cSDH( options=dict( debug_level=options.debug_level-1, debug_output=options.debug_output ) )
+    hand.path_check_step = options.step
+
+    random.seed( options.seed )
+    def RandomPose():
+        return [ random.uniform( hand.f_min_angle_a[ai], hand.f_max_angle_a[ai] ) for ai in hand.all_axes ]
+    poses = [ RandomPose() for i in xrange( options.nb_poses ) ] # pylint: disable-msg=W0612
+    fingers_poses = [ hand._AxisAnglesToFingerAngles( pose ) for pose in poses ] # pylint: disable-msg=W0212
+
+    #---------------------
+    # target pose checks:
+    scalar = Benchmark( "target pose, scalar", lambda f: ScalarCheck( hand, f ), fingers_poses )
+    vectorized = Benchmark( "target pose, numpy", lambda f: hand.CheckFingerCollisions( *f )[0], fingers_poses )
+    start = time.time()
+    (cxy, c, d) = hand.CheckFingerCollisionsMany( fingers_poses ) # pylint: disable-msg=W0612
+    print "%-44s %8.1f us/check" % ("batch of %d poses, numpy" % len( fingers_poses ), (time.time() - start) / len( fingers_poses ) * 1e6)
+    if ( scalar != vectorized  or  scalar != list( cxy ) ):
+        print "ERROR: results differ!"
+    print "%d of %d poses collide" % (sum( scalar ), len( scalar ))
+
+    #---------------------
+    # path checks of movements between poses without collision:
+    free = [ pose for (pose, collides) in zip( poses, scalar ) if not collides ]
+    movements = zip( free[:-1], free[1:] )
+    if ( not movements ):
+        return
+    paths = Benchmark( "path, CheckPathCollisions()", lambda (a, b): hand.CheckPathCollisions( a, b, 0, [ 40.0 ]*7, [ 100.0 ]*7 ), movements )
+
+    finger_hulls = hand._GetFingerHulls() # pylint: disable-msg=W0212
+    step = sdh.DegToRad( hand.path_check_step )
+    r_movements = [ ( hand._AxisAnglesToFingerAngles( hand._AnglesToRad( a ) ), # pylint: disable-msg=W0212
+                      hand._AxisAnglesToFingerAngles( hand._AnglesToRad( b ) ) ) # pylint: disable-msg=W0212
+                    for (a, b) in movements ]
+    Benchmark( "path, whole path at once", lambda (a, b): finger_hulls.CheckPath( a, b, step ), r_movements )
+    for chunk in (8, 64):
+        Benchmark( "path, chunks from %d, stop at collision" % chunk, lambda (a, b): ChunkedCheckPath( finger_hulls, a, b, step, chunk ), r_movements )
+
+    nb_colliding = len( [ p for p in paths if p.collision ] )
+    nb_checked = sum( [ p.nb_checked for p in paths ] )
+    print "%d of %d movements between poses without collision collide on the way, %.1f poses checked per movement" % (nb_colliding, len( paths ), float( nb_checked ) / len( paths ))
+
+#
+######################################################################
+
+if __name__ == "__main__":
+    main()
+
+#
+######################################################################
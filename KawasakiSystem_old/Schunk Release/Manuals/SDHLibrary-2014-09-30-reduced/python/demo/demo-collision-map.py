@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+# -*- coding: latin-1 -*-
+## \addtogroup sdh_library_python_demo_scripts_group
+#  @{
+
+#######################################################################
+## \file
+#  \section sdhlibrary_python_demo_collision_map_py_general General file information
+#
+#    \brief
+#      Generate a collision map for the internal collision checks of
+#      the SDH fingers, no hardware needed.
+#      See demo-collision-map.__doc__ and the online help ("-h" or "--help")
+#      for a list of available options.
+#
+#  \section sdhlibrary_python_demo_collision_map_py_copyright Copyright
+#
+#  - Copyright (c) 2007 SCHUNK GmbH & Co. KG
+#
+#######################################################################
+
+##
+#  @}
+
+
+#######################################################################
+## \anchor sdhlibrary_python_demo_collision_map_python_vars
+#  \name   Python specific variables
+#
+#  Some definitions that describe the script for python
+#
+#  @{
+
+# pylint: disable-msg=W0622
+## The docstring describing the purpose of the script:
+__doc__ = '''Generate a collision map for the internal collision checks of the SDH fingers:
+The map is written to a file that can then be used with the --collision_map
+option of the other scripts or with cSDH.LoadCollisionMap(). The generation
+is distributed on all cores. Afterwards the map is verified against the exact
+check for random poses and the time per check with and without the map is printed.
+No hardware is needed, but numpy is.
+
+- Example usage:
+  - Generate the map with the default cell size:
+    > demo-collision-map.py --output=sdh-collision-map.npz
+  - Generate a smaller map with larger cells using 2 processes:
+    > demo-collision-map.py --output=sdh-collision-map.npz --cell_size=10,10,20 --processes=2
+  - Use the map:
+    > demo-simple.py --collision_map=sdh-collision-map.npz
+'''
+
+__url__       = "http://www.schunk.com"
+__copyright__ = "Copyright (c) 2007 SCHUNK GmbH & Co. KG"
+
+#  end of doxygen name group sdhlibrary_python_demo_collision_map_python_vars
+#  @}
+######################################################################
+
+import sys
+import os
+import random
+import time
+
+import sdh
+import sdh.collisionmap  # pylint: disable-msg=E0611,F0401
+
+######################################################################
+# Command line option handling:
+
+
+def CreateOptionParser():
+    '''Create an option parser specifically for this demo program.
+    '''
+    ## Create an option parser object to parse common command line options:
+    parser = sdh.cSDHOptionParser( usage    =  __doc__ + "\nusage: %prog [options]",
+                                   revision = sdh.__version__ )
+    parser.add_option( "--output",
+                       dest="output", default="sdh-collision-map.npz", type=str, metavar="FILE",
+                       help="Name of the collision map file to write. Default is 'sdh-collision-map.npz'." )
+    parser.add_option( "--cell_size",
+                       dest="cell_size", default=",".join( [ "%g" % c for c in sdh.collisionmap.DEFAULT_CELL_SIZE ] ), type=str, metavar="BASE,PROXIMAL,DISTAL",
+                       help="Size of the cells of the map in degrees for the base axis, the proximal axes and the distal axes. Smaller cells decide more poses but make the map larger. Default is '%default'." )
+    parser.add_option( "--processes",
+                       dest="processes", default=None, type=int, metavar="N",
+                       help="Number of processes to use. Default is one per core." )
+    parser.add_option( "--nb_poses",
+                       dest="nb_poses", default=1000, type=int, metavar="N",
+                       help="Number of random poses to verify the map with. Default is 1000." )
+    parser.add_option( "--seed",
+                       dest="seed", default=42, type=int, metavar="SEED",
+                       help="Seed of the random numbers. Default is 42." )
+    return parser
+
+#
+######################################################################
+
+
+def PrintProgress( done, total ):
+    '''Print the progress of the generation of the map.
+    '''
+    sys.stdout.write( "\rgenerating map: %d of %d slabs done" % (done, total) )
+    if ( done == total ):
+        sys.stdout.write( "\n" )
+    sys.stdout.flush()
+
+
+######################################################################
+# The main function
+def main():
+    '''Main function of demo script.
+    Parses command line and reacts accordingly.
+    '''
+
+    # Parse (and handle, if possible) the command line options of the script:
+    parser = CreateOptionParser()
+    (options, args) = parser.parse_args()
+
+    ## An object to print script-level debug messages, if requested.
+    _dbg = sdh.dbg.tDBG( flag=options.debug_level>0, fd=options.debug_output )
+    _dbg << "Debug messages of script are printed like this.\n" # pylint: disable-msg=W0104
+    _dbg << sdh.PrettyStruct( "options", options )  # pylint: disable-msg=W0104
+
+    if ( sdh.collisionmap.numpy is None ):
+        print "This demo needs numpy."
+        return
+
+    cell_size = [ float( c ) for c in options.cell_size.split( "," ) ]
+    if ( len( cell_size ) != 3 ):
+        parser.error( "--cell_size needs 3 values" )
+
+    hand = sdh.cSDH( options=dict( debug_level=options.debug_level-1, debug_output=options.debug_output ) )
+    min_angle = hand.f_min_angle_a[ :hand.NUMBER_OF_AXES_PER_FINGER ]
+    max_angle = hand.f_max_angle_a[ :hand.NUMBER_OF_AXES_PER_FINGER ]
+
+    #---------------------
+    # generate the map:
+    start = time.time()
+    sdh.collisionmap.Generate( options.output, hand.l1, hand.l2, hand.offset, min_angle, max_angle,
+                               cell_size, processes=options.processes, progress=PrintProgress )
+    print "wrote %s (%d bytes) in %.1f s" % (options.output, os.path.getsize( options.output ), time.time() - start)
+
+    #---------------------
+    # verify the map with random poses:
+    random.seed( options.seed )
+    def RandomPose():
+        return [ random.uniform( hand.f_min_angle_a[ai], hand.f_max_angle_a[ai] ) for ai in hand.all_axes ]
+    fingers_poses = [ hand._AxisAnglesToFingerAngles( RandomPose() ) for i in xrange( options.nb_poses ) ] # pylint: disable-msg=W0212,W0612
+
+    start = time.time()
+    exact = [ hand.IsFingerCollision( *f ) for f in fingers_poses ]
+    t_exact = (time.time() - start) / len( fingers_poses )
+
+    hand.LoadCollisionMap( options.output )
+    start = time.time()
+    mapped = [ hand.IsFingerCollision( *f ) for f in fingers_poses ]
+    t_mapped = (time.time() - start) / len( fingers_poses )
+
+    decided = 0
+    for f in fingers_poses:
+        c = hand.collision_map.Lookup( *[ hand._AnglesToRad( fa ) for fa in f ] ) # pylint: disable-msg=W0212
+        if ( True in c  or  None not in c ):
+            decided += 1
+
+    print "%d of %d poses decided by the map" % (decided, len( fingers_poses ))
+    print "%-30s %8.1f us/check" % ("without map", t_exact * 1e6)
+    print "%-30s %8.1f us/check" % ("with map", t_mapped * 1e6)
+    if ( mapped != exact ):
+        print "ERROR: results differ!"
+
+#
+######################################################################
+
+if __name__ == "__main__":
+    main()
+
+#
+######################################################################
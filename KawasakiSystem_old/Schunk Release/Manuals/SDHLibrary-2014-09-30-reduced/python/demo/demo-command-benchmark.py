@@ -0,0 +1,223 @@
+#!/usr/bin/env python
+# -*- coding: latin-1 -*-
+## \addtogroup sdh_library_python_demo_scripts_group
+#  @{
+
+#######################################################################
+## \file
+#  \section sdhlibrary_python_demo_command_benchmark_py_general General file information
+#
+#    \brief
+#      Microbenchmark for the host side cost of SDH commands, measured
+#      against a simulated SDH, no hardware needed.
+#      See demo-command-benchmark.__doc__ and the online help ("-h" or "--help")
+#      for a list of available options.
+#
+#  \section sdhlibrary_python_demo_command_benchmark_py_copyright Copyright
+#
+#  - Copyright (c) 2007 SCHUNK GmbH & Co. KG
+#
+#######################################################################
+
+##
+#  @}
+
+
+#######################################################################
+## \anchor sdhlibrary_python_demo_command_benchmark_python_vars
+#  \name   Python specific variables
+#
+#  Some definitions that describe the script for python
+#
+#  @{
+
+# pylint: disable-msg=W0622
+## The docstring describing the purpose of the script:
+__doc__ = '''Microbenchmark for the host side cost of SDH commands:
+Commands are sent with a sdh.sdhserial.cSDHSerial object to a
+simulated SDH that replies immediately within the same process. So
+only the time spent in the SDHLibrary (formatting the command, reading
+and parsing the reply, debug messages) is measured, not the time of
+the communication or the SDH itself. The achieved rate in commands per
+second is printed for reading the actual angles of all axes with
+debug messages off, with the former implementation (debug messages
+formatted even if debug messages are off, reply pattern compiled for
+each command, reply parsed with eval()) and with the current one.
+For comparison the rate with debug messages on (printed to a null
+device) is reported as well.
+No hardware is needed.
+
+- Example usage:
+  - Send 20000 commands:
+    > demo-command-benchmark.py --nb_commands=20000
+'''
+
+__url__       = "http://www.schunk.com"
+__copyright__ = "Copyright (c) 2007 SCHUNK GmbH & Co. KG"
+
+#  end of doxygen name group sdhlibrary_python_demo_command_benchmark_python_vars
+#  @}
+######################################################################
+
+import os
+import re
+import sys
+import time
+
+import sdh
+import sdh.sdhserial  # pylint: disable-msg=E0611,F0401
+
+######################################################################
+# Command line option handling:
+
+
+def CreateOptionParser():
+    '''Create an option parser specifically for this demo program.
+    '''
+    ## Create an option parser object to parse common command line options:
+    parser = sdh.cSDHOptionParser( usage    =  __doc__ + "\nusage: %prog [options]",
+                                   revision = sdh.__version__ )
+    parser.add_option( "--nb_commands",
+                       dest="nb_commands", default=5000, type=int, metavar="N",
+                       help="Number of commands to send per run. Default is 5000." )
+    parser.add_option( "--repeat",
+                       dest="repeat", default=3, type=int, metavar="N",
+                       help="Send the commands N times and report the best run. Default is 3." )
+    return parser
+
+#
+######################################################################
+
+
+class tSimulatedSDH( object ):
+    '''File like object that replies to the commands that read
+    values of all axes like an SDH would, immediately and without delay.
+    Provides the subset of the serial.Serial interface used by sdh.sdhserial.cSDHSerial.
+    '''
+    ## The replies of the commands known
+    replies = { "p" : "P=10.000,-10.000,0.000,-10.000,0.000,-10.000,0.000",
+                "pos" : "POS=10.013,-9.987,0.000,-10.022,0.000,-10.003,0.000",
+                "vel" : "VEL=0.000,0.000,0.000,0.000,0.000,0.000,0.000",
+                "state" : "STATE=0,0,0,0,0,0,0" }
+
+    def __init__( self ):
+        self.timeout = 1.0
+        self.lines = []
+
+    def write( self, s ):
+        for command in s.split( "\r\n" )[:-1]:
+            self.lines.append( self.replies[ command ] + "\r\n" )
+
+    def readline( self ):
+        if self.lines:
+            return self.lines.pop( 0 )
+        return ""
+
+    def close( self ):
+        pass
+
+
+class cSimulatedSDHSerial( sdh.sdhserial.cSDHSerial ):
+    '''A cSDHSerial object communicating with a tSimulatedSDH.
+    '''
+    def __init__( self, debug_level, debug_output ):
+        # start with the "virtual" port, then connect to the simulated SDH:
+        sdh.sdhserial.cSDHSerial.__init__( self, dict( port=-1, debug_level=debug_level, debug_output=debug_output ) )
+        self.options[ "port" ] = 0
+        self.com = tSimulatedSDH()
+
+    def LegacySend( self, s, nb_lines ):
+        '''The successful path of the former cSDHSerial.Send() with the
+        debug messages that were formatted even if debug messages were off, for comparison.
+        '''
+        # pylint: disable-msg=W0104
+        self.firmware_state = self.eErrorCode[ "E_SUCCESS" ]
+        lines = []
+        self.dbg.PDM( "sending command "+repr(s+self.EOL)+" to SDH" )
+        self.dbg.PDM( "nb_lines=", nb_lines, "  nb_lines_total=", sdh.All, "  self.nb_lines_to_ignore=", self.nb_lines_to_ignore )
+        self.com.write(s+self.EOL)
+        while (nb_lines == sdh.All or nb_lines > 0):
+            l = self.com.readline()
+            if (nb_lines != sdh.All):
+                nb_lines -= 1
+            lines.append( l.strip( "\r\n" ) )
+            self.dbg.PDM( "appended '%s' for l='%s'" %(lines[-1],l) )
+            if (len(lines[-1])>0 and lines[-1][0] != '@'):
+                break
+            self.dbg << "not breaking for line '%s'\n" % l
+            sys.stdout.flush()
+            sys.stderr.flush()
+        sys.stdout.flush()
+        sys.stderr.flush()
+        self.dbg.PDM( "%d lines remain to be ignored" % self.nb_lines_to_ignore )
+        self.ExtractFirmwareState( lines )
+        self.dbg << "got reply:\n"
+        self.dbg.SetColor( "blue" )
+        for (i,l) in zip(range(0,len(lines)),lines):
+            self.dbg << "%2d: " % i << repr( l ) << "\n"
+        self.dbg.SetColor( "green" )
+        return lines
+
+    def LegacyPos( self ):
+        '''Read the actual angles of all axes like the former cSDHSerial.pos(All):
+        the reply pattern is compiled for each call and the reply is parsed with eval().
+        '''
+        self.dbg << "Sendparse( %s, %s )\n" % (repr("pos"), repr("POS=(.*)")) # pylint: disable-msg=W0104
+        answer = re.compile( "POS=(.*)" ).match( self.LegacySend( "pos", 1 )[0] ).group(1)
+        return eval( "[" + answer + "]" )
+
+
+def Benchmark( name, command, nb_commands, repeat ):
+    '''Call \a command() \a nb_commands times, \a repeat times and print the best rate.
+    Return the number of commands per second.
+    '''
+    best = None
+    for r in xrange( repeat ): # pylint: disable-msg=W0612
+        start = time.time()
+        for i in xrange( nb_commands ): # pylint: disable-msg=W0612
+            command()
+        elapsed = time.time() - start
+        if best is None  or  elapsed < best:
+            best = elapsed
+    rate = nb_commands / best
+    print "%-34s %6d commands in %8.4fs = %10.1f commands/s = %7.1f us/command" % (name, nb_commands, best, rate, best / nb_commands * 1e6)
+    return rate
+
+
+######################################################################
+# The main function
+def main():
+    '''Main function of demo script.
+    Parses command line and reacts accordingly.
+    '''
+
+    # Parse (and handle, if possible) the command line options of the script:
+    parser = CreateOptionParser()
+    (options, args) = parser.parse_args()
+
+    ## An object to print script-level debug messages, if requested.
+    _dbg = sdh.dbg.tDBG( flag=options.debug_level>0, fd=options.debug_output )
+    _dbg << "Debug messages of script are printed like this.\n" # pylint: disable-msg=W0104
+    _dbg << sdh.PrettyStruct( "options", options )  # pylint: disable-msg=W0104
+
+    ser = cSimulatedSDHSerial( 0, sys.stderr )
+    if ( ser.LegacyPos() != ser.pos( sdh.All ) ):
+        print "ERROR: replies differ!"
+
+    rate_before = Benchmark( "pos(All), debug off (former)", ser.LegacyPos, options.nb_commands, options.repeat )
+    rate_after  = Benchmark( "pos(All), debug off", lambda: ser.pos( sdh.All ), options.nb_commands, options.repeat )
+    print "speedup: %.2f" % (rate_after / rate_before)
+
+    null = open( os.devnull, "w" )
+    ser_dbg = cSimulatedSDHSerial( 1, null )
+    Benchmark( "pos(All), debug on (to %s)" % os.devnull, lambda: ser_dbg.pos( sdh.All ), options.nb_commands, options.repeat )
+    null.close()
+
+#
+######################################################################
+
+if __name__ == "__main__":
+    main()
+
+#
+######################################################################
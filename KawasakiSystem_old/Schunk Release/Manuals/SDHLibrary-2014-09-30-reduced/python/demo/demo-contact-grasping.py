@@ -199,7 +199,7 @@ def main():
     
     ## Create a global instance "ts" (tactile sensor) of the class cDSA according to the given options:
     print "Connecting to tactile sensor controller. This may take up to 8 seconds...",    
-    ts = sdh.dsa.cDSA( port=options.dsaport, debug_level=options.dsa_debug_level, debug_output=options.dsa_debug_output )
+    ts = sdh.dsa.cDSA( port=options.dsaport, debug_level=options.dsa_debug_level, debug_output=options.dsa_debug_output, record=options.dsa_record )
     print "OK"
     
     # Pack the actual movement commands in a try block
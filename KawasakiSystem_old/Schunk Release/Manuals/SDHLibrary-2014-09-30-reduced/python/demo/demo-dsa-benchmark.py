@@ -0,0 +1,497 @@
+#!/usr/bin/env python
+# -*- coding: latin-1 -*-
+## \addtogroup sdh_library_python_demo_scripts_group
+#  @{
+
+#######################################################################
+## \file
+#  \section sdhlibrary_python_demo_dsa_benchmark_py_general General file information
+#
+#    \brief
+#      Microbenchmark for decoding tactile sensor packets of the DSACON32m
+#      from a recorded byte stream, no hardware needed.
+#      See demo-dsa-benchmark.__doc__ and the online help ("-h" or "--help")
+#      for a list of available options.
+#
+#  \section sdhlibrary_python_demo_dsa_benchmark_py_copyright Copyright
+#
+#  - Copyright (c) 2007 SCHUNK GmbH & Co. KG
+#
+#######################################################################
+
+##
+#  @}
+
+
+#######################################################################
+## \anchor sdhlibrary_python_demo_dsa_benchmark_python_vars
+#  \name   Python specific variables
+#
+#  Some definitions that describe the script for python
+#
+#  @{
+
+# pylint: disable-msg=W0622
+## The docstring describing the purpose of the script:
+__doc__ = '''Microbenchmark for decoding tactile sensor frames of the DSACON32m:
+A byte stream as sent by the DSACON32m in push mode is decoded
+completely by the sdh.dsa.cDSA packet decoder, and the achieved
+decoding rate in frames per second is printed. For comparison the
+same stream is decoded with the former byte-by-byte reading
+decoder as well. Additionally the rate of checksumming the frames
+with the former per byte CRC16 calculation and with the batched
+sdh.crc.CRC16Bytes() is printed, as well as the rate of decoding the
+texel values of the frames with the former per texel loop, with the
+pure python sdh.dsa.DecodeTexelsArray() and with the vectorized
+sdh.dsa.DecodeTexelsNumPy() (if numpy is available), and the rate of
+parsing frames with debug messages off with the former debug messages
+(formatted even if not printed) and with cDSA._ParseFrame(). Finally the rate
+of calculating the contact forces of all 6 sensor matrices of a frame
+with cDSA.GetContactForce() per matrix and with the batched
+cDSA.GetContactForces() is printed.
+No hardware is needed.
+
+The byte stream is either read from a file recorded before or
+generated synthetically (6 sensor matrices with a moving contact).
+
+- Example usage:
+  - Decode a synthetic stream of 1000 RLE encoded frames:
+    > demo-dsa-benchmark.py --nb_frames=1000
+
+  - Decode a synthetic stream of raw (not RLE encoded) frames:
+    > demo-dsa-benchmark.py --no_rle
+
+  - Save the synthetic stream to file stream.bin for later use:
+    > demo-dsa-benchmark.py --save_stream=stream.bin
+
+  - Decode a byte stream recorded before and saved in file stream.bin:
+    > demo-dsa-benchmark.py --stream=stream.bin
+'''
+
+__url__       = "http://www.schunk.com"
+__copyright__ = "Copyright (c) 2007 SCHUNK GmbH & Co. KG"
+
+#  end of doxygen name group sdhlibrary_python_demo_dsa_benchmark_python_vars
+#  @}
+######################################################################
+
+import sys
+import time
+import math
+import threading
+
+import sdh
+import sdh.dsa  # pylint: disable-msg=E0611,F0401
+import sdh.crc  # pylint: disable-msg=E0611,F0401
+
+######################################################################
+# Command line option handling:
+
+
+def CreateOptionParser():
+    '''Create an option parser specifically for this demo program.
+    '''
+    ## Create an option parser object to parse common command line options:
+    parser = sdh.cSDHOptionParser( usage    =  __doc__ + "\nusage: %prog [options]",
+                                   revision = sdh.__version__ )
+    parser.add_option( "--stream",
+                       dest="stream", default=None, type=str, metavar="FILE",
+                       help="Read the byte stream to decode from FILE instead of generating a synthetic one." )
+    parser.add_option( "--save_stream",
+                       dest="save_stream", default=None, type=str, metavar="FILE",
+                       help="Save the byte stream to decode to FILE." )
+    parser.add_option( "--nb_frames",
+                       dest="nb_frames", default=500, type=int, metavar="N",
+                       help="Number of frames of the synthetic stream. Default is 500." )
+    parser.add_option( "--repeat",
+                       dest="repeat", default=3, type=int, metavar="N",
+                       help="Decode the stream N times and report the best run. Default is 3." )
+    return parser
+
+#
+######################################################################
+
+## The sensor matrices of an SDH: (cells_x, cells_y) of proximal / distal sensor of the 3 fingers
+SDH_MATRICES = [ (6,14), (6,13) ] * 3
+
+def BuildPacket( packet_id, payload ):
+    '''Return a string with a complete DSACON32m packet with
+    preamble, \a packet_id, size, \a payload (list of ints) and checksum
+    '''
+    checksum = sdh.dsa.CRC_INIT_VALUE
+    size = [ sdh.dsa.LB( len(payload) ), sdh.dsa.HB( len(payload) ) ]
+    for b in [ packet_id ] + size + payload:
+        checksum = sdh.dsa.CRC16( checksum, b, sdh.dsa.gCRCtbl )
+    the_bytes = [ 0xaa, 0xaa, 0xaa, packet_id ] + size + payload + [ sdh.dsa.LB( checksum ), sdh.dsa.HB( checksum ) ]
+    return "".join( [ chr( b ) for b in the_bytes ] )
+
+
+def EncodeFrame( timestamp, data, do_RLE ):
+    '''Return the payload of a full frame packet for the texel values
+    in list \a data as list of ints
+    '''
+    flags = 0
+    if do_RLE:
+        flags |= (1<<0)
+    payload = [ (timestamp >> s) & 0xff for s in (0, 8, 16, 24) ] + [ flags ]
+    if do_RLE:
+        words = []
+        for v in data:
+            if words and (words[-1] & 0x0fff) == v  and  (words[-1] >> 12) < 15:
+                words[-1] += (1 << 12)
+            else:
+                words.append( (1 << 12) | v )
+    else:
+        words = data
+    for w in words:
+        payload += [ sdh.dsa.LB( w ), sdh.dsa.HB( w ) ]
+    return payload
+
+
+def CreateStream( nb_frames, do_RLE ):
+    '''Return a synthetic byte stream of \a nb_frames full frames as sent
+    by a DSACON32m in push mode at 30 FPS: A contact with a gaussian
+    pressure profile moves across all sensor matrices.
+    '''
+    packets = []
+    for f in xrange( nb_frames ):
+        data = []
+        for (m, (cells_x, cells_y)) in enumerate( SDH_MATRICES ):
+            cx = (cells_x - 1) * 0.5 * (1.0 + math.sin( f * 0.1 + m ))
+            cy = (cells_y - 1) * 0.5 * (1.0 + math.cos( f * 0.07 + m ))
+            for y in xrange( cells_y ):
+                for x in xrange( cells_x ):
+                    v = int( 4095.0 * math.exp( -((x-cx)**2 + (y-cy)**2) / 4.0 ) )
+                    if v < 10:
+                        v = 0
+                    data.append( v )
+        packets.append( BuildPacket( sdh.dsa.cDSA.eDSAPacketID[ "eDSA_FULL_FRAME" ], EncodeFrame( f * 33, data, do_RLE ) ) )
+    return "".join( packets )
+
+
+class tStreamCom( object ):
+    '''File like object that replays a byte stream.
+    Provides the subset of the serial.Serial interface used by sdh.dsa.cDSA.
+    '''
+    def __init__( self, stream ):
+        self.stream = stream
+        self.pos = 0
+        self.timeout = 0
+
+    def read( self, n ):
+        s = self.stream[ self.pos : self.pos + n ]
+        self.pos += len( s )
+        return s
+
+    def inWaiting( self ):
+        return len( self.stream ) - self.pos
+
+    def write( self, s ):
+        return len( s )
+
+    def close( self ):
+        pass
+
+
+class cStreamDSA( sdh.dsa.cDSA ):
+    '''A cDSA object decoding a byte stream instead of communicating with a real DSACON32m.
+    Only the packet decoding parts of the cDSA object can be used.
+    '''
+    def __init__( self, stream ): # pylint: disable-msg=W0231
+        self._dbg = sdh.dbg.tDBG( False )
+        self.port = "stream"
+        self.com = tStreamCom( stream )
+        self.GetTimeout = self.GetTimeoutRS232
+        self.SetTimeout = self.SetTimeoutRS232
+        self.GetNbBytesReadable = self.GetNbBytesReadableRS232
+        self._InitReceiveState()
+
+        self.sensor_info = sdh.utils.Struct()
+        self.sensor_info.nb_matrices = len( SDH_MATRICES )
+        self.matrix_info = []
+        self.texel_offset = []
+        nb_cells = 0
+        for (cells_x, cells_y) in SDH_MATRICES:
+            mi = sdh.utils.Struct()
+            mi.cells_x = cells_x
+            mi.cells_y = cells_y
+            mi.texel_width = 3.4
+            mi.texel_height = 3.4
+            self.matrix_info.append( mi )
+            self.texel_offset.append( nb_cells )
+            nb_cells += cells_x * cells_y
+        self._InitFrameState( nb_cells )
+
+
+def LegacyReadNextResponse( dsa ):
+    '''The former byte-by-byte reading decoder of cDSA._ReadNextResponse(), for comparison.
+    '''
+    def ReadUInt8():
+        c = dsa.read( 1 )
+        if c == "":
+            raise sdh.dsa.cDSAError( "Timeout while reading 1 byte from port %r " % (dsa.port) )
+        return ord( c )
+
+    the_bytes = []
+    response = sdh.utils.Struct()
+    nb_preamble_bytes = 0
+    for i in xrange( 0, 1000): # pylint: disable-msg=W0612
+        if ( ReadUInt8() == 0xaa ):
+            nb_preamble_bytes += 1
+        else:
+            nb_preamble_bytes = 0
+        if (nb_preamble_bytes == 3):
+            the_bytes.extend( [ 0xaa, 0xaa, 0xaa] )
+            break
+    if (nb_preamble_bytes != 3):
+        raise sdh.dsa.cDSAError( "Could not find preamble 0xaa 0xaa 0xaa within 1000 bytes" )
+    response.packet_id = ReadUInt8()
+    bs = [ ReadUInt8(), ReadUInt8() ]
+    response.size = bs[0] + (bs[1] << 8)
+    the_bytes += [ response.packet_id ] + bs
+    response.payload = [ ReadUInt8()  for i in xrange( 0, response.size ) ]
+    the_bytes += response.payload
+    bs = [ ReadUInt8(), ReadUInt8() ]
+    response.checksum = bs[0] + (bs[1] << 8)
+    the_bytes += bs
+    response.the_bytes = the_bytes
+    checksum = sdh.dsa.CRC_INIT_VALUE
+    for b in the_bytes[3:-2]:
+        checksum = sdh.dsa.CRC16( checksum, b, sdh.dsa.gCRCtbl )
+    if ( checksum != response.checksum ):
+        raise sdh.dsa.cDSAError( "Checkusm Error, expected 0x%x but got 0x%x" % (checksum, response.checksum) )
+    return response
+
+
+def Benchmark( name, stream, decode, repeat ):
+    '''Decode all packets of \a stream with function \a decode( dsa )
+    \a repeat times and print the best decoding rate. Return the number of frames per second.
+    '''
+    best = None
+    for r in xrange( repeat ): # pylint: disable-msg=W0612
+        dsa = cStreamDSA( stream )
+        nb_frames = 0
+        start = time.time()
+        while dsa.com.inWaiting() > 0  or  len( dsa._rx_buffer ) > 0: # pylint: disable-msg=W0212
+            decode( dsa )
+            nb_frames += 1
+        elapsed = time.time() - start
+        if best is None  or  elapsed < best:
+            best = elapsed
+    fps = nb_frames / best
+    print "%-30s %6d frames in %8.4fs = %10.1f frames/s" % (name, nb_frames, best, fps)
+    return fps
+
+def BenchmarkCRC( stream, repeat ):
+    '''Checksum all packets of \a stream byte by byte with sdh.dsa.CRC16() and
+    with the batched sdh.crc.CRC16Bytes() \a repeat times and print the best rates.
+    '''
+    dsa = cStreamDSA( stream )
+    packets = []
+    while dsa.com.inWaiting() > 0  or  len( dsa._rx_buffer ) > 0: # pylint: disable-msg=W0212
+        packets.append( dsa._ReadNextResponse().the_bytes[3:-2] ) # pylint: disable-msg=W0212
+
+    def PerByte( data ):
+        checksum = sdh.dsa.CRC_INIT_VALUE
+        for b in data:
+            checksum = sdh.dsa.CRC16( checksum, b, sdh.dsa.gCRCtbl )
+        return checksum
+
+    sdh.crc.GetCRCTable2() # the table is computed on first use, so exclude that
+    results = []
+    for (name, f) in [ ("CRC16 per byte (former)", PerByte), ("crc.CRC16Bytes", sdh.crc.CRC16Bytes) ]:
+        best = None
+        for r in xrange( repeat ): # pylint: disable-msg=W0612
+            start = time.time()
+            checksums = [ f( data ) for data in packets ]
+            elapsed = time.time() - start
+            if best is None  or  elapsed < best:
+                best = elapsed
+        results.append( checksums )
+        print "%-30s %6d frames in %8.4fs = %10.1f frames/s" % (name, len( packets ), best, len( packets ) / best)
+    if results[0] != results[1]:
+        print "ERROR: checksums differ!"
+
+def LegacyDecodeTexels( payload, i, do_RLE, data ):
+    '''The former per texel loop of cDSA._ParseFrame(), for comparison.
+    '''
+    j = 0
+    size = len( payload )
+    if do_RLE:
+        while i+1 < size:
+            b = sdh.dsa.UIntFromBytes( payload[ i:i+2 ] )
+            v = b & 0x0fff
+            n = b >> 12
+            while n > 0:
+                data[ j ] = v
+                n -= 1
+                j += 1
+            i += 2
+    else:
+        while i+1 < size:
+            data[ j ] = sdh.dsa.UIntFromBytes( payload[ i:i+2 ] )
+            i += 2
+            j += 1
+    return j
+
+
+def BenchmarkTexels( stream, repeat ):
+    '''Decode the texel values of all frames of \a stream with the former per
+    texel loop and the decoders of sdh.dsa \a repeat times and print the best rates.
+    '''
+    dsa = cStreamDSA( stream )
+    payloads = []
+    while dsa.com.inWaiting() > 0  or  len( dsa._rx_buffer ) > 0: # pylint: disable-msg=W0212
+        payloads.append( dsa._ReadNextResponse().payload ) # pylint: disable-msg=W0212
+
+    decoders = [ ("texel loop (former)", LegacyDecodeTexels, dsa.frame.data),
+                 ("dsa.DecodeTexelsArray", sdh.dsa.DecodeTexelsArray, dsa.frame.data) ]
+    if sdh.dsa.numpy is not None:
+        decoders.append( ("dsa.DecodeTexelsNumPy", sdh.dsa.DecodeTexelsNumPy, dsa.frame.texels) )
+    else:
+        print "(numpy is not available)"
+    for (name, f, data) in decoders:
+        best = None
+        for r in xrange( repeat ): # pylint: disable-msg=W0612
+            start = time.time()
+            for payload in payloads:
+                f( payload, 5, payload[4] & 1, data )
+            elapsed = time.time() - start
+            if best is None  or  elapsed < best:
+                best = elapsed
+        print "%-30s %6d frames in %8.4fs = %10.1f frames/s" % (name, len( payloads ), best, len( payloads ) / best)
+
+def LegacyParseFrame( dsa, response ):
+    '''cDSA._ParseFrame() with the former debug messages that were formatted
+    even if debug messages were off, for comparison.
+    '''
+    frame = dsa._CreateFrame( len( dsa.frame.data ), dsa.frame.data ) # pylint: disable-msg=W0212
+    i = 0
+    # pylint: disable-msg=C0321,W0104,W0212
+    frame.timestamp = sdh.dsa.UIntFromBytes( response.payload[ i:i+4 ] ); i+=4
+    dsa._dbg.var( "frame.timestamp" )
+    frame.flags = sdh.dsa.UIntFromBytes( response.payload[ i:i+1 ] ); i+=1
+    dsa._dbg.var( "frame.flags" )
+    do_RLE = sdh.dsa.Boolify( frame.flags & (1<<0) )
+    if dsa._start_pc == 0:
+        dsa._start_pc  = int(time.time() * 1000.0 + 0.5)
+        dsa._dbg << "Init start_pc  %d \n" % (dsa._start_pc )
+    if dsa._start_dsa == 0:
+        dsa._start_dsa = frame.timestamp
+        dsa._dbg << "Init start_dsa %d\n" % (dsa._start_dsa )
+    diff_pc = int(time.time() * 1000.0 + 0.5) - dsa._start_pc
+    diff_dsa = frame.timestamp - dsa._start_dsa
+    dsa._dbg << "_ParseFrame: elapsed ms pc,dsa = %6d,%6d  age %6d\n" % (diff_pc, diff_dsa, dsa.GetAgeOfFrame(frame))
+    payload = response.payload
+    if do_RLE:
+        dsa._dbg.var( "do_RLE" )
+    if sdh.dsa.numpy is not None:
+        sdh.dsa.DecodeTexelsNumPy( payload, i, do_RLE, frame.texels )
+    else:
+        sdh.dsa.DecodeTexelsArray( payload, i, do_RLE, frame.data )
+    dsa._PublishFrame( frame )
+    response.frame = frame
+    return response
+
+
+def BenchmarkParseFrame( stream, repeat ):
+    '''Parse all frames of \a stream with debug messages off with the former
+    debug messages formatted in vain and with cDSA._ParseFrame() \a repeat times
+    and print the best rates.
+    '''
+    dsa = cStreamDSA( stream )
+    responses = []
+    while dsa.com.inWaiting() > 0  or  len( dsa._rx_buffer ) > 0: # pylint: disable-msg=W0212
+        responses.append( dsa._ReadNextResponse() ) # pylint: disable-msg=W0212
+
+    rates = []
+    for (name, f) in [ ("parse, eager debug (former)", LegacyParseFrame), ("cDSA._ParseFrame", sdh.dsa.cDSA._ParseFrame) ]: # pylint: disable-msg=W0212
+        best = None
+        for r in xrange( repeat ): # pylint: disable-msg=W0612
+            start = time.time()
+            for response in responses:
+                f( dsa, response )
+            elapsed = time.time() - start
+            if best is None  or  elapsed < best:
+                best = elapsed
+        rates.append( len( responses ) / best )
+        print "%-30s %6d frames in %8.4fs = %10.1f frames/s" % (name, len( responses ), best, len( responses ) / best)
+    print "speedup: %.2f" % (rates[1] / rates[0])
+
+def BenchmarkContactForces( stream, repeat ):
+    '''Calculate the contact forces of all sensor matrices for all frames of
+    \a stream with cDSA.GetContactForce() for each matrix and with
+    cDSA.GetContactForces() \a repeat times and print the best rates.
+    '''
+    dsa = cStreamDSA( stream )
+    frames = []
+    while dsa.com.inWaiting() > 0  or  len( dsa._rx_buffer ) > 0: # pylint: disable-msg=W0212
+        frames.append( dsa._ParseFrame( dsa._ReadNextResponse() ).frame ) # pylint: disable-msg=W0212
+
+    def PerMatrix( dsa ):
+        return [ [ dsa.GetContactForce( fi, part ) for part in dsa.all_parts ] for fi in dsa.all_fingers ]
+
+    results = []
+    for (name, f) in [ ("GetContactForce per matrix", PerMatrix), ("GetContactForces", sdh.dsa.cDSA.GetContactForces) ]:
+        best = None
+        for r in xrange( repeat ): # pylint: disable-msg=W0612
+            result = []
+            start = time.time()
+            for frame in frames:
+                dsa.frame = frame
+                result.append( f( dsa ) )
+            elapsed = time.time() - start
+            if best is None  or  elapsed < best:
+                best = elapsed
+        results.append( result )
+        print "%-30s %6d frames in %8.4fs = %10.1f frames/s" % (name, len( frames ), best, len( frames ) / best)
+
+    for (per_matrix, batched) in zip( *results ):
+        for fi in dsa.all_fingers:
+            for part in dsa.all_parts:
+                if per_matrix[fi][part] != tuple( [ batched[k][fi][part] for k in xrange( 4 ) ] ):
+                    print "ERROR: contact forces differ!"
+                    return
+
+######################################################################
+# The main function
+def main():
+    '''Main function of demo script.
+    Parses command line and reacts accordingly.
+    '''
+
+    # Parse (and handle, if possible) the command line options of the script:
+    parser = CreateOptionParser()
+    (options, args) = parser.parse_args()
+
+    ## An object to print script-level debug messages, if requested.
+    _dbg = sdh.dbg.tDBG( flag=options.debug_level>0, fd=options.debug_output )
+    _dbg << "Debug messages of script are printed like this.\n" # pylint: disable-msg=W0104
+    _dbg << sdh.PrettyStruct( "options", options )  # pylint: disable-msg=W0104
+
+    if options.stream:
+        stream = open( options.stream, "rb" ).read()
+    else:
+        stream = CreateStream( options.nb_frames, options.do_RLE )
+    _dbg << "stream has %d bytes\n" % len( stream ) # pylint: disable-msg=W0104
+
+    if options.save_stream:
+        open( options.save_stream, "wb" ).write( stream )
+
+    fps_before = Benchmark( "byte-by-byte decoder (former)", stream, LegacyReadNextResponse, options.repeat )
+    fps_after  = Benchmark( "cDSA._ReadNextResponse", stream, sdh.dsa.cDSA._ReadNextResponse, options.repeat ) # pylint: disable-msg=W0212
+    print "speedup: %.2f" % (fps_after / fps_before)
+
+    BenchmarkCRC( stream, options.repeat )
+    BenchmarkTexels( stream, options.repeat )
+    BenchmarkParseFrame( stream, options.repeat )
+    BenchmarkContactForces( stream, options.repeat )
+
+#
+######################################################################
+
+if __name__ == "__main__":
+    main()
+
+#
+######################################################################
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# -*- coding: latin-1 -*-
+## \addtogroup sdh_library_python_demo_scripts_group
+#  @{
+
+#######################################################################
+## \file
+#  \section sdhlibrary_python_demo_dsa_framelog_py_general General file information
+#
+#    \brief
+#      Print information about a frame log of tactile sensor frames and
+#      the texels of a sensor matrix for a range of time.
+#      See demo-dsa-framelog.__doc__ and the online help ("-h" or "--help")
+#      for a list of available options.
+#
+#  \section sdhlibrary_python_demo_dsa_framelog_py_copyright Copyright
+#
+#  - Copyright (c) 2007 SCHUNK GmbH & Co. KG
+#
+#######################################################################
+
+##
+#  @}
+
+
+#######################################################################
+## \anchor sdhlibrary_python_demo_dsa_framelog_python_vars
+#  \name   Python specific variables
+#
+#  Some definitions that describe the script for python
+#
+#  @{
+
+# pylint: disable-msg=W0622
+## The docstring describing the purpose of the script:
+__doc__ = '''Print information about a frame log of tactile sensor frames:
+Frame logs are written with the --dsa_frame_log=FILE option (or
+with sdh.dsa.cDSA.StartFrameLog()). The log FILE is memory mapped, so
+only the frames requested are read from the file, even for logs with
+hours of tactile data.
+Without further options the number of frames and the range of
+timestamps in the log is printed. With --t0 and --t1 the frames
+within that range of DSA timestamps are selected and for each
+selected frame the maximum texel value of each sensor matrix is
+printed, or all texels of a single sensor matrix with --matrix.
+No hardware is needed, but numpy.
+
+- Example usage:
+  - Print information about frame log grasp.dsalog:
+    > demo-dsa-framelog.py grasp.dsalog
+
+  - Print the maximum texel values of all frames with a DSA timestamp
+    from 10000ms to 12000ms:
+    > demo-dsa-framelog.py --t0=10000 --t1=12000 grasp.dsalog
+
+  - Print the texels of sensor matrix 1 (distal sensor of finger 0)
+    for the same frames:
+    > demo-dsa-framelog.py --t0=10000 --t1=12000 --matrix=1 grasp.dsalog
+'''
+
+__url__       = "http://www.schunk.com"
+__copyright__ = "Copyright (c) 2007 SCHUNK GmbH & Co. KG"
+
+#  end of doxygen name group sdhlibrary_python_demo_dsa_framelog_python_vars
+#  @}
+######################################################################
+
+import time
+
+import sdh
+import sdh.dsaframelog  # pylint: disable-msg=E0611,F0401
+
+######################################################################
+# Command line option handling:
+
+
+def CreateOptionParser():
+    '''Create an option parser specifically for this demo program.
+    '''
+    ## Create an option parser object to parse common command line options:
+    parser = sdh.cSDHOptionParser( usage    =  __doc__ + "\nusage: %prog [options] FRAME_LOG",
+                                   revision = sdh.__version__ )
+    parser.add_option( "--t0",
+                       dest="t0", default=None, type=int, metavar="MS",
+                       help="Select the frames with a DSA timestamp >= MS." )
+    parser.add_option( "--t1",
+                       dest="t1", default=None, type=int, metavar="MS",
+                       help="Select the frames with a DSA timestamp < MS." )
+    parser.add_option( "--matrix",
+                       dest="matrix", default=None, type=int, metavar="M",
+                       help="Print all texels of sensor matrix M of the selected frames." )
+    return parser
+
+#
+######################################################################
+
+
+######################################################################
+# The main function
+def main():
+    '''Main function of demo script.
+    Parses command line and reacts accordingly.
+    '''
+
+    # Parse (and handle, if possible) the command line options of the script:
+    parser = CreateOptionParser()
+    (options, args) = parser.parse_args()
+    if ( len( args ) != 1 ):
+        parser.error( "exactly one frame log file must be given" )
+
+    ## An object to print script-level debug messages, if requested.
+    _dbg = sdh.dbg.tDBG( flag=options.debug_level>0, fd=options.debug_output )
+    _dbg << "Debug messages of script are printed like this.\n" # pylint: disable-msg=W0104
+    _dbg << sdh.PrettyStruct( "options", options )  # pylint: disable-msg=W0104
+
+    log = sdh.dsaframelog.cDSAFrameLog( args[0] )
+    nb_frames = len( log )
+    print "frame log:      %s" % args[0]
+    print "sensor matrices: %s" % ", ".join( [ "%dx%d" % (m.cells_x, m.cells_y) for m in log.matrices ] )
+    print "frames:         %d" % nb_frames
+    if ( nb_frames == 0 ):
+        return
+    first = log.records[0]
+    last = log.records[-1]
+    print "DSA timestamps: %d .. %d ms" % (first["timestamp"], last["timestamp"])
+    print "host time:      %s .. %s" % (time.ctime( first["host_time"] ), time.ctime( last["host_time"] ))
+
+    if ( options.t0 is None  and  options.t1 is None  and  options.matrix is None ):
+        return
+
+    i0 = 0
+    i1 = nb_frames
+    if ( options.t0 is not None ):
+        i0 = log.FindTimestamp( options.t0 )
+    if ( options.t1 is not None ):
+        i1 = log.FindTimestamp( options.t1 )
+    print "selected frames: %d .. %d" % (i0, i1)
+
+    if ( options.matrix is None ):
+        maxima = [ log.GetMatrix( m, slice( i0, i1 ) ).max( axis=2 ).max( axis=1 ) for m in xrange( len( log.matrices ) ) ]
+        for (i, r) in enumerate( log.records[i0:i1] ):
+            print "%8d  %s" % (r["timestamp"], " ".join( [ "%4d" % mx[i] for mx in maxima ] ))
+    else:
+        texels = log.GetMatrix( options.matrix, slice( i0, i1 ) )
+        for (i, r) in enumerate( log.records[i0:i1] ):
+            print "%8d" % r["timestamp"]
+            for row in texels[i]:
+                print "   ", " ".join( [ "%4d" % v for v in row ] )
+
+#
+######################################################################
+
+if __name__ == "__main__":
+    main()
+
+#
+######################################################################
@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+# -*- coding: latin-1 -*-
+## \addtogroup sdh_library_python_demo_scripts_group
+#  @{
+
+#######################################################################
+## \file
+#  \section sdhlibrary_python_demo_dsa_replay_py_general General file information
+#
+#    \brief
+#      Replay a recorded communication with the DSACON32m through an
+#      unmodified sdh.dsa.cDSA object, no hardware needed.
+#      See demo-dsa-replay.__doc__ and the online help ("-h" or "--help")
+#      for a list of available options.
+#
+#  \section sdhlibrary_python_demo_dsa_replay_py_copyright Copyright
+#
+#  - Copyright (c) 2007 SCHUNK GmbH & Co. KG
+#
+#######################################################################
+
+##
+#  @}
+
+
+#######################################################################
+## \anchor sdhlibrary_python_demo_dsa_replay_python_vars
+#  \name   Python specific variables
+#
+#  Some definitions that describe the script for python
+#
+#  @{
+
+# pylint: disable-msg=W0622
+## The docstring describing the purpose of the script:
+__doc__ = '''Replay a recorded communication with the tactile sensor
+controller DSACON32m of an SDH:
+The recording FILE given with --dsa_replay=FILE is replayed through a
+sdh.dsa.cDSA object with its updater thread, exactly like when
+communicating with a real DSACON32m in push mode. The number of frames
+and the achieved rate in frames per second is printed as well as the
+statistics of the communication. Optionally the contact forces of each
+frame are printed.
+No hardware is needed.
+
+Recordings are made with the --dsa_record=FILE option of the demo
+scripts, e.g. of demo-contact-grasping.py. The replay expects that the
+recorded program started the push mode (the updater thread) right after
+connecting, like demo-contact-grasping.py does.
+
+- Example usage:
+  - Replay recording grasp.dsarec in real time:
+    > demo-dsa-replay.py --dsa_replay=grasp.dsarec
+
+  - Replay recording grasp.dsarec as fast as possible, e.g. to measure
+    the decoding throughput:
+    > demo-dsa-replay.py --dsa_replay=grasp.dsarec --dsa_replay_speed=0
+
+  - Print the contact forces of each frame of recording grasp.dsarec:
+    > demo-dsa-replay.py --dsa_replay=grasp.dsarec --dsa_replay_speed=0 --forces
+
+  - Convert recording grasp.dsarec to the frame log grasp.dsalog:
+    > demo-dsa-replay.py --dsa_replay=grasp.dsarec --dsa_replay_speed=0 --dsa_frame_log=grasp.dsalog
+'''
+
+__url__       = "http://www.schunk.com"
+__copyright__ = "Copyright (c) 2007 SCHUNK GmbH & Co. KG"
+
+#  end of doxygen name group sdhlibrary_python_demo_dsa_replay_python_vars
+#  @}
+######################################################################
+
+import sys
+import time
+
+import sdh
+import sdh.dsa  # pylint: disable-msg=E0611,F0401
+
+######################################################################
+# Command line option handling:
+
+
+def CreateOptionParser():
+    '''Create an option parser specifically for this demo program.
+    '''
+    ## Create an option parser object to parse common command line options:
+    parser = sdh.cSDHOptionParser( usage    =  __doc__ + "\nusage: %prog [options]",
+                                   revision = sdh.__version__ )
+    parser.add_option( "--forces",
+                       dest="print_forces", default=False, action="store_true",
+                       help="Print the contact forces (force, x, y, area) of all sensor matrices for each frame." )
+    return parser
+
+#
+######################################################################
+
+
+######################################################################
+# The main function
+def main():
+    '''Main function of demo script.
+    Parses command line and reacts accordingly.
+    '''
+
+    # Parse (and handle, if possible) the command line options of the script:
+    parser = CreateOptionParser()
+    (options, args) = parser.parse_args()
+
+    ## An object to print script-level debug messages, if requested.
+    _dbg = sdh.dbg.tDBG( flag=options.debug_level>0, fd=options.debug_output )
+    _dbg << "Debug messages of script are printed like this.\n" # pylint: disable-msg=W0104
+    _dbg << sdh.PrettyStruct( "options", options )  # pylint: disable-msg=W0104
+
+    if ( options.dsa_replay is None ):
+        parser.error( "a recording must be given with --dsa_replay=FILE" )
+    replay = options.dsaport
+
+    ts = sdh.dsa.cDSA( port=replay, debug_level=options.debug_level-1, debug_output=options.debug_output )
+    framerate = options.framerate
+    if ( framerate <= 0 ):
+        framerate = 30
+
+    if ( options.dsa_frame_log ):
+        ts.StartFrameLog( options.dsa_frame_log )
+
+    start = time.time()
+    last = start
+    ts.StartUpdater( framerate=framerate, do_RLE=options.do_RLE )
+    nb_frames = 0
+    seq = ts.frame.seq
+    while True:
+        try:
+            frame = ts.WaitForFrame( seq, timeout=1.0 )
+        except sdh.dsa.cDSAError:
+            if ( replay.eof  or  replay.stalled ):
+                # end of the recording, or the recording continues only after
+                # a command that this script will never send (like the
+                # SetFramerate(0) sent when the recorded cDSA was closed)
+                break
+            continue
+        last = time.time()
+        nb_frames += frame.seq - seq
+        seq = frame.seq
+        if ( options.print_forces ):
+            (forces, cog_x, cog_y, areas) = ts.GetContactForces( frame )
+            print "%d" % frame.timestamp,
+            for fi in ts.all_fingers:
+                for part in ts.all_parts:
+                    print " %.3f %.1f %.1f %.1f" % (forces[fi][part], cog_x[fi][part], cog_y[fi][part], areas[fi][part]),
+            print
+    elapsed = last - start
+    ts.StopUpdater()
+    ts.StopFrameLog()
+    ts.com.close()
+
+    print >> sys.stderr, "%d frames replayed in %.3fs = %.1f frames/s" % (nb_frames, elapsed, nb_frames / max( elapsed, 1e-6 ))
+    print >> sys.stderr, "statistics:", ts.GetStats()
+
+#
+######################################################################
+
+if __name__ == "__main__":
+    main()
+
+#
+######################################################################
@@ -0,0 +1,235 @@
+#!/usr/bin/env python
+# -*- coding: latin-1 -*-
+## \addtogroup sdh_library_python_demo_scripts_group
+#  @{
+
+#######################################################################
+## \file
+#  \section sdhlibrary_python_demo_dsa_simulator_py_general General file information
+#
+#    \brief
+#      Simulate the tactile sensor controller DSACON32m of an SDH connected
+#      via TCP, so that the other scripts can be used without hardware.
+#      See demo-dsa-simulator.__doc__ and the online help ("-h" or "--help")
+#      for a list of available options.
+#
+#  \section sdhlibrary_python_demo_dsa_simulator_py_copyright Copyright
+#
+#  - Copyright (c) 2007 SCHUNK GmbH & Co. KG
+#
+#######################################################################
+
+##
+#  @}
+
+
+#######################################################################
+## \anchor sdhlibrary_python_demo_dsa_simulator_python_vars
+#  \name   Python specific variables
+#
+#  Some definitions that describe the script for python
+#
+#  @{
+
+# pylint: disable-msg=W0622
+## The docstring describing the purpose of the script:
+__doc__ = '''Simulate the tactile sensor controller DSACON32m connected via TCP:
+The script answers the binary protocol of the DSACON32m until it is
+interrupted with Ctrl-C. The other scripts can connect to it with the
+--dsa_tcp option. Contact blobs move across the sensor matrices, the
+frames are pushed at a fixed rate or as fast as possible (--burst),
+and bit errors and lost bytes can be injected, see the options.
+
+With --measure the script connects a cDSA to the simulator itself, reads
+frames for the given time and reports the rate of decoded frames, the
+communication statistics of the cDSA and the age of the frames. With
+--read_delay a slow reader can be simulated to see how far the frames
+read lag behind.
+
+- Example usage:
+  - Simulate a DSACON32m at TCP port 13000 of the local host:
+    > demo-dsa-simulator.py --listen=127.0.0.1:13000
+    and connect to it from another shell:
+    > demo-dsa-benchmark.py --dsa_tcp=127.0.0.1:13000
+
+  - Measure the maximum rate of frames the cDSA can decode:
+    > demo-dsa-simulator.py --burst --measure=5
+
+  - Measure the decoding with errors and compressible frames:
+    > demo-dsa-simulator.py --fps=100 --rle_ratio=0.2 --bit_error_rate=1e-5 --drop_rate=1e-5 --measure=5
+
+  - See how far the frames lag behind with a slow reader:
+    > demo-dsa-simulator.py --fps=100 --read_delay=0.015 --measure=5
+'''
+
+__url__       = "http://www.schunk.com"
+__copyright__ = "Copyright (c) 2007 SCHUNK GmbH & Co. KG"
+
+#  end of doxygen name group sdhlibrary_python_demo_dsa_simulator_python_vars
+#  @}
+######################################################################
+
+import time
+import multiprocessing
+
+import sdh
+import sdh.dsa     # pylint: disable-msg=E0611,F0401
+import sdh.dsasim  # pylint: disable-msg=E0611,F0401
+
+######################################################################
+# Command line option handling:
+
+
+def CreateOptionParser():
+    '''Create an option parser specifically for this demo program.
+    '''
+    ## Create an option parser object to parse common command line options:
+    parser = sdh.cSDHOptionParser( usage    =  __doc__ + "\nusage: %prog [options]",
+                                   revision = sdh.__version__ )
+    parser.add_option( "--listen",
+                       dest="listen", default="127.0.0.1:13000", type=str, metavar="ADR:PORT",
+                       help="TCP address and port to listen at. Default is '%default'." )
+    parser.add_option( "--fps",
+                       dest="fps", default=30.0, type=float, metavar="FPS",
+                       help="Rate of the frames sent in push mode. Default is %default." )
+    parser.add_option( "--burst",
+                       dest="burst", default=False, action="store_true",
+                       help="Push the frames as fast as they are read instead of at the rate of --fps." )
+    parser.add_option( "--rle_ratio",
+                       dest="rle_ratio", default=None, type=float, metavar="RATIO",
+                       help="Size of the RLE encoded frames relative to not encoded frames (1/15 .. 1). Default is best compression." )
+    parser.add_option( "--bit_error_rate",
+                       dest="bit_error_rate", default=0.0, type=float, metavar="P",
+                       help="Probability that a bit sent is flipped. Default is 0." )
+    parser.add_option( "--drop_rate",
+                       dest="drop_rate", default=0.0, type=float, metavar="P",
+                       help="Probability that a byte sent is lost. Default is 0." )
+    parser.add_option( "--seed",
+                       dest="seed", default=None, type=int, metavar="SEED",
+                       help="Seed of the random numbers for the errors. Default is random." )
+    parser.add_option( "--measure",
+                       dest="measure", default=None, type=float, metavar="SECONDS",
+                       help="Connect a cDSA to the simulator and measure the reading of frames for SECONDS, then exit." )
+    parser.add_option( "--read_delay",
+                       dest="read_delay", default=0.0, type=float, metavar="SECONDS",
+                       help="With --measure: additional time in seconds to process each frame read. Default is 0." )
+    return parser
+
+#
+######################################################################
+
+
+######################################################################
+# The simulator process for --measure
+def Serve( simulator_options ):
+    '''Serve a cDSASimulator with \a simulator_options, to be run in a separate process
+    (a thread would compete with the decoding for the interpreter).
+    '''
+    try:
+        sdh.dsasim.cDSASimulator( simulator_options ).Serve()
+    except KeyboardInterrupt:
+        pass
+
+#
+######################################################################
+
+
+######################################################################
+# The measurement
+def Measure( options, port ):
+    '''Read frames from the simulator at \a port for options.measure seconds and print the results.
+    '''
+    ts = sdh.dsa.cDSA( port=port, debug_level=options.debug_level-1, debug_output=options.debug_output )
+    try:
+        ts.SetFramerate( 1, options.do_RLE )
+        while True:
+            try:
+                ts.ReadFrame()
+                break
+            except sdh.dsa.cDSAError:
+                pass
+        ages = [ ts.GetAgeOfFrame() ]
+        ts.ResetStats()
+        nb_frames = 0
+        nb_exceptions = 0
+        t0 = time.time()
+        while time.time() - t0 < options.measure:
+            try:
+                ts.ReadFrame()
+            except sdh.dsa.cDSAError:
+                # ReadFrame resyncs with the next frame
+                nb_exceptions += 1
+                continue
+            nb_frames += 1
+            if ( options.read_delay > 0.0 ):
+                time.sleep( options.read_delay )
+        elapsed = time.time() - t0
+        ages.append( ts.GetAgeOfFrame() )
+        stats = ts.GetStats()
+        ts.SetFramerateRetries( 0, options.do_RLE, False, 3, True )
+    finally:
+        ts.Close()
+
+    print "frames decoded:   %d in %.3fs = %.1f frames/s" % (nb_frames, elapsed, nb_frames / elapsed)
+    print "frame age:        %d ms at start, %d ms at end" % (ages[0], ages[-1])
+    print "interval:         %.2f ms mean, %.2f ms max" % (stats.interval_mean, stats.interval_max)
+    print "errors:           %d exceptions, %d crc errors, %d timeouts, %d resyncs, %d bytes dropped" % (nb_exceptions, stats.crc_errors, stats.timeouts, stats.resyncs, stats.bytes_dropped)
+
+#
+######################################################################
+
+
+######################################################################
+# The main function
+def main():
+    '''Main function of demo script.
+    Parses command line and reacts accordingly.
+    '''
+
+    # Parse (and handle, if possible) the command line options of the script:
+    parser = CreateOptionParser()
+    (options, args) = parser.parse_args()
+
+    ## An object to print script-level debug messages, if requested.
+    _dbg = sdh.dbg.tDBG( flag=options.debug_level>0, fd=options.debug_output )
+    _dbg << "Debug messages of script are printed like this.\n" # pylint: disable-msg=W0104
+    _dbg << sdh.PrettyStruct( "options", options )  # pylint: disable-msg=W0104
+
+    adr_port = options.listen.split( ":" )
+    if ( len( adr_port ) != 2 ):
+        parser.error( "--listen needs ADR:PORT" )
+
+    simulator_options = dict( debug_level=options.debug_level-1,
+                              tcp_adr=adr_port[0], tcp_port=int( adr_port[1] ),
+                              fps=options.fps, burst=options.burst, rle_ratio=options.rle_ratio,
+                              bit_error_rate=options.bit_error_rate, drop_rate=options.drop_rate, seed=options.seed )
+
+    if ( options.measure is None ):
+        simulator_options[ "debug_output" ] = options.debug_output
+        simulator = sdh.dsasim.cDSASimulator( simulator_options )
+        print "Simulating a DSACON32m at %s, connect with --dsa_tcp=%s (Ctrl-C to stop)" % (options.listen, options.listen)
+        try:
+            simulator.Serve()
+        except KeyboardInterrupt:
+            print "stopped"
+        return
+
+    server = multiprocessing.Process( target=Serve, args=( simulator_options, ) )
+    server.daemon = True
+    server.start()
+    try:
+        # wait until the simulator listens:
+        time.sleep( 0.5 )
+        Measure( options, options.listen )
+    finally:
+        server.terminate()
+        server.join()
+
+#
+######################################################################
+
+if __name__ == "__main__":
+    main()
+
+#
+######################################################################
@@ -318,7 +318,7 @@ def main():
     print "Connecting to remote DSACON32m in SDH via %r." % (options.dsaport)
     print "This may take up to 8 seconds..."
     # pylint: disable-msg=E1101    
-    ts = sdh.dsa.cDSA( port=options.dsaport, debug_level= options.debug_level-1, baudrate=options.baudrate, timeout=options.timeout, debug_output=options.debug_output )
+    ts = sdh.dsa.cDSA( port=options.dsaport, debug_level= options.debug_level-1, baudrate=options.baudrate, timeout=options.timeout, debug_output=options.debug_output, record=options.dsa_record )
     print "Connected.\n"
     
     if ( options.calib_pressure ):
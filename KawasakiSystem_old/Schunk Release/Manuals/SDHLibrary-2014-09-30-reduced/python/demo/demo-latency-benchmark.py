@@ -0,0 +1,389 @@
+#!/usr/bin/env python
+# -*- coding: latin-1 -*-
+## \addtogroup sdh_library_python_demo_scripts_group
+#  @{
+
+#######################################################################
+## \file
+#  \section sdhlibrary_python_demo_latency_benchmark_py_general General file information
+#
+#    \brief
+#      Benchmark for the round trip latency of the SDH commands, per
+#      command family, via any communication interface.
+#      See demo-latency-benchmark.__doc__ and the online help ("-h" or "--help")
+#      for a list of available options.
+#
+#  \section sdhlibrary_python_demo_latency_benchmark_py_copyright Copyright
+#
+#  - Copyright (c) 2007 SCHUNK GmbH & Co. KG
+#
+#######################################################################
+
+##
+#  @}
+
+
+#######################################################################
+## \anchor sdhlibrary_python_demo_latency_benchmark_python_vars
+#  \name   Python specific variables
+#
+#  Some definitions that describe the script for python
+#
+#  @{
+
+# pylint: disable-msg=W0622
+## The docstring describing the purpose of the script:
+__doc__ = '''Benchmark for the round trip latency of the SDH commands:
+The commands of cSDH are called repeatedly, one command after the
+other, grouped in the families:
+- getters:  reading actual and target values (GetAxisActualAngle() ...)
+- setters:  writing target values (SetAxisTargetAngle() ...)
+- moves:    starting and stopping movements (MoveAxis(), Stop())
+- combined: setting targets and getting actual values with one
+            command (tpap = SetAxisTargetGetAxisActualAngle(),
+            tvav = SetAxisTargetGetAxisActualVelocity())
+For each command the percentiles p50, p95, p99 and the maximum of the
+round trip latency, the throughput and the bytes sent and received per
+call are reported. With --json the results are written to a file as
+well, to compare runs with different communication interfaces, cables
+or library versions.
+
+The hand does not move: the target angles are set to the actual angles
+and the target velocities to 0.
+
+Any communication interface can be used (RS232, CAN, TCP). With
+--simulate an SDH is simulated (see demo-sdh-simulator.py) in a
+separate process and connected via TCP, no hardware is needed.
+
+With --overhead no SDH is used: only the time the enabled
+instrumentation (see sdh.instrumentation and the --instrumentation
+option) adds per command is measured, i.e. the clock read before
+sending and the recording of the reply.
+
+- Example usage:
+  - Benchmark an SDH connected to USB to RS232 converter 0:
+    > demo-latency-benchmark.py --sdh_rs_device=/dev/ttyUSB0 --json=rs232.json --label="USB-RS232"
+
+  - Benchmark an SDH connected via Ethernet:
+    > demo-latency-benchmark.py --tcp=192.168.1.42:23 --json=tcp.json --label="Ethernet"
+
+  - Benchmark the getters and combined commands only against a simulated SDH:
+    > demo-latency-benchmark.py --simulate --families=getters,combined
+
+  - Measure the overhead per command of the instrumentation:
+    > demo-latency-benchmark.py --overhead
+'''
+
+__url__       = "http://www.schunk.com"
+__copyright__ = "Copyright (c) 2007 SCHUNK GmbH & Co. KG"
+
+#  end of doxygen name group sdhlibrary_python_demo_latency_benchmark_python_vars
+#  @}
+######################################################################
+
+import sys
+import time
+import json
+import multiprocessing
+
+import sdh
+import sdh.sdhsim  # pylint: disable-msg=E0611,F0401
+import sdh.instrumentation  # pylint: disable-msg=E0611,F0401
+
+## The command families in the order they are benchmarked
+FAMILIES = [ "getters", "setters", "moves", "combined" ]
+
+######################################################################
+# Command line option handling:
+
+
+def CreateOptionParser():
+    '''Create an option parser specifically for this demo program.
+    '''
+    ## Create an option parser object to parse common command line options:
+    parser = sdh.cSDHOptionParser( usage    =  __doc__ + "\nusage: %prog [options]",
+                                   revision = sdh.__version__ )
+    parser.add_option( "--nb_commands",
+                       dest="nb_commands", default=200, type=int, metavar="N",
+                       help="Number of calls of each command. Default is %default." )
+    parser.add_option( "--families",
+                       dest="families", default=",".join( FAMILIES ), type=str, metavar="LIST",
+                       help="Comma separated list of the command families to benchmark. Default is '%default'." )
+    parser.add_option( "--json",
+                       dest="json", default=None, type=str, metavar="FILE",
+                       help="Write the results to FILE in JSON format." )
+    parser.add_option( "--label",
+                       dest="label", default="", type=str, metavar="TEXT",
+                       help="Description of the run (like the cable used), stored in the JSON file." )
+    parser.add_option( "--simulate",
+                       dest="simulate", default=False, action="store_true",
+                       help="Benchmark a simulated SDH, connected via TCP, instead of a real one." )
+    parser.add_option( "--overhead",
+                       dest="overhead", default=False, action="store_true",
+                       help="Do not use an SDH, only measure the overhead per command of the instrumentation." )
+    return parser
+
+#
+######################################################################
+
+
+class cCountingCom( object ):
+    '''Communication object that counts the bytes written and read
+    by the wrapped communication object \a com of a cSDHSerial.
+    '''
+    def __init__( self, com ):
+        self.com = com
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def _GetTimeout( self ):
+        return self.com.timeout
+
+    def _SetTimeout( self, value ):
+        self.com.timeout = value
+
+    timeout = property( _GetTimeout, _SetTimeout )
+
+    def write( self, s ):
+        self.bytes_sent += len( s )
+        return self.com.write( s )
+
+    def read( self, length ):
+        data = self.com.read( length )
+        self.bytes_received += len( data )
+        return data
+
+    def readline( self ):
+        data = self.com.readline()
+        self.bytes_received += len( data )
+        return data
+
+    def __getattr__( self, name ):
+        return getattr( self.com, name )
+
+
+def Percentile( sorted_values, p ):
+    '''Return the \a p percentile (0..100) of the list \a sorted_values (nearest rank).
+    '''
+    i = int( round( p / 100.0 * len( sorted_values ) + 0.5 ) ) - 1
+    return sorted_values[ min( max( i, 0 ), len( sorted_values ) - 1 ) ]
+
+
+def Benchmark( com, family, name, command, nb_commands ):
+    '''Call \a command() \a nb_commands times and return a dictionary with the results
+    (latencies in ms). Calls raising a cSDHError are counted as errors and not included in the latencies.
+    '''
+    latencies = []
+    nb_errors = 0
+    bytes_sent = com.bytes_sent
+    bytes_received = com.bytes_received
+    start = time.time()
+    for i in xrange( nb_commands ): # pylint: disable-msg=W0612
+        t0 = time.time()
+        try:
+            command()
+        except sdh.cSDHError:
+            nb_errors += 1
+            continue
+        latencies.append( (time.time() - t0) * 1000.0 )
+    elapsed = time.time() - start
+
+    result = dict( family=family, command=name, calls=nb_commands, errors=nb_errors,
+                   throughput=nb_commands / elapsed,
+                   bytes_sent=float( com.bytes_sent - bytes_sent ) / nb_commands,
+                   bytes_received=float( com.bytes_received - bytes_received ) / nb_commands )
+    latencies.sort()
+    if ( latencies ):
+        result.update( mean=sum( latencies ) / len( latencies ),
+                       p50=Percentile( latencies, 50 ), p95=Percentile( latencies, 95 ), p99=Percentile( latencies, 99 ),
+                       max=latencies[-1] )
+    else:
+        result.update( mean=None, p50=None, p95=None, p99=None, max=None )
+    return result
+
+
+def MeasureOverhead( nb_commands, repeat=50 ):
+    '''Return the time in us that the enabled instrumentation adds per command of
+    cSDHSerial: the clock read before sending and cInstrumentation.Record() for the reply.
+    The best of \a repeat runs of \a nb_commands commands is taken, minus the loop itself.
+    '''
+    instrumentation = sdh.instrumentation.cInstrumentation( "overhead", sdh.instrumentation.SDHCommandName, sdh.instrumentation.SDHRequestSize )
+    record = instrumentation.Record
+    now = time.time
+    commands = [ "p(%d)" % i for i in xrange( 7 ) ] + [ "p" ]
+    loop = xrange( nb_commands // len( commands ) )
+    best_recorded = best_empty = None
+    for r in xrange( repeat ): # pylint: disable-msg=W0612
+        start = now()
+        for i in loop: # pylint: disable-msg=W0612
+            for s in commands:
+                t0 = now()
+                record( s, t0, 20 )
+        recorded = now() - start
+        start = now()
+        for i in loop: # pylint: disable-msg=W0612
+            for s in commands:
+                pass
+        empty = now() - start
+        if ( best_recorded is None  or  recorded < best_recorded ):
+            best_recorded = recorded
+        if ( best_empty is None  or  empty < best_empty ):
+            best_empty = empty
+    return (best_recorded - best_empty) * 1e6 / (len( loop ) * len( commands ))
+
+
+def PrintHeader():
+    '''Print the header of the table printed by PrintResult().
+    '''
+    print "%-9s %-34s %8s %8s %8s %8s %10s %8s %8s %6s" % ("family", "command", "p50[ms]", "p95[ms]", "p99[ms]", "max[ms]", "calls/s", "sent[B]", "recv[B]", "errors")
+
+
+def PrintResult( result ):
+    '''Print the \a result returned by Benchmark() as line of a table.
+    '''
+    if ( result[ "p50" ] is None ):
+        latencies = "%8s %8s %8s %8s" % ( ("-",) * 4 )
+    else:
+        latencies = "%8.3f %8.3f %8.3f %8.3f" % (result[ "p50" ], result[ "p95" ], result[ "p99" ], result[ "max" ])
+    print "%-9s %-34s %s %10.1f %8.1f %8.1f %6d" % (result[ "family" ], result[ "command" ], latencies,
+                                                   result[ "throughput" ], result[ "bytes_sent" ], result[ "bytes_received" ], result[ "errors" ])
+    sys.stdout.flush()
+
+
+def GetCommands( hand, family ):
+    '''Return a list of (name, prepare, command) tuples with the commands of \a family.
+    prepare() (if not None) must be called once before command() is benchmarked.
+    '''
+    All = sdh.All
+    if ( family == "getters" ):
+        return [ ("GetAxisActualAngle(All)",            None, lambda: hand.GetAxisActualAngle( All )),
+                 ("GetAxisActualVelocity(All)",         None, lambda: hand.GetAxisActualVelocity( All )),
+                 ("GetAxisActualState(All)",            None, lambda: hand.GetAxisActualState( All )),
+                 ("GetAxisTargetAngle(All)",            None, lambda: hand.GetAxisTargetAngle( All )),
+                 ("GetTemperature(All)",                None, lambda: hand.GetTemperature( All )) ]
+
+    # all other commands keep the hand where it is:
+    hand.SetController( hand.eControllerType[ "eCT_POSE" ] )
+    angles = hand.GetAxisActualAngle( All )
+    hand.SetAxisTargetAngle( All, angles )
+    velocities = hand.GetAxisTargetVelocity( All )
+    accelerations = hand.GetAxisTargetAcceleration( All )
+    if ( family == "setters" ):
+        return [ ("SetAxisTargetAngle(All)",            None, lambda: hand.SetAxisTargetAngle( All, angles )),
+                 ("SetAxisTargetVelocity(All)",         None, lambda: hand.SetAxisTargetVelocity( All, velocities )),
+                 ("SetAxisTargetAcceleration(All)",     None, lambda: hand.SetAxisTargetAcceleration( All, accelerations )),
+                 ("SetAxisTargetAngle(0)",              None, lambda: hand.SetAxisTargetAngle( 0, angles[0] )) ]
+    if ( family == "moves" ):
+        return [ ("MoveAxis(All, sequ=False)",          None, lambda: hand.MoveAxis( All, False )),
+                 ("Stop()",                             None, hand.Stop) ]
+    if ( family == "combined" ):
+        zeros = [ 0.0 ] * hand.NUMBER_OF_AXES
+        return [ ("SetAxisTargetGetAxisActualAngle",    None, lambda: hand.SetAxisTargetGetAxisActualAngle( All, angles )),
+                 ("SetAxisTargetGetAxisActualVelocity",
+                  lambda: hand.SetController( hand.eControllerType[ "eCT_VELOCITY_ACCELERATION" ] ),
+                  lambda: hand.SetAxisTargetGetAxisActualVelocity( All, zeros )) ]
+    raise ValueError( "unknown command family '%s'" % family )
+
+
+def Serve( simulator_options ):
+    '''Serve a cSDHSimulator with \a simulator_options, to be run in a separate process
+    so that it does not compete with the benchmark for the interpreter.
+    '''
+    try:
+        sdh.sdhsim.cSDHSimulator( simulator_options ).Serve()
+    except KeyboardInterrupt:
+        pass
+
+
+######################################################################
+# The main function
+def main():
+    '''Main function of demo script.
+    Parses command line and reacts accordingly.
+    '''
+
+    # Parse (and handle, if possible) the command line options of the script:
+    parser = CreateOptionParser()
+    (options, args) = parser.parse_args()
+
+    ## An object to print script-level debug messages, if requested.
+    _dbg = sdh.dbg.tDBG( flag=options.debug_level>0, fd=options.debug_output )
+    _dbg << "Debug messages of script are printed like this.\n" # pylint: disable-msg=W0104
+    _dbg << sdh.PrettyStruct( "options", options )  # pylint: disable-msg=W0104
+
+    if ( options.overhead ):
+        print "Instrumentation overhead per command: %.3f us" % MeasureOverhead( max( options.nb_commands, 10000 ) )
+        return
+
+    families = options.families.split( "," )
+    for family in families:
+        if ( family not in FAMILIES ):
+            parser.error( "unknown command family '%s', known are %s" % (family, ", ".join( FAMILIES )) )
+
+    # reduce debug level for subsystems
+    options.debug_level-=1
+    if ( options.timeout is None ):
+        options.timeout = 1.0  # a real timeout is needed to count lost replies as errors
+
+    server = None
+    if ( options.simulate ):
+        options.usecan = False
+        options.usetcp = True
+        options.tcp_adr = "127.0.0.1"
+        options.tcp_port = 2324
+        server = multiprocessing.Process( target=Serve, args=( dict( tcp_adr=options.tcp_adr, tcp_port=options.tcp_port ), ) )
+        server.daemon = True
+        server.start()
+        # wait until the simulator listens:
+        time.sleep( 0.5 )
+
+    hand = sdh.cSDH( options=options.__dict__ )
+    try:
+        hand.Open()
+        try:
+            com = cCountingCom( hand.interface.com )
+            hand.interface.com = com
+
+            interface = sdh.GetCommunicationInterfaceName( options.__dict__ )
+            if ( options.simulate ):
+                interface += " simulated"
+            run = dict( label=options.label,
+                        date=time.strftime( "%Y-%m-%d %H:%M:%S" ),
+                        library_release=sdh.release.PROJECT_RELEASE,
+                        firmware_release=hand.GetFirmwareRelease(),
+                        interface=interface,
+                        shadow_state=options.shadow_state,
+                        nb_commands=options.nb_commands,
+                        results=[] )
+            print "Benchmarking SDH firmware %s via %s, %d calls per command" % (run[ "firmware_release" ], interface, options.nb_commands)
+            PrintHeader()
+            for family in families:
+                for (name, prepare, command) in GetCommands( hand, family ):
+                    if ( prepare is not None ):
+                        prepare()
+                    result = Benchmark( com, family, name, command, options.nb_commands )
+                    PrintResult( result )
+                    run[ "results" ].append( result )
+
+            hand.SetController( hand.eControllerType[ "eCT_POSE" ] )
+        finally:
+            hand.Close()
+
+        if ( options.json ):
+            f = open( options.json, "w" )
+            json.dump( run, f, indent=2, sort_keys=True )
+            f.close()
+            print "Results written to %s" % options.json
+    finally:
+        if ( server is not None ):
+            server.terminate()
+            server.join()
+
+#
+######################################################################
+
+if __name__ == "__main__":
+    main()
+
+#
+######################################################################
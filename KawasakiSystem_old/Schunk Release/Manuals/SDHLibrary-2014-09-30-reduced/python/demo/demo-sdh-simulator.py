@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+# -*- coding: latin-1 -*-
+## \addtogroup sdh_library_python_demo_scripts_group
+#  @{
+
+#######################################################################
+## \file
+#  \section sdhlibrary_python_demo_sdh_simulator_py_general General file information
+#
+#    \brief
+#      Simulate an SDH connected via TCP, so that the other scripts
+#      can be used without hardware.
+#      See demo-sdh-simulator.__doc__ and the online help ("-h" or "--help")
+#      for a list of available options.
+#
+#  \section sdhlibrary_python_demo_sdh_simulator_py_copyright Copyright
+#
+#  - Copyright (c) 2007 SCHUNK GmbH & Co. KG
+#
+#######################################################################
+
+##
+#  @}
+
+
+#######################################################################
+## \anchor sdhlibrary_python_demo_sdh_simulator_python_vars
+#  \name   Python specific variables
+#
+#  Some definitions that describe the script for python
+#
+#  @{
+
+# pylint: disable-msg=W0622
+## The docstring describing the purpose of the script:
+__doc__ = '''Simulate an SDH connected via TCP:
+The script answers the commands of the SDH firmware (joint controllers
+only, no tactile sensors) until it is interrupted with Ctrl-C. The other
+scripts can connect to it with the --tcp option, e.g. to measure the
+communication or the waiting for movements reproducibly without a hand.
+The axes move with simple dynamics, the replies can be delayed and
+errors can be injected, see the options.
+
+- Example usage:
+  - Simulate an SDH at TCP port 2323 of the local host:
+    > demo-sdh-simulator.py --listen=127.0.0.1:2323
+    and connect to it from another shell:
+    > demo-benchmark.py --tcp=127.0.0.1:2323
+
+  - Simulate a slow network with 2ms +- 0.5ms latency and 1% lost replies:
+    > demo-sdh-simulator.py --latency=0.0015 --jitter=0.001 --drop_rate=0.01
+'''
+
+__url__       = "http://www.schunk.com"
+__copyright__ = "Copyright (c) 2007 SCHUNK GmbH & Co. KG"
+
+#  end of doxygen name group sdhlibrary_python_demo_sdh_simulator_python_vars
+#  @}
+######################################################################
+
+import sdh
+import sdh.sdhsim  # pylint: disable-msg=E0611,F0401
+
+######################################################################
+# Command line option handling:
+
+
+def CreateOptionParser():
+    '''Create an option parser specifically for this demo program.
+    '''
+    ## Create an option parser object to parse common command line options:
+    parser = sdh.cSDHOptionParser( usage    =  __doc__ + "\nusage: %prog [options]",
+                                   revision = sdh.__version__ )
+    parser.add_option( "--listen",
+                       dest="listen", default="127.0.0.1:2323", type=str, metavar="ADR:PORT",
+                       help="TCP address and port to listen at. Default is '%default'." )
+    parser.add_option( "--latency",
+                       dest="latency", default=0.0, type=float, metavar="SECONDS",
+                       help="Delay of each reply line in seconds. Default is 0." )
+    parser.add_option( "--jitter",
+                       dest="jitter", default=0.0, type=float, metavar="SECONDS",
+                       help="Maximum random delay in seconds added to the latency of each reply line. Default is 0." )
+    parser.add_option( "--line_time",
+                       dest="line_time", default=0.0, type=float, metavar="SECONDS",
+                       help="Time in seconds to process a command. Default is 0." )
+    parser.add_option( "--error_rate",
+                       dest="error_rate", default=0.0, type=float, metavar="P",
+                       help="Probability that a command is answered with an error (E_CMD_FAILED). Default is 0." )
+    parser.add_option( "--drop_rate",
+                       dest="drop_rate", default=0.0, type=float, metavar="P",
+                       help="Probability that a reply line is lost. Default is 0." )
+    parser.add_option( "--seed",
+                       dest="seed", default=None, type=int, metavar="SEED",
+                       help="Seed of the random numbers for the jitter and the errors. Default is random." )
+    return parser
+
+#
+######################################################################
+
+
+######################################################################
+# The main function
+def main():
+    '''Main function of demo script.
+    Parses command line and reacts accordingly.
+    '''
+
+    # Parse (and handle, if possible) the command line options of the script:
+    parser = CreateOptionParser()
+    (options, args) = parser.parse_args()
+
+    ## An object to print script-level debug messages, if requested.
+    _dbg = sdh.dbg.tDBG( flag=options.debug_level>0, fd=options.debug_output )
+    _dbg << "Debug messages of script are printed like this.\n" # pylint: disable-msg=W0104
+    _dbg << sdh.PrettyStruct( "options", options )  # pylint: disable-msg=W0104
+
+    adr_port = options.listen.split( ":" )
+    if ( len( adr_port ) != 2 ):
+        parser.error( "--listen needs ADR:PORT" )
+
+    simulator = sdh.sdhsim.cSDHSimulator( dict( debug_level=options.debug_level-1, debug_output=options.debug_output,
+                                                tcp_adr=adr_port[0], tcp_port=int( adr_port[1] ),
+                                                latency=options.latency, jitter=options.jitter, line_time=options.line_time,
+                                                error_rate=options.error_rate, drop_rate=options.drop_rate, seed=options.seed ) )
+    print "Simulating an SDH at %s, connect with --tcp=%s (Ctrl-C to stop)" % (options.listen, options.listen)
+    try:
+        simulator.Serve()
+    except KeyboardInterrupt:
+        print "stopped"
+
+#
+######################################################################
+
+if __name__ == "__main__":
+    main()
+
+#
+######################################################################
@@ -293,7 +293,7 @@ def main():
     ## Create a ts (tactile sensor) object of the class cDSA according to the given options:
     print "Connecting to remote DSACON32m in SDH via RS232 port %r" % (options.dsaport)
     print "This may take up to 8 seconds..."
-    ts = sdh.dsa.cDSA( port=options.dsaport, debug_level=options.debug_level-1, debug_output=options.debug_output )
+    ts = sdh.dsa.cDSA( port=options.dsaport, debug_level=options.debug_level-1, debug_output=options.debug_output, record=options.dsa_record )
     print "Connected.\n"
     
     #-----------
@@ -0,0 +1,235 @@
+# -*- coding: latin-1 -*-
+#######################################################################
+#
+## \file
+#  \section sdhlibrary_python_asyncdsa_py_general General file information
+#
+#  \brief
+#    Non blocking access to the tactile sensor controller DSACON32m,
+#    driven by an eventloop.cEventLoop.
+#
+#  \section sdhlibrary_python_asyncdsa_py_copyright Copyright
+#
+#  Copyright (c) 2007 SCHUNK GmbH & Co. KG
+#
+#######################################################################
+
+
+#######################################################################
+## \anchor sdhlibrary_python_asyncdsa_py_python_vars
+#  \name   Python specific variables
+#
+#  Some definitions that describe the module for python.
+#
+#  @{
+
+__doc__       = "Non blocking access to the tactile sensor controller, driven by an event loop."
+__url__       = "http://www.schunk.com"
+__copyright__ = "Copyright (c) 2007 SCHUNK GmbH & Co. KG"
+
+#  end of doxygen name group sdhlibrary_python_asyncdsa_py_python_vars
+#  @}
+######################################################################
+
+#######################################################################
+## \package asyncdsa
+#
+#  \brief
+#    A cAsyncDSA replaces the updater thread of a cDSA object (see
+#    cDSA.StartUpdater()): The bytes sent by the DSACON32m are read by
+#    an eventloop.cEventLoop whenever the communication object is
+#    readable and decoded with the packet parsing of cDSA. So the frames
+#    are published in the cDSA object as usual (cDSA.frame, frame log,
+#    statistics, GetContactForces() etc.), and additionally the futures
+#    returned by NextFrame() are completed.
+#
+#    Several frames might be decoded from the bytes of a single read. The
+#    frames not yet taken with NextFrame() are kept in a queue of at most
+#    \a queue_size frames (see cAsyncDSA.__init__()), so NextFrame() called
+#    in a loop iterates over all frames received, in order. If the consumer
+#    is too slow then the oldest frames are dropped and counted in
+#    cAsyncDSA.nb_frames_skipped.
+#
+#    Example: print the contact forces of each frame within an event loop
+#    \code
+#      def PrintForces( ts ):
+#          yield ts.Start( framerate=30 )
+#          while True:
+#              frame = yield ts.NextFrame()
+#              print ts.dsa.GetContactForces( frame )[0]
+#
+#      ts = sdh.asyncdsa.cAsyncDSA( loop, sdh.dsa.cDSA( port="192.168.1.42:13000" ) )
+#      task = loop.CreateTask( PrintForces( ts ) )
+#    \endcode
+#
+#######################################################################
+
+import collections
+
+from .dsa import cDSAError, LB, HB, UIntFromBytes
+from . import eventloop
+
+
+#-----------------------------------------------------------------
+class cAsyncDSA( object ):
+    '''
+    Non blocking access to the DSACON32m, driven by an eventloop.cEventLoop.
+    See the package documentation of asyncdsa.
+    '''
+    def __init__( self, loop, dsa, queue_size=64 ):
+        '''
+        Constructor of cAsyncDSA: use the connected cDSA object \a dsa
+        (via RS232 or TCP) with the eventloop.cEventLoop \a loop.
+        The updater thread of \a dsa must not be running.
+        At most \a queue_size frames received but not yet taken with
+        NextFrame() are kept, older frames are dropped.
+        '''
+        if ( not hasattr( dsa.com, "fileno" ) ):
+            raise cDSAError( "cAsyncDSA needs a connection via RS232 or TCP, not %r" % (dsa.com,) )
+        if ( dsa._updater is not None ): # pylint: disable-msg=W0212
+            raise cDSAError( "cAsyncDSA cannot be used while the updater thread of the cDSA object is running" )
+
+        ## The event loop driving this object
+        self.loop = loop
+
+        ## The cDSA object that decodes and publishes the frames
+        self.dsa = dsa
+
+        # the futures waiting for the next frame
+        self._frame_waiters = []
+
+        # the frames received while no future was waiting, oldest first
+        self._frames = collections.deque( maxlen=max( int( queue_size ), 1 ) )
+
+        ## The number of frames dropped from the full queue before they were taken with NextFrame()
+        self.nb_frames_skipped = 0
+
+        # the commands sent and not yet acknowledged: (packet id, future)
+        self._pending = collections.deque()
+
+        loop.AddReader( dsa.com, self._OnReadable )
+
+    def Close( self ):
+        '''
+        Stop reading from the DSACON32m. Pending futures fail with a cDSAError.
+        The cDSA object is not closed.
+        '''
+        self.loop.RemoveReader( self.dsa.com )
+        self._Fail( cDSAError( "cAsyncDSA was closed" ) )
+
+    def _Fail( self, exception ):
+        '''Non public helper function: make all pending futures fail with \a exception.
+        '''
+        waiters = self._frame_waiters + [ future for (packet_id, future) in self._pending ]
+        self._frame_waiters = []
+        self._pending = collections.deque()
+        for future in waiters:
+            future.set_exception( exception )
+
+    def _Configure( self, framerate, do_RLE, do_data_acquisition ):
+        '''Non public helper function: send a data acquisition command like cDSA.SetFramerate()
+        and return a future for its acknowledge.
+        '''
+        dsa = self.dsa
+        command = dsa.eDSAPacketID[ "eDSA_CONFIGURE_DATA_ACQUISITION" ]
+        future = eventloop.cFuture()
+        self._pending.append( (command, future) )
+        dsa._WriteCommandWithPayload( command, [ dsa._CommandFlags( do_data_acquisition, False, do_RLE ), LB( framerate ), HB( framerate ) ] ) # pylint: disable-msg=W0212
+        dsa._framerate = framerate # pylint: disable-msg=W0212
+        return future
+
+    def Start( self, framerate, do_RLE=True ):
+        '''
+        Make the DSACON32m send frames with \a framerate (push mode, like cDSA.StartUpdater()).
+        Return a future that is done when the DSACON32m acknowledged the command.
+        '''
+        return self._Configure( framerate, do_RLE, True )
+
+    def Stop( self ):
+        '''
+        Make the DSACON32m stop sending frames.
+        Return a future that is done when the DSACON32m acknowledged the command.
+        '''
+        return self._Configure( 0, True, False )
+
+    def NextFrame( self ):
+        '''
+        Return a future for the next frame received (a frame structure like cDSA.frame).
+        Call this again in a loop to iterate over the frames received: If frames
+        were queued in the meantime then the future returned is done already
+        with the oldest of them.
+        '''
+        future = eventloop.cFuture()
+        if ( self._frames ):
+            future.set_result( self._frames.popleft() )
+        else:
+            self._frame_waiters.append( future )
+        return future
+
+    def _OnReadable( self ):
+        '''Non public helper function: read the bytes available, decode and publish the complete packets.
+        '''
+        dsa = self.dsa
+        s = dsa.read( dsa.GetNbBytesReadable() )
+        if ( not s ):
+            # readable but no bytes: the connection was closed
+            self.loop.RemoveReader( dsa.com )
+            self._Fail( cDSAError( "Connection to DSACON32m closed" ) )
+            return
+        dsa._rx_buffer.extend( s ) # pylint: disable-msg=W0212
+
+        full_frame = dsa.eDSAPacketID[ "eDSA_FULL_FRAME" ]
+        while True:
+            try:
+                response = dsa._ParseBufferedResponse() # pylint: disable-msg=W0212
+                if ( response is None ):
+                    break
+                if ( response.packet_id == full_frame ):
+                    dsa._ParseFrame( response ) # pylint: disable-msg=W0212
+                    self._PublishFrame( response.frame )
+                elif ( self._pending  and  self._pending[0][0] == response.packet_id ):
+                    (packet_id, future) = self._pending.popleft() # pylint: disable-msg=W0612
+                    self._Acknowledge( response, future )
+                else:
+                    dsa._dbg.Printf( "cAsyncDSA: ignoring unexpected response with packet id 0x%02x\n", response.packet_id ) # pylint: disable-msg=W0212
+            except cDSAError, e:
+                # like the updater thread: ignore errors like checksum errors and resync on the next preamble
+                dsa._stats.errors += 1 # pylint: disable-msg=W0212
+                dsa._dbg.Printf( "cAsyncDSA: ignoring %s\n", e ) # pylint: disable-msg=W0212
+
+    def _PublishFrame( self, frame ):
+        '''Non public helper function: complete the futures waiting for the next frame with \a frame,
+        or queue \a frame for the next call of NextFrame() if no future is waiting.
+        '''
+        waiters = self._frame_waiters
+        if ( not waiters ):
+            if ( len( self._frames ) == self._frames.maxlen ):
+                self.nb_frames_skipped += 1
+            self._frames.append( frame )
+            return
+        self._frame_waiters = []
+        for future in waiters:
+            future.set_result( frame )
+
+    def _Acknowledge( self, response, future ):
+        '''Non public helper function: complete \a future with the acknowledge \a response of a command.
+        '''
+        if ( response.size != 2 ):
+            future.set_exception( cDSAError( "Invalid response from DSACON32m, expected 2 bytes but got %d" % response.size ) )
+            return
+        try:
+            self.dsa.CheckErrorCode( UIntFromBytes( response.payload ), "Error response from DSACON32m for command 0x%02x" % response.packet_id )
+        except cDSAError, e:
+            future.set_exception( e )
+            return
+        future.set_result( None )
+
+
+######################################################################
+# some usefull editing settings for emacs:
+#
+#;;; Local Variables: ***
+#;;; mode:python ***
+#;;; End: ***
+#
+######################################################################
@@ -0,0 +1,272 @@
+# -*- coding: latin-1 -*-
+#######################################################################
+#
+## \file
+#  \section sdhlibrary_python_asyncsdh_py_general General file information
+#
+#  \brief
+#    Non blocking access to the SDH, driven by an eventloop.cEventLoop.
+#
+#  \section sdhlibrary_python_asyncsdh_py_copyright Copyright
+#
+#  Copyright (c) 2007 SCHUNK GmbH & Co. KG
+#
+#######################################################################
+
+
+#######################################################################
+## \anchor sdhlibrary_python_asyncsdh_py_python_vars
+#  \name   Python specific variables
+#
+#  Some definitions that describe the module for python.
+#
+#  @{
+
+__doc__       = "Non blocking access to the SDH, driven by an event loop."
+__url__       = "http://www.schunk.com"
+__copyright__ = "Copyright (c) 2007 SCHUNK GmbH & Co. KG"
+
+#  end of doxygen name group sdhlibrary_python_asyncsdh_py_python_vars
+#  @}
+######################################################################
+
+#######################################################################
+## \package asyncsdh
+#
+#  \brief
+#    A cAsyncSDH sends the commands of a connected cSDHSerial object
+#    without waiting for the reply. Each command returns an
+#    eventloop.cFuture for its reply, the replies are read by the
+#    eventloop.cEventLoop whenever the communication object is readable.
+#    So any number of commands to several SDHs can be pending at the
+#    same time within a single thread. The commands and the parsing of
+#    their replies are the same as those of cSDHSerial. Values are in
+#    the internal units of the SDH firmware (degrees, seconds).
+#
+#    Example: move 2 hands at the same time
+#    \code
+#      def MoveBoth( hand_a, hand_b, angles ):
+#          yield eventloop.Gather( [ hand_a.AxisCommand( "p", All, angles ), hand_b.AxisCommand( "p", All, angles ) ] )
+#          yield eventloop.Gather( [ hand_a.Move(), hand_b.Move() ] )
+#
+#      task = loop.CreateTask( MoveBoth( hand_a, hand_b, [ 0.0 ] * 7 ) )
+#      loop.RunUntilComplete( task )
+#    \endcode
+#
+#    Cancelling a movement started with Move() (or the task waiting for
+#    it) performs a FastStop() of the SDH.
+#
+#######################################################################
+
+import sys, collections, socket
+
+# pySerial module from http://pyserial.sourceforge.net/
+import serial
+
+from .sdhbase import All, cSDHError, cSDHErrorCommunication, cSDHErrorCancelled
+from .auxiliary import ToRange_a
+from . import linereader
+from . import eventloop
+
+
+#-----------------------------------------------------------------
+class cAsyncSDH( object ):
+    '''
+    Non blocking access to an SDH, driven by an eventloop.cEventLoop.
+    See the package documentation of asyncsdh.
+    '''
+    def __init__( self, loop, interface ):
+        '''
+        Constructor of cAsyncSDH: use the connected cSDHSerial object \a interface
+        (via RS232 or TCP, e.g. the interface member of a cSDH object) with
+        the eventloop.cEventLoop \a loop.
+        From now on \a interface must not be used directly any more until Close() is called.
+        '''
+        com = interface.com
+        if ( not isinstance( com, linereader.tLineReader )  or  not hasattr( com, "fileno" ) ):
+            raise cSDHErrorCommunication( "cAsyncSDH needs a connection via RS232 or TCP, not %r" % (com,) )
+
+        ## The event loop driving this object
+        self.loop = loop
+
+        ## The cSDHSerial object whose commands are used
+        self.interface = interface
+
+        ## \brief Time in seconds before the predicted end of a movement
+        #  at which Move() starts to query the axis states.
+        self.wait_axis_early = 0.05
+
+        ## \brief Minimum and maximum time in seconds between two queries
+        #  of the axis states in Move().
+        self.wait_axis_poll_min = 0.005
+        self.wait_axis_poll_max = 0.1
+
+        # read the replies of previous blocking commands that were not read yet:
+        interface.Sync()
+
+        # the commands sent and not yet completely replied: [future, reply lines so far]
+        self._pending = collections.deque()
+        loop.AddReader( com, self._OnReadable )
+
+    def Close( self ):
+        '''
+        Stop reading replies. Pending commands fail with a cSDHErrorCommunication.
+        The interface is not closed, but its cached settings (if any) are invalidated
+        since the commands sent by this object bypassed them.
+        '''
+        self.loop.RemoveReader( self.interface.com )
+        self.interface.InvalidateShadow()
+        self._Fail( cSDHErrorCommunication( "cAsyncSDH was closed" ) )
+
+    def _Fail( self, exception ):
+        '''Non public helper function: make all pending commands fail with \a exception.
+        '''
+        pending = self._pending
+        self._pending = collections.deque()
+        for (future, reply) in pending: # pylint: disable-msg=W0612
+            future.set_exception( exception )
+
+    def _OnReadable( self ):
+        '''Non public helper function: read the lines available and complete the pending commands.
+        '''
+        interface = self.interface
+        try:
+            lines = interface.com.ReadLinesAvailable()
+        except (socket.error, serial.SerialException), e:
+            self.loop.RemoveReader( interface.com )
+            self._Fail( cSDHErrorCommunication( "Reading from SDH failed: %s" % e ) )
+            return
+
+        for l in lines:
+            l = l.strip( "\r\n" )
+            if ( l == "" ):
+                continue
+            if ( not self._pending ):
+                interface.dbg.Printf( "cAsyncSDH: ignoring unexpected line %r\n", l )
+                continue
+            (future, reply) = self._pending[0]
+            reply.append( l )
+            if ( l[0] == '@' ):
+                # a debug message, the reply continues
+                continue
+            self._pending.popleft()
+            if ( future.done() ):
+                # cancelled or timed out
+                continue
+            interface.dbg.Printf( "cAsyncSDH: got reply %r\n", reply )
+            try:
+                interface.ExtractFirmwareState( reply )
+            except cSDHError, e:
+                future.set_exception( e )
+                continue
+            future.set_result( reply )
+
+    def Send( self, s ):
+        '''
+        Send command string \a s to the SDH. Return a future for the lines
+        of the reply (without end of line), the last one being the line that
+        completes the command, like cSDHSerial.Send(). The future fails
+        with a cSDHErrorInvalidParameter if the SDH reports an error.
+        '''
+        future = eventloop.cFuture()
+        interface = self.interface
+        interface.dbg.Printf( "cAsyncSDH: sending command %r\n", s )
+        try:
+            interface.com.write( s + interface.EOL )
+        except (socket.error, serial.SerialException), e:
+            future.set_exception( cSDHErrorCommunication( "Writing to SDH failed: %s" % e ) )
+            return future
+        self._pending.append( (future, []) )
+        return future
+
+    def AxisCommand( self, command, axis=All, value=None ):
+        '''
+        Get/Set values of axes like cSDHSerial.AxisCommand(), e.g.
+        AxisCommand( "pos" ) for the actual angles of all axes or
+        AxisCommand( "p", 3, 42.0 ) to set the target angle of axis 3.
+        Return a future for the value(s) replied.
+        '''
+        (s, re_obj, convert) = self.interface._AxisRequest( command, axis, value ) # pylint: disable-msg=W0212
+
+        def _Parse( reply ):
+            mo = re_obj.match( reply[-1] )
+            if ( mo is None ):
+                raise cSDHErrorCommunication( "Reply %r to command %r does not match %r" % (reply[-1], s, re_obj.pattern) )
+            try:
+                return convert( mo.group(1) )
+            except ValueError, e:
+                raise cSDHErrorCommunication( "Invalid reply %r to command %r: %s" % (reply[-1], s, e) )
+
+        return eventloop.Chain( self.Send( s ), _Parse )
+
+    def Move( self ):
+        '''
+        Move the axes to the previously set target angles ("m" command) and
+        return a cTask (a future) that is done when all axes have finished the
+        movement. The result is the expected duration of the movement in seconds
+        as reported by the SDH.
+
+        Like cSDH.WaitAxis() the task sleeps until shortly before the predicted end
+        of the movement and then queries the axis states with increasing pauses.
+        Cancelling the task performs a FastStop().
+        '''
+        return self.loop.CreateTask( self._Move() )
+
+    def _Move( self ):
+        '''Non public helper function: the generator of the task of Move().
+        '''
+        interface = self.interface
+        positioning = interface.eAxisState[ "eAS_POSITIONING" ]
+        try:
+            reply = yield self.Send( "m" )
+            t = interface.GetDuration( reply[-1] )
+            yield self.loop.Sleep( max( t - self.wait_axis_early, 0.0 ) )
+            pause = self.wait_axis_poll_min
+            while True:
+                states = yield self.AxisCommand( "state" )
+                if ( positioning not in states ):
+                    break
+                yield self.loop.Sleep( pause )
+                pause = min( pause * 2.0, self.wait_axis_poll_max )
+        except cSDHErrorCancelled:
+            # a bare raise after a yield would raise the last exception handled elsewhere
+            (exc_type, exc_value, exc_traceback) = sys.exc_info()
+            interface.dbg.Printf( "cAsyncSDH: movement cancelled, performing a fast stop\n" )
+            yield self.FastStop()
+            raise exc_type, exc_value, exc_traceback
+        raise eventloop.cReturn( t )
+
+    def Stop( self ):
+        '''
+        Stop the movement of all axes but keep the controllers on ("stop" command).
+        Return a future for the reply.
+        '''
+        return self.Send( "stop" )
+
+    def FastStop( self ):
+        '''
+        Stop the movement of all axes and switch off the controllers like cSDH.FastStop():
+        The controllers are switched off and the actual axis angles are read with
+        a single round trip, then the actual axis angles are set as target axis angles.
+        Return a cTask (a future) that is done when the SDH confirmed the fast stop.
+        '''
+        return self.loop.CreateTask( self._FastStop() )
+
+    def _FastStop( self ):
+        '''Non public helper function: the generator of the task of FastStop().
+        '''
+        interface = self.interface
+        (power, angles) = yield eventloop.Gather( [ self.AxisCommand( "power", All, [ 0 ] * interface.NUMBER_OF_AXES ),
+                                                    self.AxisCommand( "pos" ) ] ) # pylint: disable-msg=W0612
+        angles = ToRange_a( angles, interface.min_angle_a, interface.max_angle_a )
+        yield self.AxisCommand( "p", All, list( angles ) )
+
+
+######################################################################
+# some usefull editing settings for emacs:
+#
+#;;; Local Variables: ***
+#;;; mode:python ***
+#;;; End: ***
+#
+######################################################################
@@ -553,6 +553,15 @@ class cSDHOptionParser(OptionParser):
             pass
         else:
             options.dsaport = options.dsa_rs_device
+
+        if ( getattr( options, "dsa_replay", None ) is not None ):
+            # replay a recording instead of communicating with a real DSA
+            from . import dsarecord
+            try:
+                options.dsaport = dsarecord.tDSAReplay( options.dsa_replay, speed=options.dsa_replay_speed )
+            except IOError,e:
+                self.error( "Could not open recording '%s' for --dsa_replay: %s" % (options.dsa_replay, str(e)) )
+            options.dsaport_set_by_user = True
         
         # do final actions, if requested
         if (options.do_check_version):
@@ -626,6 +635,15 @@ class cSDHOptionParser(OptionParser):
         self.add_option( "-T", "--timeout",
                          dest="timeout", default=None, type=float, metavar="TIMEOUT",
                          help="Timeout in seconds (float accepted) used to wait for answers from SDH (default is None = wait for ever)." )
+        self.add_option( "--shadow_state",
+                         dest="shadow_state", default=False, action="store_true",
+                         help="Cache the settings read from or written to the SDH (like target angles or velocities) to avoid redundant communication. Use only if no other program changes the settings of the SDH." )
+        self.add_option( "--instrumentation",
+                         dest="instrumentation", default=False, action="store_true",
+                         help="Count the commands sent to the SDH with their bytes and round trip latencies, see cSDH.EnableInstrumentation()." )
+        self.add_option( "--collision_map",
+                         dest="collision_map", default=None, type=str, metavar="FILE",
+                         help="Use the collision map FILE (generated with demo-collision-map.py) to speed up the checks for internal collisions of the fingers. Requires numpy." )
         self.add_option( "-c", "--can",
                          dest="usecan", default=False, action="store_true",
                          help="use the (ESD) CAN interface instead of RS232. (Requires the windows python.exe not the cygwin one)" )
@@ -672,6 +690,19 @@ class cSDHOptionParser(OptionParser):
             self.add_option( "--no_rle",
                              dest="do_RLE", default=True, action="store_false",
                              help="Disable RLE (Run Length Encoding) for acquiring full frames." )
+            # Add options to record / replay the communication with the DSA
+            self.add_option( "--dsa_record",
+                             dest="dsa_record", default=None, type=str, metavar="FILE",
+                             help="Record all communication with the DSA (tactile sensor of SDH) to recording FILE (appended if FILE exists)." )
+            self.add_option( "--dsa_replay",
+                             dest="dsa_replay", default=None, type=str, metavar="FILE",
+                             help="Do not communicate with a real DSA (tactile sensor of SDH) but replay the communication recorded with --dsa_record in FILE." )
+            self.add_option( "--dsa_frame_log",
+                             dest="dsa_frame_log", default=None, type=str, metavar="FILE",
+                             help="Append all tactile sensor frames read from the DSA (tactile sensor of SDH) to frame log FILE, see sdh.dsaframelog." )
+            self.add_option( "--dsa_replay_speed",
+                             dest="dsa_replay_speed", default=1.0, type=float, metavar="SPEED",
+                             help="Speed for --dsa_replay: 1.0 (default) replays in real time, 2.0 twice as fast and so on. 0 replays as fast as possible." )
   
   
 def GetCommunicationInterfaceName( options, dsa=False):
@@ -679,6 +710,8 @@ def GetCommunicationInterfaceName( options, dsa=False):
     If \a dsa is False then then interface for SDH is returned. If True then the interface for DSA is returned.
     '''    
     if ( dsa ):
+        if ( options.get( "dsa_replay" ) ):
+            return "replay of recording (%s)" %(options["dsa_replay"])
         return "RS232 (%s)" %(options["dsaport"]) 
         
     if ( options["usecan"] ):
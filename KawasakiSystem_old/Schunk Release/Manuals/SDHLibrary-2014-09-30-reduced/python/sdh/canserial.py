@@ -38,8 +38,10 @@ except ImportError:
     sys.stderr.write( "  (ntcan is a python wrapper module provided by ESD to access its CAN cards from python)\n" )
     raise  #reraise
 
+from .linereader import tLineReader
 
-class tCANSerial( object ):
+
+class tCANSerial( tLineReader ):
     """Simple wrapper class to access an ESD CAN port like a serial port as a file like object
     """
 
@@ -55,6 +57,7 @@ class tCANSerial( object ):
                timeout==0.0  => make read() / readline() return immediately with whatever is available
                timeout==else => use the given timeout for read() and readline()
         """
+        tLineReader.__init__( self )
         self._cif = None
         self.SetTimeout( timeout )
         self._id_read = id_read
@@ -89,7 +92,6 @@ class tCANSerial( object ):
         t = self._cif.timestamp  # required for CAN-USB/2, see ntcan.CIF.canIdAdd() @UnusedVariable
         self._rcmsg = ntcan.CMSG()
         self._wcmsg  =ntcan.CMSG()
-        self._buffer  = ""
         self._return_on_less = False
 
     def GetTimeout(self):
@@ -133,6 +135,17 @@ class tCANSerial( object ):
         '''read \a length bytes from CAN and return them as as string.
         The waiting time for that many bytes depends on the setting of self.timeout and self._return_on_less
         '''
+        if ( self._line_buffer ):
+            # bytes already received by readline() come first
+            s = self._TakeBuffered( length )
+            if ( len( s ) < length ):
+                s += self._ReadCAN( length - len( s ) )
+            return s
+        return self._ReadCAN( length )
+
+    def _ReadCAN( self, length ):
+        '''Non public helper function: read \a length bytes from the CAN messages received, see read()
+        '''
         read_bytes = 0
         result = []
         
@@ -193,20 +206,17 @@ class tCANSerial( object ):
         '''
         del self._cif
 
-    def readline( self, eol='\n' ):
-        '''read a complete line (terminated by the \a eol character sequence) from CAN and return it as string.
+    def _ReadChunk( self, timeout ):
+        '''Read the bytes of the next CAN message.
+        The message is waited for with the timeout of the CAN interface
+        instead of \a timeout (both are the same when called from readline()).
         '''
         old_return_on_less = self._return_on_less
         self._return_on_less = True
-        end = self._GetEndTime()
-        while ( not eol in self._buffer  and  time.time() <= end ):
-            self._buffer += self.read( 8 )
-        self._return_on_less = old_return_on_less
-        if ( eol in self._buffer ):
-            l = self._buffer.split( eol, 1 )
-            self._buffer = l[1]
-            return l[0] + eol
-        return ""
+        try:
+            return self._ReadCAN( 8 )
+        finally:
+            self._return_on_less = old_return_on_less
 
     timeout = property(GetTimeout, SetTimeout, None, "The timeout for reading in seconds. None == Wait for ever, 0.0 == return immediately.")
 
@@ -0,0 +1,374 @@
+# -*- coding: latin-1 -*-
+#######################################################################
+#
+## \file
+#  \section sdhlibrary_python_collision_py_general General file information
+#
+#  \brief
+#    Vectorized check for internal collisions of the fingers of the SDH.
+#
+#  \section sdhlibrary_python_collision_py_copyright Copyright
+#
+#  Copyright (c) 2007 SCHUNK GmbH & Co. KG
+#
+#######################################################################
+
+
+#######################################################################
+## \anchor sdhlibrary_python_collision_py_python_vars
+#  \name   Python specific variables
+#
+#  Some definitions that describe the module for python.
+#
+#  @{
+
+__doc__       = "Vectorized check for internal collisions of the fingers of the SDH."
+__url__       = "http://www.schunk.com"
+__copyright__ = "Copyright (c) 2007 SCHUNK GmbH & Co. KG"
+
+#  end of doxygen name group sdhlibrary_python_collision_py_python_vars
+#  @}
+######################################################################
+
+#######################################################################
+## \package collision
+#
+#  \brief
+#    The internal collision check of cSDH.CheckFingerCollisions()
+#    encloses each finger in a hull of spheres (a "virtual airbag"):
+#    6 spheres on the proximal and 4 spheres on the distal limb. Two
+#    fingers collide if any sphere of the one finger intersects any
+#    sphere of the other finger.
+#
+#    A cFingerHulls object does the same computation with numpy
+#    for a whole batch of poses at once: The centres of all spheres of
+#    all fingers are computed with a few array operations and the
+#    distances of all pairs of spheres with a few broadcasts. The results
+#    are identical to those of the scalar implementation
+#    cSDH._GetFingerSphereHull() / cSDH._GetFingerHullCollision()
+#    (including the minimum distance reported for colliding fingers,
+#    which the scalar implementation takes only up to the first
+#    intersecting pair of spheres).
+#
+#    cFingerHulls.CheckPath() checks the path of a movement: As the SDH
+#    starts and ends the movements of all axes synchronously, the
+#    path in joint space is the straight line from the start to the
+#    target angles, whatever the velocity profile. The path is sampled
+#    with a fixed maximum angle step and all samples are checked with a
+#    single vectorized Check(): The paths are short (about 50 samples
+#    with the default step), so stopping early at a collision does not
+#    pay off, see demo-collision-benchmark.py. The velocity profile
+#    only determines \b when the collision would happen:
+#    MovementDuration() and TimeFraction() estimate this on the PC.
+#
+#    cFingerHulls.Points() is the forward kinematics of the fingers for
+#    batches of poses and any points on the finger limbs, see
+#    cSDH.GetFingerXYZMany().
+#
+#    cFingerHulls.ClearanceBounds() bounds the distance of the fingers
+#    for all poses within a box of joint angles around a pose: A sphere
+#    centre moves at most by its distance from the rotation axis times
+#    the change of an angle. The collisionmap module uses this to
+#    classify whole cells of a grid of joint angles as free or colliding.
+#
+#    This module requires numpy.
+#
+#######################################################################
+
+import math
+
+# Try to import numpy: cFingerHulls needs it, without numpy
+# cSDH.CheckFingerCollisions() uses the scalar implementation.
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from .auxiliary import Square
+
+## number of spheres on the proximal finger limb
+NB_PROXIMAL_SPHERES = 6
+
+## number of spheres on the distal finger limb
+NB_DISTAL_SPHERES = 4
+
+## diameter of a finger limb in mm
+FINGER_DIAMETER = 27
+
+## The pairs of fingers checked, in the order of the results of cSDH.CheckFingerCollisions()
+FINGER_PAIRS = ( (0,1), (0,2), (1,2) )
+
+## The velocity profiles of the SDH firmware (like cSDHBase.eVelocityProfile)
+eVP_SIN_SQUARE = 0
+eVP_RAMP = 1
+
+
+#-----------------------------------------------------------------
+def MovementDuration( velocity_profile, distances, velocities, accelerations ):
+    '''
+    Estimate the duration of a movement with \a velocity_profile (eVP_SIN_SQUARE or eVP_RAMP)
+    where the axes move by \a distances with the target \a velocities and \a accelerations
+    (lists of absolute values, in consistent units like deg, deg/s, deg/s*s).
+    The SDH synchronizes the axes to the one that needs the longest time.
+
+    Return a tuple (T, f) with the duration T in seconds and, for eVP_RAMP, the fraction f
+    of T used to accelerate (f is 0.5 for the eVP_SIN_SQUARE profile).
+    '''
+    duration = 0.0
+    fraction = 0.5
+    for (d, v, a) in zip( distances, velocities, accelerations ):
+        d = abs( float( d ) )
+        if ( d == 0.0 ):
+            continue
+        v = abs( float( v ) )
+        a = abs( float( a ) )
+        if ( v == 0.0  or  a == 0.0 ):
+            return ( float( "inf" ), fraction )
+        if ( velocity_profile == eVP_RAMP ):
+            if ( d * a >= v * v ):
+                # trapezoidal: accelerate to v, move with v, decelerate
+                t_acc = v / a
+                t = d / v + t_acc
+            else:
+                # triangular: v is never reached
+                t_acc = math.sqrt( d / a )
+                t = 2.0 * t_acc
+            if ( t > duration ):
+                (duration, fraction) = (t, t_acc / t)
+        else:
+            # sin square velocity v_peak * sin(pi*t/T)^2: mean velocity is v_peak/2, peak acceleration pi*v_peak/T
+            t = max( 2.0 * d / v, math.sqrt( 2.0 * math.pi * d / a ) )
+            duration = max( duration, t )
+    return ( duration, fraction )
+
+
+#-----------------------------------------------------------------
+def PathFraction( velocity_profile, tau, fraction=0.5 ):
+    '''
+    Return the fraction of the path covered at time fraction \a tau (0..1, scalar or numpy array)
+    of a movement with \a velocity_profile. \a fraction is the acceleration fraction
+    for the eVP_RAMP profile as returned by MovementDuration().
+    '''
+    tau = numpy.clip( numpy.asarray( tau, dtype=float ), 0.0, 1.0 )
+    if ( velocity_profile == eVP_RAMP ):
+        f = min( max( fraction, 1e-9 ), 0.5 )
+        scale = 1.0 / (2.0 * f * (1.0 - f))
+        return numpy.where( tau < f, tau * tau * scale,
+                            numpy.where( tau > 1.0 - f, 1.0 - (1.0 - tau) * (1.0 - tau) * scale,
+                                         (tau - f / 2.0) / (1.0 - f) ) )
+    return tau - numpy.sin( 2.0 * math.pi * tau ) / (2.0 * math.pi)
+
+
+#-----------------------------------------------------------------
+def TimeFraction( velocity_profile, s, fraction=0.5 ):
+    '''
+    Return the time fraction (0..1) at which a movement with \a velocity_profile
+    has covered the fraction \a s of its path, the inverse of PathFraction().
+    '''
+    tau = numpy.linspace( 0.0, 1.0, 1025 )
+    return numpy.interp( s, PathFraction( velocity_profile, tau, fraction ), tau )
+
+
+#-----------------------------------------------------------------
+class cFingerHulls( object ):
+    '''
+    The sphere hulls of the 3 fingers of an SDH with the kinematic
+    parameters of a cSDH object, evaluated with numpy for batches of poses.
+    See the package documentation of collision.
+    '''
+    ## sign of the x / y coordinates of each finger, see cSDH._GetFingerXYZ()
+    FAC_X = ( -1.0, 1.0, -1.0 )
+    FAC_Y = ( -1.0, 1.0,  1.0 )
+
+    def __init__( self, l1, l2, offset ):
+        '''
+        Constructor of cFingerHulls for finger limbs of length \a l1 (proximal)
+        and \a l2 (distal) in mm and the list \a offset of the xyz offsets of
+        the proximal joints of the fingers (like cSDH.l1, cSDH.l2 and cSDH.offset).
+        '''
+        if ( numpy is None ):
+            raise ImportError( "sdh.collision.cFingerHulls requires numpy" )
+
+        ## length of the proximal and distal finger limbs in mm
+        self.l1 = l1
+        self.l2 = l2
+
+        # positions of the sphere centres along the limbs (proximal, distal) and radii,
+        # computed exactly like in cSDH._GetFingerSphereHull():
+        proximal = []
+        distal = []
+        radius = []
+        d = l1 / NB_PROXIMAL_SPHERES
+        r = math.sqrt( Square( FINGER_DIAMETER/2.0 ) + Square( d/2.0 ) )
+        for i in range( 0, NB_PROXIMAL_SPHERES ):
+            proximal.append( d/2.0 + i*d )
+            distal.append( 0.0 )
+            radius.append( r )
+        d = l2 / NB_DISTAL_SPHERES
+        r = math.sqrt( Square( FINGER_DIAMETER/2.0 ) + Square( d/2.0 ) )
+        for i in range( 0, NB_DISTAL_SPHERES ):
+            proximal.append( l1 )
+            if ( i < NB_DISTAL_SPHERES-1 ):
+                distal.append( d/2.0 + i*d )
+            else:
+                distal.append( l2 - r )
+            radius.append( r )
+
+        ## position of each sphere centre on the proximal limb in mm
+        self.proximal = numpy.array( proximal )
+        ## position of each sphere centre on the distal limb in mm
+        self.distal = numpy.array( distal )
+        ## radius of each sphere in mm
+        self.radius = numpy.array( radius )
+        ## number of spheres per finger
+        self.nb_spheres = len( radius )
+
+        # per finger factors and offsets, shaped (3, 1) to broadcast over the spheres:
+        self._fac_x = numpy.array( self.FAC_X ).reshape( 3, 1 )
+        self._fac_y = numpy.array( self.FAC_Y ).reshape( 3, 1 )
+        self._offset = numpy.array( [ list( o ) for o in offset ] ).reshape( 3, 1, 3 )
+
+        # radii shaped to broadcast over all pairs of spheres (subtracted like in cSphere.Distance())
+        self._radius_i = self.radius.reshape( -1, 1 )
+        self._radius_j = self.radius.reshape( 1, -1 )
+
+        # upper bound of the distance of each sphere centre from the rotation axis of
+        # each finger axis, shape (3, S): base and proximal joint: whole limb, distal joint: distal limb
+        self._lever = numpy.array( [ self.proximal + self.distal, self.proximal + self.distal, self.distal ] )
+
+    def Points( self, r_angles, proximal, distal ):
+        '''
+        Forward kinematics of the fingers: return the positions of the points
+        \a proximal mm on the proximal finger limb and \a distal mm on the distal
+        finger limb (like for cSDH._GetFingerXYZ(), sequences of P values each)
+        of all fingers for the finger angles \a r_angles (in rad) as an array of shape
+        (N, 3, P, 3): pose, finger, point, xyz in mm.
+        \a r_angles must have the shape (N, 3, 3): pose, finger, finger axis.
+        '''
+        r_angles = numpy.asarray( r_angles, dtype=float )
+        proximal = numpy.asarray( proximal, dtype=float )
+        distal = numpy.asarray( distal, dtype=float )
+        # shape (N, 3, 1) to broadcast over the points:
+        a0 = r_angles[ :, :, 0:1 ]
+        a1 = r_angles[ :, :, 1:2 ]
+        a12 = a1 + r_angles[ :, :, 2:3 ]
+
+        # same operations in the same order as cSDH._GetFingerXYZ(), so the results are identical:
+        l1_s_b_l2_s_bc = proximal * numpy.sin( a1 ) + distal * numpy.sin( a12 )
+        points = numpy.empty( r_angles.shape[:2] + (len( proximal ), 3) )
+        points[ ..., 0 ] = self._fac_x * l1_s_b_l2_s_bc * numpy.cos( a0 ) + self._offset[ ..., 0 ]
+        points[ ..., 1 ] = self._fac_y * l1_s_b_l2_s_bc * numpy.sin( a0 ) + self._offset[ ..., 1 ]
+        points[ ..., 2 ] = proximal * numpy.cos( a1 ) + distal * numpy.cos( a12 ) + self._offset[ ..., 2 ]
+        return points
+
+    def Centres( self, r_angles ):
+        '''
+        Return the centres of the spheres of all fingers for the finger angles
+        \a r_angles (in rad) as an array of shape (N, 3, S, 3): pose, finger,
+        sphere, xyz in mm, where S is the number of spheres per finger.
+        \a r_angles must have the shape (N, 3, 3): pose, finger, finger axis.
+        '''
+        return self.Points( r_angles, self.proximal, self.distal )
+
+    def Distances( self, centres, pairs=FINGER_PAIRS ):
+        '''
+        Return the distances of all pairs of spheres of the finger \a pairs (default FINGER_PAIRS)
+        for the sphere \a centres returned by Centres(), as an array of shape (N, P, S, S):
+        pose, finger pair, sphere of first finger, sphere of second finger.
+        Negative distances mean intersecting spheres, see cSphere.Distance().
+        '''
+        fi = [ i for (i, j) in pairs ]
+        fj = [ j for (i, j) in pairs ]
+        # sum up dx*dx + dy*dy + dz*dz one coordinate after the other, in place:
+        # this is much faster than computing all the (N, 3, S, S, 3) differences at once
+        distances = None
+        for xyz in range( 0, 3 ):
+            c = centres[ ..., xyz ]
+            # shape (N, P, 1, S) - (N, P, S, 1) = (N, P, S, S)
+            delta = c[ :, fj, numpy.newaxis, : ] - c[ :, fi, :, numpy.newaxis ]
+            delta *= delta
+            if ( distances is None ):
+                distances = delta
+            else:
+                distances += delta
+        numpy.sqrt( distances, distances )
+        distances -= self._radius_i
+        distances -= self._radius_j
+        return distances
+
+    def Check( self, r_angles ):
+        '''
+        Check the finger angles \a r_angles (in rad, shape (N, 3, 3): pose, finger, finger axis)
+        for internal collisions. Return a tuple (cxy, c, d) with:
+        - cxy: bool array of shape (N,), True if any fingers collide in that pose
+        - c: bool array of shape (N, 3), True if the fingers of FINGER_PAIRS collide
+        - d: array of shape (N, 3) with the minimum distance in mm of the fingers of
+          FINGER_PAIRS, negative if they collide. Like cSDH._GetFingerHullCollision()
+          this is the minimum of the distances up to the first intersecting pair of spheres.
+        '''
+        distances = self.Distances( self.Centres( r_angles ) )
+        distances = distances.reshape( distances.shape[:2] + (-1,) )
+        intersecting = distances < 0.0
+        c = intersecting.any( axis=-1 )
+
+        # the scalar implementation stops at the first intersecting pair of spheres:
+        last = numpy.where( c, intersecting.argmax( axis=-1 ), distances.shape[-1]-1 )
+        running_min = numpy.minimum.accumulate( distances, axis=-1 )
+        (n, p) = numpy.indices( last.shape )
+        d = running_min[ n, p, last ]
+        return ( c.any( axis=-1 ), c, d )
+
+    def ClearanceBounds( self, r_angles, half_widths, pairs=FINGER_PAIRS ):
+        '''
+        Return a tuple (lower, upper) of arrays of shape (N, P) with a lower and an upper
+        bound of the minimum distance in mm of the fingers of each of the finger \a pairs
+        (default FINGER_PAIRS) for all poses whose angles differ from the finger
+        angles \a r_angles (in rad, shape (N, 3, 3): pose, finger, finger axis) by
+        at most \a half_widths (in rad, shape (3, 3): finger, finger axis).
+        So the fingers of a pair cannot collide anywhere in such a box of poses if
+        lower > 0, and collide everywhere in the box if upper < 0.
+        '''
+        # maximum displacement of each sphere centre, shape (3, S):
+        displacement = numpy.dot( numpy.asarray( half_widths, dtype=float ), self._lever )
+        # maximum change of the distance of each pair of spheres, shape (P, S, S):
+        margin = numpy.array( [ displacement[ i ][ :, numpy.newaxis ] + displacement[ j ][ numpy.newaxis, : ] for (i, j) in pairs ] )
+
+        distances = self.Distances( self.Centres( r_angles ), pairs )
+        shape = distances.shape[:2] + (-1,)
+        lower = ( distances - margin ).reshape( shape ).min( axis=-1 )
+        upper = ( distances + margin ).reshape( shape ).min( axis=-1 )
+        return ( lower, upper )
+
+    def CheckPath( self, r_start, r_end, step ):
+        '''
+        Check the straight path in joint space from finger angles \a r_start to
+        \a r_end (in rad, shape (3, 3): finger, finger axis) for internal collisions.
+        The path is sampled so that no angle changes more than \a step rad between
+        two samples. The start pose itself is not checked. All samples are checked
+        with a single call of Check().
+
+        Return a tuple (s, c, clearance, nb_checked) with:
+        - s: the fraction of the path (0..1] of the first colliding sample, or None if there is no collision
+        - c: bool array of shape (3,), the colliding FINGER_PAIRS at s (all False if there is no collision)
+        - clearance: the minimum distance in mm of the fingers on the path up to s (the whole path if there is no collision)
+        - nb_checked: the number of poses checked
+        '''
+        r_start = numpy.asarray( r_start, dtype=float )
+        delta = numpy.asarray( r_end, dtype=float ) - r_start
+        nb_samples = max( 1, int( math.ceil( numpy.abs( delta ).max() / step ) ) )
+        s = numpy.arange( 1, nb_samples + 1 ) / float( nb_samples )
+        (cxy, c, d) = self.Check( r_start + s[ :, numpy.newaxis, numpy.newaxis ] * delta )
+        if ( cxy.any() ):
+            i = int( cxy.argmax() )
+            return ( float( s[i] ), c[i], float( d[ :i+1 ].min() ), nb_samples )
+        return ( None, numpy.zeros( len( FINGER_PAIRS ), dtype=bool ), float( d.min() ), nb_samples )
+
+
+######################################################################
+# some usefull editing settings for emacs:
+#
+#;;; Local Variables: ***
+#;;; mode:python ***
+#;;; End: ***
+#
+######################################################################
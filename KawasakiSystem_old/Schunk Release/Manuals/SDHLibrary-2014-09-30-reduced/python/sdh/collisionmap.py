@@ -0,0 +1,308 @@
+# -*- coding: latin-1 -*-
+#######################################################################
+#
+## \file
+#  \section sdhlibrary_python_collisionmap_py_general General file information
+#
+#  \brief
+#    Precomputed map of the internal collisions of the fingers of the SDH.
+#
+#  \section sdhlibrary_python_collisionmap_py_copyright Copyright
+#
+#  Copyright (c) 2007 SCHUNK GmbH & Co. KG
+#
+#######################################################################
+
+
+#######################################################################
+## \anchor sdhlibrary_python_collisionmap_py_python_vars
+#  \name   Python specific variables
+#
+#  Some definitions that describe the module for python.
+#
+#  @{
+
+__doc__       = "Precomputed map of the internal collisions of the fingers of the SDH."
+__url__       = "http://www.schunk.com"
+__copyright__ = "Copyright (c) 2007 SCHUNK GmbH & Co. KG"
+
+#  end of doxygen name group sdhlibrary_python_collisionmap_py_python_vars
+#  @}
+######################################################################
+
+#######################################################################
+## \package collisionmap
+#
+#  \brief
+#    Whether two fingers of the SDH collide depends on 5 joint angles
+#    only: the common base axis angle (axis 0) and the proximal and
+#    distal angles of the two fingers. A collision map divides this
+#    5 dimensional joint space into a grid of cells and stores for each
+#    cell 2 bits: "free" if the fingers cannot collide anywhere in the
+#    cell and "colliding" if they collide everywhere in the cell. The
+#    cells are classified with the bounds of
+#    collision.cFingerHulls.ClearanceBounds(), so the map is
+#    conservative: cells near the boundary between free and colliding
+#    poses are neither, for poses in these cells the exact check must
+#    be used.
+#
+#    There are maps for the finger pairs (0,1) and (0,2). The pair
+#    (1,2) is the mirror image of the pair (0,1) (in the xz plane), so
+#    it uses the map of (0,1) with finger 2 in place of finger 0.
+#
+#    A map is generated once with Generate() (e.g. with the script
+#    demo-collision-map.py), which distributes the work on all cores,
+#    and stored as a compressed numpy .npz file. A cCollisionMap loads
+#    such a file, looking up a pose is then a few arithmetic operations
+#    per finger pair. cSDH uses a map for the checks of MoveAxis(),
+#    MoveFinger() and MoveHand() if one is loaded with
+#    cSDH.LoadCollisionMap() (or the \c --collision_map command line
+#    option), see cSDH.IsFingerCollision().
+#
+#    This module requires numpy.
+#
+#######################################################################
+
+import math
+
+# Try to import numpy: the maps need it, without numpy
+# cSDH uses the exact collision check only.
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from . import collision
+
+## Version of the file format written by Generate()
+FILE_FORMAT_VERSION = 1
+
+## The finger pairs with a map of their own, the pair (1,2) uses the map of (0,1)
+MAPPED_PAIRS = ( (0,1), (0,2) )
+
+## Default size of the cells in degrees for the base axis, the proximal axes and the distal axes
+DEFAULT_CELL_SIZE = ( 5.0, 5.0, 10.0 )
+
+## Minimum distance in mm by which the bounds of a cell must clear 0 to classify the cell
+MARGIN = 1.0e-6
+
+
+#-----------------------------------------------------------------
+def _GridShape( min_angle, max_angle, cell_size ):
+    '''Non public helper function: return the number of cells along each of the 5
+    dimensions of a map for the finger axis angle ranges \a min_angle .. \a max_angle
+    and the \a cell_size (all in degrees, per finger axis: base, proximal, distal).
+    '''
+    shape = []
+    for fai in ( 0, 1, 2, 1, 2 ):
+        n = int( math.ceil( (max_angle[ fai ] - min_angle[ fai ]) / cell_size[ fai ] - 1.0e-9 ) )
+        shape.append( max( n, 1 ) )
+    return tuple( shape )
+
+
+#-----------------------------------------------------------------
+def _GenerateSlab( job ):
+    '''Non public helper function for Generate(), executed in a worker process:
+    classify the cells of the map of a finger pair that have the base axis index i0.
+    Return a tuple (pair index, i0, free, colliding) with free / colliding as
+    bool arrays of the shape of the remaining 4 dimensions.
+    '''
+    (l1, l2, offset, pair_index, i0, min_angle, cell_size, shape, chunk) = job
+    finger_hulls = collision.cFingerHulls( l1, l2, offset )
+    (fi, fj) = MAPPED_PAIRS[ pair_index ]
+
+    lo = numpy.radians( [ min_angle[ fai ] for fai in ( 0, 1, 2, 1, 2 ) ] )
+    cell = numpy.radians( [ cell_size[ fai ] for fai in ( 0, 1, 2, 1, 2 ) ] )
+
+    # the half widths of the cells per finger axis, finger 1 has no base axis:
+    half_widths = numpy.zeros( (3, 3) )
+    for f in ( fi, fj ):
+        half_widths[ f ] = cell[:3] / 2.0
+    half_widths[ 1, 0 ] = 0.0
+
+    # the angles of the cell centres of the slab, shape (M, 4):
+    axes = [ lo[ d ] + ( numpy.arange( shape[ d ] ) + 0.5 ) * cell[ d ] for d in range( 1, 5 ) ]
+    centres = numpy.array( numpy.meshgrid( *axes, indexing="ij" ) ).reshape( 4, -1 ).T
+    a0 = lo[0] + ( i0 + 0.5 ) * cell[0]
+
+    free = numpy.empty( len( centres ), dtype=bool )
+    colliding = numpy.empty( len( centres ), dtype=bool )
+    for first in range( 0, len( centres ), chunk ):
+        c = centres[ first:first+chunk ]
+        r_angles = numpy.zeros( (len( c ), 3, 3) )
+        r_angles[ :, fi, 0 ] = a0
+        r_angles[ :, fj, 0 ] = a0
+        r_angles[ :, 1, 0 ] = 0.0
+        r_angles[ :, fi, 1: ] = c[ :, 0:2 ]
+        r_angles[ :, fj, 1: ] = c[ :, 2:4 ]
+        (lower, upper) = finger_hulls.ClearanceBounds( r_angles, half_widths, pairs=[ (fi, fj) ] )
+        free[ first:first+chunk ] = lower[ :, 0 ] > MARGIN
+        colliding[ first:first+chunk ] = upper[ :, 0 ] < -MARGIN
+    return ( pair_index, i0, free.reshape( shape[1:] ), colliding.reshape( shape[1:] ) )
+
+
+#-----------------------------------------------------------------
+def Generate( filename, l1, l2, offset, min_angle, max_angle, cell_size=DEFAULT_CELL_SIZE, processes=None, progress=None, chunk=4096 ):
+    '''
+    Generate the collision maps for the fingers with the kinematic parameters \a l1, \a l2
+    and \a offset (like cSDH.l1, cSDH.l2 and cSDH.offset) and write them to the
+    file \a filename (a numpy .npz file, the name is used as given).
+
+    The maps cover the finger axis angles from \a min_angle to \a max_angle with cells of
+    \a cell_size (all in degrees, lists of 3 values per finger axis: base, proximal, distal).
+    The work is distributed on \a processes worker processes (default: one per core, 1 means
+    no worker processes). If given, \a progress( done, total ) is called after each finished
+    slab of cells. \a chunk is the number of cells classified with one call of
+    collision.cFingerHulls.ClearanceBounds().
+    '''
+    if ( numpy is None ):
+        raise ImportError( "sdh.collisionmap.Generate() requires numpy" )
+
+    offset = [ [ float( v ) for v in o ] for o in offset ]
+    min_angle = [ float( v ) for v in min_angle ]
+    cell_size = [ float( v ) for v in cell_size ]
+    shape = _GridShape( min_angle, max_angle, cell_size )
+    jobs = [ (l1, l2, offset, pair_index, i0, min_angle, cell_size, shape, chunk)
+             for pair_index in range( 0, len( MAPPED_PAIRS ) )
+             for i0 in range( 0, shape[0] ) ]
+
+    free = numpy.empty( (len( MAPPED_PAIRS ),) + shape, dtype=bool )
+    colliding = numpy.empty( (len( MAPPED_PAIRS ),) + shape, dtype=bool )
+    pool = None
+    if ( processes != 1 ):
+        import multiprocessing
+        pool = multiprocessing.Pool( processes )
+        results = pool.imap_unordered( _GenerateSlab, jobs )
+    else:
+        results = ( _GenerateSlab( job ) for job in jobs )
+    try:
+        for (done, (pair_index, i0, f, c)) in enumerate( results ):
+            free[ pair_index, i0 ] = f
+            colliding[ pair_index, i0 ] = c
+            if ( progress is not None ):
+                progress( done+1, len( jobs ) )
+    finally:
+        if ( pool is not None ):
+            pool.terminate()
+
+    arrays = dict( version = FILE_FORMAT_VERSION,
+                   l1 = l1, l2 = l2, offset = offset,
+                   min_angle = min_angle, cell_size = cell_size, shape = shape )
+    for (pair_index, (fi, fj)) in enumerate( MAPPED_PAIRS ):
+        arrays[ "free_%d%d" % (fi, fj) ] = numpy.packbits( free[ pair_index ].ravel() )
+        arrays[ "colliding_%d%d" % (fi, fj) ] = numpy.packbits( colliding[ pair_index ].ravel() )
+    f = open( filename, "wb" )
+    try:
+        numpy.savez_compressed( f, **arrays )
+    finally:
+        f.close()
+
+
+#-----------------------------------------------------------------
+class cCollisionMap( object ):
+    '''
+    The collision maps of the finger pairs of an SDH, loaded from a file
+    written by Generate(). See the package documentation of collisionmap.
+    '''
+    def __init__( self, filename ):
+        '''
+        Constructor of cCollisionMap: load the maps from file \a filename.
+        '''
+        if ( numpy is None ):
+            raise ImportError( "sdh.collisionmap.cCollisionMap requires numpy" )
+
+        data = numpy.load( filename )
+        if ( int( data[ "version" ] ) != FILE_FORMAT_VERSION ):
+            raise ValueError( "Collision map %r has version %d, expected %d" % (filename, int( data[ "version" ] ), FILE_FORMAT_VERSION) )
+
+        ## the kinematic parameters the maps were generated for, see Matches()
+        self.l1 = float( data[ "l1" ] )
+        self.l2 = float( data[ "l2" ] )
+        self.offset = data[ "offset" ].tolist()
+
+        ## minimum finger axis angles and size of the cells in degrees (base, proximal, distal)
+        self.min_angle = data[ "min_angle" ].tolist()
+        self.cell_size = data[ "cell_size" ].tolist()
+
+        ## number of cells along the 5 dimensions of a map
+        self.shape = tuple( int( n ) for n in data[ "shape" ] )
+
+        # origin and cell size in rad, per dimension of a map:
+        self._lo = [ math.radians( self.min_angle[ fai ] ) for fai in ( 0, 1, 2, 1, 2 ) ]
+        self._cell = [ math.radians( self.cell_size[ fai ] ) for fai in ( 0, 1, 2, 1, 2 ) ]
+
+        # the bit planes of the maps as bytearrays, indexing them is faster than indexing numpy arrays:
+        self._free = [ bytearray( data[ "free_%d%d" % pair ].tostring() ) for pair in MAPPED_PAIRS ]
+        self._colliding = [ bytearray( data[ "colliding_%d%d" % pair ].tostring() ) for pair in MAPPED_PAIRS ]
+
+    def Matches( self, l1, l2, offset ):
+        '''
+        Return True if the maps were generated for the kinematic parameters \a l1, \a l2 and \a offset.
+        '''
+        return ( numpy.allclose( [ self.l1, self.l2 ], [ l1, l2 ] )  and
+                 numpy.allclose( self.offset, [ list( o ) for o in offset ] ) )
+
+    def _AxisIndex( self, a, d ):
+        '''Non public helper function: return the index of the cell containing angle \a a
+        (in rad) along dimension \a d of a map, or None if \a a is not covered by the map.
+        '''
+        n = self.shape[ d ]
+        x = (a - self._lo[ d ]) / self._cell[ d ]
+        # cells are closed, so a pose on the border of the map is still covered:
+        if ( x < -1.0e-9  or  x > n + 1.0e-9 ):
+            return None
+        return min( int( x ), n-1 )
+
+    def _FingerIndex( self, r_angles ):
+        '''Non public helper function: return the index of the cell containing the proximal
+        and distal angles of finger angles \a r_angles (in rad) within the last 2 dimensions
+        of a map, or None if they are not covered by the map.
+        '''
+        i1 = self._AxisIndex( r_angles[1], 3 )
+        i2 = self._AxisIndex( r_angles[2], 4 )
+        if ( i1 is None  or  i2 is None ):
+            return None
+        return i1 * self.shape[4] + i2
+
+    def _Cell( self, pair_index, i0, ki, kj ):
+        '''Non public helper function: return the state of the cell of the map of
+        MAPPED_PAIRS[ \a pair_index ] with base axis index \a i0 and finger indices
+        \a ki and \a kj (see _FingerIndex()): True, False or None like Lookup().
+        '''
+        if ( ki is None  or  kj is None ):
+            return None
+        n_finger = self.shape[3] * self.shape[4]
+        (byte, bit) = divmod( ( i0 * n_finger + ki ) * n_finger + kj, 8 )
+        mask = 0x80 >> bit
+        if ( self._free[ pair_index ][ byte ] & mask ):
+            return False
+        if ( self._colliding[ pair_index ][ byte ] & mask ):
+            return True
+        return None
+
+    def Lookup( self, r_f0, r_f1, r_f2 ):
+        '''
+        Look up the finger angles \a r_f0, \a r_f1 and \a r_f2 (in rad, 3 per finger).
+        Return a list with an entry per finger pair of collision.FINGER_PAIRS:
+        True if the fingers collide, False if they do not collide or None if
+        this is unknown (the exact check is needed).
+        '''
+        i0 = self._AxisIndex( r_f0[0], 0 )
+        if ( i0 is None  or  r_f1[0] != 0.0  or  r_f0[0] != r_f2[0] ):
+            # not covered or not a pose of the SDH: finger 1 has no base axis and fingers 0 and 2 share axis 0
+            return [ None, None, None ]
+        (k0, k1, k2) = [ self._FingerIndex( r ) for r in (r_f0, r_f1, r_f2) ]
+        return [ self._Cell( 0, i0, k0, k1 ),
+                 self._Cell( 1, i0, k0, k2 ),
+                 # pair (1,2) is the mirror image of pair (0,1):
+                 self._Cell( 0, i0, k2, k1 ) ]
+
+
+######################################################################
+# some usefull editing settings for emacs:
+#
+#;;; Local Variables: ***
+#;;; mode:python ***
+#;;; End: ***
+#
+######################################################################
@@ -37,7 +37,7 @@ SVN-revision: $Id: dbg.py 6432 2011-02-08 13:53:00Z Osswald2 $
 #
 ##########################################################################
 
-import sys, string
+import sys, string, logging
 
 from util import *
 
@@ -62,12 +62,25 @@ class tDBG(object):
     g << "Messages can be turned of and on, e.g. selected by command line options"
     g.SetFlag(False)
     g << "This messages is not printed"
+
+    Messages in frequently executed code should not be formatted
+    in vain if debug messages are off. Use Printf() which formats
+    only if the message is printed, or guard expensive code with IsEnabled():
+    d.Printf( "read %r\n", the_bytes )
+    if d.IsEnabled():
+        d << "age %d\n" % ComputeAge()
+
+    Instead of a file like object the output can be a logging.Logger
+    of the standard logging module, see SetOutput().
     '''
     def __init__(self, flag = False, color = 'red', fd = sys.stderr ):
         self.debug_flag     = flag
         self.debug_color    = color
-        self.output         = fd
         self.do_add_newline = True
+        self.logger         = None
+        self.log_level      = logging.DEBUG
+        self._log_line      = ""
+        self.SetOutput( fd )
         
     def SetFlag(self, flag):
         '''Set debug_flag of this tDBG object to flag. After setting
@@ -88,12 +101,42 @@ class tDBG(object):
 
     def SetOutput(self, fd):
         '''Set output of this tDBG object to fd, which must be a file like object like sys.stderr
+        or a logging.Logger object, see SetLogger().
+        '''
+        if ( isinstance( fd, logging.Logger ) ):
+            self.SetLogger( fd )
+        else:
+            self.output = fd
+            self.logger = None
+
+    def SetLogger(self, logger, level = logging.DEBUG):
+        '''Route the messages of this tDBG object to logger, a logging.Logger object
+        (or the name of one) of the standard logging module, with the given level.
+        The messages are then printed only if the debug_flag is True and the
+        logger is enabled for level. Messages are passed to the logger line by line
+        and without colors.
         '''
-        self.output = fd
+        if ( isinstance( logger, basestring ) ):
+            logger = logging.getLogger( logger )
+        self.logger    = logger
+        self.log_level = level
+        self.output    = None
+        self._log_line = ""
+
+    def IsEnabled(self):
+        '''Return True if messages are printed, like logging.Logger.isEnabledFor().
+        Use this to skip code that is needed for debug messages only.
+        '''
+        if not self.debug_flag:
+            return False
+        return self.logger is None  or  self.logger.isEnabledFor( self.log_level )
 
     def GetOutput(self):
         '''Get output of this tDBG object, which is a file like object like sys.stderr
+        or the logging.Logger set with SetLogger()
         '''
+        if self.logger is not None:
+            return self.logger
         return self.output
 
     def SetAddNewline(self, flag):
@@ -109,6 +152,10 @@ class tDBG(object):
         with SetColor, but only if self.debug_flag is True.
         '''
         if self.debug_flag:
+            if self.logger is not None:
+                self._Log( msgs )
+                return
+
             # compose message
             allmsgs = GetColor( self.debug_color )
             for msg in msgs:
@@ -122,6 +169,37 @@ class tDBG(object):
             else:
                 self.output.write( allmsgs )
 
+    def _Log(self, msgs ):
+        '''Non public helper function: pass the complete lines of msgs to self.logger
+        '''
+        if not self.logger.isEnabledFor( self.log_level ):
+            return
+        for msg in msgs:
+            if ( type( msg ) is unicode ):
+                msg = msg.encode("latin1")
+            self._log_line += str(msg)
+        if self.do_add_newline:
+            self._log_line += '\n'
+        lines = self._log_line.split( '\n' )
+        # the last part is not terminated yet, keep it for the next message:
+        self._log_line = lines.pop()
+        for line in lines:
+            self.logger.log( self.log_level, line )
+
+    def Printf(self, fmt, *args ):
+        '''C like printing: print fmt % args (without adding a newline, like <<),
+        but only if messages are printed, see IsEnabled(). So the formatting
+        costs nothing if debug messages are off:
+        d.Printf( "read %d bytes: %r\n", len(s), s )
+        '''
+        if self.debug_flag  and  self.IsEnabled():
+            if args:
+                fmt = fmt % args
+            old_do_add_newline = self.do_add_newline
+            self.do_add_newline = False
+            self.PDM( fmt )
+            self.do_add_newline = old_do_add_newline
+
     def __lshift__(self, msg):
         '''C++ stream like printing:
         d = tDBG( True )
@@ -153,7 +231,7 @@ class tDBG(object):
 
         Both lines will print "v = 42, s = test"
         '''
-        if self.debug_flag:
+        if self.IsEnabled():
             global_vars = sys._getframe(1).f_globals
             local_vars = sys._getframe(1).f_locals
             sep=""
@@ -166,5 +244,6 @@ class tDBG(object):
     def flush(self):
         '''flush output stream
         '''
-        self.output.flush()
+        if self.output is not None:
+            self.output.flush()
         
\ No newline at end of file
@@ -51,7 +51,11 @@
 #
 #    The following non-standard python modules are used
 #    - util, utils, dbg : common utilities, provided by SCHUNK
+#    - crc       : the CRC16 checksum used by the DSACON32m, provided by SCHUNK
+#    - dsarecord : recording and replay of the communication, provided by SCHUNK
+#    - dsaframelog : persistent log of frames, provided by SCHUNK
 #    - serial    : the pySerial module from <a href="http://pyserial.sourceforge.net/">http://pyserial.sourceforge.net/</a>
+#    - numpy     : (optional) for fast decoding of frames. Without numpy a slower pure python decoding is used.
 #    - py.test   : unit testing framework from <a href="http://codespeak.net/py/current/doc/index.html">http://codespeak.net/py/current/doc/index.html</a>.
 #
 #
@@ -67,12 +71,24 @@ import sys, struct, array, threading, time
 # pySerial module from http://pyserial.sourceforge.net/
 import serial
 
+# Try to import numpy: If available then it is used to decode frames
+# and frame.texels and frame.matrices are provided as numpy views.
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 # import modules from the package:
 from . import sdh
 from . import util
 from . import utils
 from . import auxiliary
 from . import tcpserial
+from . import dsarecord
+from . import dsaframelog
+from . import instrumentation
+# the CRC16 checksum of the DSACON32m (gCRCtbl, CRC_INIT_VALUE and CRC16 were defined here before):
+from .crc import gCRCtbl, CRC_INIT_VALUE, CRC16, CRC16Bytes # pylint: disable-msg=W0611
 import socket
 
 # special value to indicate "all fingers" or "all parts"
@@ -120,55 +136,13 @@ def Boolify( v ):
         return False
 #-----------------------------------------------------------------
 
-## The CRC table used by the DSACON32m controller
-gCRCtbl = [ 0x0000, 0x1021, 0x2042, 0x3063, 0x4084, 0x50a5, 0x60c6, 0x70e7,
-                  0x8108, 0x9129, 0xa14a, 0xb16b, 0xc18c, 0xd1ad, 0xe1ce, 0xf1ef,
-                  0x1231, 0x0210, 0x3273, 0x2252, 0x52b5, 0x4294, 0x72f7, 0x62d6,
-                  0x9339, 0x8318, 0xb37b, 0xa35a, 0xd3bd, 0xc39c, 0xf3ff, 0xe3de,
-                  0x2462, 0x3443, 0x0420, 0x1401, 0x64e6, 0x74c7, 0x44a4, 0x5485,
-                  0xa56a, 0xb54b, 0x8528, 0x9509, 0xe5ee, 0xf5cf, 0xc5ac, 0xd58d,
-                  0x3653, 0x2672, 0x1611, 0x0630, 0x76d7, 0x66f6, 0x5695, 0x46b4,
-                  0xb75b, 0xa77a, 0x9719, 0x8738, 0xf7df, 0xe7fe, 0xd79d, 0xc7bc,
-                  0x48c4, 0x58e5, 0x6886, 0x78a7, 0x0840, 0x1861, 0x2802, 0x3823,
-                  0xc9cc, 0xd9ed, 0xe98e, 0xf9af, 0x8948, 0x9969, 0xa90a, 0xb92b,
-                  0x5af5, 0x4ad4, 0x7ab7, 0x6a96, 0x1a71, 0x0a50, 0x3a33, 0x2a12,
-                  0xdbfd, 0xcbdc, 0xfbbf, 0xeb9e, 0x9b79, 0x8b58, 0xbb3b, 0xab1a,
-                  0x6ca6, 0x7c87, 0x4ce4, 0x5cc5, 0x2c22, 0x3c03, 0x0c60, 0x1c41,
-                  0xedae, 0xfd8f, 0xcdec, 0xddcd, 0xad2a, 0xbd0b, 0x8d68, 0x9d49,
-                  0x7e97, 0x6eb6, 0x5ed5, 0x4ef4, 0x3e13, 0x2e32, 0x1e51, 0x0e70,
-                  0xff9f, 0xefbe, 0xdfdd, 0xcffc, 0xbf1b, 0xaf3a, 0x9f59, 0x8f78,
-                  0x9188, 0x81a9, 0xb1ca, 0xa1eb, 0xd10c, 0xc12d, 0xf14e, 0xe16f,
-                  0x1080, 0x00a1, 0x30c2, 0x20e3, 0x5004, 0x4025, 0x7046, 0x6067,
-                  0x83b9, 0x9398, 0xa3fb, 0xb3da, 0xc33d, 0xd31c, 0xe37f, 0xf35e,
-                  0x02b1, 0x1290, 0x22f3, 0x32d2, 0x4235, 0x5214, 0x6277, 0x7256,
-                  0xb5ea, 0xa5cb, 0x95a8, 0x8589, 0xf56e, 0xe54f, 0xd52c, 0xc50d,
-                  0x34e2, 0x24c3, 0x14a0, 0x0481, 0x7466, 0x6447, 0x5424, 0x4405,
-                  0xa7db, 0xb7fa, 0x8799, 0x97b8, 0xe75f, 0xf77e, 0xc71d, 0xd73c,
-                  0x26d3, 0x36f2, 0x0691, 0x16b0, 0x6657, 0x7676, 0x4615, 0x5634,
-                  0xd94c, 0xc96d, 0xf90e, 0xe92f, 0x99c8, 0x89e9, 0xb98a, 0xa9ab,
-                  0x5844, 0x4865, 0x7806, 0x6827, 0x18c0, 0x08e1, 0x3882, 0x28a3,
-                  0xcb7d, 0xdb5c, 0xeb3f, 0xfb1e, 0x8bf9, 0x9bd8, 0xabbb, 0xbb9a,
-                  0x4a75, 0x5a54, 0x6a37, 0x7a16, 0x0af1, 0x1ad0, 0x2ab3, 0x3a92,
-                  0xfd2e, 0xed0f, 0xdd6c, 0xcd4d, 0xbdaa, 0xad8b, 0x9de8, 0x8dc9,
-                  0x7c26, 0x6c07, 0x5c64, 0x4c45, 0x3ca2, 0x2c83, 0x1ce0, 0x0cc1,
-                  0xef1f, 0xff3e, 0xcf5d, 0xdf7c, 0xaf9b, 0xbfba, 0x8fd9, 0x9ff8,
-                  0x6e17, 0x7e36, 0x4e55, 0x5e74, 0x2e93, 0x3eb2, 0x0ed1, 0x1ef0 ]
-
-# DSACON32m controller uses this value as initial value of the checksum:
-CRC_INIT_VALUE = 0xffff
-
-def CRC16( crc, byte, crc_table ):
-    '''Do cyclic redundancy check calculation. 
-    Return the CRC for byte added to the current crc using the crc_table.  
-    '''
-    return ( (crc & 0xFF00) >> 8 ) ^ crc_table[ ( crc & 0x00FF ) ^ (byte & 0x00FF)] 
-
 #-----------------------------------------------------------------
 def UIntFromBytes( the_bytes ):
     '''
     Return an int from the bytes in list the_bytes (1,2,3,4,...,bytes) in little endian
+    (the_bytes may also be a bytearray, like the payload of a response)
     '''
-    if not type( the_bytes ) in [ list, tuple ]:
+    if not type( the_bytes ) in [ list, tuple, bytearray ]:
         return int(the_bytes)
     the_sum = 0
     factor = 0
@@ -208,6 +182,53 @@ def UInt16ToBytes( the_uint16 ):
     return [ ord(b) for b in byte_string ]
         
 
+#-----------------------------------------------------------------
+def DecodeTexelsArray( payload, i, do_RLE, data ):
+    '''
+    Decode the texel values of a full frame from the bytearray \a payload,
+    starting at index \a i, into the array('H') \a data. If \a do_RLE is true
+    then the texels are run length encoded (each 16 bit word holds the value
+    in the lower 12 bits and the repeat count in the upper 4 bits).
+    This is the pure python variant of DecodeTexelsNumPy().
+    Return the number of texels decoded.
+    '''
+    nb_words = (len( payload ) - i) // 2
+    words = array.array( 'H' )
+    words.fromstring( str( payload[ i : i + 2*nb_words ] ) )
+    if sys.byteorder != "little":
+        words.byteswap()
+
+    if do_RLE:
+        values = []
+        for w in words:
+            values.extend( [ w & 0x0fff ] * (w >> 12) )
+        words = array.array( 'H', values )
+
+    if len( words ) > len( data ):
+        raise cDSAError( "Invalid frame with %d texels, expected at most %d" % (len( words ), len( data )) )
+    data[ 0:len( words ) ] = words
+    return len( words )
+
+#-----------------------------------------------------------------
+def DecodeTexelsNumPy( payload, i, do_RLE, texels ):
+    '''
+    Decode the texel values of a full frame from the bytearray \a payload,
+    starting at index \a i, into the 1D numpy array \a texels, using
+    vectorized operations on the whole payload.
+    See DecodeTexelsArray() for the parameters.
+    Return the number of texels decoded.
+    '''
+    nb_words = (len( payload ) - i) // 2
+    words = numpy.frombuffer( payload, dtype="<u2", count=nb_words, offset=i )
+
+    if do_RLE:
+        words = numpy.repeat( words & 0x0fff, words >> 12 )
+
+    if len( words ) > len( texels ):
+        raise cDSAError( "Invalid frame with %d texels, expected at most %d" % (len( words ), len( texels )) )
+    texels[ 0:len( words ) ] = words
+    return len( words )
+
 #-----------------------------------------------------------------
 ## \addtogroup sdh_library_python_primary_user_interface_classes_group
 #  @{
@@ -224,7 +245,7 @@ class cDSA( object ):
     '''
 
     #----------------------------------------------------------------- 
-    def __init__(self, debug_level=0, port=None, baudrate=115200, bytesize=8, parity='N', stopbits=1, timeout=1, xonxoff=0, rtscts=0, writeTimeout=None, dsrdtr=None, debug_output=sys.stderr ): # pylint: disable-msg=W0231
+    def __init__(self, debug_level=0, port=None, baudrate=115200, bytesize=8, parity='N', stopbits=1, timeout=1, xonxoff=0, rtscts=0, writeTimeout=None, dsrdtr=None, debug_output=sys.stderr, record=None ): # pylint: disable-msg=W0231
         '''Constructor of cDSA class.
         
         This constructs a cDSA object to communicate with
@@ -244,6 +265,8 @@ class cDSA( object ):
                                - a single number like 0 for an RS232 port (port 0 = ttyS0 = COM1, port 1 = ttyS1 = COM2, 
                                - or a device name like \"/dev/ttyUSB0\" for the corresponding RS232 port,
                                - or a IP_OR_HOSTNAME:PORT for a TCP connection to that numeric IPv4 address or hostname
+                               - or an already opened communication object providing read(), write(), inWaiting(), close() 
+                                 and timeout like a serial.Serial object, e.g. a dsarecord.tDSAReplay object to replay a recording
         \param baudrate      - the baudrate to use. Leave this at the default 115200 bit/s. A value of 0 will use the default.
         \param bytesize      - the size in bits of one byte to transfer. Leave this at the default 8 bit / byte.
         \param parity        - the parity to use for transfer. Leave this at the default 'N' for no parity.
@@ -254,6 +277,8 @@ class cDSA( object ):
         \param writeTimeout  - the write timeout to use for transfer. Leave this at the default None.
         \param dsrdtr        - the DSR/DTR setting to use for transfer. Leave this at the default None.
         \param debug_output  - a file like object where debug output is sent to, if enabled. Default is stderr. 
+        \param record        - if not None then the name of a file where all communication with the remote DSACON32m
+                               is recorded to, see dsarecord.tDSARecorder. 
         '''
         self._dbg = sdh.dbg.tDBG( True, "blue" )
         self._dbg.SetFlag( debug_level > 0 )
@@ -264,11 +289,18 @@ class cDSA( object ):
 
         self.com = None
         self.port = port
-        if ( type( port ) is int  or  "/" in port or (type( port ) is str  and  port[:3] == "COM") ):
+        if ( hasattr( port, "read" ) ):
+            self._dbg << "Using communication object %r\n" % port
+            self.com = port
+            self.GetTimeout = self.GetTimeoutRS232
+            self.SetTimeout = self.SetTimeoutRS232
+            self.GetNbBytesReadable = self.GetNbBytesReadableRS232
+        elif ( type( port ) is int  or  "/" in port or (type( port ) is str  and  port[:3] == "COM") ):
             self._dbg << "Using RS232 on port %r for communication\n" % port
             self.com = serial.Serial( port=port, baudrate=baudrate, bytesize=bytesize, parity=parity, stopbits=stopbits, timeout=timeout, xonxoff=xonxoff, rtscts=rtscts, writeTimeout=writeTimeout, dsrdtr=dsrdtr )
             self.GetTimeout = self.GetTimeoutRS232
             self.SetTimeout = self.SetTimeoutRS232
+            self.GetNbBytesReadable = self.GetNbBytesReadableRS232
         elif ":" in port:
             adr_port = port.split(":")
             tcp_adr = adr_port[0]
@@ -277,19 +309,17 @@ class cDSA( object ):
             self.com = tcpserial.tTCPSerial( tcp_adr, dsa_tcp_port )
             self.GetTimeout = self.GetTimeoutTCP
             self.SetTimeout = self.SetTimeoutTCP
+            self.GetNbBytesReadable = self.GetNbBytesReadableTCP
         else:
             raise cDSAError( "Invalid communication port specification %r" % port )
 
+        if ( record is not None ):
+            self._dbg << "Recording communication to %r\n" % record
+            self.com = dsarecord.tDSARecorder( self.com, record )
+
         self._dbg.var( "port baudrate bytesize parity stopbits timeout xonxoff rtscts writeTimeout dsrdtr")
 
-        ## flag, true if user requested acquiring of a single frame. Needed for DSACON32m firmware-bug workaround.
-        self.acquiring_single_frame = False 
-        
-        ## \brief A list with all vector-like types that are accepted as parameters.
-        self._vector_types = [ list, tuple ]
-        #  TODO: This should be made more general, e.g. to work with derived classes.
-        #        What we acutally need to know if the parameter is iterable,
-        #        see e.g. http://bytes.com/groups/python/514838-how-test-if-object-sequence-iterable
+        self._InitReceiveState()
         
         #---------------------
         # Set framerate of remote DSACON32m to 0 first.
@@ -330,9 +360,6 @@ class cDSA( object ):
         ## A list of texel offsets. For each sensor matrix the offset of the first texel of the matrix in the frame is stored. 
         self.texel_offset = []
         
-        ## A structure containing the last tactile sensor frame read from the SDH
-        self.frame = utils.Struct()
-        self.frame.timestamp = 0
         nb_cells = 0
         
         for i in xrange( 0, self.sensor_info.nb_matrices ):
@@ -345,12 +372,62 @@ class cDSA( object ):
         self._dbg.var( "self.matrix_info" )
         self._dbg.var( "nb_cells" )
 
-        self.frame.data = array.array( 'H', [ 0 ]*nb_cells )
+        self._InitFrameState( nb_cells )
+
+    #-----------------------------------------------------------------
+    def _InitReceiveState( self ):
+        '''
+        Non public helper function: initialize the state of the receiving and
+        decoding of responses (receive buffer, statistics, instrumentation).
+        Called by the constructor before the first command is sent.
+        '''
+        ## Receive buffer: bytes read from the interface but not yet consumed by _ReadNextResponse()
+        self._rx_buffer = bytearray()
+
+        ## Statistics about the communication, see GetStats()
+        self.ResetStats()
+
+        ## The timing instrumentation of the responses, see EnableInstrumentation()
+        self.instrumentation = None
+
+        ## flag, true if user requested acquiring of a single frame. Needed for DSACON32m firmware-bug workaround.
+        self.acquiring_single_frame = False 
+        
+        ## \brief A list with all vector-like types that are accepted as parameters.
+        self._vector_types = [ list, tuple ]
+        #  TODO: This should be made more general, e.g. to work with derived classes.
+        #        What we acutally need to know if the parameter is iterable,
+        #        see e.g. http://bytes.com/groups/python/514838-how-test-if-object-sequence-iterable
+
+    #-----------------------------------------------------------------
+    def _InitFrameState( self, nb_cells ):
+        '''
+        Non public helper function: initialize the frame with \a nb_cells
+        texels and the state of the frame processing (updater, frame log,
+        contact evaluation). Called by the constructor after the matrix
+        infos were queried.
+        '''
+        ## A structure containing the last tactile sensor frame read from the SDH.
+        #  Each newly read frame is a new frame structure (a snapshot) that
+        #  is never modified after it was published here, see _PublishFrame(). 
+        #  So keep a reference to self.frame to work on a consistent frame.
+        self.frame = self._CreateFrame( nb_cells )
         self._start_pc = 0
         self._start_dsa = 0
         
+        ## Condition to wait for new frames, notified on each published frame, see WaitForFrame()
+        self._frame_condition = threading.Condition()
+
         self._updater = None
-        self._semaphore = None
+
+        ## Event to make the updater thread terminate, see StopUpdater()
+        self._updater_stop = threading.Event()
+
+        ## The log where published frames are appended to, see StartFrameLog()
+        self._frame_log = None
+
+        ## Precomputed coordinates of all texels, see _GetTexelGrids()
+        self._texel_grids = None
 
         ## A list of all the finger indices of the SDH.        
         self.all_fingers = [ 0, 1, 2 ]
@@ -382,7 +459,7 @@ class cDSA( object ):
         #  new computers and fast communication like via TCP this should remain
         #  at "False".
         self.read_another = False
-        
+
     def read(self,n):
         try:
             return self.com.read(n)
@@ -410,6 +487,16 @@ class cDSA( object ):
     def SetTimeoutTCP(self,v):
         self._dbg << "SetTimeoutTCP(%r)\n" % v 
         self.com.SetTimeout(v)
+
+    def GetNbBytesReadableRS232(self):
+        # serial.Serial.read(n) blocks until n bytes are read, so ask for what is already there only:
+        return self.com.inWaiting()
+    def GetNbBytesReadableTCP(self):
+        # a socket recv(n) returns as soon as any data is available, so reading more is always ok:
+        return self.RX_CHUNK_SIZE
+
+    ## Maximum number of bytes to request from a TCP interface with a single read
+    RX_CHUNK_SIZE = 4096
         
     #-----------------------------------------------------------------
     def FlushInput( self, timeout_s_first, timeout_s_subsequent ):
@@ -426,7 +513,8 @@ class cDSA( object ):
         #---------------------
         # clean up communication line
         bytes_read = 1        # to start the loop
-        bytes_read_total = 0
+        bytes_read_total = len( self._rx_buffer )
+        del self._rx_buffer[:]
         try:
             old_timeout = self.timeout
             self.timeout = timeout_s_first
@@ -515,8 +603,11 @@ class cDSA( object ):
     #-----------------------------------------------------------------
     def Close(self):
         '''Close connection to remote DSACON32m controller in the SDH.
-        Tries to reset the framerate to 0 to stop the DSACON32m from sending before closing
+        Stops the updater thread (if any) and the frame log (if any) and tries 
+        to reset the framerate to 0 to stop the DSACON32m from sending before closing
         '''
+        self.StopUpdater()
+        self.StopFrameLog()
         self.SetFramerateRetries( framerate=0, do_data_acquisition=False, retries=0, ignore_exceptions=True )
         self.com.close()
 
@@ -527,6 +618,7 @@ class cDSA( object ):
         timeout 0, i.e. return at once ignoring anything that is available
         now.
         '''
+        del self._rx_buffer[:]
         try:
             old_timeout = self.timeout
             self.timeout = 0
@@ -549,21 +641,21 @@ class cDSA( object ):
             if ( b < 0  or  b > 255 ):
                 raise cDSAError( "Invalid byte value %d = 0x%x, not in [0.255]" % (b, b) )
             self.write( "%c" % b )
+        if ( self.instrumentation is not None  and  len( the_bytes ) > 3 ):
+            self.instrumentation.RecordSent( the_bytes[3], len( the_bytes ) )
 
-        self._dbg << "wrote bytes %s to port\n" % (repr(the_bytes)) # pylint: disable-msg=W0231
+        self._dbg.Printf( "wrote bytes %r to port\n", the_bytes )
 
     #-----------------------------------------------------------------
     def _WriteCommandWithPayload( self, command, payload ):
         '''Non public helper function:
         Write a command with some payload to the remote DSACON32m controller. 
         '''
-        checksum = CRC_INIT_VALUE
         if ( type(payload) not in (tuple, list) ):
             payload = [ payload ]
     
         lenp = len( payload )
-        for b in [command, LB( lenp ), HB( lenp )] + payload:
-            checksum = CRC16( checksum, b, gCRCtbl )
+        checksum = CRC16Bytes( [command, LB( lenp ), HB( lenp )] + payload )
         self._WriteBytes( [0xaa, 0xaa, 0xaa, command, LB( lenp ), HB( lenp )] + payload + [ LB( checksum ), HB( checksum ) ] )
 
     #-----------------------------------------------------------------
@@ -654,6 +746,8 @@ class cDSA( object ):
             #self.com.close()
             #self.open()
             retries -= 1
+            if ( self.instrumentation is not None  and  retries >= 0 ):
+                self.instrumentation.RecordRetry()
 
     #-----------------------------------------------------------------
     # pylint: disable-msg=W0613
@@ -663,6 +757,31 @@ class cDSA( object ):
         
         Raises a cDSAError in case of invalid responses from the remote DSACON32m controller.
         '''
+        flags = self._CommandFlags( do_data_acquisition, do_single_shot, do_RLE )
+    
+        if ( framerate is not None ):
+            self._WriteCommandWithPayload( command, [ flags, LB( framerate ), HB( framerate ) ] )
+            response = self._ReadResponse( command )
+            if ( response.size != 2 ):
+                raise cDSAError( "Invalid response from DSACON32m, expected 2 bytes but got %d" % response.size )
+            response.error_code = UIntFromBytes( response.payload )
+            self.CheckErrorCode(response.error_code, "Error response from DSACON32m for command 0x%02x" % command )
+            self._dbg << "acknowledge ok\n" # pylint: disable-msg=W0104
+        elif ( payload is not None):
+            self._WriteCommandWithPayload( command, payload )
+        else:
+            # no payload => no checksum
+            self._WriteBytes( [0xaa, 0xaa, 0xaa, command, 0x00, 0x00 ] )                
+        return # everything ok, so return
+
+            
+
+    #-----------------------------------------------------------------
+    @staticmethod
+    def _CommandFlags( do_data_acquisition=True, do_single_shot=False, do_RLE=True ):
+        '''Non public helper function: 
+        Return the flags byte of a command to the remote DSACON32m controller, see _WriteCommand().
+        '''
         flags = 0
         if ( do_data_acquisition ):
             flags |= (1<<7)
@@ -681,48 +800,41 @@ class cDSA( object ):
                             
         if ( do_RLE ):
             flags |= (1<<0)
-    
-        if ( framerate is not None ):
-            self._WriteCommandWithPayload( command, [ flags, LB( framerate ), HB( framerate ) ] )
-            response = self._ReadResponse( command )
-            if ( response.size != 2 ):
-                raise cDSAError( "Invalid response from DSACON32m, expected 2 bytes but got %d" % response.size )
-            response.error_code = UIntFromBytes( response.payload )
-            self.CheckErrorCode(response.error_code, "Error response from DSACON32m for command 0x%02x" % command )
-            self._dbg << "acknowledge ok\n" # pylint: disable-msg=W0104
-        elif ( payload is not None):
-            self._WriteCommandWithPayload( command, payload )
-        else:
-            # no payload => no checksum
-            self._WriteBytes( [0xaa, 0xaa, 0xaa, command, 0x00, 0x00 ] )                
-        return # everything ok, so return
-
-            
+        return flags
 
     #-----------------------------------------------------------------
-    def _ReadUInt8( self ):
+    def _FillReceiveBuffer( self, nb_bytes ):
         '''Non public helper function: 
-        Read one byte from the interface and return the byte as 8 bit unsigned int
+        Read from the interface until the receive buffer holds at least \a nb_bytes bytes.
+        As many bytes as available are read with each call of read(), so complete 
+        packets are usually read with a single call.
+        
+        Raises a cDSAError in case of timeout.
         '''
         retries = 3
-        e = None
-        while (retries>0):
-            retries -= 1
+        while len( self._rx_buffer ) < nb_bytes:
+            nb_missing = nb_bytes - len( self._rx_buffer )
             try:
-                c = self.read( 1 )
-                if c == "":
-                    raise cDSAError( "Timeout while reading 1 byte from port %r " % (self.port) )
-                b = ord( c )
-                #self._dbg << "read UInt8 %d\n" % b  # pylint: disable-msg=W0104
-                return b
+                s = self.read( max( nb_missing, self.GetNbBytesReadable() ) )
             except OSError, e:
-                pass
-            except TypeError, e:
-                # this seems to happen sometimes: TypeError: ord() expected a character, but string of length 4 found
-                pass
-        if (e is None):
-            e = cDSAError( "Could not read 1 byte with 3 retries" )
-        raise e # pylint: disable-msg=E0702
+                retries -= 1
+                if ( retries <= 0 ):
+                    raise cDSAError( "Could not read %d bytes with 3 retries: %s" % (nb_missing, str(e)) )
+                continue
+            if s == "":
+                self._stats.timeouts += 1
+                raise cDSAError( "Timeout while reading %d bytes from port %r " % (nb_missing, self.port) )
+            self._rx_buffer.extend( s )
+
+    #-----------------------------------------------------------------
+    def _ReadUInt8( self ):
+        '''Non public helper function: 
+        Read one byte from the interface and return the byte as 8 bit unsigned int
+        '''
+        self._FillReceiveBuffer( 1 )
+        b = self._rx_buffer[0]
+        del self._rx_buffer[0]
+        return b
             
 
     #-----------------------------------------------------------------
@@ -745,66 +857,182 @@ class cDSA( object ):
         #self._dbg << "read UInt32 %d\n" % v  # pylint: disable-msg=W0104
         return (v, bs)
 
+    ## The preamble that starts every packet sent by the DSACON32m
+    PREAMBLE = "\xaa\xaa\xaa"
+    
+    ## Number of bytes of a packet before the payload: preamble, packet ID and size
+    HEADER_SIZE = 6
+
+    ## Number of bytes of a packet after the payload: checksum
+    TRAILER_SIZE = 2
+
+    ## Packets with a larger payload size are considered to be corrupted.
+    #  This is much more than any response of the DSACON32m (a full frame
+    #  of the SDH without RLE has 977 bytes), but avoids waiting for
+    #  up to 64KB of data if the size field was garbled.
+    MAX_PAYLOAD_SIZE = 4096
+
     #-----------------------------------------------------------------
     def _ReadNextResponse( self ):
         '''Non public helper function: 
         Read and return the next response from the remote DSA
+        
+        The bytes are read in bulk into a receive buffer which is then
+        scanned for the preamble. The header and the complete rest of the
+        packet are read with as few reads as possible. 
+        The members \a payload and \a the_bytes of the returned response
+        are bytearrays (indexing yields ints, like the lists used before).
+
+        If the packet found is invalid (checksum error, implausible size or
+        timeout while reading the packet) then only the first preamble byte
+        is dropped before the cDSAError is raised. So the next call
+        resynchronizes on the next preamble found, which might be within
+        the bytes of the invalid packet. See also GetStats().
         '''
-        # read  preamble 0xaa, 0xaa, 0xaa
-        the_bytes = []
+        instrumentation = self.instrumentation
+        if ( instrumentation is not None ):
+            t0 = time.time()
+        buf = self._rx_buffer
         response = utils.Struct()
         response.size = 0
         
-        # scan for 3 preamble bytes
-        nb_preamble_bytes = 0
-        for i in xrange( 0, 1000): # pylint: disable-msg=W0612
-            v = self._ReadUInt8()
-            if ( v == 0xaa ):
-                nb_preamble_bytes += 1
-            else:
-                nb_preamble_bytes = 0
-                
-            if (nb_preamble_bytes == 3):
-                the_bytes.extend( [ 0xaa, 0xaa, 0xaa] )
+        # scan for 3 preamble bytes 0xaa, 0xaa, 0xaa, ignore at most 1000 bytes before
+        nb_dropped = 0
+        self._FillReceiveBuffer( len( self.PREAMBLE ) )
+        while True:
+            start = buf.find( self.PREAMBLE )
+            if ( start >= 0 ):
+                nb_dropped += start
+                del buf[:start]
                 break
-        if (nb_preamble_bytes != 3):
+            # keep the last bytes, they might be the beginning of a preamble
+            nb_drop = len( buf ) - len( self.PREAMBLE ) + 1
+            nb_dropped += nb_drop
+            del buf[:nb_drop]
+            if ( nb_dropped >= 1000 ):
+                self._CountDropped( nb_dropped )
+                raise cDSAError( "Could not find preamble 0xaa 0xaa 0xaa within 1000 bytes" )
+            try:
+                self._FillReceiveBuffer( len( buf ) + 1 )
+            except cDSAError:
+                self._CountDropped( nb_dropped )
+                raise
+        self._CountDropped( nb_dropped )
+        if ( nb_dropped >= 1000 ):
             raise cDSAError( "Could not find preamble 0xaa 0xaa 0xaa within 1000 bytes" )
 
-        # read and check packet ID
-        v = self._ReadUInt8() 
-        the_bytes.append( v )
-        response.packet_id = v
-        
+        try:
+            # read packet ID and size
+            self._FillReceiveBuffer( self.HEADER_SIZE )
+            response.packet_id = buf[3]
+            response.size = buf[4] + (buf[5] << 8)
+            if ( response.size > self.MAX_PAYLOAD_SIZE ):
+                raise cDSAError( "Invalid packet size %d for packet with id 0x%02x" % (response.size, response.packet_id) )
+
+            # read indicated rest: payload and checksum (chksum is now 2 bytes !!!new)
+            nb_packet = self.HEADER_SIZE + response.size + self.TRAILER_SIZE
+            self._FillReceiveBuffer( nb_packet )
+        except cDSAError:
+            self._Resync()
+            raise
+        response = self._TakeResponse( response, nb_packet )
+        if ( instrumentation is not None ):
+            instrumentation.Record( response.packet_id, t0, nb_packet )
+        return response
+
+    #-----------------------------------------------------------------
+    def _ParseBufferedResponse( self ):
+        '''Non public helper function: 
+        Return the next response if the receive buffer holds a complete packet,
+        or None if more bytes are needed. Unlike _ReadNextResponse() this never
+        reads from the interface, so the caller can fill the receive buffer
+        with the bytes available whenever it likes (see asyncdsa.cAsyncDSA).
 
-        # read size
-        (v, bs) = self._ReadUInt16()
-        the_bytes += bs
-        response.size = v
+        Bytes before the preamble are dropped and counted in the statistics.
+        Invalid packets raise a cDSAError like in _ReadNextResponse().
+        '''
+        buf = self._rx_buffer
+        start = buf.find( self.PREAMBLE )
+        if ( start < 0 ):
+            # keep the last bytes, they might be the beginning of a preamble
+            nb_drop = max( len( buf ) - len( self.PREAMBLE ) + 1, 0 )
+            del buf[:nb_drop]
+            self._CountDropped( nb_drop )
+            return None
+        self._CountDropped( start )
+        del buf[:start]
+
+        if ( len( buf ) < self.HEADER_SIZE ):
+            return None
+        response = utils.Struct()
+        response.packet_id = buf[3]
+        response.size = buf[4] + (buf[5] << 8)
+        if ( response.size > self.MAX_PAYLOAD_SIZE ):
+            self._Resync()
+            raise cDSAError( "Invalid packet size %d for packet with id 0x%02x" % (response.size, response.packet_id) )
+        nb_packet = self.HEADER_SIZE + response.size + self.TRAILER_SIZE
+        if ( len( buf ) < nb_packet ):
+            return None
+        return self._TakeResponse( response, nb_packet )
 
-        # read indicated rest
-        response.payload = []
-        # TODO: reading byte by byte could be slow!
-        response.payload +=  [ self._ReadUInt8()  for i in xrange( 0, response.size ) ] # do not include checksum here any more  !!!new
-        the_bytes += response.payload
-        
-        # read checksum
-        (response.checksum, bs) = self._ReadUInt16() # chksum is now 2 bytes !!!new
-        the_bytes += bs
+    #-----------------------------------------------------------------
+    def _TakeResponse( self, response, nb_packet ):
+        '''Non public helper function: 
+        Remove the complete packet of \a nb_packet bytes from the start of the receive
+        buffer, check its checksum and return \a response with the packet data filled in.
+        '''
+        buf = self._rx_buffer
+        the_bytes = buf[:nb_packet]
+        del buf[:nb_packet]
+
+        response.payload = the_bytes[self.HEADER_SIZE:-self.TRAILER_SIZE] # do not include checksum here any more  !!!new
+        response.checksum = the_bytes[-2] + (the_bytes[-1] << 8)
         
         response.the_bytes = the_bytes
-        self._dbg << "read %s\n" % repr( the_bytes ) # pylint: disable-msg=W0104
+        self._dbg.Printf( "read %r\n", the_bytes )
 
-        # do CRC check
-        checksum = CRC_INIT_VALUE
-        for b in the_bytes[3:-2]:
-            checksum = CRC16( checksum, b, gCRCtbl )
+        # do CRC check (on packet ID, size and payload)
+        checksum = CRC16Bytes( the_bytes[3:-2] )
         if ( checksum != response.checksum ):
+            self._stats.crc_errors += 1
+            # put back the packet and let _Resync() drop its first preamble byte only:
+            # the next preamble might be among the remaining bytes
+            buf[0:0] = the_bytes
+            self._Resync()
             raise cDSAError( "Checkusm Error, expected 0x%x but got 0x%x" % (checksum, response.checksum) )
         else:
-            self._dbg << "Checksum OK\n" # pylint: disable-msg=W0104
+            self._dbg.Printf( "Checksum OK\n" )
 
         return response
 
+    #-----------------------------------------------------------------
+    def _CountDropped( self, nb_dropped ):
+        '''Non public helper function: 
+        Count \a nb_dropped bytes dropped while scanning for a preamble in the statistics.
+        Skipping bytes after an invalid packet belongs to the resync already counted by _Resync().
+        '''
+        if ( nb_dropped > 0 ):
+            self._stats.bytes_dropped += nb_dropped
+            if not self._resyncing:
+                self._stats.resyncs += 1
+                if ( self.instrumentation is not None ):
+                    self.instrumentation.RecordSync()
+        self._resyncing = False
+
+    #-----------------------------------------------------------------
+    def _Resync( self ):
+        '''Non public helper function: 
+        Drop the first byte of the preamble of an invalid packet at the start of the 
+        receive buffer, so that the next _ReadNextResponse() scans for the next preamble.
+        '''
+        if ( len( self._rx_buffer ) > 0 ):
+            del self._rx_buffer[0]
+            self._stats.bytes_dropped += 1
+            self._stats.resyncs += 1
+            self._resyncing = True
+            if ( self.instrumentation is not None ):
+                self.instrumentation.RecordSync()
+
     #-----------------------------------------------------------------
     def _ReadResponse( self, command_id ):
         '''Non public helper function: 
@@ -973,60 +1201,159 @@ class cDSA( object ):
         return self._ParseFrame( response )
 
 
+    #-----------------------------------------------------------------
+    def _CreateFrame( self, nb_cells, data=None ):
+        '''Non public helper function:
+        Return a new frame structure for \a nb_cells texels, with members
+        - \a timestamp - the timestamp reported by the DSACON32m
+        - \a seq       - the sequence number of the frame, incremented for each published frame
+        - \a data      - the texel values of all matrices as array('H'), a copy of \a data if given
+        - \a texels    - (only if numpy is available) a numpy view of \a data (no copy)
+        - \a matrices  - (only if numpy is available) a list with a 2D numpy view 
+                         of \a data for each sensor matrix, indexed [y,x] (no copy)
+        '''
+        frame = utils.Struct()
+        frame.timestamp = 0
+        frame.seq = 0
+        frame.flags = 0
+        if data is None:
+            frame.data = array.array( 'H', [ 0 ]*nb_cells )
+        else:
+            frame.data = data[:]
+        if numpy is not None:
+            frame.texels = numpy.frombuffer( frame.data, dtype=numpy.uint16 )
+            frame.matrices = []
+            for (m, mi) in enumerate( self.matrix_info ):
+                o = self.texel_offset[m]
+                frame.matrices.append( frame.texels[ o : o + mi.cells_x * mi.cells_y ].reshape( (mi.cells_y, mi.cells_x) ) )
+        return frame
+
     #-----------------------------------------------------------------
     def _ParseFrame( self, response ):
         '''
-        Parse a full frame response from remote DSA
+        Parse a full frame response from remote DSA.
+
+        The frame is parsed into a new frame structure (the back buffer,
+        initialized with the texels of the current frame), which is then
+        published as self.frame, see _PublishFrame().
         '''
+        # texels not contained in the response keep their previous values:
+        frame = self._CreateFrame( len( self.frame.data ), self.frame.data )
+
         i = 0 # index of next unparsed data byte in payload
         # pylint: disable-msg=C0321
-        self.frame.timestamp = UIntFromBytes( response.payload[ i:i+4 ] ); i+=4
-        self._dbg.var( "self.frame.timestamp" )
-
-        self.frame.flags = UIntFromBytes( response.payload[ i:i+1 ] ); i+=1
-        self._dbg.var( "self.frame.flags" )
+        frame.timestamp = UIntFromBytes( response.payload[ i:i+4 ] ); i+=4
+        frame.flags = UIntFromBytes( response.payload[ i:i+1 ] ); i+=1
 
-        do_RLE = Boolify( self.frame.flags & (1<<0) )
+        do_RLE = Boolify( frame.flags & (1<<0) )
 
         # for the first frame: record reported timestamp (time of DS) and now (time of pc)
         if self._start_pc == 0:
             self._start_pc  = int(time.time() * 1000.0 + 0.5)
-            self._dbg << "Init start_pc  %d \n" % (self._start_pc ) # pylint: disable-msg=W0104
+            self._dbg.Printf( "Init start_pc  %d \n", self._start_pc )
         if self._start_dsa == 0:
-            self._start_dsa = self.frame.timestamp
-            self._dbg << "Init start_dsa %d\n" % (self._start_dsa ) # pylint: disable-msg=W0104
-        ####
-        diff_pc = int(time.time() * 1000.0 + 0.5) - self._start_pc
-        diff_dsa = self.frame.timestamp - self._start_dsa
-        self._dbg << "_ParseFrame: elapsed ms pc,dsa = %6d,%6d  age %6d\n" % (diff_pc, diff_dsa, self.GetAgeOfFrame(self.frame)) # pylint: disable-msg=W0104
-        ####
-
-        #response.frame = array.array('H')
-
-        j = 0   # counter for frame elements
-        if do_RLE:
-            self._dbg.var( "do_RLE" )
-            while i+1 < response.size:
-                b = UIntFromBytes( response.payload[ i:i+2 ] )
-                v = b & 0x0fff
-                n = b >> 12
-                while n > 0:
-                    #response.frame append( v )
-                    self.frame.data[ j ] = v
-                    n -= 1
-                    j += 1
-                i += 2
-        
+            self._start_dsa = frame.timestamp
+            self._dbg.Printf( "Init start_dsa %d\n", self._start_dsa )
+
+        if self._dbg.IsEnabled():
+            # debug output only, this is skipped when parsing frames with debug messages off
+            self._dbg.var( "frame.timestamp frame.flags do_RLE" )
+            diff_pc = int(time.time() * 1000.0 + 0.5) - self._start_pc
+            diff_dsa = frame.timestamp - self._start_dsa
+            self._dbg << "_ParseFrame: elapsed ms pc,dsa = %6d,%6d  age %6d\n" % (diff_pc, diff_dsa, self.GetAgeOfFrame(frame)) # pylint: disable-msg=W0104
+
+        payload = response.payload
+        if type( payload ) is not bytearray:
+            payload = bytearray( payload )
+        if numpy is not None:
+            DecodeTexelsNumPy( payload, i, do_RLE, frame.texels )
         else:
-            while i+1 < response.size:
-                #self._dbg.var( "response.size i j" )
-                self.frame.data[ j ] = UIntFromBytes( response.payload[ i:i+2 ] )
-                i += 2
-                j += 1
+            DecodeTexelsArray( payload, i, do_RLE, frame.data )
         #self._dbg.var( "response" )
-        response.frame = self.frame
+        self._PublishFrame( frame )
+        response.frame = frame
         return response
 
+    #-----------------------------------------------------------------
+    def _PublishFrame( self, frame ):
+        '''Non public helper function:
+        Make the completely parsed \a frame the current frame self.frame 
+        with the next sequence number and wake up all threads waiting in WaitForFrame().
+
+        Readers need no locking: Replacing the reference self.frame is atomic,
+        and a published frame is never modified afterwards.
+        '''
+        stats = self._stats
+        now = time.time()
+        if ( stats.frames_ok > 0 ):
+            interval = now - stats.last_frame_time
+            stats.interval_sum += interval
+            stats.interval_max = max( stats.interval_max, interval )
+        stats.frames_ok += 1
+        stats.last_frame_time = now
+
+        self._frame_condition.acquire()
+        try:
+            frame.seq = self.frame.seq + 1
+            self.frame = frame
+            self._frame_condition.notifyAll()
+        finally:
+            self._frame_condition.release()
+
+        frame_log = self._frame_log
+        if frame_log is not None:
+            frame_log.Append( frame, now )
+
+    #-----------------------------------------------------------------
+    def StartFrameLog( self, filename ):
+        '''
+        Append all frames published from now on (with their sequence number 
+        and host time) to the frame log file \a filename, see dsaframelog.
+        If the file exists already then the frames are appended.
+        Use dsaframelog.cDSAFrameLog to read the log.
+        '''
+        self.StopFrameLog()
+        self._frame_log = dsaframelog.cDSAFrameLogWriter( filename, self.matrix_info, self.texel_offset )
+
+    #-----------------------------------------------------------------
+    def StopFrameLog( self ):
+        '''
+        Stop appending frames to the frame log started with StartFrameLog() and close the file.
+        '''
+        frame_log = self._frame_log
+        self._frame_log = None
+        if frame_log is not None:
+            frame_log.Close()
+
+    #-----------------------------------------------------------------
+    def WaitForFrame( self, seq = None, timeout = None ):
+        '''
+        Wait until a frame newer than the frame with sequence number \a seq
+        is available and return that frame. If \a seq is None then the 
+        sequence number of the current frame is used, i.e. wait for the next frame.
+        The frames are read by the updater thread, see StartUpdater().
+        
+        Raises a cDSAError if no such frame is available within \a timeout
+        seconds. (None means wait for ever)
+        '''
+        self._frame_condition.acquire()
+        try:
+            if seq is None:
+                seq = self.frame.seq
+            if timeout is not None:
+                end = time.time() + timeout
+            while self.frame.seq <= seq:
+                if timeout is None:
+                    self._frame_condition.wait()
+                else:
+                    remaining = end - time.time()
+                    if remaining <= 0.0:
+                        raise cDSAError( "Timeout while waiting for frame newer than %d" % seq )
+                    self._frame_condition.wait( remaining )
+            return self.frame
+        finally:
+            self._frame_condition.release()
+
     #-----------------------------------------------------------------
     def QueryControllerInfo( self ):
         '''
@@ -1217,7 +1544,7 @@ class cDSA( object ):
     def StartUpdater( self, framerate, do_RLE = True  ):
         '''
         Make remote DSA send frames with framerate. Create a thread
-        that updates self.frame continuously (guarded by self.semaphore).
+        that updates self.frame continuously. Use WaitForFrame() to wait for new frames.
         '''
         self._framerate = framerate
         self._WriteCommand( self.eDSAPacketID[ "eDSA_CONFIGURE_DATA_ACQUISITION" ], framerate=framerate, do_RLE = do_RLE )
@@ -1228,34 +1555,54 @@ class cDSA( object ):
         if self._updater is None:
             # no, so start one
             self._dbg << "Starting new updater thread\n" # pylint: disable-msg=W0104
-            self._semaphore = threading.Semaphore()
-            self._updater = threading.Thread( target = self._Updater, name = "cDSA._Updater", args = (self._semaphore,) )
+            self._updater_stop.clear()
+            self._updater = threading.Thread( target = self._Updater, name = "cDSA._Updater" )
             self._updater.setDaemon( True )
             self._updater.start()
 
     #-----------------------------------------------------------------
-    def _Updater( self, semaphore ):
+    def StopUpdater( self ):
+        '''
+        Make the updater thread started by StartUpdater() terminate and wait
+        for that. The remote DSA is not told to stop sending frames, use 
+        SetFramerate() for that.
+        '''
+        if self._updater is None:
+            return
+        self._updater_stop.set()
+        if self._updater is not threading.currentThread():
+            # the updater notices the stop request at the latest after a read timeout
+            self._updater.join( self.timeout + 1.0 )
+        self._updater = None
+
+    #-----------------------------------------------------------------
+    def _Updater( self ):
         '''
         run function of updater thread
+
+        Errors while reading or parsing a frame (like checksum errors,
+        garbled packets or timeouts) are counted in the statistics and the
+        updater resynchronizes on the next preamble and continues, see GetStats().
+        Only a call of StopUpdater() or unexpected exceptions make the thread terminate.
         '''
         try:
-            while True:
+            while not self._updater_stop.isSet():
                 #self._dbg << "_Updater: self.framerate = %d\n" % self.framerate # pylint: disable-msg=W0104
                 if self._framerate > 0:
-                    response = self._ReadResponse( self.eDSAPacketID[ "eDSA_FULL_FRAME" ] )
-        
-                    #self._dbg << "_Updater: read\n" # pylint: disable-msg=W0104
-                    
-                    self._dbg << "_Updater: updating\n" # pylint: disable-msg=W0104
-                    semaphore.acquire()
-                    self._ParseFrame( response )
-                    semaphore.release()
+                    try:
+                        response = self._ReadResponse( self.eDSAPacketID[ "eDSA_FULL_FRAME" ] )
+            
+                        #self._dbg << "_Updater: read\n" # pylint: disable-msg=W0104
+                        
+                        self._dbg.Printf( "_Updater: updating\n" )
+                        self._ParseFrame( response )
+                    except cDSAError,e:
+                        # ignore errors like checksum errors and retry with the next frame
+                        self._stats.errors += 1
+                        self._dbg.Printf( "_Updater: ignoring %s\n", e )
                 else:
                     # framerate was (re)set to 0: retry periodically
-                    time.sleep( 1 )
-        except cDSAError,e:
-            # ignore errors like checksum errors and retry next time
-            self._dbg << "_Updater: ignoring %s\n" % str(e) # pylint: disable-msg=W0104
+                    self._updater_stop.wait( 1 )
         except KeyboardInterrupt:
             print "_Updater thread: caught KeyboardInterrupt"
         except Exception,e:
@@ -1307,6 +1654,87 @@ class cDSA( object ):
         '''
         return fi * 2 + part
 
+    #-----------------------------------------------------------------
+    def ResetStats( self ):
+        '''
+        Reset the statistics about the communication with the remote DSA, see GetStats().
+        '''
+        ## Counters of the communication, see GetStats()
+        self._stats = utils.Struct( frames_ok = 0, crc_errors = 0, timeouts = 0, errors = 0,
+                                    resyncs = 0, bytes_dropped = 0,
+                                    interval_sum = 0.0, interval_max = 0.0, last_frame_time = 0.0 )
+        ## flag, True while resynchronizing after an invalid packet, see _Resync()
+        self._resyncing = False
+
+    #-----------------------------------------------------------------
+    def GetStats( self ):
+        '''
+        Return a snapshot of the statistics about the communication with the
+        remote DSA since construction or the last ResetStats(). The returned
+        structure can be polled and logged by the application while the updater 
+        thread is running. Members:
+        - \c frames_ok: number of frames read and parsed successfully
+        - \c crc_errors: number of packets with a checksum error
+        - \c timeouts: number of timeouts while reading
+        - \c errors: number of errors ignored by the updater thread (including the ones above)
+        - \c resyncs: number of times the packet synchronisation was lost and bytes had to be skipped
+        - \c bytes_dropped: number of bytes skipped while scanning for the start of a packet
+        - \c interval_mean, \c interval_max: mean and maximum time in ms between two successive frames
+        - \c frame_age: age of the current frame in ms, see GetAgeOfFrame(), None if there is no frame yet
+        - \c updater_running: True if the updater thread is running
+        '''
+        st = self._stats
+        stats = utils.Struct( frames_ok = st.frames_ok, crc_errors = st.crc_errors, timeouts = st.timeouts, errors = st.errors,
+                              resyncs = st.resyncs, bytes_dropped = st.bytes_dropped )
+        if ( st.frames_ok > 1 ):
+            stats.interval_mean = st.interval_sum * 1000.0 / (st.frames_ok - 1)
+        else:
+            stats.interval_mean = 0.0
+        stats.interval_max = st.interval_max * 1000.0
+        if ( self.frame.seq > 0 ):
+            stats.frame_age = self.GetAgeOfFrame()
+        else:
+            stats.frame_age = None
+        stats.updater_running = self._updater is not None  and  self._updater.isAlive()
+        return stats
+
+    #-----------------------------------------------------------------
+    def EnableInstrumentation( self, flag=True ):
+        '''
+        Enable or disable the timing instrumentation of the communication with the remote DSA.
+        With the instrumentation enabled each response read (like each frame) is counted 
+        in an instrumentation.cInstrumentation per packet ID, with the bytes sent and received 
+        and a histogram of the time waiting for and reading the response. Retries and 
+        resynchronisations after invalid packets are counted as well. 
+        If \a flag is True then an instrumentation enabled before is kept, if False it is disabled.
+        '''
+        if ( not flag ):
+            if ( self.instrumentation is not None ):
+                self.instrumentation.StopExport()
+            self.instrumentation = None
+        elif ( self.instrumentation is None ):
+            self.instrumentation = instrumentation.cInstrumentation( "cDSA", self._PacketName )
+
+    #-----------------------------------------------------------------
+    def GetInstrumentation( self ):
+        '''
+        Return the timing instrumentation.cInstrumentation of the communication with the
+        remote DSA (see its Snapshot()), or None if not enabled, see EnableInstrumentation().
+        '''
+        return self.instrumentation
+
+    #-----------------------------------------------------------------
+    def _PacketName( self, packet_id ):
+        '''Non public helper function: 
+        Return the name of \a packet_id for the instrumentation, like "eDSA_FULL_FRAME".
+        '''
+        try:
+            return self._packet_names.get( packet_id, "0x%02x" % packet_id )
+        except AttributeError:
+            ## The names of the packet IDs by ID, see _PacketName()
+            self._packet_names = dict( [ (v, k) for (k, v) in self.eDSAPacketID.items() ] )
+            return self._packet_names.get( packet_id, "0x%02x" % packet_id )
+
     #-----------------------------------------------------------------
     def GetAgeOfFrame( self, frame = None ):
         '''
@@ -1322,9 +1750,10 @@ class cDSA( object ):
     def GetContactArea( self, fi = All, part = All, frame = None ):
         '''
         Return contact area in mm*mm for finger(s) fi and sensor part(s) part
+        of \a frame (default is the current frame self.frame)
         '''
-        fingers = self._ToIndexList( fi, self.all_fingers, 2, "finger" )
-        parts   = self._ToIndexList( part, self.all_parts, 1, "tactile sensor part" )
+        fingers = self._ToIndexList( fi, self.all_fingers, len( self.all_fingers ), "finger" )
+        parts   = self._ToIndexList( part, self.all_parts, len( self.all_parts ), "tactile sensor part" )
         if frame is None:
             frame = self.frame
 
@@ -1334,10 +1763,13 @@ class cDSA( object ):
                 m = self.GetMatrixIndex( fi, part )
                 apc  = self.matrix_info[m].texel_width * self.matrix_info[m].texel_height  # area per cell
 
+                o = self.texel_offset[m]
+                nbcells = 0
                 for y in xrange( 0, self.matrix_info[m].cells_y ):
                     for x in xrange( 0, self.matrix_info[m].cells_x ):
-                        if self.GetTexel( m, x, y ) > self.contact_area_cell_threshold:
-                            area += apc
+                        if frame.data[ o + y * self.matrix_info[m].cells_x + x ] > self.contact_area_cell_threshold:
+                            nbcells += 1
+                area += apc * float(nbcells)
         return area
 
 
@@ -1364,7 +1796,7 @@ class cDSA( object ):
         '''
         Return a tuple (force,cog_x,cog_y,area) of contact force and
         center of gravity and contact area of that force for finger
-        fi and sensor part.
+        fi and sensor part of \a frame (default is the current frame self.frame).
         force is in N, cog_x,cog_ in mm, area in mm*mm.
         '''
         assert 0 <= fi  and  fi < 3
@@ -1379,10 +1811,11 @@ class cDSA( object ):
         nbcells = 0
 
         m = self.GetMatrixIndex( fi, part )
+        o = self.texel_offset[m]
 
         for y in xrange( 0, self.matrix_info[m].cells_y ):
             for x in xrange( 0, self.matrix_info[m].cells_x ):
-                v = self.GetTexel( m, x, y )
+                v = frame.data[ o + y * self.matrix_info[m].cells_x + x ]
 
                 if ( v > self.contact_force_cell_threshold ):
 
@@ -1406,6 +1839,127 @@ class cDSA( object ):
             cog_y = 0.0
 
         return (force, cog_x, cog_y, area)
+
+    #-----------------------------------------------------------------
+    def _GetTexelGrids( self ):
+        '''Non public helper function:
+        Return a structure with the coordinates of all texels of a frame, in frame order:
+        - \a m - the index of the sensor matrix of each texel
+        - \a x - the column of each texel within its matrix (as float)
+        - \a y - the row of each texel within its matrix (as float)
+        These are numpy arrays if numpy is available, else lists. 
+        The grids are computed on first call only.
+        '''
+        if self._texel_grids is None:
+            grids = utils.Struct()
+            grids.m = []
+            grids.x = []
+            grids.y = []
+            for (m, mi) in enumerate( self.matrix_info ):
+                for y in xrange( 0, mi.cells_y ):
+                    for x in xrange( 0, mi.cells_x ):
+                        grids.m.append( m )
+                        grids.x.append( float(x) )
+                        grids.y.append( float(y) )
+            if numpy is not None:
+                grids.m = numpy.array( grids.m, dtype=numpy.intp )
+                grids.x = numpy.array( grids.x )
+                grids.y = numpy.array( grids.y )
+            self._texel_grids = grids
+        return self._texel_grids
+
+    #-----------------------------------------------------------------
+    def _GetContactSums( self, frame, threshold ):
+        '''Non public helper function:
+        Return a tuple (sum_pressures, sum_x, sum_y, nbcells) of lists with one
+        entry per sensor matrix. The sums are taken over all texels of \a frame
+        with a value above \a threshold, in one pass over the whole frame.
+        sum_x and sum_y are the sums of the texel coordinates weighted with
+        the pressure, see GetContactForce().
+        '''
+        grids = self._GetTexelGrids()
+        nb_matrices = len( self.matrix_info )
+        if numpy is not None:
+            texels = numpy.frombuffer( frame.data, dtype=numpy.uint16 )
+            mask = texels > threshold
+            m = grids.m[mask]
+            p = self._VoltageToPressure( texels[mask].astype( numpy.float64 ) )
+            sum_pressures = numpy.bincount( m, weights=p, minlength=nb_matrices )
+            sum_x = numpy.bincount( m, weights=grids.x[mask] * p, minlength=nb_matrices )
+            sum_y = numpy.bincount( m, weights=grids.y[mask] * p, minlength=nb_matrices )
+            nbcells = numpy.bincount( m, minlength=nb_matrices )
+            return (sum_pressures.tolist(), sum_x.tolist(), sum_y.tolist(), nbcells.tolist())
+
+        sum_pressures = [ 0.0 ] * nb_matrices
+        sum_x = [ 0.0 ] * nb_matrices
+        sum_y = [ 0.0 ] * nb_matrices
+        nbcells = [ 0 ] * nb_matrices
+        for (v, m, x, y) in zip( frame.data, grids.m, grids.x, grids.y ):
+            if ( v > threshold ):
+                p = self._VoltageToPressure( v )
+                sum_pressures[m] += p
+                sum_x[m] += x * p
+                sum_y[m] += y * p
+                nbcells[m] += 1
+        return (sum_pressures, sum_x, sum_y, nbcells)
+
+    #-----------------------------------------------------------------
+    def _ToFingerPartArray( self, values ):
+        '''Non public helper function:
+        Return the list \a values with one entry per sensor matrix as
+        numpy array indexed [fi,part] if numpy is available, else as list of lists indexed [fi][part].
+        '''
+        nb_parts = len( self.all_parts )
+        values = [ [ values[ self.GetMatrixIndex( fi, part ) ] for part in self.all_parts ] for fi in xrange( len( values ) // nb_parts ) ]
+        if numpy is not None:
+            return numpy.array( values )
+        return values
+
+    #-----------------------------------------------------------------
+    def GetContactAreas( self, frame = None ):
+        '''
+        Return the contact areas in mm*mm for all fingers and sensor parts at once.
+        The result is indexed [fi][part], see _ToFingerPartArray(). The
+        values are the same as GetContactArea( fi, part ) would report for
+        each single finger fi and part, but the frame is processed in one pass.
+        '''
+        if frame is None:
+            frame = self.frame
+        (sum_pressures, sum_x, sum_y, nbcells) = self._GetContactSums( frame, self.contact_area_cell_threshold ) # pylint: disable-msg=W0612
+
+        areas = [ mi.texel_width * mi.texel_height * float(nbcells[m]) for (m, mi) in enumerate( self.matrix_info ) ]
+        return self._ToFingerPartArray( areas )
+
+    #-----------------------------------------------------------------
+    def GetContactForces( self, frame = None ):
+        '''
+        Return a tuple (force,cog_x,cog_y,area) of contact forces and
+        centers of gravity and contact areas of these forces for all fingers
+        and sensor parts at once. Each element of the tuple is indexed [fi][part],
+        see _ToFingerPartArray(). The values are the same as GetContactForce( fi, part )
+        would report for each single finger fi and part, but the frame is processed 
+        in one pass with precomputed texel coordinates (vectorized if numpy is available).
+        force is in N, cog_x,cog_ in mm, area in mm*mm.
+        '''
+        if frame is None:
+            frame = self.frame
+        (sum_pressures, sum_x, sum_y, nbcells) = self._GetContactSums( frame, self.contact_force_cell_threshold )
+
+        forces = []
+        cogs_x = []
+        cogs_y = []
+        areas  = []
+        for (m, mi) in enumerate( self.matrix_info ):
+            area = mi.texel_width * mi.texel_height * float(nbcells[m])
+            forces.append( self.force_factor * sum_pressures[m] * area )
+            if ( sum_pressures[m] != 0.0 ):
+                cogs_x.append( mi.texel_width  * sum_x[m] / sum_pressures[m] )
+                cogs_y.append( mi.texel_height * sum_y[m] / sum_pressures[m] )
+            else:
+                cogs_x.append( 0.0 )
+                cogs_y.append( 0.0 )
+            areas.append( area )
+        return (self._ToFingerPartArray( forces ), self._ToFingerPartArray( cogs_x ), self._ToFingerPartArray( cogs_y ), self._ToFingerPartArray( areas ))
     
 # end of class cDSA
 ######################################################################
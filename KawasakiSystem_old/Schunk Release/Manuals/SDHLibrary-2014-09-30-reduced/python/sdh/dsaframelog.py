@@ -0,0 +1,295 @@
+# -*- coding: latin-1 -*-
+#######################################################################
+#
+## \file
+#  \section sdhlibrary_python_dsaframelog_py_general General file information
+#
+#  \brief
+#    Persistent log of decoded tactile sensor frames of the DSACON32m
+#    with random access by timestamp.
+#
+#  \section sdhlibrary_python_dsaframelog_py_copyright Copyright
+#
+#  Copyright (c) 2007 SCHUNK GmbH & Co. KG
+#
+#######################################################################
+
+
+#######################################################################
+## \anchor sdhlibrary_python_dsaframelog_py_python_vars
+#  \name   Python specific variables
+#
+#  Some definitions that describe the module for python.
+#
+#  @{
+
+__doc__       = "Persistent log of decoded tactile sensor frames with random access by timestamp."
+__url__       = "http://www.schunk.com"
+__copyright__ = "Copyright (c) 2007 SCHUNK GmbH & Co. KG"
+
+#  end of doxygen name group sdhlibrary_python_dsaframelog_py_python_vars
+#  @}
+######################################################################
+
+#######################################################################
+## \package dsaframelog
+#
+#  \brief
+#    A cDSAFrameLogWriter appends the frames published by a cDSA object
+#    to a frame log file, see cDSA.StartFrameLog(). A cDSAFrameLog
+#    maps such a file into memory with numpy.memmap, so hours of tactile
+#    data can be accessed without reading the whole file: frames are
+#    found by DSA timestamp or host time with a binary search and the
+#    texels of a sensor matrix can be sliced for a range of frames.
+#
+#    A frame log file starts with a file header: #MAGIC followed by
+#    #FILE_HEADER (format version, size of the whole file header,
+#    number of texels per frame, number of sensor matrices) and one
+#    #MATRIX_HEADER (cells_x, cells_y, texel offset) per sensor matrix.
+#    Then one record of fixed size follows for each frame: #RECORD_HEADER
+#    (host time in seconds since the epoch, DSA timestamp in ms, sequence
+#    number, flags, reserved) followed by the texel values as 16 bit
+#    unsigned ints. All values are little endian.
+#
+#    The records are only ever appended. A log can be read while it is
+#    still written, see cDSAFrameLog.Refresh(). An incomplete last record
+#    is ignored.
+#
+#    Example:
+#    \code
+#      ts.StartFrameLog( "grasp.dsalog" )
+#      ...
+#      log = sdh.dsaframelog.cDSAFrameLog( "grasp.dsalog" )
+#      (i0, i1) = log.FindTimestampRange( t0, t1 )
+#      distal_thumb = log.GetMatrix( 1, slice( i0, i1 ) )  # shape (i1-i0, cells_y, cells_x)
+#    \endcode
+#
+#######################################################################
+
+import sys, os, struct, array, threading
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from . import utils
+
+## The first bytes of a frame log file
+MAGIC = "SDHDSAFL"
+
+## The version of the frame log file format
+VERSION = 1
+
+## Format of the file header following the #MAGIC: version, file header size, nb_cells, nb_matrices
+FILE_HEADER = struct.Struct( "<HHII" )
+
+## Format of the description of a sensor matrix in the file header: cells_x, cells_y, texel offset
+MATRIX_HEADER = struct.Struct( "<HHI" )
+
+## Format of the header of each record: host time, DSA timestamp, sequence number, flags, reserved
+RECORD_HEADER = struct.Struct( "<dIIHH" )
+
+
+#-----------------------------------------------------------------
+class cDSAFrameLogError( IOError ):
+    '''
+    Invalid frame log file.
+    '''
+    pass
+
+
+#-----------------------------------------------------------------
+class cDSAFrameLogWriter( object ):
+    '''
+    Append tactile sensor frames to a frame log file.
+    Does not need numpy.
+    '''
+    def __init__( self, filename, matrix_info, texel_offset ):
+        '''Open the frame log file \a filename for appending frames
+        of the sensor matrices described by \a matrix_info and \a texel_offset
+        (like cDSA.matrix_info and cDSA.texel_offset).
+        If the file does not exist or is empty then the file header is written.
+        If the file exists then its layout of matrices must match.
+
+        Raises a cDSAFrameLogError if an existing file does not match.
+        '''
+        self.nb_cells = sum( [ mi.cells_x * mi.cells_y for mi in matrix_info ] )
+        header = MAGIC
+        matrices = ""
+        for (mi, o) in zip( matrix_info, texel_offset ):
+            matrices += MATRIX_HEADER.pack( mi.cells_x, mi.cells_y, o )
+        header_size = len( MAGIC ) + FILE_HEADER.size + len( matrices )
+        header += FILE_HEADER.pack( VERSION, header_size, self.nb_cells, len( matrix_info ) ) + matrices
+
+        self._lock = threading.Lock()
+        self._file = open( filename, "ab" )
+        self._file.seek( 0, 2 )
+        size = self._file.tell()
+        if ( size == 0 ):
+            self._file.write( header )
+            self._file.flush()
+        else:
+            f = open( filename, "rb" )
+            try:
+                existing = f.read( header_size )
+            finally:
+                f.close()
+            if ( existing != header ):
+                self._file.close()
+                raise cDSAFrameLogError( "Frame log %r was written for different sensor matrices" % filename )
+            record_size = RECORD_HEADER.size + 2 * self.nb_cells
+            incomplete = (size - header_size) % record_size
+            if ( incomplete ):
+                # cut off an incomplete last record (e.g. of a process that was killed)
+                self._file.truncate( size - incomplete )
+
+    def Append( self, frame, host_time ):
+        '''Append the record for \a frame (a frame structure like cDSA.frame)
+        received at \a host_time (in seconds since the epoch) to the log.
+        The record is flushed to the file at once, so it is not lost if the process exits.
+        '''
+        data = frame.data
+        if ( sys.byteorder != "little" ):
+            data = array.array( 'H', data )
+            data.byteswap()
+        record = RECORD_HEADER.pack( host_time, frame.timestamp & 0xffffffff, frame.seq & 0xffffffff, frame.flags, 0 ) + data.tostring()
+        self._lock.acquire()
+        try:
+            if ( self._file.closed ):
+                # the log was closed meanwhile by another thread
+                return
+            self._file.write( record )
+            self._file.flush()
+        finally:
+            self._lock.release()
+
+    def Close( self ):
+        '''Close the frame log file.
+        '''
+        self._lock.acquire()
+        try:
+            self._file.close()
+        finally:
+            self._lock.release()
+
+
+#-----------------------------------------------------------------
+class cDSAFrameLog( object ):
+    '''
+    Random access to the frames in a frame log file, memory mapped with numpy.memmap.
+    Needs numpy.
+
+    Members:
+    - \c records: numpy structured array (memory mapped) with fields host_time,
+      timestamp, seq, flags and data, indexed by frame number
+    - \c matrices: list of structures with cells_x, cells_y and texel_offset for each sensor matrix
+    - \c nb_cells: number of texels per frame
+    '''
+    def __init__( self, filename ):
+        '''Open the frame log file \a filename for reading.
+
+        Raises a cDSAFrameLogError if the file is not a frame log file.
+        '''
+        if numpy is None:
+            raise ImportError( "numpy is needed to read frame logs" )
+        self.filename = filename
+        f = open( filename, "rb" )
+        try:
+            start = f.read( len( MAGIC ) + FILE_HEADER.size )
+            if ( start[:len( MAGIC )] != MAGIC  or  len( start ) < len( MAGIC ) + FILE_HEADER.size ):
+                raise cDSAFrameLogError( "%r is not a frame log file" % filename )
+            (version, self._header_size, self.nb_cells, nb_matrices) = FILE_HEADER.unpack( start[len( MAGIC ):] )
+            if ( version != VERSION ):
+                raise cDSAFrameLogError( "Frame log %r has unsupported version %d" % (filename, version) )
+            self.matrices = []
+            for m in xrange( nb_matrices ): # pylint: disable-msg=W0612
+                (cells_x, cells_y, texel_offset) = MATRIX_HEADER.unpack( f.read( MATRIX_HEADER.size ) )
+                self.matrices.append( utils.Struct( cells_x=cells_x, cells_y=cells_y, texel_offset=texel_offset ) )
+        finally:
+            f.close()
+
+        ## The numpy data type of a record
+        self.dtype = numpy.dtype( [ ("host_time", "<f8"), ("timestamp", "<u4"), ("seq", "<u4"),
+                                    ("flags", "<u2"), ("reserved", "<u2"),
+                                    ("data", "<u2", (self.nb_cells,)) ] )
+        self.records = None
+        self.Refresh()
+
+    def Refresh( self ):
+        '''(Re)map the file, e.g. to access the frames appended since
+        the log was opened or last refreshed. Return the number of frames.
+        '''
+        nb_frames = (os.path.getsize( self.filename ) - self._header_size) // self.dtype.itemsize
+        if ( nb_frames > 0 ):
+            self.records = numpy.memmap( self.filename, dtype=self.dtype, mode="r",
+                                         offset=self._header_size, shape=(nb_frames,) )
+        else:
+            self.records = numpy.zeros( (0,), dtype=self.dtype )
+        return nb_frames
+
+    def __len__( self ):
+        return len( self.records )
+
+    def FindTimestamp( self, timestamp ):
+        '''Return the index of the first frame with a DSA timestamp >= \a timestamp (in ms),
+        or len(self) if there is none.
+        The DSA timestamps must be increasing, i.e. the log must have been written
+        while the DSACON32m was not restarted. Else use FindHostTime().
+        '''
+        return int( numpy.searchsorted( self.records["timestamp"], timestamp, side="left" ) )
+
+    def FindHostTime( self, host_time ):
+        '''Return the index of the first frame received at host time >= \a host_time
+        (in seconds since the epoch), or len(self) if there is none.
+        '''
+        return int( numpy.searchsorted( self.records["host_time"], host_time, side="left" ) )
+
+    def FindTimestampRange( self, t0, t1 ):
+        '''Return the indices (i0,i1) of the frames with a DSA timestamp
+        t0 <= timestamp < t1 (in ms), so that these frames are self.records[i0:i1]
+        '''
+        return (self.FindTimestamp( t0 ), self.FindTimestamp( t1 ))
+
+    def GetMatrix( self, m, index=slice( None ) ):
+        '''Return the texels of sensor matrix \a m of the frame(s) \a index
+        (a frame number or a slice) as numpy array indexed [y,x] or
+        [frame,y,x] for a slice. Only the data needed is read from the file.
+        '''
+        mi = self.matrices[m]
+        o = mi.texel_offset
+        texels = self.records["data"][ index, o : o + mi.cells_x * mi.cells_y ]
+        return texels.reshape( texels.shape[:-1] + (mi.cells_y, mi.cells_x) )
+
+    def GetFrame( self, i ):
+        '''Return frame \a i as new frame structure like cDSA.frame with
+        members timestamp, seq, flags, data (array('H')) and host_time.
+        So the frame can be given to the cDSA functions that take a frame
+        like cDSA.GetContactForces().
+        '''
+        r = self.records[i]
+        frame = utils.Struct()
+        frame.host_time = float( r["host_time"] )
+        frame.timestamp = int( r["timestamp"] )
+        frame.seq = int( r["seq"] )
+        frame.flags = int( r["flags"] )
+        frame.data = array.array( 'H' )
+        frame.data.fromstring( r["data"].astype( "<u2" ).tostring() )
+        if ( sys.byteorder != "little" ):
+            frame.data.byteswap()
+        frame.texels = numpy.frombuffer( frame.data, dtype=numpy.uint16 )
+        frame.matrices = []
+        for mi in self.matrices:
+            o = mi.texel_offset
+            frame.matrices.append( frame.texels[ o : o + mi.cells_x * mi.cells_y ].reshape( (mi.cells_y, mi.cells_x) ) )
+        return frame
+
+
+######################################################################
+# some usefull editing settings for emacs:
+#
+#;;; Local Variables: ***
+#;;; mode:python ***
+#;;; End: ***
+#
+######################################################################
@@ -0,0 +1,401 @@
+# -*- coding: latin-1 -*-
+#######################################################################
+#
+## \file
+#  \section sdhlibrary_python_dsarecord_py_general General file information
+#
+#  \brief
+#    Recording and replay of the raw communication with the DSACON32m,
+#    the tactile sensor controller of the SDH.
+#
+#  \section sdhlibrary_python_dsarecord_py_copyright Copyright
+#
+#  Copyright (c) 2007 SCHUNK GmbH & Co. KG
+#
+#######################################################################
+
+
+#######################################################################
+## \anchor sdhlibrary_python_dsarecord_py_python_vars
+#  \name   Python specific variables
+#
+#  Some definitions that describe the module for python.
+#
+#  @{
+
+__doc__       = "Recording and replay of the raw communication with the DSACON32m tactile sensor controller."
+__url__       = "http://www.schunk.com"
+__copyright__ = "Copyright (c) 2007 SCHUNK GmbH & Co. KG"
+
+#  end of doxygen name group sdhlibrary_python_dsarecord_py_python_vars
+#  @}
+######################################################################
+
+#######################################################################
+## \package dsarecord
+#
+#  \brief
+#    A tDSARecorder wraps the communication object of a cDSA (like a
+#    serial.Serial or a tcpserial.tTCPSerial object) and appends all bytes
+#    read from and written to the DSACON32m to a recording file. A
+#    tDSAReplay object replays such a recording file and can be given
+#    as port to a cDSA object instead of a real communication port.
+#    So the unmodified cDSA code (packet decoding, frame parsing, updater
+#    thread, contact forces...) can be run without hardware.
+#
+#    A recording file starts with #MAGIC followed by the format version as
+#    16 bit unsigned int. Then records follow, each consisting of a
+#    #RECORD_HEADER (host time in seconds since the epoch as double,
+#    direction #RX or #TX, number of bytes) and the bytes transferred.
+#    All values are little endian. Records are only ever appended.
+#
+#    Example:
+#    \code
+#      # record:
+#      ts = sdh.dsa.cDSA( port="/dev/ttyS4", record="grasp.dsarec" )
+#      ...
+#      # replay as fast as possible:
+#      ts = sdh.dsa.cDSA( port=sdh.dsarecord.tDSAReplay( "grasp.dsarec", speed=0 ) )
+#    \endcode
+#
+#    Or use the --dsa_record and --dsa_replay options of the demo scripts.
+#
+#######################################################################
+
+import struct, threading, time, collections
+
+## The first bytes of a recording file
+MAGIC = "SDHDSARC"
+
+## The version of the recording file format
+VERSION = 1
+
+## Format of the version following the #MAGIC
+FILE_HEADER = struct.Struct( "<H" )
+
+## Format of the header of each record: host time, direction, number of bytes
+RECORD_HEADER = struct.Struct( "<dBI" )
+
+## Direction of a record: bytes received from the DSACON32m
+RX = 0
+
+## Direction of a record: bytes sent to the DSACON32m
+TX = 1
+
+
+#-----------------------------------------------------------------
+class cDSARecordError( IOError ):
+    '''
+    Invalid recording file.
+    '''
+    pass
+
+#-----------------------------------------------------------------
+def ReadRecords( f ):
+    '''Generator function, yield all records of the recording file \a f
+    (an open file object positioned after the file header) as tuples
+    (host time, direction, bytes).
+
+    An incomplete last record (e.g. from a recording that was interrupted) is ignored.
+    '''
+    while True:
+        header = f.read( RECORD_HEADER.size )
+        if ( len( header ) < RECORD_HEADER.size ):
+            return
+        (t, direction, length) = RECORD_HEADER.unpack( header )
+        the_bytes = f.read( length )
+        if ( len( the_bytes ) < length ):
+            return
+        yield (t, direction, the_bytes)
+
+#-----------------------------------------------------------------
+def OpenRecording( filename ):
+    '''Open the recording file \a filename for reading, check the file header
+    and return the file object positioned at the first record.
+
+    Raises a cDSARecordError if the file is not a recording file.
+    '''
+    f = open( filename, "rb" )
+    header = f.read( len( MAGIC ) + FILE_HEADER.size )
+    if ( header[:len( MAGIC )] != MAGIC ):
+        f.close()
+        raise cDSARecordError( "%r is not a recording file of the DSA communication" % filename )
+    (version,) = FILE_HEADER.unpack( header[len( MAGIC ):] )
+    if ( version != VERSION ):
+        f.close()
+        raise cDSARecordError( "Recording file %r has unsupported version %d" % (filename, version) )
+    return f
+
+
+#-----------------------------------------------------------------
+class tDSARecorder( object ):
+    '''File like object that wraps the communication object \a com
+    of a cDSA and records all bytes read and written.
+    '''
+    def __init__( self, com, filename ):
+        '''Create a tDSARecorder object that records all communication
+        via \a com to recording file \a filename. If the file exists already
+        then the records are appended.
+        '''
+        self.com = com
+        self._lock = threading.Lock()
+        self._file = open( filename, "ab" )
+        self._file.seek( 0, 2 )
+        if ( self._file.tell() == 0 ):
+            self._file.write( MAGIC + FILE_HEADER.pack( VERSION ) )
+
+    def _Record( self, direction, the_bytes ):
+        '''Non public helper function: append a record for \a the_bytes to the recording file
+        '''
+        the_bytes = str( the_bytes )
+        self._lock.acquire()
+        try:
+            self._file.write( RECORD_HEADER.pack( time.time(), direction, len( the_bytes ) ) )
+            self._file.write( the_bytes )
+        finally:
+            self._lock.release()
+
+    def read( self, n ):
+        '''Read up to \a n bytes from the wrapped communication object and record them.
+        '''
+        s = self.com.read( n )
+        if ( s ):
+            self._Record( RX, s )
+        return s
+
+    def write( self, s ):
+        '''Record \a s and write it to the wrapped communication object.
+        '''
+        self._Record( TX, s )
+        return self.com.write( s )
+
+    def close( self ):
+        '''Close the wrapped communication object and the recording file.
+        '''
+        try:
+            self.com.close()
+        finally:
+            self._lock.acquire()
+            try:
+                self._file.close()
+            finally:
+                self._lock.release()
+
+    def __getattr__( self, name ):
+        # everything else (inWaiting(), flush(),...) is forwarded to the wrapped object
+        return getattr( self.com, name )
+
+    def GetTimeout(self):
+        '''helper function to get property timeout
+        '''
+        return self.com.timeout
+
+    def SetTimeout(self, value):
+        '''helper function to set property timeout
+        '''
+        self.com.timeout = value
+
+    timeout = property(GetTimeout, SetTimeout, None, "The timeout of the wrapped communication object.")
+
+
+#-----------------------------------------------------------------
+class tDSAReplay( object ):
+    '''File like object that replays the bytes received in a recording
+    file made with a tDSARecorder. Provides the subset of the serial.Serial
+    interface used by sdh.dsa.cDSA, so a tDSAReplay object can be given
+    as \a port to a cDSA object.
+    '''
+    def __init__( self, filename, speed=1.0, follow_commands=True, timeout=1.0 ):
+        '''Create a tDSAReplay object for the recording file \a filename.
+
+        \param self            - the instance of the class that this function operates on (the "object")
+        \param filename        - name of the recording file made with a tDSARecorder
+        \param speed           - replay speed: 1.0 replays in real time (with the timing of the recording),
+                                 2.0 twice as fast... 0 replays as fast as possible.
+        \param follow_commands - flag, if True then the bytes received after the first n bytes
+                                 sent in the recording are replayed only after n bytes were written
+                                 with write(). So the responses match the commands sent, as long as
+                                 the same sequence of commands is sent as in the recording.
+                                 If False then all received bytes are replayed regardless of writes.
+        \param timeout         - timeout in seconds for read(), None => wait for ever
+        '''
+        self._file = OpenRecording( filename )
+        self._records = ReadRecords( self._file )
+        self.speed = speed
+        self.follow_commands = follow_commands
+        self.timeout = timeout
+
+        ## The recorded host time of the bytes returned by the last read()
+        self.time = None
+        ## Flag, True if all bytes of the recording have been replayed.
+        #  With follow_commands this is also set if only recorded commands remain
+        #  (every recording made with a cDSA ends with the SetFramerate(0) command sent
+        #  by Close() or StopUpdater()), since writing them would not replay anything.
+        self.eof = False
+        ## Flag, True if with follow_commands the replay waits for the next recorded
+        #  command to be written with write() before any more bytes can be read.
+        #  A client that sends no more commands (like the updater thread of a cDSA
+        #  after StartUpdater()) will not get any more bytes then.
+        self.stalled = False
+
+        self._condition = threading.Condition()
+        self._pending = ""       # replayed bytes not yet read
+        self._next = None        # next record not yet replayed
+        self._lookahead = collections.deque() # records read after self._next, see _IsReceiveRemaining()
+        self._nb_written = 0     # number of bytes written with write() so far
+        self._nb_sent = 0        # number of recorded sent bytes passed so far
+        self._last_write = time.time()
+        # map recorded time to host time: (host time, recorded time)
+        self._anchor = (time.time(), None)
+
+    def _GetDueTime( self, t ):
+        '''Non public helper function: return the host time at which the bytes recorded at \a t are due.
+        '''
+        if ( self._anchor[1] is None ):
+            self._anchor = (self._anchor[0], t)
+        return self._anchor[0] + (t - self._anchor[1]) / self.speed
+
+    def _Fill( self, n ):
+        '''Non public helper function:
+        Append the bytes of all due records to the pending bytes, until at least \a n bytes are pending.
+        Return the host time at which the next record will be due,
+        or None if no record will be due without a write() (or at the end of the recording).
+        '''
+        self.stalled = False
+        while len( self._pending ) < n:
+            if ( self._next is None ):
+                try:
+                    self._next = self._NextRecord()
+                except StopIteration:
+                    self.eof = True
+                    return None
+            (t, direction, the_bytes) = self._next
+            if ( direction == TX ):
+                if ( self.follow_commands ):
+                    if ( self._nb_sent + len( the_bytes ) > self._nb_written ):
+                        if ( not self._IsReceiveRemaining() ):
+                            # waiting for a write() is pointless, nothing would be replayed
+                            self.eof = True
+                        self.stalled = True
+                        return None
+                    # replay the response relative to the time the command was sent
+                    self._anchor = (self._last_write, t)
+                self._nb_sent += len( the_bytes )
+                self._next = None
+                continue
+            if ( self.speed > 0 ):
+                due = self._GetDueTime( t )
+                if ( due > time.time() ):
+                    return due
+            self._pending += the_bytes
+            self.time = t
+            self._next = None
+        return None
+
+    def _NextRecord( self ):
+        '''Non public helper function: return the next record of the recording, raise StopIteration at the end.
+        '''
+        if ( self._lookahead ):
+            return self._lookahead.popleft()
+        return self._records.next()
+
+    def _IsReceiveRemaining( self ):
+        '''Non public helper function: return True if a record of received bytes follows the next record.
+        Reads ahead in the recording just until such a record is found.
+        '''
+        for (t, direction, the_bytes) in self._lookahead: # pylint: disable-msg=W0612
+            if ( direction != TX ):
+                return True
+        while True:
+            try:
+                record = self._records.next()
+            except StopIteration:
+                return False
+            self._lookahead.append( record )
+            if ( record[1] != TX ):
+                return True
+
+    def read( self, n ):
+        '''Read \a n bytes of the recording. Like a serial.Serial object this
+        waits for at most timeout seconds for the bytes to become due and
+        may return less than \a n bytes (or "") on timeout.
+        '''
+        self._condition.acquire()
+        try:
+            if ( self.timeout is not None ):
+                end = time.time() + self.timeout
+            while True:
+                due = self._Fill( n )
+                if ( len( self._pending ) >= n ):
+                    break
+                if ( self.timeout is None ):
+                    if ( self.eof ):
+                        # nothing will ever come, so do not wait for ever
+                        break
+                    if ( due is None ):
+                        self._condition.wait()
+                    else:
+                        self._condition.wait( max( due - time.time(), 0.0 ) )
+                else:
+                    remaining = end - time.time()
+                    if ( remaining <= 0.0 ):
+                        break
+                    if ( due is not None ):
+                        remaining = min( remaining, max( due - time.time(), 0.0 ) )
+                    self._condition.wait( remaining )
+            s = self._pending[:n]
+            self._pending = self._pending[n:]
+            return s
+        finally:
+            self._condition.release()
+
+    def inWaiting( self ):
+        '''Return the number of bytes that can be read without waiting.
+        '''
+        self._condition.acquire()
+        try:
+            self._Fill( 1 )
+            return len( self._pending )
+        finally:
+            self._condition.release()
+
+    def write( self, s ):
+        '''The bytes \a s are ignored. But with follow_commands the bytes received after
+        the next recorded command become due now.
+        '''
+        self._condition.acquire()
+        try:
+            self._nb_written += len( s )
+            self._last_write = time.time()
+            self._condition.notifyAll()
+        finally:
+            self._condition.release()
+        return len( s )
+
+    def flush( self ):
+        '''This is a no-op. Just for compatibility with the file like interface.
+        '''
+        pass
+
+    def close( self ):
+        '''Close the recording file.
+        '''
+        self._condition.acquire()
+        try:
+            self._file.close()
+            self.eof = True
+            self._next = None
+            self._records = iter( [] )
+            self._condition.notifyAll()
+        finally:
+            self._condition.release()
+
+
+######################################################################
+# some usefull editing settings for emacs:
+#
+#;;; Local Variables: ***
+#;;; mode:python ***
+#;;; End: ***
+#
+######################################################################
@@ -0,0 +1,715 @@
+# -*- coding: latin-1 -*-
+#######################################################################
+#
+## \file
+#  \section sdhlibrary_python_dsasim_py_general General file information
+#
+#  \brief
+#    Simulation of the DSACON32m tactile sensor controller, served via TCP.
+#
+#  \section sdhlibrary_python_dsasim_py_copyright Copyright
+#
+#  Copyright (c) 2007 SCHUNK GmbH & Co. KG
+#
+#######################################################################
+
+
+#######################################################################
+## \anchor sdhlibrary_python_dsasim_py_python_vars
+#  \name   Python specific variables
+#
+#  Some definitions that describe the module for python.
+#
+#  @{
+
+__doc__       = "Simulation of the DSACON32m tactile sensor controller, served via TCP."
+__url__       = "http://www.schunk.com"
+__copyright__ = "Copyright (c) 2007 SCHUNK GmbH & Co. KG"
+
+#  end of doxygen name group sdhlibrary_python_dsasim_py_python_vars
+#  @}
+######################################################################
+
+#######################################################################
+## \package dsasim
+#
+#  \brief
+#    A cDSASimulator answers the binary protocol of the DSACON32m like
+#    the tactile sensor controller of an SDH connected via TCP, so a
+#    dsa.cDSA can be used (e.g. with the \c --dsa_tcp command line
+#    option) and load tested without a hand. Like sdhsim.cSDHSimulator
+#    for the joint controllers.
+#
+#    The packets start with the preamble 0xaa 0xaa 0xaa, followed by
+#    the packet ID (see dsa.cDSA.eDSAPacketID), the payload size, the
+#    payload and the CRC16 (see crc). The simulator answers the queries
+#    for the controller, sensor and matrix info, the sensitivity and
+#    threshold commands and the configuration of the data acquisition.
+#    Full frames are sent as single frames or in push mode, with or
+#    without RLE, like requested by the client.
+#
+#    The texel values are generated from contact blobs: pressure
+#    patches with a gaussian profile that move across the sensor
+#    matrices and bounce at their borders. The blobs can be scripted
+#    with the option \c "blobs", a list of dictionaries with the keys
+#    - \c "matrix" : index of the sensor matrix (0..5)
+#    - \c "x", \c "y" : position in cells at time 0
+#    - \c "vx", \c "vy" : velocity in cells per second
+#    - \c "radius" : the standard deviation of the profile in cells
+#    - \c "pressure" : the texel value in the center (max. 4095)
+#
+#    More options:
+#    - \c "fps" : rate of the frames in push mode. Like the DSACON32m the
+#      simulator ignores the framerate requested by the client (except 0).
+#      Frames that are due while the client does not read fast enough are
+#      skipped, see \c stats.frames_skipped.
+#    - \c "burst" : if True then frames are pushed as fast as the client
+#      reads them, to flood the client.
+#    - \c "rle_ratio" : if not None then the texels without contact get
+#      low values (below the contact thresholds of dsa.cDSA) in runs, so
+#      that the RLE encoded frames have about \c rle_ratio times the size of
+#      not encoded frames (1/15 .. 1). Else they are 0 and RLE compresses best.
+#    - \c "bit_error_rate" : probability that a bit of a frame sent is flipped
+#    - \c "drop_rate" : probability that a byte of a frame sent is lost.
+#      The errors are injected into the frames only, not into the responses
+#      to commands, so that the connection can be set up reliably.
+#    - \c "seed" : seed of the random numbers for the errors
+#
+#    Example:
+#    \code
+#      simulator = sdh.dsasim.cDSASimulator( dict( fps=100, bit_error_rate=1e-5 ) )
+#      (tcp_adr, tcp_port) = simulator.Start()
+#      ts = sdh.dsa.cDSA( port="%s:%d" % (tcp_adr, tcp_port) )
+#    \endcode
+#    or start the script demo-dsa-simulator.py and use the \c --dsa_tcp
+#    option of the other scripts.
+#
+#######################################################################
+
+import sys
+import math
+import time
+import array
+import random
+import struct
+import socket
+import threading
+import SocketServer
+
+from . import dbg
+from . import utils
+from .crc import CRC16Bytes
+from .dsa import cDSA, Boolify, FloatToBytes, FloatFromBytes, UInt16ToBytes, UIntFromBytes
+
+
+## The sensor matrices of an SDH: (cells_x, cells_y) of proximal / distal sensor of the 3 fingers
+SDH_MATRICES = [ (6,14), (6,13) ] * 3
+
+## Size of a texel in mm
+TEXEL_SIZE = 3.4
+
+## The firmware release reported, new enough for all features used by dsa.cDSA
+SW_VERSION = 412
+
+## The preamble that starts every packet
+PREAMBLE = "\xaa\xaa\xaa"
+
+## The error codes of the DSACON32m by name
+ERROR = dict( [ (name, code) for (code, name, description) in cDSA.error_codes ] )
+
+
+#-----------------------------------------------------------------
+def BuildPacket( packet_id, payload ):
+    '''
+    Return a string with a complete DSACON32m packet with preamble,
+    \a packet_id, size, \a payload (a string) and checksum.
+    '''
+    header = struct.pack( "<BH", packet_id, len( payload ) )
+    checksum = CRC16Bytes( header + payload )
+    return PREAMBLE + header + payload + struct.pack( "<H", checksum )
+
+
+#-----------------------------------------------------------------
+def EncodeTexels( texels, do_RLE ):
+    '''
+    Return the texel values of array('H') \a texels as string of 16 bit words
+    as sent in a full frame, run length encoded if \a do_RLE is true
+    (value in the lower 12 bits, repeat count in the upper 4 bits),
+    the inverse of dsa.DecodeTexelsArray().
+    '''
+    if do_RLE:
+        words = array.array( 'H' )
+        previous = -1
+        count = 0
+        for v in texels:
+            if ( v == previous  and  count < 15 ):
+                count += 1
+                continue
+            if ( count > 0 ):
+                words.append( (count << 12) | previous )
+            previous = v
+            count = 1
+        if ( count > 0 ):
+            words.append( (count << 12) | previous )
+    else:
+        words = array.array( 'H', texels )
+    if sys.byteorder != "little":
+        words.byteswap()
+    return words.tostring()
+
+
+#-----------------------------------------------------------------
+def _Bounce( x, high ):
+    '''
+    Non public helper function: return \a x folded into [0, \a high] like a ball bouncing at the borders.
+    '''
+    if ( high <= 0.0 ):
+        return 0.0
+    x = math.fmod( abs( x ), 2.0 * high )
+    if ( x > high ):
+        x = 2.0 * high - x
+    return x
+
+
+#=====================================================================
+## \brief Simulation of the DSACON32m tactile sensor controller of an SDH,
+#  see \ref dsasim "the package description".
+#
+#  <hr>
+class cDSASimulator( object ):
+    '''
+    Simulation of the DSACON32m tactile sensor controller of an SDH,
+    answering its binary protocol via TCP. See html/pdf documentation for details.
+    '''
+    #-----------------------------------------------------------------
+    ## Constructor of cDSASimulator class
+    #
+    #  \param self    - reference to the object itself
+    #  \param options - a dictionary of additional settings:
+    #  - \c "tcp_adr", \c "tcp_port" : the address to listen at, the default
+    #    port 0 selects a free port, see Start()
+    #  - \c "fps", \c "burst", \c "blobs", \c "rle_ratio", \c "bit_error_rate",
+    #    \c "drop_rate", \c "seed" : see \ref dsasim "the package description"
+    #  - \c "debug_level", \c "debug_output" : like for sdhbase.cSDHBase
+    #
+    def __init__( self, options=None ):
+        '''
+        Constructor of cDSASimulator class, see html/pdf documentation for details.
+        '''
+        self.options = dict( debug_level=0, debug_output=sys.stderr,
+                             tcp_adr="127.0.0.1", tcp_port=0,
+                             fps=30.0, burst=False, blobs=None, rle_ratio=None,
+                             bit_error_rate=0.0, drop_rate=0.0, seed=None )
+        if ( options ):   self.options.update( options )
+
+        ## tDBG object to disable/enable debug messages on demand
+        self.dbg = dbg.tDBG( flag=self.options[ "debug_level" ] > 0, color="blue", fd=self.options[ "debug_output" ] )
+
+        ## random numbers for the injected errors
+        self.random = random.Random( self.options[ "seed" ] )
+
+        ## the lock for the random numbers and the statistics, shared by all connections
+        self.lock = threading.Lock()
+
+        ## Statistics of the simulator:
+        #  frames_sent, frames_skipped (in push mode since the client did not read fast enough),
+        #  bytes_sent, bits_flipped, bytes_dropped
+        self.stats = utils.Struct( frames_sent=0, frames_skipped=0, bytes_sent=0, bits_flipped=0, bytes_dropped=0 )
+
+        ## the sensor matrices as list of (cells_x, cells_y)
+        self.matrices = list( SDH_MATRICES )
+        ## the offset of the first texel of each matrix in a frame
+        self.texel_offset = []
+        nb_texels = 0
+        for (cells_x, cells_y) in self.matrices:
+            self.texel_offset.append( nb_texels )
+            nb_texels += cells_x * cells_y
+        ## the number of texels of a frame
+        self.nb_texels = nb_texels
+
+        ## the contact blobs, see \ref dsasim "the package description"
+        self.blobs = self.options[ "blobs" ]
+        if ( self.blobs is None ):
+            self.blobs = [ dict( matrix=m, x=0.0, y=0.0, vx=1.5 + 0.3 * m, vy=2.5 - 0.2 * m, radius=1.2, pressure=3000.0 )
+                           for m in range( len( self.matrices ) ) ]
+
+        ## the texel values without contact
+        self.background = array.array( 'H', [ 0 ] * nb_texels )
+        if ( self.options[ "rle_ratio" ] is not None ):
+            run = int( round( 1.0 / self.options[ "rle_ratio" ] ) )
+            run = min( max( run, 1 ), 15 )
+            for i in xrange( nb_texels ):
+                self.background[ i ] = 1 + (i // run) % 2
+
+        ## the sensitivity of each matrix
+        self.sensitivities = [ 0.5 ] * len( self.matrices )
+        ## the threshold of each matrix
+        self.thresholds = [ 0 ] * len( self.matrices )
+
+        ## the time of the timestamp 0 of the frames
+        self.start_time = time.time()
+
+        self._server = None
+        self._thread = None
+
+        eid = cDSA.eDSAPacketID
+        self._commands = { eid[ "eDSA_QUERY_CONTROLLER_CONFIGURATION" ] : self._ControllerInfo,
+                           eid[ "eDSA_QUERY_SENSOR_CONFIGURATION" ] : self._SensorInfo,
+                           eid[ "eDSA_QUERY_MATRIX_CONFIGURATION" ] : self._MatrixInfo,
+                           eid[ "eDSA_CONFIGURE_DATA_ACQUISITION" ] : self._ConfigureDataAcquisition,
+                           eid[ "eDSA_ADJUST_MATRIX_SENSITIVITY" ] : self._SetSensitivity,
+                           eid[ "eDSA_GET_SENSITIVITY_ADJUSTMENT_INFO" ] : self._GetSensitivity,
+                           eid[ "eDSA_SET_MATRIX_THRESHOLD" ] : self._SetThreshold,
+                           eid[ "eDSA_GET_MATRIX_THRESHOLD" ] : self._GetThreshold }
+
+    #-----------------------------------------------------------------
+    ## Start serving the simulated DSACON32m via TCP in a background thread.
+    #
+    #  \return a tuple (tcp_adr, tcp_port) with the address to connect to
+    #
+    def Start( self ):
+        '''
+        Start serving the simulated DSACON32m via TCP in a background thread.
+        Return a tuple (tcp_adr, tcp_port) with the address to connect to.
+        '''
+        address = self._CreateServer()
+        self._thread = threading.Thread( target=self._server.serve_forever, name="cDSASimulator" )
+        self._thread.daemon = True
+        self._thread.start()
+        return address
+
+    #-----------------------------------------------------------------
+    ## Serve the simulated DSACON32m via TCP until Stop() is called from another
+    #  thread or the process is interrupted.
+    #
+    def Serve( self ):
+        '''
+        Serve the simulated DSACON32m via TCP until Stop() is called or the process is interrupted.
+        '''
+        self._CreateServer()
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    #-----------------------------------------------------------------
+    ## Stop serving, close the listening socket.
+    #
+    def Stop( self ):
+        '''
+        Stop serving, close the listening socket.
+        '''
+        if ( self._server is None ):
+            return
+        self._server.shutdown()
+        if ( self._thread is not None ):
+            self._thread.join()
+            self._server.server_close()
+            self._thread = None
+        self._server = None
+
+    #-----------------------------------------------------------------
+    def _CreateServer( self ):
+        '''
+        Non public helper function: create the TCP server and return its
+        address as tuple (tcp_adr, tcp_port).
+        '''
+        self._server = _cServer( (self.options[ "tcp_adr" ], self.options[ "tcp_port" ]), _cRequestHandler )
+        self._server.simulator = self
+        address = self._server.server_address
+        self.dbg << "DSACON32m simulator listening at %s:%d\n" % address # pylint: disable-msg=W0104
+        return address
+
+    #-----------------------------------------------------------------
+    ## Return the texel values of all matrices at time \a t (in seconds) as array('H').
+    #
+    def Texels( self, t ):
+        '''
+        Return the texel values of all matrices at time \a t (in seconds) as array('H').
+        '''
+        texels = array.array( 'H', self.background )
+        for blob in self.blobs:
+            m = blob[ "matrix" ]
+            (cells_x, cells_y) = self.matrices[ m ]
+            offset = self.texel_offset[ m ]
+            cx = _Bounce( blob[ "x" ] + blob[ "vx" ] * t, cells_x - 1 )
+            cy = _Bounce( blob[ "y" ] + blob[ "vy" ] * t, cells_y - 1 )
+            r = blob[ "radius" ]
+            scale = -0.5 / (r * r)
+            # cells further away than 3 radii get less than 1% of the pressure:
+            for y in xrange( max( int( cy - 3.0 * r ), 0 ), min( int( cy + 3.0 * r ) + 2, cells_y ) ):
+                dy2 = (y - cy) * (y - cy)
+                for x in xrange( max( int( cx - 3.0 * r ), 0 ), min( int( cx + 3.0 * r ) + 2, cells_x ) ):
+                    v = int( blob[ "pressure" ] * math.exp( ((x - cx) * (x - cx) + dy2) * scale ) )
+                    i = offset + y * cells_x + x
+                    if ( v > 10  and  v > texels[ i ] ):
+                        texels[ i ] = min( v, 4095 )
+        return texels
+
+    #-----------------------------------------------------------------
+    ## Return a string with the full frame packet for time \a now (as returned by time.time()).
+    #
+    def FramePacket( self, now, do_RLE ):
+        '''
+        Return a string with the full frame packet for time \a now (as returned by time.time()),
+        run length encoded if \a do_RLE is true.
+        '''
+        t = now - self.start_time
+        timestamp = int( t * 1000.0 ) & 0xffffffff
+        flags = 1 if do_RLE else 0
+        payload = struct.pack( "<IB", timestamp, flags ) + EncodeTexels( self.Texels( t ), do_RLE )
+        return BuildPacket( cDSA.eDSAPacketID[ "eDSA_FULL_FRAME" ], payload )
+
+    #-----------------------------------------------------------------
+    ## Return the response packets for the command with \a packet_id and
+    #  \a payload (a bytearray) received on connection \a connection as string.
+    #
+    def Command( self, connection, packet_id, payload ):
+        '''
+        Return the response packets for the command with \a packet_id and \a payload
+        (a bytearray) received on \a connection (a _cRequestHandler) as string.
+        '''
+        try:
+            handler = self._commands[ packet_id ]
+        except KeyError:
+            return self._Error( packet_id, "E_CMD_UNKNOWN" )
+        return handler( connection, packet_id, payload )
+
+    #-----------------------------------------------------------------
+    def _Error( self, packet_id, name ):
+        '''
+        Non public helper function: return the response packet with the error code \a name only.
+        '''
+        return BuildPacket( packet_id, struct.pack( "<H", ERROR[ name ] ) )
+
+    #-----------------------------------------------------------------
+    def _Response( self, packet_id, the_bytes ):
+        '''
+        Non public helper function: return the successful response packet
+        with the list of ints \a the_bytes following the error code.
+        '''
+        return BuildPacket( packet_id, "".join( [ chr( b ) for b in [ 0, 0 ] + the_bytes ] ) )
+
+    #-----------------------------------------------------------------
+    def _ControllerInfo( self, connection, packet_id, payload ):
+        '''
+        Non public helper function: the response to a controller info query.
+        '''
+        status_flags = (1<<7)
+        if ( connection.acquiring ):
+            status_flags |= (1<<6)
+        the_bytes = ( [ 0x78, 0x56, 0x34, 0x12 ] +     # serial_no
+                      [ 0x11 ] +                       # hw_version
+                      UInt16ToBytes( SW_VERSION ) +
+                      [ status_flags, (1<<4), 0, 0 ] + # status_flags, feature_flags (RS232), senscon_type, active_interface
+                      [ 0, 0, 0, 0 ] +                 # can_baudrate
+                      [ 0 ] )                          # can_id (only one byte is sent by the DSACON32m)
+        return self._Response( packet_id, the_bytes )
+
+    #-----------------------------------------------------------------
+    def _SensorInfo( self, connection, packet_id, payload ):
+        '''
+        Non public helper function: the response to a sensor info query.
+        '''
+        the_bytes = ( UInt16ToBytes( len( self.matrices ) ) +
+                      [ 0, 0 ] +                   # generated_by
+                      [ 1 ] +                      # hw_revision
+                      [ 0x21, 0x43, 0x65, 0x07 ] + # serial_no
+                      [ 0 ] )                      # feature_flags
+        return self._Response( packet_id, the_bytes )
+
+    #-----------------------------------------------------------------
+    def _MatrixIndex( self, payload, i ):
+        '''
+        Non public helper function: return the matrix index in \a payload at \a i, None if invalid.
+        '''
+        if ( len( payload ) <= i  or  payload[ i ] >= len( self.matrices ) ):
+            return None
+        return payload[ i ]
+
+    #-----------------------------------------------------------------
+    def _MatrixInfo( self, connection, packet_id, payload ):
+        '''
+        Non public helper function: the response to a matrix info query.
+        '''
+        m = self._MatrixIndex( payload, 0 )
+        if ( m is None ):
+            return self._Error( packet_id, "E_INDEX_OUT_OF_BOUNDS" )
+        (cells_x, cells_y) = self.matrices[ m ]
+        the_bytes = ( FloatToBytes( TEXEL_SIZE ) + FloatToBytes( TEXEL_SIZE ) +
+                      UInt16ToBytes( cells_x ) + UInt16ToBytes( cells_y ) +
+                      [ m, 0, 0, 0, 0, 0 ] +           # uid
+                      [ 0, 0 ] +                       # reserved
+                      [ 1 ] +                          # hw_revision
+                      FloatToBytes( 0.0 ) * 6 +        # matrix_center_x/y/z, matrix_theta_x/y/z
+                      [ 0xff, 0x0f, 0, 0 ] +           # fullscale 4095
+                      [ 0 ] )                          # feature_flags
+        return self._Response( packet_id, the_bytes )
+
+    #-----------------------------------------------------------------
+    def _ConfigureDataAcquisition( self, connection, packet_id, payload ):
+        '''
+        Non public helper function: start or stop sending frames.
+        '''
+        if ( len( payload ) != 3 ):
+            return self._Error( packet_id, "E_CMD_NOT_ENOUGH_PARAMS" )
+        flags = payload[0]
+        framerate = payload[1] + (payload[2] << 8)
+        connection.Configure( acquiring=Boolify( flags & (1<<7) ), single=(framerate == 0), do_RLE=Boolify( flags & (1<<0) ) )
+        return self._Response( packet_id, [] )
+
+    #-----------------------------------------------------------------
+    def _ApplyToMatrices( self, values, flags, m, value, default ):
+        '''
+        Non public helper function: set \a value (or \a default if the reset
+        flag is set in \a flags) in list \a values for matrix \a m or all matrices.
+        '''
+        if ( flags & (1<<0) ):
+            value = default
+        if ( flags & (1<<1) ):
+            values[:] = [ value ] * len( values )
+        else:
+            values[ m ] = value
+
+    #-----------------------------------------------------------------
+    def _SetSensitivity( self, connection, packet_id, payload ):
+        '''
+        Non public helper function: set the sensitivity of a matrix.
+        '''
+        m = self._MatrixIndex( payload, 1 )
+        if ( m is None  or  len( payload ) != 6 ):
+            return self._Error( packet_id, "E_INVALID_PARAMETER" )
+        sensitivity = FloatFromBytes( payload[ 2:6 ] )
+        if ( sensitivity < 0.0  or  sensitivity > 1.0 ):
+            return self._Error( packet_id, "E_RANGE_ERROR" )
+        self._ApplyToMatrices( self.sensitivities, payload[0], m, sensitivity, 0.5 )
+        return self._Response( packet_id, [] )
+
+    #-----------------------------------------------------------------
+    def _GetSensitivity( self, connection, packet_id, payload ):
+        '''
+        Non public helper function: the response to a sensitivity query.
+        '''
+        m = self._MatrixIndex( payload, 0 )
+        if ( m is None ):
+            return self._Error( packet_id, "E_INDEX_OUT_OF_BOUNDS" )
+        return self._Response( packet_id, [ 0 ] + FloatToBytes( self.sensitivities[ m ] ) + FloatToBytes( 0.5 ) )
+
+    #-----------------------------------------------------------------
+    def _SetThreshold( self, connection, packet_id, payload ):
+        '''
+        Non public helper function: set the threshold of a matrix.
+        '''
+        m = self._MatrixIndex( payload, 1 )
+        if ( m is None  or  len( payload ) != 4 ):
+            return self._Error( packet_id, "E_INVALID_PARAMETER" )
+        threshold = UIntFromBytes( payload[ 2:4 ] )
+        if ( threshold > 4095 ):
+            return self._Error( packet_id, "E_RANGE_ERROR" )
+        self._ApplyToMatrices( self.thresholds, payload[0], m, threshold, 0 )
+        return self._Response( packet_id, [] )
+
+    #-----------------------------------------------------------------
+    def _GetThreshold( self, connection, packet_id, payload ):
+        '''
+        Non public helper function: the response to a threshold query.
+        '''
+        m = self._MatrixIndex( payload, 0 )
+        if ( m is None ):
+            return self._Error( packet_id, "E_INDEX_OUT_OF_BOUNDS" )
+        return self._Response( packet_id, UInt16ToBytes( self.thresholds[ m ] ) )
+
+    #-----------------------------------------------------------------
+    ## Return \a data (a string) with the bit errors and lost bytes injected
+    #  according to the options \c "bit_error_rate" and \c "drop_rate".
+    #
+    def Corrupt( self, data ):
+        '''
+        Return \a data (a string) with the bit errors and lost bytes injected
+        according to the options "bit_error_rate" and "drop_rate".
+        '''
+        bit_error_rate = self.options[ "bit_error_rate" ]
+        drop_rate = self.options[ "drop_rate" ]
+        if ( bit_error_rate <= 0.0  and  drop_rate <= 0.0 ):
+            return data
+        data = bytearray( data )
+        with self.lock:
+            for i in self._Events( len( data ) * 8, bit_error_rate ):
+                data[ i >> 3 ] ^= 1 << (i & 7)
+                self.stats.bits_flipped += 1
+            for i in reversed( list( self._Events( len( data ), drop_rate ) ) ):
+                del data[ i ]
+                self.stats.bytes_dropped += 1
+        return str( data )
+
+    #-----------------------------------------------------------------
+    def _Events( self, n, p ):
+        '''
+        Non public helper function: generate the indices of the events happening
+        with probability \a p in \a n trials. Only the gaps between the events are
+        drawn (geometric distribution), so this is fast for small \a p.
+        '''
+        if ( p <= 0.0 ):
+            return
+        i = -1
+        while True:
+            if ( p >= 1.0 ):
+                i += 1
+            else:
+                i += 1 + int( math.log( 1.0 - self.random.random() ) / math.log( 1.0 - p ) )
+            if ( i >= n ):
+                return
+            yield i
+
+# end of class cDSASimulator
+#=====================================================================
+
+
+#=====================================================================
+class _cServer( SocketServer.ThreadingTCPServer ):
+    '''
+    Non public helper class: the TCP server of a cDSASimulator, one thread per connection.
+    '''
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+#=====================================================================
+class _cRequestHandler( SocketServer.BaseRequestHandler ):
+    '''
+    Non public helper class: handle one connection to a cDSASimulator.
+    The commands are answered by the thread of the connection, the frames
+    are pushed by a second thread. Each connection has its own data acquisition settings.
+    '''
+    ## Commands with a larger payload size are considered to be corrupted.
+    MAX_PAYLOAD_SIZE = 64
+
+    def setup( self ):
+        self.request.setsockopt( socket.IPPROTO_TCP, socket.TCP_NODELAY, 1 )
+        ## flag, True while frames are to be sent
+        self.acquiring = False
+        ## flag, True if a single frame is to be sent only
+        self.single = False
+        ## flag, True if the frames are run length encoded
+        self.do_RLE = True
+        self.closed = False
+        self.changed = threading.Event()
+        self.send_lock = threading.Lock()
+        self.pusher = threading.Thread( target=self.Pusher, name="cDSASimulator pusher" )
+        self.pusher.daemon = True
+        self.pusher.start()
+
+    def Configure( self, acquiring, single, do_RLE ):
+        '''
+        Change the data acquisition settings of the connection.
+        '''
+        self.single = single
+        self.do_RLE = do_RLE
+        self.acquiring = acquiring
+        self.changed.set()
+
+    def handle( self ):
+        simulator = self.server.simulator # pylint: disable-msg=E1101
+        buf = bytearray()
+        while True:
+            try:
+                data = self.request.recv( 4096 )
+            except socket.error:
+                break
+            if ( data == "" ):
+                break
+            buf.extend( data )
+            while True:
+                start = buf.find( PREAMBLE )
+                if ( start < 0 ):
+                    del buf[ :max( len( buf ) - len( PREAMBLE ) + 1, 0 ) ]
+                    break
+                del buf[ :start ]
+                if ( len( buf ) < 6 ):
+                    break
+                packet_id = buf[3]
+                size = buf[4] + (buf[5] << 8)
+                if ( size > self.MAX_PAYLOAD_SIZE ):
+                    del buf[0]
+                    continue
+                # commands without payload have no checksum:
+                nb_packet = 6 + size
+                if ( size > 0 ):
+                    nb_packet += 2
+                if ( len( buf ) < nb_packet ):
+                    break
+                packet = buf[ :nb_packet ]
+                del buf[ :nb_packet ]
+                payload = packet[ 6:6+size ]
+                if ( size > 0  and  CRC16Bytes( packet[ 3:6+size ] ) != packet[-2] + (packet[-1] << 8) ):
+                    response = simulator._Error( packet_id, "E_CHECKSUM_ERROR" ) # pylint: disable-msg=W0212
+                else:
+                    response = simulator.Command( self, packet_id, payload )
+                self.Send( response, False )
+
+    def finish( self ):
+        self.closed = True
+        self.changed.set()
+        self.pusher.join()
+
+    def Send( self, packet, is_frame ):
+        '''
+        Send \a packet, with the injected errors if \a is_frame.
+        '''
+        simulator = self.server.simulator # pylint: disable-msg=E1101
+        data = packet
+        if ( is_frame ):
+            data = simulator.Corrupt( packet )
+        with self.send_lock:
+            try:
+                self.request.sendall( data )
+            except socket.error:
+                self.closed = True
+                return
+        with simulator.lock:
+            simulator.stats.bytes_sent += len( data )
+            if ( is_frame ):
+                simulator.stats.frames_sent += 1
+
+    def Pusher( self ):
+        '''
+        Send the frames while the data acquisition is on.
+        '''
+        simulator = self.server.simulator # pylint: disable-msg=E1101
+        options = simulator.options
+        period = 1.0 / options[ "fps" ]
+        next_time = None
+        while not self.closed:
+            if ( not self.acquiring ):
+                self.changed.wait( 1.0 )
+                self.changed.clear()
+                next_time = None
+                continue
+            now = time.time()
+            if ( not self.single  and  not options[ "burst" ] ):
+                if ( next_time is None ):
+                    next_time = now
+                if ( now < next_time ):
+                    self.changed.wait( next_time - now )
+                    self.changed.clear()
+                    continue
+                # like the DSACON32m skip the frames that could not be sent in time:
+                nb_late = int( (now - next_time) / period )
+                if ( nb_late > 0 ):
+                    with simulator.lock:
+                        simulator.stats.frames_skipped += nb_late
+                next_time += (nb_late + 1) * period
+            packet = simulator.FramePacket( now, self.do_RLE )
+            if ( self.single ):
+                self.acquiring = False
+            self.Send( packet, True )
+
+
+######################################################################
+# some usefull editing settings for emacs:
+#
+#;;; Local Variables: ***
+#;;; mode:python ***
+#;;; End: ***
+#
+######################################################################
@@ -0,0 +1,468 @@
+# -*- coding: latin-1 -*-
+#######################################################################
+#
+## \file
+#  \section sdhlibrary_python_eventloop_py_general General file information
+#
+#  \brief
+#    A single threaded event loop with futures and generator based tasks
+#    to drive several SDHs, tactile sensors and other devices at once.
+#
+#  \section sdhlibrary_python_eventloop_py_copyright Copyright
+#
+#  Copyright (c) 2007 SCHUNK GmbH & Co. KG
+#
+#######################################################################
+
+
+#######################################################################
+## \anchor sdhlibrary_python_eventloop_py_python_vars
+#  \name   Python specific variables
+#
+#  Some definitions that describe the module for python.
+#
+#  @{
+
+__doc__       = "A single threaded event loop with futures and generator based tasks."
+__url__       = "http://www.schunk.com"
+__copyright__ = "Copyright (c) 2007 SCHUNK GmbH & Co. KG"
+
+#  end of doxygen name group sdhlibrary_python_eventloop_py_python_vars
+#  @}
+######################################################################
+
+#######################################################################
+## \package eventloop
+#
+#  \brief
+#    The communication classes of the library (cSDHSerial, cDSA) block
+#    the calling thread until a reply is received. To control several
+#    devices at once an application would need one thread per device.
+#    A cEventLoop instead waits with select() for any of the
+#    communication objects registered to become readable and calls the
+#    callback registered for it, so one thread can drive several SDHs,
+#    tactile sensors and other devices (like a camera connected via TCP)
+#    concurrently, see asyncsdh.cAsyncSDH and asyncdsa.cAsyncDSA.
+#
+#    Operations that complete later return a cFuture. Sequences of such
+#    operations are best written as generator functions that yield the
+#    futures to wait for, run as a cTask by the event loop. The value of
+#    the yield expression is the result of the future (or its exception is
+#    raised there). A task returns a result by raising cReturn.
+#    Cancelling a task raises a cSDHErrorCancelled in the generator at the
+#    yield it is waiting at.
+#
+#    Example:
+#    \code
+#      loop = sdh.eventloop.cEventLoop()
+#      hand = sdh.asyncsdh.cAsyncSDH( loop, sdh.sdhserial.cSDHSerial( options ) )
+#
+#      def ReadAll():
+#          # both commands are sent at once, then both replies are waited for:
+#          (angles, temperatures) = yield sdh.eventloop.Gather( [ hand.AxisCommand( "pos" ), hand.Send( "temp" ) ] )
+#          raise sdh.eventloop.cReturn( angles )
+#
+#      angles = loop.RunUntilComplete( loop.CreateTask( ReadAll() ) )
+#    \endcode
+#
+#    The event loop uses select(), so on MS-Windows only TCP connections
+#    can be registered.
+#
+#######################################################################
+
+import sys, time, select, errno, heapq, collections
+
+from .sdhbase import cSDHError, cSDHErrorCancelled, cSDHErrorTimeout
+
+
+#-----------------------------------------------------------------
+class cReturn( Exception ):
+    '''
+    Raise a cReturn in the generator of a cTask to make \a value the result of the task
+    (a generator cannot return a value in python 2).
+    '''
+    def __init__( self, value=None ):
+        Exception.__init__( self, value )
+        self.value = value
+
+
+#-----------------------------------------------------------------
+class cFuture( object ):
+    '''
+    The result of an operation that completes later: either a value
+    (set with set_result()) or an exception (set with set_exception()).
+    Functions added with add_done_callback() are called when the future
+    is done, i.e. when its result or exception is set or when it is cancelled.
+    Setting the result or exception of a future that is already done
+    (e.g. cancelled) has no effect.
+    '''
+    def __init__( self ):
+        self._done = False
+        self._cancelled = False
+        self._result = None
+        self._exception = None
+        self._traceback = None
+        self._callbacks = []
+
+    def done( self ):
+        '''Return True if the future is done.
+        '''
+        return self._done
+
+    def cancelled( self ):
+        '''Return True if the future was cancelled.
+        '''
+        return self._cancelled
+
+    def cancel( self ):
+        '''Cancel the future if it is not done yet. Return True if it was cancelled.
+        '''
+        if ( self._done ):
+            return False
+        self._cancelled = True
+        self._exception = cSDHErrorCancelled( "Operation was cancelled" )
+        self._Finish()
+        return True
+
+    def result( self ):
+        '''Return the result of the future or raise its exception.
+        Raises a cSDHError if the future is not done yet, use
+        cEventLoop.RunUntilComplete() to wait for it.
+        '''
+        if ( not self._done ):
+            raise cSDHError( "Result of a future requested that is not done yet" )
+        if ( self._exception is not None ):
+            raise self._exception.__class__, self._exception, self._traceback
+        return self._result
+
+    def exception( self ):
+        '''Return the exception of the future or None.
+        '''
+        return self._exception
+
+    def add_done_callback( self, callback ):
+        '''Call \a callback with the future as parameter when the future is done
+        (immediately if it is done already).
+        '''
+        if ( self._done ):
+            callback( self )
+        else:
+            self._callbacks.append( callback )
+
+    def set_result( self, result ):
+        '''Make \a result the result of the future. Return False if the future was done already.
+        '''
+        if ( self._done ):
+            return False
+        self._result = result
+        self._Finish()
+        return True
+
+    def set_exception( self, exception, traceback=None ):
+        '''Make \a exception (raised with \a traceback) the exception of the future.
+        Return False if the future was done already.
+        '''
+        if ( self._done ):
+            return False
+        self._exception = exception
+        self._traceback = traceback
+        self._Finish()
+        return True
+
+    def _Finish( self ):
+        '''Non public helper function: mark the future as done and call the callbacks.
+        '''
+        self._done = True
+        callbacks = self._callbacks
+        self._callbacks = []
+        for callback in callbacks:
+            callback( self )
+
+
+#-----------------------------------------------------------------
+class cTask( cFuture ):
+    '''
+    A future for the result of a generator function run by a cEventLoop.
+    The generator yields cFuture objects and is resumed with their result
+    when they are done. See the package documentation of eventloop.
+    Use cEventLoop.CreateTask() to create a task.
+    '''
+    def __init__( self, loop, generator ):
+        cFuture.__init__( self )
+        self._loop = loop
+        self._generator = generator
+        self._waiting_for = None
+        self._must_cancel = False
+        loop.CallSoon( self._Step, None, None )
+
+    def cancel( self ):
+        '''Request cancellation of the task: a cSDHErrorCancelled is raised in the
+        generator at the yield it is waiting at. The generator might catch it to
+        clean up (e.g. stop a movement), the task is cancelled when the
+        exception leaves the generator. Return False if the task was done already.
+        '''
+        if ( self._done ):
+            return False
+        if ( self._waiting_for is not None ):
+            # resumes the generator with the cSDHErrorCancelled of the future:
+            if ( self._waiting_for.cancel() ):
+                return True
+        self._must_cancel = True
+        return True
+
+    def _Step( self, value, exception, traceback=None ):
+        '''Non public helper function: resume the generator with \a value or \a exception.
+        '''
+        self._waiting_for = None
+        if ( self._done ):
+            return
+        if ( self._must_cancel ):
+            self._must_cancel = False
+            exception = cSDHErrorCancelled( "Task was cancelled" )
+            traceback = None
+        try:
+            if ( exception is None ):
+                future = self._generator.send( value )
+            else:
+                future = self._generator.throw( exception.__class__, exception, traceback )
+        except StopIteration:
+            self.set_result( None )
+            return
+        except cReturn, e:
+            self.set_result( e.value )
+            return
+        except cSDHErrorCancelled, e:
+            self._cancelled = True
+            self.set_exception( e, sys.exc_info()[2] )
+            return
+        except Exception, e:
+            self.set_exception( e, sys.exc_info()[2] )
+            return
+
+        if ( not isinstance( future, cFuture ) ):
+            self._loop.CallSoon( self._Step, None, cSDHError( "Task yielded %r instead of a cFuture" % (future,) ) )
+            return
+        self._waiting_for = future
+        future.add_done_callback( self._Wakeup )
+
+    def _Wakeup( self, future ):
+        '''Non public helper function: resume the generator with the result of the done \a future.
+        '''
+        self._loop.CallSoon( self._Step, future._result, future._exception, future._traceback ) # pylint: disable-msg=W0212
+
+
+#-----------------------------------------------------------------
+def Chain( future, function ):
+    '''
+    Return a new future for the result of \a function applied to the
+    result of \a future. Exceptions of \a future or \a function become
+    the exception of the new future. Cancelling the new future cancels \a future.
+    '''
+    chained = cFuture()
+
+    def _Done( f ):
+        if ( f._exception is not None ): # pylint: disable-msg=W0212
+            chained.set_exception( f._exception, f._traceback ) # pylint: disable-msg=W0212
+            return
+        try:
+            result = function( f._result ) # pylint: disable-msg=W0212
+        except Exception, e:
+            chained.set_exception( e, sys.exc_info()[2] )
+            return
+        chained.set_result( result )
+
+    def _Cancelled( f ):
+        if ( f.cancelled() ):
+            future.cancel()
+
+    future.add_done_callback( _Done )
+    chained.add_done_callback( _Cancelled )
+    return chained
+
+
+#-----------------------------------------------------------------
+def Gather( futures ):
+    '''
+    Return a new future for the list of the results of all \a futures,
+    in the same order. If one of the \a futures fails then the new future
+    fails with the same exception. Cancelling the new future cancels all \a futures.
+    '''
+    futures = list( futures )
+    gathered = cFuture()
+    remaining = [ len( futures ) ]
+
+    def _Done( f ):
+        if ( f._exception is not None ): # pylint: disable-msg=W0212
+            gathered.set_exception( f._exception, f._traceback ) # pylint: disable-msg=W0212
+            return
+        remaining[0] -= 1
+        if ( remaining[0] == 0 ):
+            gathered.set_result( [ ff._result for ff in futures ] ) # pylint: disable-msg=W0212
+
+    def _Cancelled( f ):
+        if ( f.cancelled() ):
+            for ff in futures:
+                ff.cancel()
+
+    if ( not futures ):
+        gathered.set_result( [] )
+    for f in futures:
+        f.add_done_callback( _Done )
+    gathered.add_done_callback( _Cancelled )
+    return gathered
+
+
+#-----------------------------------------------------------------
+class cEventLoop( object ):
+    '''
+    A single threaded event loop: calls the callbacks registered for
+    readable communication objects (AddReader()) and for points in time
+    (CallLater()) and runs generator based tasks (CreateTask()).
+    See the package documentation of eventloop.
+
+    A cEventLoop and all objects driven by it must be used by a single thread only.
+    '''
+    def __init__( self ):
+        # file descriptor -> callback to call when readable
+        self._readers = {}
+        # heap of timers [time, sequence number, callback, args], callback None == cancelled
+        self._timers = []
+        self._timer_seq = 0
+        # callbacks to call in the next iteration: (callback, args)
+        self._ready = collections.deque()
+
+    @staticmethod
+    def _FileNo( fileobj ):
+        '''Non public helper function: return the file descriptor of \a fileobj (or \a fileobj itself if it is an int).
+        '''
+        if ( type( fileobj ) in (int, long) ):
+            return fileobj
+        return fileobj.fileno()
+
+    def AddReader( self, fileobj, callback ):
+        '''Call \a callback() whenever \a fileobj (a file descriptor or an object
+        with a fileno() method, like a socket, a serial.Serial or a tcpserial.tTCPSerial) is readable.
+        '''
+        self._readers[ self._FileNo( fileobj ) ] = callback
+
+    def RemoveReader( self, fileobj ):
+        '''Stop calling the callback registered for \a fileobj with AddReader().
+        '''
+        self._readers.pop( self._FileNo( fileobj ), None )
+
+    def CallSoon( self, callback, *args ):
+        '''Call \a callback(*args) in the next iteration of the event loop.
+        '''
+        self._ready.append( (callback, args) )
+
+    def CallLater( self, delay, callback, *args ):
+        '''Call \a callback(*args) after \a delay seconds.
+        Return a handle to be used with CancelTimer().
+        '''
+        self._timer_seq += 1
+        timer = [ time.time() + delay, self._timer_seq, callback, args ]
+        heapq.heappush( self._timers, timer )
+        return timer
+
+    def CancelTimer( self, timer ):
+        '''Cancel the call scheduled with CallLater() that returned \a timer.
+        '''
+        timer[2] = None
+
+    def Sleep( self, delay ):
+        '''Return a future that is done after \a delay seconds.
+        '''
+        future = cFuture()
+        timer = self.CallLater( delay, future.set_result, None )
+        future.add_done_callback( lambda f: self.CancelTimer( timer ) )
+        return future
+
+    def WaitFor( self, future, timeout ):
+        '''Return a new future for the result of \a future. If \a future is
+        not done after \a timeout seconds then it is cancelled and the new future
+        fails with a cSDHErrorTimeout.
+        '''
+        waiting = Chain( future, lambda result: result )
+
+        def _Timeout():
+            if ( waiting.set_exception( cSDHErrorTimeout( "Timeout after %.3fs" % timeout ) ) ):
+                future.cancel()
+
+        timer = self.CallLater( timeout, _Timeout )
+        waiting.add_done_callback( lambda f: self.CancelTimer( timer ) )
+        return waiting
+
+    def CreateTask( self, generator ):
+        '''Run the \a generator (the result of calling a generator function) as a task.
+        Return the cTask object, a future for the result of the task.
+        '''
+        return cTask( self, generator )
+
+    def RunOnce( self, timeout=None ):
+        '''Wait at most \a timeout seconds (None == wait until something happens)
+        for readable communication objects or due timers and call their callbacks.
+        '''
+        if ( self._ready ):
+            timeout = 0.0
+        elif ( self._timers ):
+            delay = max( self._timers[0][0] - time.time(), 0.0 )
+            if ( timeout is None  or  delay < timeout ):
+                timeout = delay
+
+        if ( self._readers ):
+            try:
+                (readable, writable, exceptional) = select.select( self._readers.keys(), [], [], timeout ) # pylint: disable-msg=W0612
+            except select.error, e:
+                if ( e.args[0] != errno.EINTR ):
+                    raise
+                readable = []
+            for fd in readable:
+                callback = self._readers.get( fd )
+                if ( callback is not None ):
+                    self._ready.append( (callback, ()) )
+        elif ( timeout is None ):
+            raise cSDHError( "Nothing to wait for in cEventLoop.RunOnce()" )
+        elif ( timeout > 0.0 ):
+            time.sleep( timeout )
+
+        now = time.time()
+        timers = self._timers
+        while ( timers  and  timers[0][0] <= now ):
+            timer = heapq.heappop( timers )
+            if ( timer[2] is not None ):
+                self._ready.append( (timer[2], timer[3]) )
+
+        # callbacks scheduled by these callbacks are called in the next iteration:
+        for i in xrange( len( self._ready ) ): # pylint: disable-msg=W0612
+            (callback, args) = self._ready.popleft()
+            callback( *args )
+
+    def RunUntilComplete( self, future, timeout=None ):
+        '''Run the event loop until \a future (a cFuture or a generator to
+        run as task) is done and return its result or raise its exception.
+        If \a timeout is not None then a cSDHErrorTimeout is raised if \a future
+        is not done after \a timeout seconds (\a future is not cancelled then).
+        '''
+        if ( not isinstance( future, cFuture ) ):
+            future = self.CreateTask( future )
+        if ( timeout is not None ):
+            end = time.time() + timeout
+        while ( not future.done() ):
+            if ( timeout is None ):
+                self.RunOnce()
+            else:
+                remaining = end - time.time()
+                if ( remaining <= 0.0 ):
+                    raise cSDHErrorTimeout( "Timeout in RunUntilComplete" )
+                self.RunOnce( remaining )
+        return future.result()
+
+
+######################################################################
+# some usefull editing settings for emacs:
+#
+#;;; Local Variables: ***
+#;;; mode:python ***
+#;;; End: ***
+#
+######################################################################
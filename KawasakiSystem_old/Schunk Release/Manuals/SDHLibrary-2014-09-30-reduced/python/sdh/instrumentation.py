@@ -0,0 +1,469 @@
+# -*- coding: latin-1 -*-
+#######################################################################
+#
+## \file
+#  \section sdhlibrary_python_instrumentation_py_general General file information
+#
+#  \brief
+#    Runtime timing instrumentation of the communication with the SDH and the DSACON32m.
+#
+#  \section sdhlibrary_python_instrumentation_py_copyright Copyright
+#
+#  Copyright (c) 2007 SCHUNK GmbH & Co. KG
+#
+#######################################################################
+
+
+#######################################################################
+## \anchor sdhlibrary_python_instrumentation_py_python_vars
+#  \name   Python specific variables
+#
+#  Some definitions that describe the module for python.
+#
+#  @{
+
+__doc__       = "Runtime timing instrumentation of the communication with the SDH and the DSACON32m."
+__url__       = "http://www.schunk.com"
+__copyright__ = "Copyright (c) 2007 SCHUNK GmbH & Co. KG"
+
+#  end of doxygen name group sdhlibrary_python_instrumentation_py_python_vars
+#  @}
+######################################################################
+
+#######################################################################
+## \package instrumentation
+#
+#  \brief
+#    A cInstrumentation counts the commands sent to the SDH by a
+#    cSDHSerial object or the responses read from the DSACON32m by a
+#    dsa.cDSA object while the application is running: per command the
+#    number of calls, the bytes sent and received and a histogram of the
+#    latencies, and in total the number of retries and resynchronisations
+#    (cSDHSerial.Sync()).
+#
+#    The histogram has fixed buckets like a HDR histogram: the latencies
+#    in microseconds are exact up to 15us, above that each power of 2 is
+#    split into 8 buckets, so the relative error is below 12.5% for all
+#    latencies up to more than a minute. Recording a sample needs no
+#    allocation: the counters are found by the command string as sent
+#    (its command name and request size are determined only the first
+#    time a string is seen) and the bucket of latencies below #TABLE_US
+#    microseconds is looked up in a precomputed table. Only the histogram
+#    and the bytes received are updated per command, the mean and maximum
+#    latency are estimated from the histogram in Snapshot(). So the
+#    overhead is two clock reads, one dictionary and one list lookup and
+#    two additions per command. "demo-latency-benchmark.py --overhead"
+#    measures it: 0.4 to 0.6us per command were measured with CPython 2.7
+#    on a current server CPU, the exact figure depends on the machine.
+#
+#    The instrumentation is opt-in: it is used by a cSDHSerial object only
+#    if the option \c "instrumentation" is set (command line option
+#    \c --instrumentation, or cSDH.EnableInstrumentation()), and by a cDSA
+#    object after cDSA.EnableInstrumentation(). When disabled the only cost
+#    per command is the check of a member for None.
+#
+#    The collected data is returned as dictionary by Snapshot() (suitable for
+#    json.dump()) and can be written periodically to a file or sent to a UDP
+#    socket by a background thread, see StartExport().
+#
+#    Example:
+#    \code
+#      hand.EnableInstrumentation()
+#      hand.GetInstrumentation().StartExport( "sdh-timing.json", period=10.0 )
+#      ...
+#      snapshot = hand.GetInstrumentation().Snapshot()
+#      print snapshot[ "commands" ][ "pos" ][ "p99_ms" ]
+#    \endcode
+#
+#######################################################################
+
+import time
+import json
+import socket
+import threading
+
+
+## Number of bits of the sub buckets of a power of 2 of the latency histogram
+SUB_BUCKET_BITS = 3
+
+## Number of buckets of the latency histogram, enough for latencies up to 2^31 us (larger ones are counted in the last bucket)
+NB_BUCKETS = (32 - SUB_BUCKET_BITS) << SUB_BUCKET_BITS
+
+## The number of keys (like command strings) remembered with their counters,
+#  the names of further keys are extracted on each call
+MAX_KEYS = 256
+
+## Latencies below this many microseconds find their bucket in a precomputed table
+TABLE_US = 1 << 14
+
+# the values below this many us have a bucket each
+_EXACT_LIMIT = 1 << (SUB_BUCKET_BITS + 1)
+
+# the counters of a key are a list [ bytes_out, bytes_in, histogram bucket 0,
+# bucket 1, ... ] (a flat list is fastest to update), where bytes_out does
+# not include the request size of the key, see cInstrumentation._Counters()
+_HISTOGRAM_OFFSET = 2
+
+
+#-----------------------------------------------------------------
+def BucketIndex( us ):
+    '''
+    Return the index of the bucket of the latency histogram for the latency \a us (int, in microseconds).
+    '''
+    if ( us < _EXACT_LIMIT ):
+        return max( us, 0 )
+    shift = us.bit_length() - SUB_BUCKET_BITS - 1
+    return min( (shift << SUB_BUCKET_BITS) + (us >> shift), NB_BUCKETS - 1 )
+
+
+#-----------------------------------------------------------------
+def BucketLowerBound( index ):
+    '''
+    Return the smallest latency in microseconds counted in bucket \a index of the latency histogram.
+    '''
+    if ( index < _EXACT_LIMIT ):
+        return index
+    shift = (index >> SUB_BUCKET_BITS) - 1
+    return (index - (shift << SUB_BUCKET_BITS)) << shift
+
+
+# the index into the counters list of the bucket for each latency in us below TABLE_US
+_BUCKET_TABLE = [ BucketIndex( us ) + _HISTOGRAM_OFFSET for us in xrange( TABLE_US ) ]
+
+
+#-----------------------------------------------------------------
+def SDHCommandName( s ):
+    '''
+    Return the name of the SDH command in command string \a s, like "p" for "p(0)=10.0".
+    '''
+    return s.partition( "=" )[0].partition( "(" )[0]
+
+
+#-----------------------------------------------------------------
+def SDHRequestSize( s ):
+    '''
+    Return the number of bytes sent to the SDH for command string \a s (including the EOL).
+    '''
+    return len( s ) + 2
+
+
+#=====================================================================
+## \brief Runtime timing instrumentation of the communication,
+#  see \ref instrumentation "the package description".
+#
+#  <hr>
+class cInstrumentation( object ):
+    '''
+    Runtime timing instrumentation of the communication with the SDH or the DSACON32m.
+    See the package documentation of instrumentation.
+    '''
+    #-----------------------------------------------------------------
+    ## Constructor of cInstrumentation class, all counters are 0.
+    #
+    #  \param self - reference to the object itself
+    #  \param name - name of the instrumented object, included in the snapshots
+    #  \param command_name - function that returns the command name for a
+    #                key given to Record() (like SDHCommandName() for the
+    #                command strings sent to the SDH), default is str()
+    #  \param request_size - function that returns the number of bytes sent
+    #                for a key given to Record() (like SDHRequestSize()), or None
+    #                if the bytes sent are recorded with RecordSent()
+    #
+    def __init__( self, name="", command_name=str, request_size=None ):
+        '''
+        Constructor of cInstrumentation class, all counters are 0.
+        '''
+        ## name of the instrumented object
+        self.name = name
+        self._command_name = command_name
+        self._request_size = request_size
+        self._exporter = None
+        self._exporter_stop = threading.Event()
+        # the counters for each key given to Record() (at most MAX_KEYS keys),
+        # and the command name and request size of each of these keys
+        self._keys = {}
+        self._key_infos = {}
+        # for each command name: the counters of the keys that are not remembered
+        self._commands = {}
+
+        ## Record( key, t0, nb_in ): record a command \a key (like the command
+        #  string sent) with the latency from \a t0 (as returned by time.time())
+        #  until now and \a nb_in bytes received. The bytes sent are given by the
+        #  \a request_size function given to the constructor.
+        #  (This is called for each command, so it is a function created by
+        #  _MakeRecord() that finds everything it needs in local variables.)
+        self.Record = self._MakeRecord()
+        self.Reset()
+
+    #-----------------------------------------------------------------
+    ## Reset all counters to 0.
+    #
+    def Reset( self ):
+        '''
+        Reset all counters to 0.
+        '''
+        ## time of the last Reset()
+        self.start_time = time.time()
+        # (cleared in place, Record() refers to the dictionaries)
+        self._keys.clear()
+        self._key_infos.clear()
+        self._commands.clear()
+        ## number of retries of commands after communication errors
+        self.retries = 0
+        ## number of resynchronisations of the communication
+        self.syncs = 0
+
+    #-----------------------------------------------------------------
+    def _MakeRecord( self, _time=time.time, _table=_BUCKET_TABLE, _int=int ):
+        '''
+        Non public helper function: return the Record() function of this object.
+        A plain function with the counters and helpers as local variables
+        is much faster to call than a method that looks them up as members.
+        '''
+        keys = self._keys
+        counters = self._Counters
+
+        def Record( key, t0, nb_in ):
+            '''
+            Record a command \a key with the latency from \a t0 until now and \a nb_in bytes received.
+            '''
+            try:
+                c = keys[ key ]
+            except KeyError:
+                c = counters( key )
+            us = _int( (_time() - t0) * 1e6 )
+            if ( us >= 0 ):
+                try:
+                    c[ _table[ us ] ] += 1
+                except IndexError:
+                    c[ BucketIndex( us ) + _HISTOGRAM_OFFSET ] += 1
+            else:
+                # the clock was set back
+                c[ _HISTOGRAM_OFFSET ] += 1
+            c[1] += nb_in
+
+        return Record
+
+    #-----------------------------------------------------------------
+    ## Record \a nb_out bytes sent for command \a key without a latency,
+    #  for commands whose reply is recorded separately (like the commands to the DSACON32m).
+    #
+    def RecordSent( self, key, nb_out ):
+        '''
+        Record \a nb_out bytes sent for command \a key without a latency.
+        '''
+        try:
+            c = self._keys[ key ]
+        except KeyError:
+            c = self._Counters( key )
+        c[0] += nb_out
+
+    #-----------------------------------------------------------------
+    def _Counters( self, key ):
+        '''
+        Non public helper function: return the counters for \a key that
+        is not remembered yet. If less than MAX_KEYS keys are remembered
+        then \a key is remembered with new counters and its request size
+        is added in Snapshot(). Else the counters of its command name
+        are returned with its request size already added, as this
+        function is called for each command with this key.
+        '''
+        name = self._command_name( key )
+        request_size = 0
+        if ( self._request_size is not None ):
+            request_size = self._request_size( key )
+        if ( len( self._keys ) < MAX_KEYS ):
+            # (the infos first, Snapshot() might be running in another thread)
+            self._key_infos[ key ] = (name, request_size)
+            c = self._keys[ key ] = [ 0, 0 ] + [ 0 ] * NB_BUCKETS
+            return c
+        c = self._commands.get( name )
+        if ( c is None ):
+            c = self._commands[ name ] = [ 0, 0 ] + [ 0 ] * NB_BUCKETS
+        c[0] += request_size
+        return c
+
+    #-----------------------------------------------------------------
+    ## Count a retry of a command after a communication error.
+    #
+    def RecordRetry( self ):
+        '''
+        Count a retry of a command after a communication error.
+        '''
+        self.retries += 1
+
+    #-----------------------------------------------------------------
+    ## Count a resynchronisation of the communication.
+    #
+    def RecordSync( self ):
+        '''
+        Count a resynchronisation of the communication.
+        '''
+        self.syncs += 1
+
+    #-----------------------------------------------------------------
+    ## Return a snapshot of the counters as dictionary (with strings,
+    #  numbers, lists and dictionaries only, so it can be written with json.dump()).
+    #
+    #  The keys are:
+    #  - \c "name" : the name given to the constructor
+    #  - \c "time", \c "start_time" : the time of the snapshot and of the last Reset(), as returned by time.time()
+    #  - \c "retries", \c "syncs" : the number of retries and resynchronisations
+    #  - \c "calls", \c "bytes_out", \c "bytes_in" : the totals over all commands
+    #  - \c "commands" : a dictionary with a dictionary per command name, with the keys
+    #    - \c "calls", \c "bytes_out", \c "bytes_in" : number of commands and bytes sent and received
+    #    - \c "mean_ms", \c "max_ms" : the mean and the maximum latency in milliseconds,
+    #      estimated from the histogram: the mean of the bucket centers and the upper
+    #      bound of the highest bucket counted in
+    #    - \c "p50_ms", \c "p90_ms", \c "p99_ms" : percentiles of the latency in milliseconds,
+    #      the lower bounds of the histogram buckets they fall into
+    #    - \c "histogram" : the buckets with counts as list of [lower bound in us, count]
+    #
+    def Snapshot( self ):
+        '''
+        Return a snapshot of the counters as dictionary, see html/pdf documentation for details.
+        '''
+        # merge the counters of the keys by command name:
+        merged = dict( [ (name, list( c )) for (name, c) in self._commands.items() ] )
+        for (key, c) in self._keys.items():
+            (name, request_size) = self._key_infos[ key ]
+            c = list( c )
+            c[0] += sum( c[ _HISTOGRAM_OFFSET: ] ) * request_size
+            m = merged.get( name )
+            if ( m is None ):
+                merged[ name ] = c
+            else:
+                merged[ name ] = [ a + b for (a, b) in zip( m, c ) ]
+
+        commands = {}
+        totals = [ 0, 0, 0 ]
+        for (name, c) in merged.items():
+            histogram = c[ _HISTOGRAM_OFFSET: ]
+            calls = sum( histogram )
+            command = dict( calls=calls, bytes_out=c[0], bytes_in=c[1],
+                            mean_ms=None, max_ms=None, p50_ms=None, p90_ms=None, p99_ms=None,
+                            histogram=[ [ BucketLowerBound( i ), n ] for (i, n) in enumerate( histogram ) if n > 0 ] )
+            if ( calls > 0 ):
+                command.update( mean_ms=self._Mean( histogram ) / 1000.0, max_ms=self._Max( histogram ) / 1000.0 )
+                for p in (50, 90, 99):
+                    command[ "p%d_ms" % p ] = self._Percentile( histogram, p ) / 1000.0
+            commands[ name ] = command
+            totals[0] += calls
+            totals[1] += c[0]
+            totals[2] += c[1]
+        return dict( name=self.name, time=time.time(), start_time=self.start_time,
+                     retries=self.retries, syncs=self.syncs,
+                     calls=totals[0], bytes_out=totals[1], bytes_in=totals[2],
+                     commands=commands )
+
+    #-----------------------------------------------------------------
+    def _Mean( self, histogram ):
+        '''
+        Non public helper function: return the mean in us of the latencies counted in
+        \a histogram (list of counts), assuming they are at the centers of their buckets.
+        '''
+        total = 0.0
+        for (i, count) in enumerate( histogram ):
+            if ( count > 0 ):
+                total += count * 0.5 * (BucketLowerBound( i ) + BucketLowerBound( i + 1 ))
+        return total / sum( histogram )
+
+    #-----------------------------------------------------------------
+    def _Max( self, histogram ):
+        '''
+        Non public helper function: return the upper bound in us of the highest bucket
+        of \a histogram (list of counts) that is counted in.
+        '''
+        for i in xrange( len( histogram ) - 1, -1, -1 ):
+            if ( histogram[ i ] > 0 ):
+                return BucketLowerBound( i + 1 )
+        return 0
+
+    #-----------------------------------------------------------------
+    def _Percentile( self, histogram, p ):
+        '''
+        Non public helper function: return the lower bound in us of the bucket of
+        \a histogram (list of counts) that holds the \a p percentile.
+        '''
+        rank = sum( histogram ) * p / 100.0
+        n = 0
+        for (i, count) in enumerate( histogram ):
+            n += count
+            if ( count > 0  and  n >= rank ):
+                return BucketLowerBound( i )
+        return 0
+
+    #-----------------------------------------------------------------
+    ## Start a background thread that exports a Snapshot() every \a period
+    #  seconds to \a target:
+    #  - a file name: the snapshots are appended to that file, one JSON line per snapshot
+    #  - a file like object with a write() method: like for a file name
+    #  - a tuple (adr, port): each snapshot is sent as JSON in an UDP datagram to that address
+    #
+    #  A running export is stopped first.
+    #
+    def StartExport( self, target, period=1.0 ):
+        '''
+        Start a background thread that exports a Snapshot() every \a period seconds
+        to \a target (a file name, a file like object or an UDP address tuple (adr, port)).
+        '''
+        self.StopExport()
+        self._exporter_stop.clear()
+        self._exporter = threading.Thread( target=self._Export, args=( target, period ), name="cInstrumentation exporter" )
+        self._exporter.daemon = True
+        self._exporter.start()
+
+    #-----------------------------------------------------------------
+    ## Stop the export started by StartExport(), after exporting a last snapshot.
+    #
+    def StopExport( self ):
+        '''
+        Stop the export started by StartExport(), after exporting a last snapshot.
+        '''
+        if ( self._exporter is None ):
+            return
+        self._exporter_stop.set()
+        self._exporter.join()
+        self._exporter = None
+
+    #-----------------------------------------------------------------
+    def _Export( self, target, period ):
+        '''
+        Non public helper function: run function of the exporter thread.
+        '''
+        sock = None
+        f = None
+        if ( type( target ) is tuple ):
+            sock = socket.socket( socket.AF_INET, socket.SOCK_DGRAM )
+        elif ( hasattr( target, "write" ) ):
+            f = target
+        else:
+            f = open( target, "a" )
+        try:
+            stopped = False
+            while not stopped:
+                stopped = self._exporter_stop.wait( period )
+                data = json.dumps( self.Snapshot(), sort_keys=True )
+                if ( sock is not None ):
+                    sock.sendto( data, target )
+                else:
+                    f.write( data + "\n" )
+                    f.flush()
+        finally:
+            if ( sock is not None ):
+                sock.close()
+            elif ( f is not target ):
+                f.close()
+
+# end of class cInstrumentation
+#=====================================================================
+
+
+######################################################################
+# some usefull editing settings for emacs:
+#
+#;;; Local Variables: ***
+#;;; mode:python ***
+#;;; End: ***
+#
+######################################################################
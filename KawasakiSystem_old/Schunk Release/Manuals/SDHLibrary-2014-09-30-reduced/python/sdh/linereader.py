@@ -0,0 +1,202 @@
+# -*- coding: latin-1 -*-
+#######################################################################
+#
+## \file
+#  \section sdhlibrary_python_linereader_py_general General file information
+#
+#  \brief
+#    Buffered line reading for the file like communication objects
+#    (RS232, TCP, CAN) used to talk to the SDH.
+#
+#  \section sdhlibrary_python_linereader_py_copyright Copyright
+#
+#  Copyright (c) 2007 SCHUNK GmbH & Co. KG
+#
+#######################################################################
+
+
+#######################################################################
+## \anchor sdhlibrary_python_linereader_py_python_vars
+#  \name   Python specific variables
+#
+#  Some definitions that describe the module for python.
+#
+#  @{
+
+__doc__       = "Buffered line reading for the communication objects of the SDH."
+__url__       = "http://www.schunk.com"
+__copyright__ = "Copyright (c) 2007 SCHUNK GmbH & Co. KG"
+
+#  end of doxygen name group sdhlibrary_python_linereader_py_python_vars
+#  @}
+######################################################################
+
+#######################################################################
+## \package linereader
+#
+#  \brief
+#    Every reply of the SDH is read with readline(), so reading lines is
+#    on the critical path of every command. Instead of reading (and
+#    concatenating) a single character at a time, tLineReader reads all
+#    bytes available from the interface at once into a bytearray and
+#    scans the new bytes for the end of line. The timeout is turned into
+#    a deadline once per line, so the clock is only queried when the
+#    interface has to be asked for more bytes.
+#
+#    Bytes received after the end of a line (e.g. the replies of
+#    pipelined commands, see cSDHSerial.SendMany()) are kept for the
+#    next readline() or read().
+#
+#######################################################################
+
+import time
+
+# pySerial module from http://pyserial.sourceforge.net/
+import serial
+
+
+#-----------------------------------------------------------------
+class tLineReader( object ):
+    '''
+    Mixin class that provides a buffered readline() for file like
+    communication objects. Derived classes must call tLineReader.__init__(),
+    implement _ReadChunk() and have a timeout attribute (in seconds,
+    None == wait for ever, 0.0 == return immediately).
+    '''
+    def __init__( self ):
+        ## Bytes received from the interface but not yet returned by readline() or read()
+        self._line_buffer = bytearray()
+
+    def _ReadChunk( self, timeout ):
+        '''Read the bytes available from the interface, waiting at most
+        \a timeout seconds (None == wait for ever) for at least one byte.
+        Return the bytes read (a string or a buffer like object) or ""
+        if none were received in time.
+        To be implemented by derived classes.
+        '''
+        raise NotImplementedError
+
+    def _TakeBuffered( self, length ):
+        '''Non public helper function:
+        Remove and return at most \a length bytes from the front of the line buffer as string.
+        '''
+        s = str( self._line_buffer[:length] )
+        del self._line_buffer[:length]
+        return s
+
+    def readline( self, eol='\n' ):
+        '''Read a complete line (terminated by the \a eol character sequence)
+        and return it as string including \a eol.
+
+        If no complete line was received within timeout seconds then ""
+        is returned. The bytes of the incomplete line are not lost but kept
+        for the next call.
+        '''
+        buffer = self._line_buffer
+        i = buffer.find( eol )
+        if ( i < 0 ):
+            timeout = self.timeout
+            if ( timeout is None ):
+                deadline = None
+            else:
+                deadline = time.time() + timeout
+            while True:
+                # the end of line might span the old and new bytes:
+                start = max( len( buffer ) - len( eol ) + 1, 0 )
+                if ( deadline is None ):
+                    chunk = self._ReadChunk( None )
+                else:
+                    chunk = self._ReadChunk( max( deadline - time.time(), 0.0 ) )
+                if ( chunk ):
+                    buffer += chunk
+                    i = buffer.find( eol, start )
+                    if ( i >= 0 ):
+                        break
+                if ( deadline is not None  and  time.time() >= deadline ):
+                    return ""
+        return self._TakeBuffered( i + len( eol ) )
+
+    def ReadLinesAvailable( self, eol='\n' ):
+        '''Read the bytes available from the interface without waiting and
+        return the list of complete lines received (each including \a eol).
+        The bytes of an incomplete last line are kept for the next call.
+        Used by event driven readers that are notified when the interface
+        is readable, see asyncsdh.cAsyncSDH.
+        '''
+        buffer = self._line_buffer
+        chunk = self._ReadChunk( 0.0 )
+        if ( chunk ):
+            buffer += chunk
+        lines = []
+        i = buffer.find( eol )
+        while ( i >= 0 ):
+            lines.append( self._TakeBuffered( i + len( eol ) ) )
+            i = buffer.find( eol )
+        return lines
+
+    def NbBuffered( self ):
+        '''Return the number of bytes received but not yet returned by readline() or read().
+        '''
+        return len( self._line_buffer )
+
+
+#-----------------------------------------------------------------
+class tBufferedSerial( tLineReader, serial.Serial ):
+    '''
+    A serial.Serial with the buffered readline() of tLineReader.
+    Takes the same parameters as serial.Serial.
+    '''
+    def __init__( self, *args, **kwargs ):
+        tLineReader.__init__( self )
+        serial.Serial.__init__( self, *args, **kwargs )
+
+    def _ReadChunk( self, timeout ):
+        '''Read the bytes available from the serial port.
+
+        Changing the timeout of a serial port reconfigures the port,
+        which is expensive. So the first byte is waited for with the timeout
+        of the port instead of \a timeout (both are the same when called from readline()).
+        '''
+        nb_waiting = serial.Serial.inWaiting( self )
+        if ( nb_waiting > 0 ):
+            return serial.Serial.read( self, nb_waiting )
+        if ( timeout == 0.0 ):
+            return ""
+        chunk = serial.Serial.read( self, 1 )
+        if ( chunk ):
+            nb_waiting = serial.Serial.inWaiting( self )
+            if ( nb_waiting > 0 ):
+                chunk += serial.Serial.read( self, nb_waiting )
+        return chunk
+
+    def read( self, size=1 ):
+        '''Read \a size bytes like serial.Serial.read(), bytes already
+        received by readline() are returned first.
+        '''
+        if ( self._line_buffer ):
+            s = self._TakeBuffered( size )
+            if ( len( s ) < size ):
+                s += serial.Serial.read( self, size - len( s ) )
+            return s
+        return serial.Serial.read( self, size )
+
+    def inWaiting( self ):
+        '''Return the number of bytes that can be read without waiting.
+        '''
+        return len( self._line_buffer ) + serial.Serial.inWaiting( self )
+
+    def flushInput( self ):
+        '''Discard all received bytes, including those already buffered.
+        '''
+        del self._line_buffer[:]
+        serial.Serial.flushInput( self )
+
+
+######################################################################
+# some usefull editing settings for emacs:
+#
+#;;; Local Variables: ***
+#;;; mode:python ***
+#;;; End: ***
+#
+######################################################################
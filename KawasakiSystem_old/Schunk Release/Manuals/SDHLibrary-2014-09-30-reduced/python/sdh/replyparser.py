@@ -0,0 +1,110 @@
+# -*- coding: latin-1 -*-
+#######################################################################
+#
+## \file
+#  \section sdhlibrary_python_replyparser_py_general General file information
+#
+#  \brief
+#    Parsing of the replies of the SDH firmware to axis commands.
+#
+#  \section sdhlibrary_python_replyparser_py_copyright Copyright
+#
+#  Copyright (c) 2007 SCHUNK GmbH & Co. KG
+#
+#######################################################################
+
+
+#######################################################################
+## \anchor sdhlibrary_python_replyparser_py_python_vars
+#  \name   Python specific variables
+#
+#  Some definitions that describe the module for python.
+#
+#  @{
+
+__doc__       = "Parsing of the replies of the SDH firmware to axis commands."
+__url__       = "http://www.schunk.com"
+__copyright__ = "Copyright (c) 2007 SCHUNK GmbH & Co. KG"
+
+#  end of doxygen name group sdhlibrary_python_replyparser_py_python_vars
+#  @}
+######################################################################
+
+#######################################################################
+## \package replyparser
+#
+#  \brief
+#    The SDH firmware replies to an axis command like "pos" or "v(3)=10"
+#    with lines like "POS=1.0,2.0,3.0,4.0,5.0,6.0,7.0" or "V(3)=10.0".
+#    A cReplyParser holds the compiled regular expressions to match these
+#    replies, so each pattern is compiled only once. ParseNumbers() converts
+#    the comma separated values of a reply to a list of numbers without
+#    evaluating the reply as python code.
+#
+#######################################################################
+
+import re
+
+## Regular expression for the value of a single axis in a reply
+RE_NUMBER = r"([-+]?(\d+(\.\d*)?|\.\d+)?)"
+
+
+#-----------------------------------------------------------------
+def ParseNumbers( answer ):
+    '''Return the comma separated values in string \a answer (like "1.0,-2,3.5")
+    as list of numbers. Values without a decimal point are returned as int,
+    others as float, like the former eval( "[" + answer + "]" ).
+    The list of strings created by splitting \a answer is reused for the result,
+    so no other list is created.
+
+    Raises a ValueError if \a answer contains anything but numbers,
+    e.g. if a reply was received only partly.
+    '''
+    values = answer.split( "," )
+    for i in xrange( len( values ) ):
+        v = values[i]
+        if ( "." in v ):
+            values[i] = float( v )
+        else:
+            try:
+                values[i] = int( v )
+            except ValueError:
+                # e.g. exponent notation, or raise ValueError for invalid values
+                values[i] = float( v )
+    return values
+
+
+#-----------------------------------------------------------------
+class cReplyParser( object ):
+    '''
+    The compiled regular expressions to match the replies of the SDH
+    to axis commands. Each pattern is compiled on first use only.
+    '''
+    def __init__( self ):
+        self._patterns = {}
+
+    def GetPattern( self, command, axis=None ):
+        '''Return the compiled regular expression to match the reply to axis
+        command \a command for the single axis \a axis (an int), or for
+        all axes if \a axis is None. Group 1 of a match is the value(s) replied.
+        '''
+        key = (command, axis)
+        try:
+            return self._patterns[ key ]
+        except KeyError:
+            if ( axis is None ):
+                pattern = re.compile( "%s=(.*)" % re.escape( command.upper() ) )
+            else:
+                pattern = re.compile( r"%s\(%d\)=%s" % (re.escape( command.upper() ), axis, RE_NUMBER) )
+            self._patterns[ key ] = pattern
+            return pattern
+
+
+######################################################################
+# some usefull editing settings for emacs:
+#
+#;;; Local Variables: ***
+#;;; mode:python ***
+#;;; End: ***
+#
+######################################################################
@@ -53,6 +53,9 @@ __copyright__ = "Copyright (c) 2007 SCHUNK GmbH & Co. KG"
 # standard python modules
 import sys, time, math, array
 
+# pySerial module from http://pyserial.sourceforge.net/
+import serial
+
 # submodules from this package:
 # pylint: disable-msg=W0614,W0401,F0401
 from sdhbase   import *
@@ -60,6 +63,12 @@ from sdhserial import *
 from auxiliary import *
 from unit      import *
 from . import release
+from . import shadowstate
+from . import instrumentation
+from . import telemetry
+from . import collision
+from . import collisionmap
+from . import utils
 
 # 
 ##########################################################################
@@ -72,6 +81,94 @@ from . import release
 ######################################################################
 # The actual SDH classes
 
+######################################################################
+#
+## \brief The pending result of a movement started with cSDH.MoveAxisAsync().
+#
+#  Like a future of other libraries a cMoveFuture can be asked if the
+#  movement has finished with done() and waited for with result().
+#  No thread is involved: the cMoveFuture communicates with the SDH
+#  only when done() or result() is called, so these must be called
+#  from the same thread that uses the cSDH object. As long as the
+#  predicted duration of the movement has not elapsed done() returns
+#  False without any communication at all.
+#
+#  When the movement has finished the target axis angles set before
+#  the cSDH.MoveAxisAsync() call are restored, like cSDH.MoveAxis() with
+#  \a sequ=True does.
+#
+#  <hr>
+class cMoveFuture( object ):
+    '''
+    The pending result of a movement started with cSDH.MoveAxisAsync().
+    See html/pdf documentation for details.
+    '''
+    def __init__( self, hand, axes, t_angles, duration ):
+        '''
+        Constructor of cMoveFuture for the movement of the \a axes of \a hand
+        with the expected \a duration in seconds, started just now.
+        \a t_angles are the target axis angles to restore when the movement has finished.
+        '''
+        self._hand = hand
+        self._axes = axes
+        self._t_angles = t_angles
+        self._duration = duration
+        self._start_time = time.time()
+        self._end_time = self._start_time + duration
+        self._done = False
+
+    def _EndTime( self ):
+        '''
+        Non public helper function: return the predicted end of the movement,
+        or the time it was cancelled (see cSDH._CancelMovement()) if that is earlier.
+        '''
+        cancel_time = self._hand._move_cancel_time # pylint: disable-msg=W0212
+        if ( cancel_time >= self._start_time ):
+            return min( self._end_time, cancel_time )
+        return self._end_time
+
+    def _Finish( self ):
+        '''
+        Non public helper function: restore the saved target axis angles.
+        '''
+        self._hand.SetAxisTargetAngle( All, self._t_angles )
+        self._done = True
+
+    def remaining( self ):
+        '''
+        Return the predicted remaining time of the movement in the configured
+        time unit system of the cSDH object (0.0 if the predicted end has passed).
+        '''
+        if ( self._done ):
+            return self._hand.uc_time.ToExternal( 0.0 )
+        return self._hand.uc_time.ToExternal( max( self._EndTime() - time.time(), 0.0 ) )
+
+    def done( self ):
+        '''
+        Return True if the movement has finished, without waiting.
+        '''
+        if ( self._done ):
+            return True
+        if ( time.time() < self._EndTime() - self._hand.wait_axis_early ):
+            return False
+        if ( self._hand._AxesBusy( self._axes ) ): # pylint: disable-msg=W0212
+            return False
+        self._Finish()
+        return True
+
+    def result( self, timeout=None ):
+        '''
+        Wait until the movement has finished, but at most \a timeout seconds
+        (None == wait for ever, see cSDH.WaitAxis()).
+        Return the expected execution time of the movement in the
+        configured time unit system of the cSDH object, like cSDH.MoveAxis().
+        '''
+        if ( not self._done ):
+            self._hand.WaitAxis( self._axes, timeout, self._EndTime() )
+            self._Finish()
+        return self._hand.uc_time.ToExternal( self._duration )
+
+
 ######################################################################
 ######################################################################
 #    
@@ -257,7 +354,7 @@ class cSDH( cSDHBase ):
         # Option handling: 
 
         # Set class specific default options:
-        default_options = dict( use_radians=False, use_fahrenheit=False, debug_output=sys.stderr )
+        default_options = dict( use_radians=False, use_fahrenheit=False, debug_output=sys.stderr, collision_map=None )
 
         # Overwrite class specific defaults with settings from caller, if any:
         if ( options ):   default_options.update( options )
@@ -298,6 +395,12 @@ class cSDH( cSDHBase ):
         ## The interface to the SDH hardware:
         self.interface = None
 
+        ## The timing instrumentation of the communication, see EnableInstrumentation()
+        self.instrumentation = None
+
+        ## The background sampler of the joint state, see StartTelemetry()
+        self.telemetry = None
+
         ## The number of axis per finger (for finger 1 this includes the "virtual" base axis)
         self.NUMBER_OF_AXES_PER_FINGER = 3
         
@@ -380,6 +483,38 @@ class cSDH( cSDHBase ):
         self._last_grip = self.eGraspId["GRIP_INVALID"]
         
         self.controller_type = None
+
+        ## \brief Time in seconds before the predicted end of a movement
+        #  at which WaitAxis() starts to query the axis states.
+        self.wait_axis_early = 0.05
+
+        ## \brief Minimum and maximum time in seconds between two queries
+        #  of the axis states in WaitAxis(). The time is doubled after each query
+        #  that reports a moving axis.
+        self.wait_axis_poll_min = 0.005
+        self.wait_axis_poll_max = 0.1
+
+        # predicted end (time.time()) of the movement started last, see _StartMovement()
+        self._move_end_time = 0.0
+
+        # time (time.time()) when the movements were cancelled last, see _CancelMovement()
+        self._move_cancel_time = 0.0
+
+        # the collision.cFingerHulls for the kinematic parameters above, created on first use, see _GetFingerHulls()
+        self._finger_hulls = None
+
+        ## \brief Flag: if True then MoveAxis(), MoveFinger() and MoveHand() check not only
+        #  the target pose for internal collisions but the whole path of the movement,
+        #  see CheckPathCollisions(). (Only used if numpy is available.)
+        self.check_path_collisions = False
+
+        ## Maximum change of an axis angle (in internal units (degrees)) between two poses checked by CheckPathCollisions()
+        self.path_check_step = 2.0
+
+        ## The collisionmap.cCollisionMap used by IsFingerCollision() or None, see LoadCollisionMap()
+        self.collision_map = None
+        if ( self.options[ "collision_map" ] ):
+            self.LoadCollisionMap( self.options[ "collision_map" ] )
         #---------------------
         
 
@@ -581,6 +716,82 @@ class cSDH( cSDHBase ):
         return (False, min_dist)
 
 
+    #-----------------------------------------------------------------
+    def _GetFingerHulls( self ):
+        '''
+        Internal helper function: return the collision.cFingerHulls for the
+        kinematic parameters l1, l2 and offset, or None if numpy is not available.
+        '''
+        if ( collision.numpy is None ):
+            return None
+        if ( self._finger_hulls is None ):
+            self._finger_hulls = collision.cFingerHulls( self.l1, self.l2, self.offset )
+        return self._finger_hulls
+
+
+    #-----------------------------------------------------------------
+    def _CheckMoveCollisions( self, name, s_angles, a_angles ):
+        '''
+        Internal helper function for MoveAxis(), MoveFinger() and MoveHand():
+        Raise a cSDHErrorInternalCollision if the fingers would collide at the
+        target axis angles \a a_angles or, if check_path_collisions is set, on the
+        way there from the actual axis angles \a s_angles (both in external units).
+        \a name is the name of the calling function.
+        '''
+        fingers_angles = self._AxisAnglesToFingerAngles( a_angles )
+        
+        if self.IsFingerCollision( fingers_angles[0], fingers_angles[1], fingers_angles[2] ):
+            (cxy, (c01,d01), (c02,d02), (c12,d12)) = self.CheckFingerCollisions( fingers_angles[0], fingers_angles[1], fingers_angles[2] )
+            self.dbg << "Internal collision detected in %s():" % name # pylint: disable-msg=W0104
+            self.dbg.var( "cxy c01 d01 c02 d02 c12 d12" )
+            raise cSDHErrorInternalCollision( "Potential internal collision detected, movement not executed!\n" )
+
+        if ( self.check_path_collisions  and  self._GetFingerHulls() is not None ):
+            path = self.CheckPathCollisions( s_angles, a_angles )
+            if path.collision:
+                self.dbg << "Internal collision on the path detected in %s():" % name # pylint: disable-msg=W0104
+                self.dbg.var( "path" )
+                raise cSDHErrorInternalCollision( "Potential internal collision detected after %.0f%% of the path (after %.3f %s), movement not executed!\n" % (path.fraction * 100.0, path.time, self.uc_time.symbol) )
+
+
+    #-----------------------------------------------------------------
+    def _AxesBusy( self, axes ):
+        '''
+        Internal helper function: return True if any of the axes in list \a axes
+        is still moving (eCT_POSE) or still has a velocity (other controllers).
+        '''
+        if ( self.controller_type == self.eControllerType["eCT_POSE"]):
+            busy = self.eAxisState[ "eAS_POSITIONING" ]
+        else:
+            busy = self.eAxisState[ "eAS_SPEED_MODE" ]
+        return busy in self.GetAxisActualState( axes )
+
+
+    #-----------------------------------------------------------------
+    def _StartMovement( self ):
+        '''
+        Internal helper function: start the movement to the currently set
+        target axis angles non-sequentially and remember its predicted end
+        for WaitAxis(). Return the expected duration in seconds.
+        '''
+        t = self.interface.m( False )
+        self._move_end_time = time.time() + t
+        return t
+
+
+    #-----------------------------------------------------------------
+    def _CancelMovement( self ):
+        '''
+        Internal helper function: forget the predicted end of the movements
+        started so far, as they were stopped or their duration changed
+        (see Stop(), FastStop(), SetController(), SetVelocityProfile()).
+        So WaitAxis() and cMoveFuture query the axis states right away
+        instead of sleeping until the predicted end.
+        '''
+        self._move_cancel_time = time.time()
+        self._move_end_time = self._move_cancel_time
+
+
     #-----------------------------------------------------------------
     
     ## end of doxygen name group sdhlibrary_python_sdh_py_csdh_internal
@@ -977,6 +1188,7 @@ class cSDH( cSDHBase ):
         except serial.SerialException,e:
             raise cSDHErrorCommunication("%s. Could not open communication interface %s." % (str(e), GetCommunicationInterfaceName( default_options ) ))
         self.dbg.PDM("cSDH.Open() successfully opened communication via %s.\n" % (GetCommunicationInterfaceName( default_options )))
+        self.EnableInstrumentation( default_options.get( "instrumentation", False ) )
         
         self._UpdateSettingsFromSDH()
 
@@ -1018,6 +1230,7 @@ class cSDH( cSDHBase ):
         '''
         Close connection to SDH.
         '''
+        self.StopTelemetry()
         if self.interface:
             if not leave_enabled:
                 self.interface.power( flag=False )
@@ -1033,6 +1246,215 @@ class cSDH( cSDHBase ):
         return wether the communication to the sdh is open or not
         '''
         return self.interface is not None
+
+    #-----------------------------------------------------------------
+    ## Enable or disable the cache of the settings of the SDH.
+    #
+    #  With the cache enabled the settings read or written via this
+    #  object (like target angles, velocities, accelerations, angle
+    #  limits, controller type or velocity profile) are remembered in a
+    #  shadowstate.cShadowState. Reading a known setting again is
+    #  answered without communication and writing a value the SDH
+    #  already has is skipped. So e.g. MoveAxis() needs less round trips
+    #  to the SDH. Actual values like the actual axis angles are always
+    #  read from the SDH.
+    #
+    #  The cache is invalidated on errors, on resynchronisation of the
+    #  communication and when the connection is reopened with Open().
+    #
+    #  \attention
+    #    Enable the cache only if no other program (or other object)
+    #    changes the settings of the same SDH.
+    #
+    #  \param self - reference to the object itself
+    #  \param flag - True to enable the cache (with empty cache), False to disable it
+    #
+    #  The cache can also be enabled with the option \c "shadow_state"
+    #  given to the constructor or to Open() (command line option \c --shadow_state).
+    #
+    #  \par Examples:
+    #  \code
+    #    # Assuming 'hand' is a sdh.cSDH object ...
+    #
+    #    hand.EnableShadowState()
+    #    hand.MoveAxis( All )
+    #    print "round trips saved:", hand.GetShadowStats().saved
+    #  \endcode
+    #
+    #  <hr>
+    def EnableShadowState( self, flag=True ):
+        '''
+        Enable or disable the cache of the settings of the SDH. See html/pdf documentation for details.
+        '''
+        self.options[ "shadow_state" ] = flag
+        if ( self.interface is not None ):
+            if ( flag ):
+                self.interface.shadow = shadowstate.cShadowState( self.NUMBER_OF_AXES )
+            else:
+                self.interface.shadow = None
+
+    #-----------------------------------------------------------------
+    ## Get the statistics of the cache of the settings of the SDH.
+    #
+    #  \return a structure as returned by shadowstate.cShadowState.GetStats()
+    #           (with e.g. the number of round trips \c saved), or None if
+    #           the cache is not enabled, see EnableShadowState().
+    #
+    #  <hr>
+    def GetShadowStats( self ):
+        '''
+        Return the statistics of the cache of the settings of the SDH, see EnableShadowState().
+        '''
+        if ( self.interface is None  or  self.interface.shadow is None ):
+            return None
+        return self.interface.shadow.GetStats()
+
+    #-----------------------------------------------------------------
+    ## Enable or disable the timing instrumentation of the communication with the SDH.
+    #
+    #  With the instrumentation enabled each command sent to the SDH is
+    #  counted in an instrumentation.cInstrumentation: per command the
+    #  number of calls, the bytes sent and received and a histogram of the
+    #  round trip latencies, and in total the retries after communication
+    #  errors and the resynchronisations. This is cheap enough to be left on
+    #  in production, e.g. to find out whether sporadic slow control cycles
+    #  are caused by the communication, by retries or by the application.
+    #
+    #  The counters are kept when the connection is reopened with Open().
+    #
+    #  \param self - reference to the object itself
+    #  \param flag - True to enable the instrumentation (the counters of an
+    #                instrumentation enabled before are kept), False to disable it
+    #
+    #  The instrumentation can also be enabled with the option \c "instrumentation"
+    #  given to the constructor or to Open() (command line option \c --instrumentation).
+    #
+    #  \par Examples:
+    #  \code
+    #    # Assuming 'hand' is a sdh.cSDH object ...
+    #
+    #    hand.EnableInstrumentation()
+    #    # write a snapshot of the counters to a file every 10 seconds:
+    #    hand.GetInstrumentation().StartExport( "sdh-timing.json", period=10.0 )
+    #    ...
+    #    print hand.GetInstrumentation().Snapshot()[ "commands" ][ "pos" ][ "p99_ms" ]
+    #  \endcode
+    #
+    #  <hr>
+    def EnableInstrumentation( self, flag=True ):
+        '''
+        Enable or disable the timing instrumentation of the communication with the SDH. See html/pdf documentation for details.
+        '''
+        self.options[ "instrumentation" ] = flag
+        if ( not flag ):
+            if ( self.instrumentation is not None ):
+                self.instrumentation.StopExport()
+            self.instrumentation = None
+        elif ( self.instrumentation is None ):
+            self.instrumentation = instrumentation.cInstrumentation( "cSDH", instrumentation.SDHCommandName, instrumentation.SDHRequestSize )
+        if ( self.interface is not None ):
+            self.interface.instrumentation = self.instrumentation
+
+    #-----------------------------------------------------------------
+    ## Get the timing instrumentation of the communication with the SDH.
+    #
+    #  \return the instrumentation.cInstrumentation with the counters
+    #           (see its Snapshot()), or None if the instrumentation is
+    #           not enabled, see EnableInstrumentation().
+    #
+    #  <hr>
+    def GetInstrumentation( self ):
+        '''
+        Return the timing instrumentation of the communication with the SDH, see EnableInstrumentation().
+        '''
+        return self.instrumentation
+
+    #-----------------------------------------------------------------
+    ## Start sampling the joint state of the SDH in a background thread.
+    #
+    #  A telemetry.cTelemetrySampler reads the actual angles, velocities
+    #  and states of all axes (and optionally the motor currents and
+    #  temperatures) \a rate times per second with a single round trip
+    #  each, and keeps the samples of the last \a capacity sampling
+    #  periods with timestamps in a ring buffer. Any thread can then get
+    #  the latest joint state or the joint states of a time window from
+    #  the sampler without communicating with the SDH.
+    #
+    #  The sampler shares the communication line with the commands sent
+    #  by the application: the commands of all threads are sent in the
+    #  order they are issued, see cSDHSerial.lock. Each sample delays the
+    #  other commands by about one round trip.
+    #
+    #  A sampler started before is stopped first. The sampler is stopped by
+    #  StopTelemetry() or Close().
+    #
+    #  \param self          - reference to the object itself
+    #  \param rate          - the number of samples per second
+    #  \param capacity      - the number of samples kept, the default None means the samples of 60 seconds
+    #  \param motor_current - flag: if True then the motor currents of mode \a motor_current_mode
+    #                         (see GetAxisMotorCurrent()) are sampled too
+    #  \param temperature   - flag: if True then the temperatures are sampled too
+    #  \param motor_current_mode - the mode of the motor currents to sample
+    #
+    #  \return the started telemetry.cTelemetrySampler
+    #
+    #  \remark
+    #    - This requires numpy, else an ImportError is raised.
+    #
+    #  \par Examples:
+    #  \code
+    #    # Assuming 'hand' is a sdh.cSDH object ...
+    #
+    #    hand.StartTelemetry( rate=50.0 )
+    #    hand.MoveAxis( sdh.All, sequ=False )
+    #    ...
+    #    # the latest actual angles, without a round trip to the SDH:
+    #    print hand.GetTelemetry().Latest().angles
+    #
+    #    # the actual angles of the last 2 seconds:
+    #    now = time.time()
+    #    print hand.GetTelemetry().Window( now - 2.0, now ).angles
+    #  \endcode
+    #
+    #  <hr>
+    def StartTelemetry( self, rate=50.0, capacity=None, motor_current=False, temperature=False, motor_current_mode=0 ):
+        '''
+        Start sampling the joint state of the SDH in a background thread. See html/pdf documentation for details.
+        '''
+        if ( self.interface is None ):
+            raise cSDHErrorCommunication( "Cannot start telemetry, the communication to the SDH is not opened" )
+        self.StopTelemetry()
+        self.telemetry = telemetry.cTelemetrySampler( self, rate=rate, capacity=capacity,
+                                                      motor_current=motor_current, temperature=temperature,
+                                                      motor_current_mode=motor_current_mode )
+        self.telemetry.Start()
+        return self.telemetry
+
+    #-----------------------------------------------------------------
+    ## Stop the sampling started by StartTelemetry(). Does nothing if no
+    #  sampling is running. The samples taken stay available via GetTelemetry().
+    #
+    #  <hr>
+    def StopTelemetry( self ):
+        '''
+        Stop the sampling started by StartTelemetry().
+        '''
+        if ( self.telemetry is not None ):
+            self.telemetry.Stop()
+
+    #-----------------------------------------------------------------
+    ## Get the background sampler of the joint state of the SDH.
+    #
+    #  \return the telemetry.cTelemetrySampler started by StartTelemetry()
+    #           (with the latest samples, see its Latest() and Window()),
+    #           or None if StartTelemetry() was not called.
+    #
+    #  <hr>
+    def GetTelemetry( self ):
+        '''
+        Return the background sampler of the joint state of the SDH, see StartTelemetry().
+        '''
+        return self.telemetry
             
     #  end of doxygen name group sdhlibrary_python_sdh_py_csdh_communication
     ## @}
@@ -1068,6 +1490,8 @@ class cSDH( cSDHBase ):
         '''
         Stop movement of all axes of the SDH and switch off the controllers. See html/pdf documentation for details.
         '''
+        self._CancelMovement()
+
         # switch off controllers 
         self.interface.power( All, False )
 
@@ -1104,6 +1528,7 @@ class cSDH( cSDHBase ):
         '''
         Stop movement of all axes of the SDH. See html/pdf documentation for details.
         '''
+        self._CancelMovement()
         self.interface.stop()
 
     #-----------------------------------------------------------------
@@ -1180,6 +1605,7 @@ class cSDH( cSDHBase ):
         else:
             self.controller_type = self.interface.con( controller )
         
+        self._CancelMovement()
         self._AdjustLimits( self.controller_type )
         return self.controller_type
         
@@ -1248,6 +1674,7 @@ class cSDH( cSDHBase ):
         if (velocity_profile not in self.eVelocityProfile.values() ):
             raise cSDHErrorInvalidParameter( "Invalid velocity profile %s" % repr(velocity_profile) )
 
+        self._CancelMovement()
         return self.interface.vp( velocity_profile )
 
 
@@ -1662,12 +2089,22 @@ class cSDH( cSDHBase ):
     #  \param iAxis - index of axis to access.
     #                 This can be All, a single index or a \ref sdhlibrary_python_sdh_py_csdh_vector "vector" of indices.
     #  \param timeout - a timeout in seconds or None (default). 
+    #  \param end_time - the predicted end of the movement as time.time() value or
+    #                 None (default) to use the predicted end of the movement started last.
     #  
     #  \remark
     #    - If timeout is None is given then this function will wait arbitrarily long
     #    - If a timeout is given then this function will raise a
     #      cSDHErrorTimeout exception if the given axes are still
     #      moving after timeout many seconds
+    #    - For the eCT_POSE controller the expected duration of a movement is
+    #      known from the SDH when the movement is started (see MoveAxis(), MoveFinger(),
+    #      MoveHand()). This function sleeps until #wait_axis_early seconds before
+    #      the predicted end of the movement without any communication. Then the
+    #      axis states are queried, with a pause between two queries that starts with
+    #      #wait_axis_poll_min and is doubled up to #wait_axis_poll_max while the
+    #      axes are still moving. So this function may return up to #wait_axis_poll_max
+    #      seconds after the movement has actually finished.
     #
     #  \bug
     #    Due to a bug in SDH firmwares prior to 0.0.2.6 the WaitAxis() command
@@ -1740,31 +2177,38 @@ class cSDH( cSDHBase ):
     #  \endcode
     #  
     #  <hr>
-    def WaitAxis( self, iAxis=All, timeout=None ):
+    def WaitAxis( self, iAxis=All, timeout=None, end_time=None ):
         '''
         Wait until the axis(axes) have actually finished their movement
         '''
         axes = self._ToIndexList( iAxis, self.all_axes, self.NUMBER_OF_AXES + self.NUMBER_OF_VIRTUAL_AXES, "axis" )
         # now axes is a list of all axis indices to access
 
-
-        finished = False
         if (timeout is not None):
             end = time.time() + timeout
 
+        # sleep until shortly before the predicted end of the movement
         if ( self.controller_type == self.eControllerType["eCT_POSE"]):
-            busy = self.eAxisState[ "eAS_POSITIONING" ]
-        else:
-            busy = self.eAxisState[ "eAS_SPEED_MODE" ]
-            
-        while ( not finished ):
-            states = self.GetAxisActualState( axes )
-            finished = True
-            for s in states:
-                finished = finished  and  (s != busy)
-
-            if (timeout is not None  and  time.time() > end):
-                raise cSDHErrorTimeout( "Timeout in WaitAxis" )
+            if (end_time is None):
+                end_time = self._move_end_time
+            wakeup = end_time - self.wait_axis_early
+            if (timeout is not None):
+                wakeup = min( wakeup, end )
+            delay = wakeup - time.time()
+            if (delay > 0.0):
+                time.sleep( delay )
+
+        # then query the states with increasing pauses
+        pause = self.wait_axis_poll_min
+        while ( self._AxesBusy( axes ) ):
+            now = time.time()
+            if (timeout is not None):
+                if (now > end):
+                    raise cSDHErrorTimeout( "Timeout in WaitAxis" )
+                time.sleep( min( pause, end - now ) )
+            else:
+                time.sleep( pause )
+            pause = min( pause * 2.0, self.wait_axis_poll_max )
             
 
          
@@ -1832,6 +2276,7 @@ class cSDH( cSDHBase ):
 
         # get current angle for those axes where the angle is None
         c_ang = None
+        t_ang = {}
         for (ai,a) in zip( axes, angles ):
             if (ai >= self.NUMBER_OF_AXES):    # handle virutal axes differently
                 if (a is not None):
@@ -1843,9 +2288,15 @@ class cSDH( cSDHBase ):
                     c_ang = self.interface.p( All )
                 a = c_ang[ ai ]
             # now a is the target angle to set
+            t_ang[ ai ] = a
 
-            # and send to firmware
-            self.interface.p( ai, a ) # ANOTE: communicates more often than strictly necessary
+        # and send to firmware
+        if ( len( t_ang ) == self.NUMBER_OF_AXES ):
+            # all axes at once with a single command
+            self.interface.p( All, [ t_ang[ ai ] for ai in self.all_axes ] )
+        else:
+            for (ai, a) in sorted( t_ang.items() ):
+                self.interface.p( ai, a )
         
     #-----------------------------------------------------------------
     ## Set the target angle(s) and read the actual angle(s) for axis(axes).
@@ -2574,6 +3025,62 @@ class cSDH( cSDHBase ):
             return [ self.uc_angular_velocity.ToExternal( all_velocities[ ai ] )   for ai in axes ]  # ANOTE: communicates more often than strictly necessary
 
 
+    #-----------------------------------------------------------------
+    ## Get the current actual angle(s), velocity(s) and state(s) of axis(axes) in one go.
+    #
+    #  The angles, velocities and states are read from the SDH with a
+    #  single pipelined exchange (see cSDHSerial.AxisCommands()), so this
+    #  takes about a single round trip instead of three for
+    #  GetAxisActualAngle(), GetAxisActualVelocity() and GetAxisActualState().
+    #  The three values of an axis are thus also sampled at nearly the same time.
+    #
+    #  \param self  - reference to the object itself
+    #  \param iAxis - index of axis to access.
+    #                 This can be All, a single index or a \ref sdhlibrary_python_sdh_py_csdh_vector "vector" of indices.
+    #
+    #  \return
+    #    A tuple (angles, velocities, states) with values like returned by
+    #    GetAxisActualAngle(), GetAxisActualVelocity() and GetAxisActualState() for \a iAxis:
+    #    - if \a iAxis is a single index then each element is a single value
+    #    - else each element is a list with the values of the selected axes
+    #    - angles are reported in the configured angle unit system #uc_angle,
+    #      velocities in the configured angular velocity unit system #uc_angular_velocity.
+    #
+    #  \par Examples:
+    #  \code
+    #    # Assuming "hand" is a sdh.cSDH object ...
+    #
+    #    # Get actual angles, velocities and states of all axes
+    #    (angles, velocities, states) = hand.GetAxisActualAngleVelocityState()
+    #
+    #    # Get actual angle, velocity and state of axis 3
+    #    (a, v, s) = hand.GetAxisActualAngleVelocityState( 3 )
+    #  \endcode
+    #
+    #  <hr>
+    def GetAxisActualAngleVelocityState( self, iAxis=All ):
+        '''
+        Get the current actual angle(s), velocity(s) and state(s) of axis(axes) in one go
+        '''
+        axes = self._ToIndexList( iAxis, self.all_axes, self.NUMBER_OF_AXES + self.NUMBER_OF_VIRTUAL_AXES, "axis" )
+        # now axes is a list of all axis indices to access
+
+        if (type(iAxis) == int):
+            (angle, velocity, state) = self.interface.AxisCommands( [ ("pos", iAxis, None), ("vel", iAxis, None), ("state", iAxis, None) ] )
+            return (self.uc_angle.ToExternal( angle ), self.uc_angular_velocity.ToExternal( velocity ), state)
+
+        (all_angles, all_velocities, all_states) = self.interface.AxisCommands( [ ("pos", All, None), ("vel", All, None), ("state", All, None) ] )
+
+        # append angle 0.0, velocity 0.0 and state 6 for all virtual axes
+        all_angles += [ 0.0 ]*self.NUMBER_OF_VIRTUAL_AXES
+        all_velocities += [ 0.0 ]*self.NUMBER_OF_VIRTUAL_AXES
+        all_states += [ 6 ]*self.NUMBER_OF_VIRTUAL_AXES
+
+        return ([ self.uc_angle.ToExternal( all_angles[ ai ] )   for ai in axes ],
+                [ self.uc_angular_velocity.ToExternal( all_velocities[ ai ] )   for ai in axes ],
+                [ all_states[ ai ]   for ai in axes ])
+
+
     #-----------------------------------------------------------------
     ## Get the current reference velocity(s) of axis(axes). (This velocity is used internally by the SDH in eCT_VELOCITY_ACCELERATION mode)
     #
@@ -3638,6 +4145,89 @@ class cSDH( cSDHBase ):
         return map( self.uc_position.ToExternal, self._GetFingerXYZ( iFinger, angles_rad ) ) # pylint: disable-msg=W0141
 
 
+    #-----------------------------------------------------------------
+    ## Get the xyz finger tip positions of all fingers for a whole batch of poses
+    #
+    #  Like GetFingerXYZ() but for all fingers and many poses with a
+    #  single call, computed with numpy by a collision.cFingerHulls.
+    #  Optionally other points on the finger limbs than the finger tips
+    #  are returned.
+    #
+    #  \param self     - reference to the object itself
+    #  \param a_angles - the axis angles of the poses, an array-like object of
+    #                    shape (N, NUMBER_OF_AXES): pose, axis.
+    #                    The values are expected in the configured angle unit system #uc_angle.
+    #  \param proximal - None (default) or a sequence of P distances from the proximal joint
+    #                    along the proximal finger limb, one for each point to return.
+    #  \param distal   - None (default) or a sequence of P distances from the distal joint
+    #                    along the distal finger limb, one for each point to return.
+    #
+    #  \return
+    #    - If \a proximal and \a distal are None: a numpy array of shape (N, NUMBER_OF_FINGERS, 3)
+    #      with the x,y,z values of the finger tip positions: pose, finger, xyz
+    #    - Else a numpy array of shape (N, NUMBER_OF_FINGERS, P, 3) with the x,y,z values
+    #      of the points: pose, finger, point, xyz. If only one of \a proximal and \a distal
+    #      is given then the length of the other limb is used for all points (like for
+    #      proximal = [#l1]*P or distal = [#l2]*P).
+    #    - The values are returned in the configured position unit system #uc_position.
+    #
+    #  \remark
+    #  - The distances \a proximal and \a distal are expected in the configured
+    #    position unit system #uc_position.
+    #  - No communication with the SDH is performed.
+    #  - This requires numpy, else an ImportError is raised.
+    #
+    #  \par Examples:
+    #  \code
+    #    # Assuming "hand" is a sdh.cSDH object ...
+    #
+    #    # Get the finger tip positions of 2 poses:
+    #    P = hand.GetFingerXYZMany( [ [0,0,0,0,0,0,0], [90,-90,-90,0,0,0,0] ] )
+    #    # now P[1,0] is something like [18.821618775581804, 119.60000000000002, -53.0]
+    #
+    #    # Get the positions of the proximal joints, distal joints and finger tips:
+    #    P = hand.GetFingerXYZMany( [ [0,0,0,0,0,0,0], [90,-90,-90,0,0,0,0] ],
+    #                               proximal=[ 0.0, hand.l1, hand.l1 ], distal=[ 0.0, 0.0, hand.l2 ] )
+    #    # now P has shape (2, 3, 3, 3)
+    #  \endcode
+    #
+    #  <hr>
+    def GetFingerXYZMany( self, a_angles, proximal=None, distal=None ):
+        '''
+        Get the xyz finger tip positions of all fingers for a batch of poses. See html/pdf documentation for details.
+        '''
+        finger_hulls = self._GetFingerHulls()
+        if ( finger_hulls is None ):
+            raise ImportError( "GetFingerXYZMany() requires numpy" )
+        numpy = collision.numpy
+
+        angles = numpy.array( a_angles, dtype=float )
+        if ( angles.ndim != 2  or  angles.shape[1] != self.NUMBER_OF_AXES ):
+            raise cSDHErrorInvalidParameter( "Invalid shape %r of a_angles, expected (N, %d)" % (angles.shape, self.NUMBER_OF_AXES) )
+
+        if (self.uc_angle != uc_angle_radians):
+            angles = DegToRad( self.uc_angle.ToInternal( angles ) )
+
+        # append the virtual axis angles and pick the angles of each finger, shape (N, 3, 3):
+        av_angles = numpy.hstack( ( angles, numpy.zeros( (len( angles ), self.NUMBER_OF_VIRTUAL_AXES) ) ) )
+        r_angles = av_angles[ :, numpy.array( self.finger_axis_index ) ]
+
+        if ( proximal is None  and  distal is None ):
+            return self.uc_position.ToExternal( finger_hulls.Points( r_angles, [ self.l1 ], [ self.l2 ] )[ :, :, 0, : ] )
+
+        if ( proximal is None ):
+            proximal = [ self.l1 ] * len( distal )
+        else:
+            proximal = self.uc_position.ToInternal( numpy.array( proximal, dtype=float ).reshape( -1 ) )
+        if ( distal is None ):
+            distal = [ self.l2 ] * len( proximal )
+        else:
+            distal = self.uc_position.ToInternal( numpy.array( distal, dtype=float ).reshape( -1 ) )
+        if ( len( proximal ) != len( distal ) ):
+            raise cSDHErrorInvalidParameter( "proximal and distal must have the same length, not %d and %d" % (len( proximal ), len( distal )) )
+        return self.uc_position.ToExternal( finger_hulls.Points( r_angles, proximal, distal ) )
+
+
     #-----------------------------------------------------------------
     ## Check for internal collisions at the given finger angles
     #
@@ -3676,6 +4266,10 @@ class cSDH( cSDHBase ):
     #  - The finger joint angles must be given as the corresponding
     #    parameter, i.e. giving the joint angles of finger 0 as f2aa and
     #    those of finger 2 as f0aa will NOT work!
+    #  - If numpy is available (and no \a iv_filename is given) then the
+    #    check is done with collision.cFingerHulls, else with the
+    #    equivalent scalar implementation. The results are the same.
+    #    To check many poses at once use CheckFingerCollisionsMany().
     #
     #  <hr>
     def CheckFingerCollisions( self, f0aa=None, f1aa=None, f2aa=None, iv_filename=None ):
@@ -3689,6 +4283,12 @@ class cSDH( cSDHBase ):
         f1aa_rad = self._AnglesToRad( f1aa )
         f2aa_rad = self._AnglesToRad( f2aa )
 
+        finger_hulls = self._GetFingerHulls()
+        if ( finger_hulls is not None  and  iv_filename is None ):
+            (cxy, c, d) = finger_hulls.Check( [ [ f0aa_rad, f1aa_rad, f2aa_rad ] ] )
+            results = [ (bool( c[0,p] ), self.uc_position.ToExternal( float( d[0,p] ) )) for p in range( 0, 3 ) ]
+            return ( bool( cxy[0] ), results[0], results[1], results[2] )
+
         # potential speed up: reuse of generated hulls !!!
         hulls = [ self._GetFingerSphereHull( 0, f0aa_rad ),
                   self._GetFingerSphereHull( 1, f1aa_rad ),
@@ -3709,6 +4309,222 @@ class cSDH( cSDHBase ):
         return ( cxy, results[0], results[1], results[2] )
 
 
+    #-----------------------------------------------------------------
+    ## Check a whole batch of poses for internal collisions at once
+    #
+    #  Like CheckFingerCollisions() but for many poses with a single
+    #  call, computed with numpy by a collision.cFingerHulls.
+    #
+    #  \param self           - reference to the object itself
+    #  \param fingers_angles - the finger angles of the poses to check, an array-like
+    #                          object of shape (N, 3, NUMBER_OF_AXES_PER_FINGER):
+    #                          pose, finger, finger axis, like a list of the
+    #                          [f0aa, f1aa, f2aa] parameters of CheckFingerCollisions().
+    #
+    #  \return a tuple (cxy, c, d) of numpy arrays with:
+    #  - cxy: bool array of shape (N,), True if there are any internal finger collisions in that pose
+    #  - c: bool array of shape (N, 3), True if fingers 0 and 1, 0 and 2, 1 and 2 collide
+    #  - d: array of shape (N, 3) with the minimum distance of fingers 0 and 1, 0 and 2, 1 and 2
+    #
+    #  \remark
+    #  - The angle values are expected in the configured angle unit
+    #    system #uc_angle.
+    #  - the returned distances are given in the configured position
+    #    unit system #uc_position.
+    #  - No communication with the SDH is performed.
+    #  - This requires numpy, else an ImportError is raised.
+    #
+    #  \par Examples:
+    #  \code
+    #    # Assuming 'hand' is a sdh.cSDH object ...
+    #
+    #    # check 2 poses
+    #    (cxy, c, d) = hand.CheckFingerCollisionsMany( [ [[0,0,0], [0,0,0], [0,0,0]],
+    #                                                   [[0,-30,30], [0,-30,30], [0,-30,30]] ] )
+    #  \endcode
+    #
+    #  <hr>
+    def CheckFingerCollisionsMany( self, fingers_angles ):
+        '''
+        Check a batch of finger poses for internal collisions. See html/pdf documentation for details.
+        '''
+        finger_hulls = self._GetFingerHulls()
+        if ( finger_hulls is None ):
+            raise ImportError( "CheckFingerCollisionsMany() requires numpy" )
+
+        angles = collision.numpy.array( fingers_angles, dtype=float )
+        if ( angles.ndim != 3  or  angles.shape[1:] != (self.NUMBER_OF_FINGERS, self.NUMBER_OF_AXES_PER_FINGER) ):
+            raise cSDHErrorInvalidParameter( "Invalid shape %r of fingers_angles, expected (N, %d, %d)" % (angles.shape, self.NUMBER_OF_FINGERS, self.NUMBER_OF_AXES_PER_FINGER) )
+
+        if (self.uc_angle != uc_angle_radians):
+            angles = DegToRad( self.uc_angle.ToInternal( angles ) )
+
+        (cxy, c, d) = finger_hulls.Check( angles )
+        return ( cxy, c, self.uc_position.ToExternal( d ) )
+
+
+    #-----------------------------------------------------------------
+    ## Check if there are internal collisions, using a collision map if loaded
+    #
+    #  Like CheckFingerCollisions() but returns only whether there
+    #  are any internal collisions. If a collision map is loaded (see
+    #  LoadCollisionMap()) then the answer is looked up in the map and
+    #  the exact check of CheckFingerCollisions() is done only for poses
+    #  that the map cannot decide (poses near the boundary between
+    #  colliding and free poses). The result is the same as with the
+    #  exact check. MoveAxis(), MoveFinger() and MoveHand() use this
+    #  function to check the target pose.
+    #
+    #  \param self - reference to the object itself
+    #  \param f0aa, f1aa, f2aa - the finger angles like for CheckFingerCollisions().
+    #                If \c None is given then the current actual axis angles
+    #                of that finger are read from the SDH and used.
+    #
+    #  \return True if there are any internal finger collisions
+    #
+    #  \remark
+    #  - The angle values are expected in the configured angle unit
+    #    system #uc_angle.
+    #
+    #  <hr>
+    def IsFingerCollision( self, f0aa=None, f1aa=None, f2aa=None ):
+        '''
+        Check if there are internal finger collisions. See html/pdf documentation for details.
+        '''
+        if ( self.collision_map is not None ):
+            if f0aa is None: f0aa = self.GetFingerActualAngle( 0 )
+            if f1aa is None: f1aa = self.GetFingerActualAngle( 1 )
+            if f2aa is None: f2aa = self.GetFingerActualAngle( 2 )
+
+            c = self.collision_map.Lookup( self._AnglesToRad( f0aa ), self._AnglesToRad( f1aa ), self._AnglesToRad( f2aa ) )
+            if ( True in c ):
+                return True
+            if ( None not in c ):
+                return False
+
+        return self.CheckFingerCollisions( f0aa, f1aa, f2aa )[0]
+
+
+    #-----------------------------------------------------------------
+    ## Load a collision map to speed up the internal collision checks
+    #
+    #  A collision map stores for a grid of cells of joint angles whether
+    #  the fingers cannot collide in a cell or collide everywhere in a
+    #  cell. IsFingerCollision() (and thus MoveAxis(), MoveFinger() and
+    #  MoveHand()) then look up most poses in the map instead of
+    #  computing the distances of the finger hulls. See the
+    #  documentation of the collisionmap module. A collision map file
+    #  is generated with the script demo-collision-map.py.
+    #
+    #  \param self     - reference to the object itself
+    #  \param filename - the name of the collision map file to load, or
+    #                    \c None to stop using a collision map.
+    #
+    #  The map can also be loaded with the option \c "collision_map"
+    #  given to the constructor (command line option \c --collision_map).
+    #
+    #  \remark
+    #  - This requires numpy, else an ImportError is raised.
+    #  - A cSDHErrorInvalidParameter is raised if the map was generated
+    #    for other kinematic parameters (#l1, #l2, #offset).
+    #
+    #  <hr>
+    def LoadCollisionMap( self, filename ):
+        '''
+        Load a collision map to speed up the internal collision checks. See html/pdf documentation for details.
+        '''
+        if ( filename is None ):
+            self.collision_map = None
+            return
+
+        collision_map = collisionmap.cCollisionMap( filename )
+        if ( not collision_map.Matches( self.l1, self.l2, self.offset ) ):
+            raise cSDHErrorInvalidParameter( "Collision map %r was generated for other kinematic parameters" % filename )
+        self.collision_map = collision_map
+        self.dbg << "Loaded collision map %r with cells of %r deg\n" % (filename, collision_map.cell_size) # pylint: disable-msg=W0104
+
+
+    #-----------------------------------------------------------------
+    ## Check the path of a movement for internal collisions
+    #
+    #  The SDH moves all axes synchronously, so the path from the
+    #  start to the end axis angles is a straight line in joint space.
+    #  The path is sampled so that no axis angle changes by more than
+    #  #path_check_step degrees between two poses and all poses are checked
+    #  at once with collision.cFingerHulls.CheckPath(). The velocity profile
+    #  is used to estimate \b when the first collision would happen.
+    #
+    #  \param self             - reference to the object itself
+    #  \param a_start          - a NUMBER_OF_AXES vector with the axis angles at the start of the movement
+    #  \param a_end            - a NUMBER_OF_AXES vector with the target axis angles of the movement
+    #  \param velocity_profile - the velocity profile (see eVelocityProfile) or None to use the one of the SDH
+    #  \param velocities       - a NUMBER_OF_AXES vector of target axis velocities, or None to use those of the SDH
+    #  \param accelerations    - a NUMBER_OF_AXES vector of target axis accelerations, or None to use those of the SDH
+    #
+    #  \return a structure with the members:
+    #  - \c collision: True if the fingers would collide on the path (the start pose is not checked)
+    #  - \c fraction: the fraction of the path (0..1] at the first collision, None if there is no collision
+    #  - \c time: the estimated time from the start of the movement until the first collision, None if there is no collision
+    #  - \c duration: the estimated duration of the whole movement, None if there is no collision
+    #  - \c pairs: a list of 3 flags, True if fingers 0 and 1, 0 and 2, 1 and 2 collide at the first collision
+    #  - \c clearance: the minimum distance of the fingers on the path up to the first collision
+    #  - \c nb_checked: the number of poses checked
+    #
+    #  \remark
+    #  - The angle, velocity and acceleration values are expected in the configured unit
+    #    systems #uc_angle, #uc_angular_velocity and #uc_angular_acceleration.
+    #  - The times are returned in the configured time unit system #uc_time,
+    #    the clearance in the configured position unit system #uc_position.
+    #  - The velocity profile, velocities and accelerations are needed only to
+    #    estimate the time of a collision. So the SDH is queried for those not given
+    #    only if a collision is found, else no communication with the SDH is performed.
+    #  - This requires numpy, else an ImportError is raised.
+    #
+    #  \par Examples:
+    #  \code
+    #    # Assuming 'hand' is a sdh.cSDH object ...
+    #
+    #    path = hand.CheckPathCollisions( hand.GetAxisActualAngle( All ), [ 0, -10, 10, 10, 10, -10, 10 ] )
+    #    if path.collision:
+    #        print "fingers would collide after %f s" % path.time
+    #
+    #    # Or let MoveAxis(), MoveFinger() and MoveHand() check the path before each movement:
+    #    hand.check_path_collisions = True
+    #  \endcode
+    #
+    #  <hr>
+    def CheckPathCollisions( self, a_start, a_end, velocity_profile=None, velocities=None, accelerations=None ):
+        '''
+        Check the path of a movement for internal collisions. See html/pdf documentation for details.
+        '''
+        finger_hulls = self._GetFingerHulls()
+        if ( finger_hulls is None ):
+            raise ImportError( "CheckPathCollisions() requires numpy" )
+
+        r_start = self._AxisAnglesToFingerAngles( list( self._AnglesToRad( a_start ) ) )
+        r_end = self._AxisAnglesToFingerAngles( list( self._AnglesToRad( a_end ) ) )
+        (s, c, clearance, nb_checked) = finger_hulls.CheckPath( r_start, r_end, DegToRad( self.path_check_step ) )
+
+        result = utils.Struct( collision = s is not None, fraction = s, time = None, duration = None,
+                               pairs = [ bool( cij ) for cij in c ],
+                               clearance = self.uc_position.ToExternal( clearance ),
+                               nb_checked = nb_checked )
+        if ( s is not None ):
+            if ( velocity_profile is None ):
+                velocity_profile = self.GetVelocityProfile()
+            if ( velocities is None ):
+                velocities = self.GetAxisTargetVelocity( All )
+            if ( accelerations is None ):
+                accelerations = self.GetAxisTargetAcceleration( All )
+            distances = [ self.uc_angle.ToInternal( e ) - self.uc_angle.ToInternal( b ) for (b, e) in zip( a_start, a_end ) ]
+            (duration, fraction) = collision.MovementDuration( velocity_profile, distances,
+                                                               self.uc_angular_velocity.ToInternal( list( velocities ) ),
+                                                               self.uc_angular_acceleration.ToInternal( list( accelerations ) ) )
+            result.duration = self.uc_time.ToExternal( duration )
+            result.time = self.uc_time.ToExternal( duration * float( collision.TimeFraction( velocity_profile, s, fraction ) ) )
+        return result
+
+
     #-----------------------------------------------------------------
     ## Move one or more axes to the previously set target position with
     #  the previously set (maximum) velocities.
@@ -3795,6 +4611,68 @@ class cSDH( cSDHBase ):
         the previously set (maximum) target velocities. See html/pdf
         documentation for details.
         '''
+        (axes, t_angles, t) = self._StartMoveAxis( iAxis, check_collisions )
+
+        # restore the saved target axis angle so that previously set
+        # target axis angles for other axes remain active
+        if sequ:
+            self.WaitAxis( axes )
+
+            self.SetAxisTargetAngle( All, t_angles )
+            
+        return self.uc_time.ToExternal( t )
+
+
+    #-----------------------------------------------------------------
+    ## Start to move one or more axes to the previously set target position with
+    #  the previously set (maximum) velocities and return immediately.
+    #
+    #  Like MoveAxis() with \a sequ=False, but the currently set target axis
+    #  angles of other axes are restored when the movement has finished,
+    #  like MoveAxis() with \a sequ=True.
+    #
+    #  \param self  - reference to the object itself
+    #  \param iAxis - index of axis to access.
+    #                 This can be All, a single index or a \ref sdhlibrary_python_sdh_py_csdh_vector "vector" of indices.
+    #  \param check_collisions - flag: If True (default) then collisions are checked, see MoveAxis().
+    #
+    #  \return A cMoveFuture object. Its done() method returns True when the movement has finished,
+    #          its result() method waits for the end of the movement and returns the
+    #          expected execution time for the movement in the configured time unit system #uc_time.
+    #
+    #  \remark
+    #    - The cMoveFuture object communicates with the SDH only when its done() or result()
+    #      method is called, so no other thread uses the cSDH object meanwhile.
+    #    - The target axis angles are restored not before done() returned True or result() returned.
+    #
+    #  \par Examples:
+    #  \code
+    #    # Assuming 'hand' is a sdh.cSDH object ...
+    #
+    #    hand.SetAxisTargetAngle( [1, 2, 3], [-10,-20,-30] )
+    #    move = hand.MoveAxisAsync( [1, 2, 3] )
+    #    while not move.done():
+    #        # ... do something else while the hand is moving ...
+    #        pass
+    #  \endcode
+    #  <hr>
+    def MoveAxisAsync( self, iAxis, check_collisions=True ):
+        '''
+        Start to move an axis or some axes to the previously set target positions with
+        the previously set (maximum) target velocities and return a cMoveFuture object
+        for the movement. See html/pdf documentation for details.
+        '''
+        (axes, t_angles, t) = self._StartMoveAxis( iAxis, check_collisions )
+        return cMoveFuture( self, axes, t_angles, t )
+
+
+    #-----------------------------------------------------------------
+    def _StartMoveAxis( self, iAxis, check_collisions ):
+        '''
+        Internal helper function: start the movement of MoveAxis() / MoveAxisAsync().
+        Return a tuple (axes, t_angles, t) with the list of axis indices, the
+        previously set target axis angles of all axes and the expected duration in seconds.
+        '''
         axes = self._ToIndexList( iAxis, self.all_axes, self.NUMBER_OF_AXES + self.NUMBER_OF_VIRTUAL_AXES, "axis" )
         # now axes is a list of all axis indices to access
 
@@ -3803,6 +4681,7 @@ class cSDH( cSDHBase ):
 
         # save current actual axis angles of all axes (in external units)
         a_angles = ToRange_a( self.GetAxisActualAngle( All ), self.f_min_angle_a, self.f_max_angle_a )
+        s_angles = list( a_angles )
 
         #---------------------
         # generate new target axis angles:
@@ -3819,29 +4698,16 @@ class cSDH( cSDHBase ):
 
         #---------------------
         if check_collisions:
-            fingers_angles = self._AxisAnglesToFingerAngles( a_angles )
-            
-            (cxy, (c01,d01), (c02,d02), (c12,d12)) = self.CheckFingerCollisions( fingers_angles[0], fingers_angles[1], fingers_angles[2] )
-            if cxy:
-                self.dbg << "Internal collision detected in MoveAxis():" # pylint: disable-msg=W0104
-                self.dbg.var( "cxy c01 d01 c02 d02 c12 d12" )
-                raise cSDHErrorInternalCollision( "Potential internal collision detected, movement not executed!\n" )
+            self._CheckMoveCollisions( "MoveAxis", s_angles, a_angles )
         #---------------------
         
         
         # set modified actual axis angles as new target axis angles
         self.SetAxisTargetAngle( All, a_angles )
         # and move there
-        t = self.interface.m(sequ)
+        t = self._StartMovement()
 
-        # restore the saved target axis angle so that previously set
-        # target axis angles for other axes remain active
-        if sequ:
-            self.WaitAxis( axes )
-
-            self.SetAxisTargetAngle( All, t_angles )
-            
-        return self.uc_time.ToExternal( t )
+        return (axes, t_angles, t)
 
 
     #-----------------------------------------------------------------
@@ -4032,6 +4898,7 @@ class cSDH( cSDHBase ):
         # Limit the returned result to the allowed range. This is necessary since
         # the SDH sometimes reports the current angles slightly out of range
         a_angles = ToRange_a( self.GetAxisActualAngle( All ), self.f_min_angle_a, self.f_max_angle_a )
+        s_angles = list( a_angles )
         self.dbg.var( "a_angles" )
 
         #---------------------
@@ -4049,20 +4916,14 @@ class cSDH( cSDHBase ):
 
         #---------------------
         if check_collisions:
-            fingers_angles = self._AxisAnglesToFingerAngles( a_angles )
-            
-            (cxy, (c01,d01), (c02,d02), (c12,d12)) = self.CheckFingerCollisions( fingers_angles[0], fingers_angles[1], fingers_angles[2] )
-            if cxy:
-                self.dbg << "Internal collision detected in MoveFinger():" # pylint: disable-msg=W0104
-                self.dbg.var( "cxy c01 d01 c02 d02 c12 d12" )
-                raise cSDHErrorInternalCollision( "Potential internal collision detected, movement not executed!\n" )
+            self._CheckMoveCollisions( "MoveFinger", s_angles, a_angles )
         #---------------------
         
         
         # set modified actual axis angles as new target axis angles
         self.SetAxisTargetAngle( All, a_angles )
         # and move there
-        t = self.interface.m(sequ)
+        t = self._StartMovement()
 
         # restore the saved target axis angle so that previously set
         # target axis angles for other fingers remain active
@@ -4180,6 +5041,7 @@ class cSDH( cSDHBase ):
 
         # save current actual axis angles of all axes in external units
         a_angles = ToRange_a( self.GetAxisActualAngle( All ), self.f_min_angle_a, self.f_max_angle_a )
+        s_angles = list( a_angles )
 
         #---------------------
         # generate new target axis angles:
@@ -4195,19 +5057,13 @@ class cSDH( cSDHBase ):
 
         #---------------------
         if check_collisions:
-            fingers_angles = self._AxisAnglesToFingerAngles( a_angles )
-            
-            (cxy, (c01,d01), (c02,d02), (c12,d12)) = self.CheckFingerCollisions( fingers_angles[0], fingers_angles[1], fingers_angles[2] )
-            if cxy:
-                self.dbg << "Internal collision detected in MoveHand():" # pylint: disable-msg=W0104
-                self.dbg.var( "cxy c01 d01 c02 d02 c12 d12" )
-                raise cSDHErrorInternalCollision( "Potential internal collision detected, movement not executed!\n" )
+            self._CheckMoveCollisions( "MoveHand", s_angles, a_angles )
         #---------------------
             
         # set modified actual axis angles as new target axis angles
         self.SetAxisTargetAngle( All, a_angles )
         # and move there
-        t = self.interface.m(sequ)
+        t = self._StartMovement()
 
         # restore the saved target axis angles so that
         # previously set target axis angles for unselected fingers remain
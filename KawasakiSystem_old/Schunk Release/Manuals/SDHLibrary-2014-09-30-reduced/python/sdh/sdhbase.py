@@ -99,6 +99,13 @@ class cSDHErrorInternalCollision(cSDHError):
     '''
     pass
 
+## SDH-exception: A pending operation was cancelled.
+class cSDHErrorCancelled(cSDHError):
+    '''
+    A pending operation was cancelled.
+    '''
+    pass
+
 #
 ######################################################################
 
@@ -28,10 +28,7 @@
 #
 #######################################################################
 
-import time, sys, re
-
-# pySerial module from http://pyserial.sourceforge.net/
-import serial
+import time, sys, thread, threading, collections
 
 from sdhbase import *
 import socket
@@ -46,6 +43,9 @@ except ImportError:
     pass
     
 from . import tcpserial
+from . import linereader
+from . import replyparser
+from . import shadowstate
     
 #######################################################################
 ## \anchor sdhlibrary_python_sdhserial_py_python_vars
@@ -65,6 +65,78 @@ __copyright__ = "Copyright (c) 2007 SCHUNK GmbH & Co. KG"
 #  @}
 ######################################################################
 
+#-----------------------------------------------------------------
+def _ReplySize( lines ):
+    '''
+    Non public helper function: return the number of bytes received for
+    the reply \a lines (stripped of the EOL), for the instrumentation.
+    '''
+    return len( "\r\n".join( lines ) ) + 2
+
+#-----------------------------------------------------------------
+## \brief A reentrant lock that is handed over to the waiting threads in
+#  the order of their arrival.
+#
+#  Used by cSDHSerial to share the communication line between the
+#  threads of an application (like the sampler thread of a
+#  telemetry.cTelemetrySampler and the foreground commands): unlike a
+#  threading.RLock a thread releasing the lock cannot acquire it again
+#  right away while other threads are waiting, so no thread starves.
+#
+#  <hr>
+class cFairLock( object ):
+    '''
+    A reentrant lock that is handed over to the waiting threads in the order of their arrival.
+    '''
+    def __init__( self ):
+        self._mutex = threading.Lock()
+        self._owner = None
+        self._depth = 0
+        # tuples (thread id, lock to release to hand over) of the waiting threads
+        self._waiters = collections.deque()
+
+    def acquire( self ):
+        '''
+        Acquire the lock, wait until all threads that wanted it before have released it.
+        '''
+        me = thread.get_ident()
+        self._mutex.acquire()
+        if ( self._owner == me ):
+            self._depth += 1
+            self._mutex.release()
+            return
+        if ( self._owner is None ):
+            self._owner = me
+            self._depth = 1
+            self._mutex.release()
+            return
+        waiter = thread.allocate_lock()
+        waiter.acquire()
+        self._waiters.append( (me, waiter) )
+        self._mutex.release()
+        # release() makes us the owner before releasing waiter:
+        waiter.acquire()
+
+    def release( self ):
+        '''
+        Release the lock, hand it over to the thread waiting longest, if any.
+        '''
+        self._mutex.acquire()
+        try:
+            if ( self._owner != thread.get_ident() ):
+                raise RuntimeError( "cannot release un-acquired lock" )
+            self._depth -= 1
+            if ( self._depth > 0 ):
+                return
+            if ( self._waiters ):
+                (self._owner, waiter) = self._waiters.popleft()
+                self._depth = 1
+                waiter.release()
+            else:
+                self._owner = None
+        finally:
+            self._mutex.release()
+
 #-----------------------------------------------------------------
 ## \brief The class to communicate with a SDH via RS232.
 #    
@@ -111,6 +183,9 @@ class cSDHSerial( cSDHBase ):
     #    - \c "timeout"     : the timeout to use:
     #                         - None : wait forever
     #                         - T    : wait for T seconds (float accepted)                   
+    #    - \c "shadow_state": if True, then the settings read or written (like target
+    #                         angles or velocities) are cached in a shadowstate.cShadowState
+    #                         to avoid redundant round trips to the SDH. Default is False.
     #  - (Superclasses of cSDHSerial use additional settings, see there.)
     #  - (Using classes of cSDHSerial like cSDH use additional settings, see there.)
     #
@@ -123,7 +198,7 @@ class cSDHSerial( cSDHBase ):
         # Option handling: 
 
         # Set class specific default options:
-        default_options = dict( port=0, timeout=None )
+        default_options = dict( port=0, timeout=None, shadow_state=False )
 
         # Overwrite class specific defaults with settings from caller, if any:
         if ( options ):   default_options.update( options )
@@ -148,6 +223,23 @@ class cSDHSerial( cSDHBase ):
 
         ## String to use as "End Of Line" marker when sending to SDH
         self.EOL="\r\n"
+
+        ## The compiled patterns to match the replies to axis commands
+        self.reply_parser = replyparser.cReplyParser()
+
+        ## The cache of the settings of the SDH, a shadowstate.cShadowState (or None if not used)
+        self.shadow = None
+        if ( self.options[ "shadow_state" ] ):
+            self.shadow = shadowstate.cShadowState( self.NUMBER_OF_AXES )
+
+        ## The timing instrumentation of the commands, an instrumentation.cInstrumentation
+        #  (or None if not used). Set by cSDH, see cSDH.EnableInstrumentation()
+        self.instrumentation = None
+
+        ## \brief The lock that serializes the communication of different threads,
+        #  a cFairLock. Held by Send(), SendMany(), SendParse(), SendParseMany() and Sync(),
+        #  acquire it to send a sequence of commands without interruption.
+        self.lock = cFairLock()
         #---------------------
         
         #---------------------
@@ -192,8 +284,8 @@ class cSDHSerial( cSDHBase ):
             if ( self.options[ "baudrate" ] == 0 ):
                 self.options[ "baudrate" ] = 115200
 
-            ## the RS232 connection to use for communication
-            self.com = serial.Serial( port=self.options[ "port" ], baudrate=self.options[ "baudrate" ], rtscts=0, xonxoff=0, timeout=self.options[ "timeout" ] )
+            ## the RS232 connection to use for communication (with a buffered readline())
+            self.com = linereader.tBufferedSerial( port=self.options[ "port" ], baudrate=self.options[ "baudrate" ], rtscts=0, xonxoff=0, timeout=self.options[ "timeout" ] )
             # the above call will succeed even if the hand is connected but off
 
         # to make shure that the SDH is connected:
@@ -259,27 +351,33 @@ class cSDHSerial( cSDHBase ):
         In case of errors the procedure is repeated up to 3 times
         after syncing the output
         '''
-        self.dbg << "Sendparse( %s, %s )\n" % (repr(s), repr(re_obj.pattern))  # pylint: disable-msg=W0104
-        retries = 3 # retry sending at most this many times
-        while retries > 0:
-            reply=None
-            try:
-                reply = self.Send( s, 1 )
-                mo = re_obj.match( reply[0] )
-                if ( mo ):
-                    return mo.group(1)
-            except cSDHErrorCommunication,e:
-                self.dbg << "Ignoring exception in SendParse: %r\n" % e # pylint: disable-msg=W0104
-            retries -= 1
-            if retries> 0:
-                self.dbg << "reply %s from SDH does not match, syncing and retrying\n" % (repr(reply))  # pylint: disable-msg=W0104
-            old_nb_lines_to_ignore = self.nb_lines_to_ignore
-            self.nb_lines_to_ignore = 5
-            self.Sync()
-            self.nb_lines_to_ignore = old_nb_lines_to_ignore
+        self.lock.acquire()
+        try:
+            self.dbg.Printf( "Sendparse( %r, %r )\n", s, re_obj.pattern )
+            retries = 3 # retry sending at most this many times
+            while retries > 0:
+                reply=None
+                try:
+                    reply = self.Send( s, 1 )
+                    mo = re_obj.match( reply[0] )
+                    if ( mo ):
+                        return mo.group(1)
+                except cSDHErrorCommunication,e:
+                    self.dbg << "Ignoring exception in SendParse: %r\n" % e # pylint: disable-msg=W0104
+                retries -= 1
+                if ( self.instrumentation is not None  and  retries > 0 ):
+                    self.instrumentation.RecordRetry()
+                if retries> 0:
+                    self.dbg << "reply %s from SDH does not match, syncing and retrying\n" % (repr(reply))  # pylint: disable-msg=W0104
+                old_nb_lines_to_ignore = self.nb_lines_to_ignore
+                self.nb_lines_to_ignore = 5
+                self.Sync()
+                self.nb_lines_to_ignore = old_nb_lines_to_ignore
                 
-        raise cSDHErrorCommunication( "Could not get matching reply in SendParse( '%s', '%s' )" % (s,re_obj.pattern) )
-         
+            raise cSDHErrorCommunication( "Could not get matching reply in SendParse( '%s', '%s' )" % (s,re_obj.pattern) )
+        finally:
+            self.lock.release()
+
 
     #-----------------------------------------------------------------
     def Send( self, s, nb_lines=All, nb_lines_total=All ):
@@ -298,115 +396,280 @@ class cSDHSerial( cSDHBase ):
         
         Return a list of all read lines of the reply from the SDH hardware.
         '''
-
-        if (self.options[ "port" ] < 0):
-            # "virtual" port for offline tests
-
-            for (request,answer) in [ ("power=0.000000,0.000000,0.000000,0.000000,0.000000,0.000000,0.000000", "POWER=0.0,0.0,0.0,0.0,0.0,0.0,0.0"),
-                                      ("vp", ["@bla", "VP=0"]),
-                                      ("p_max", ["P_MAX=90.0,90.0,90.0,90.0,90.0,90.0,90.0"]),
-                                      ("p_min", ["P_MIN=0.0,-90.0,-90.0,-90.0,-90.0,-90.0,-90.0"]),
-                                      ("vlim", ["VLIM=83,140,200,140,200,140,200"]),
-                                      ("ver",  ["VER=0.0.0.0"]),
-                                      ]:
-                if (s == request):
-                    self.dbg << "!!! Virtual COM port, faking reply '%s' for request '%s'\n" % (answer,request) # pylint: disable-msg=W0104
-                    return answer
+        self.lock.acquire()
+        try:
+            if (self.options[ "port" ] < 0):
+                # "virtual" port for offline tests
+
+                for (request,answer) in [ ("power=0.000000,0.000000,0.000000,0.000000,0.000000,0.000000,0.000000", "POWER=0.0,0.0,0.0,0.0,0.0,0.0,0.0"),
+                                          ("vp", ["@bla", "VP=0"]),
+                                          ("p_max", ["P_MAX=90.0,90.0,90.0,90.0,90.0,90.0,90.0"]),
+                                          ("p_min", ["P_MIN=0.0,-90.0,-90.0,-90.0,-90.0,-90.0,-90.0"]),
+                                          ("vlim", ["VLIM=83,140,200,140,200,140,200"]),
+                                          ("ver",  ["VER=0.0.0.0"]),
+                                          ]:
+                    if (s == request):
+                        self.dbg << "!!! Virtual COM port, faking reply '%s' for request '%s'\n" % (answer,request) # pylint: disable-msg=W0104
+                        return answer
               
-            self.dbg << "!!! Virtual COM port, ignoring '%s'\n" % s # pylint: disable-msg=W0104
-            return []
-
-        retries = 3 # retry sending at most this many times
-        while retries > 0:
-            try:
-                #---------------------
-                # first read all lines to ignore (replies of previous commands)
-                while ( self.nb_lines_to_ignore > 0 ):
-                    l = self.com.readline()
-                    self.nb_lines_to_ignore -= 1
-                    self.dbg.PDM( "ignoring line", l )
-                #---------------------
+                self.dbg << "!!! Virtual COM port, ignoring '%s'\n" % s # pylint: disable-msg=W0104
+                return []
+
+            instrumentation = self.instrumentation
+            if ( instrumentation is not None ):
+                t0 = time.time()
+            retries = 3 # retry sending at most this many times
+            while retries > 0:
+                try:
+                    #---------------------
+                    # first read all lines to ignore (replies of previous commands)
+                    while ( self.nb_lines_to_ignore > 0 ):
+                        l = self.com.readline()
+                        self.nb_lines_to_ignore -= 1
+                        self.dbg.PDM( "ignoring line", l )
+                    #---------------------
+                
+                    self.firmware_state = self.eErrorCode[ "E_SUCCESS" ]
+                    lines = []
                 
-                self.firmware_state = self.eErrorCode[ "E_SUCCESS" ]
-                lines = []
+                    #---------------------
+                    # send new command to SDH
+                    self.dbg.Printf( "sending command %r to SDH\n", s+self.EOL )
+                    self.dbg.PDM( "nb_lines=", nb_lines, "  nb_lines_total=", nb_lines_total, "  self.nb_lines_to_ignore=", self.nb_lines_to_ignore )
+                    self.com.write(s+self.EOL)
+                    #---------------------
+                
+                    #---------------------
+                    # read reply if requested
+                    while (nb_lines == All or nb_lines > 0):
                 
-                #---------------------
-                # send new command to SDH
-                self.dbg.PDM( "sending command "+repr(s+self.EOL)+" to SDH" )
-                self.dbg.PDM( "nb_lines=", nb_lines, "  nb_lines_total=", nb_lines_total, "  self.nb_lines_to_ignore=", self.nb_lines_to_ignore )
-                self.com.write(s+self.EOL)
-                #---------------------
+                        #---------------------
+                        # now read requested reply lines of current command
+                        l = self.com.readline()
+                        if (nb_lines != All):
+                            nb_lines -= 1
+                        if (nb_lines_total != All):
+                            nb_lines_total -= 1
                 
-                #---------------------
-                # read reply if requested
-                while (nb_lines == All or nb_lines > 0):
+                        # append line l without beginning or trailing "\r\n" to lines list
+                        start = 0
+                        while (start < len(l)  and  l[start] in ('\r', '\n')):
+                            start += 1
+                
+                        end = len(l)-1
+                        while (end > 0         and  l[end] in ('\r', '\n')):
+                            end -= 1
+                        lines.append( l[start:end+1] )
+                        self.dbg.Printf( "appended '%s' for l='%s'\n", lines[-1], l )
+                        if (len(lines[-1])>0 and lines[-1][0] != '@'): # ??? or better and (nb_lines != All and nb_lines <= 0)
+                            break
+                        if ( len(lines[-1]) == 0 ):
+                            self.dbg.Printf( "breaking for empty line\n" )
+                            break  # !!! needed, but why????
+                        if self.dbg.IsEnabled():
+                            self.dbg << "not breaking for line '%s'\n" % l # pylint: disable-msg=W0104
+                            sys.stdout.flush()
+                            sys.stderr.flush()
+                        #---------------------
+                    if self.dbg.IsEnabled():
+                        # keep debug messages and other output in order
+                        sys.stdout.flush()
+                        sys.stderr.flush()
                 
                     #---------------------
-                    # now read requested reply lines of current command
-                    l = self.com.readline()
-                    if (nb_lines != All):
-                        nb_lines -= 1
+                    # remember if there are more lines to be ignored next time
                     if (nb_lines_total != All):
-                        nb_lines_total -= 1
-                
-                    # append line l without beginning or trailing "\r\n" to lines list
-                    start = 0
-                    while (start < len(l)  and  l[start] in ('\r', '\n')):
-                        start += 1
+                        self.nb_lines_to_ignore = nb_lines_total
+                    self.dbg.Printf( "%d lines remain to be ignored\n", self.nb_lines_to_ignore )
+                    #---------------------
                 
-                    end = len(l)-1
-                    while (end > 0         and  l[end] in ('\r', '\n')):
-                        end -= 1
-                    lines.append( l[start:end+1] )
-                    self.dbg.PDM( "appended '%s' for l='%s'" %(lines[-1],l) )
-                    if (len(lines[-1])>0 and lines[-1][0] != '@'): # ??? or better and (nb_lines != All and nb_lines <= 0)
-                        break
-                    if ( len(lines[-1]) == 0 ):
-                        self.dbg << "breaking for empty line\n" # pylint: disable-msg=W0104
-                        break  # !!! needed, but why????
-                    self.dbg << "not breaking for line '%s'\n" % l # pylint: disable-msg=W0104
-                    sys.stdout.flush()
-                    sys.stderr.flush()
                     #---------------------
-                sys.stdout.flush()
-                sys.stderr.flush()
+                    # set state if possible
+                    if (self.nb_lines_to_ignore == 0):
+                        self.ExtractFirmwareState( lines )
+                    #---------------------
+
+                    # finished, so no more retries needed
+                    retries = 0
                 
-                #---------------------
-                # remember if there are more lines to be ignored next time
-                if (nb_lines_total != All):
-                    self.nb_lines_to_ignore = nb_lines_total
-                self.dbg.PDM( "%d lines remain to be ignored" % self.nb_lines_to_ignore )
-                #---------------------
+                except cSDHErrorCommunication, e:
+                    # some communication error occured, so retry:
+                    retries -= 1
+                    if (retries <= 0):
+                        self.dbg << "Retried sending, but still got errors from SDH!\n" # pylint: disable-msg=W0104
+                        # reraise e:
+                        raise 
                 
-                #---------------------
-                # set state if possible
-                if (self.nb_lines_to_ignore == 0):
-                    self.ExtractFirmwareState( lines )
-                #---------------------
+                    self.dbg << "ignoring cSDHErrorCommunication:", e, "\n" # pylint: disable-msg=W0104
+                    if ( instrumentation is not None ):
+                        instrumentation.RecordRetry()
+
+                    # resync first:
+                    self.Sync()
+                    # now start over again
+
+            if ( instrumentation is not None ):
+                if ( len( lines ) == 1 ):
+                    # the usual single line reply, without the call of _ReplySize()
+                    instrumentation.Record( s, t0, len( lines[0] ) + 2 )
+                else:
+                    instrumentation.Record( s, t0, _ReplySize( lines ) )
+
+            if self.dbg.IsEnabled():
+                self.dbg << "got reply:\n" # pylint: disable-msg=W0104
+                self.dbg.SetColor( "blue" ) 
+                for (i,l) in zip(range(0,len(lines)),lines):
+                    self.dbg << "%2d: " % i << repr( l ) << "\n" # pylint: disable-msg=W0104
+                self.dbg.SetColor( "green" ) 
+            return lines
+        finally:
+            self.lock.release()
 
-                # finished, so no more retries needed
-                retries = 0
+    #-----------------------------------------------------------------
+    def SendMany( self, commands ):
+        '''
+        Pipelined version of Send(): Send all command strings in list
+        \a commands (each terminated with EOL) with a single write to
+        self.com, then read the replies in the same order. For each
+        command reply lines are read until a line without "@" prefix is
+        found, like Send() with nb_lines=All.
+
+        This saves a round trip to the SDH for each command but the first.
+        Since a whole batch is resent in case of communication errors
+        only commands that can safely be repeated (like querying values
+        or setting target values) should be sent this way.
+
+        self.firmware_state is set according to the replies. If the SDH reports
+        an error for any command then all replies are read first, then a
+        cSDHErrorInvalidParameter for the first error is raised.
+        
+        Return a list with a list of reply lines for each command.
+        '''
+        self.lock.acquire()
+        try:
+            if (self.options[ "port" ] < 0):
+                # "virtual" port for offline tests
+                return [ self.Send( s ) for s in commands ]
+
+            instrumentation = self.instrumentation
+            if ( instrumentation is not None ):
+                t0 = time.time()
+            retries = 3 # retry sending at most this many times
+            while retries > 0:
+                try:
+                    #---------------------
+                    # first read all lines to ignore (replies of previous commands)
+                    while ( self.nb_lines_to_ignore > 0 ):
+                        l = self.com.readline()
+                        self.nb_lines_to_ignore -= 1
+                        self.dbg.PDM( "ignoring line", l )
+                    #---------------------
+
+                    self.firmware_state = self.eErrorCode[ "E_SUCCESS" ]
                 
-            except cSDHErrorCommunication, e:
-                # some communication error occured, so retry:
-                retries -= 1
-                if (retries <= 0):
-                    self.dbg << "Retried sending, but still got errors from SDH!\n" # pylint: disable-msg=W0104
-                    # reraise e:
-                    raise 
+                    #---------------------
+                    # send all commands at once
+                    request = "".join( [ s+self.EOL for s in commands ] )
+                    self.dbg.Printf( "sending %d pipelined commands %r to SDH\n", len( commands ), request )
+                    self.com.write( request )
+                    #---------------------
+                
+                    #---------------------
+                    # read replies in order
+                    replies = []
+                    for s in commands:
+                        lines = []
+                        while True:
+                            l = self.com.readline()
+                            lines.append( l.strip( "\r\n" ) )
+                            if ( len( lines[-1] ) == 0 ):
+                                # timeout: the replies of the remaining commands might still come in
+                                self.nb_lines_to_ignore = len( commands ) - len( replies ) - 1
+                                raise cSDHErrorCommunication( "Timeout while reading reply for pipelined command %r" % s )
+                            if ( lines[-1][0] != '@' ):
+                                break
+                        replies.append( lines )
+                    #---------------------
+                    retries = 0
                 
-                self.dbg << "ignoring cSDHErrorCommunication:", e, "\n" # pylint: disable-msg=W0104
+                except cSDHErrorCommunication, e:
+                    # some communication error occured, so retry:
+                    retries -= 1
+                    if (retries <= 0):
+                        self.dbg << "Retried sending, but still got errors from SDH!\n" # pylint: disable-msg=W0104
+                        raise 
+                
+                    self.dbg << "ignoring cSDHErrorCommunication:", e, "\n" # pylint: disable-msg=W0104
+                    if ( instrumentation is not None ):
+                        instrumentation.RecordRetry()
+
+                    # resync first:
+                    self.Sync()
+                    # now start over again
+
+            if ( instrumentation is not None ):
+                # the pipelined commands are recorded with the latency of the whole batch
+                for (s, lines) in zip( commands, replies ):
+                    instrumentation.Record( s, t0, _ReplySize( lines ) )
+
+            #---------------------
+            # set state (raises an exception for the first error reported)
+            for lines in replies:
+                self.ExtractFirmwareState( lines )
+            #---------------------
+
+            if self.dbg.IsEnabled():
+                self.dbg << "got replies:\n" # pylint: disable-msg=W0104
+                self.dbg.SetColor( "blue" ) 
+                for (s,lines) in zip( commands, replies ):
+                    self.dbg << "%s: " % s << repr( lines ) << "\n" # pylint: disable-msg=W0104
+                self.dbg.SetColor( "green" ) 
+            return replies
+        finally:
+            self.lock.release()
 
-                # resync first:
+    #-----------------------------------------------------------------
+    def SendParseMany( self, requests ):
+        '''
+        Pipelined version of SendParse(): \a requests is a list of tuples
+        (s, re_obj) with a command s to send and a compiled regular expression
+        re_obj. All commands are sent with a single SendMany(), the last line
+        of the reply for each s is matched against its re_obj and a list of the
+        groups 1 of the resulting match objects is returned, in the order of \a requests.
+        In case of errors the whole batch is repeated up to 3 times after syncing the output.
+        '''
+        self.lock.acquire()
+        try:
+            commands = [ s for (s, re_obj) in requests ]
+            self.dbg.Printf( "SendparseMany( %r )\n", commands )
+            retries = 3 # retry sending at most this many times
+            while retries > 0:
+                replies = None
+                try:
+                    replies = self.SendMany( commands )
+                    answers = []
+                    for ((s, re_obj), reply) in zip( requests, replies ):
+                        mo = re_obj.match( reply[-1] )
+                        if ( not mo ):
+                            break
+                        answers.append( mo.group(1) )
+                    else:
+                        return answers
+                except cSDHErrorCommunication,e:
+                    self.dbg << "Ignoring exception in SendParseMany: %r\n" % e # pylint: disable-msg=W0104
+                retries -= 1
+                if ( self.instrumentation is not None  and  retries > 0 ):
+                    self.instrumentation.RecordRetry()
+                if retries> 0:
+                    self.dbg << "replies %s from SDH do not match, syncing and retrying\n" % (repr(replies))  # pylint: disable-msg=W0104
+                old_nb_lines_to_ignore = self.nb_lines_to_ignore
+                self.nb_lines_to_ignore = 5
                 self.Sync()
-                # now start over again
-
-        self.dbg << "got reply:\n" # pylint: disable-msg=W0104
-        self.dbg.SetColor( "blue" ) 
-        for (i,l) in zip(range(0,len(lines)),lines):
-            self.dbg << "%2d: " % i << repr( l ) << "\n" # pylint: disable-msg=W0104
-        self.dbg.SetColor( "green" ) 
-        return lines
+                self.nb_lines_to_ignore = old_nb_lines_to_ignore
+                
+            raise cSDHErrorCommunication( "Could not get matching replies in SendParseMany( %r )" % (commands,) )
+        finally:
+            self.lock.release()
 
     #-----------------------------------------------------------------
     def ExtractFirmwareState( self, lines ):
@@ -422,11 +685,13 @@ class cSDHSerial( cSDHBase ):
         elif (lines[-1][0] == 'E'):
             # it is an error message:
             self.firmware_state = int(lines[-1][1:])
+            self.InvalidateShadow()
             self.dbg.PDM( "got error reply '%s' = %d = %s" % (lines[-1], self.firmware_state, self.firmware_error_codes[self.firmware_state]) )
             raise cSDHErrorInvalidParameter( "SDH firmware reports error %d = %s" % (self.firmware_state, self.firmware_error_codes[self.firmware_state])  )
 
         elif (lines[-1][0] == '@'):
             # it is an debug message (should not happen):
+            self.InvalidateShadow()
             raise cSDHErrorCommunication( "Cannot get SDH firmware state from lines %r" % lines )
 
         else:
@@ -448,24 +713,77 @@ class cSDHSerial( cSDHBase ):
     def Sync( self ):
         '''
         Read all pending lines from SDH to resync execution of PC and SDH.
+        The cached settings, if any, are invalidated.
         '''
-        lines = []
-        # read all lines to ignore (replies of previous commands)
-        while ( self.nb_lines_to_ignore > 0 ):
-            l = self.com.readline()
+        self.lock.acquire()
+        try:
+            self.InvalidateShadow()
+            if ( self.instrumentation is not None ):
+                self.instrumentation.RecordSync()
+            lines = []
+            # read all lines to ignore (replies of previous commands)
+            while ( self.nb_lines_to_ignore > 0 ):
+                l = self.com.readline()
             
-            self.nb_lines_to_ignore -= 1
-            self.dbg.PDM( "syncing: ignoring line %r" % l )
+                self.nb_lines_to_ignore -= 1
+                self.dbg.PDM( "syncing: ignoring line %r" % l )
+
+                # append line l without trailing "\n\r" to lines list
+                if (len(l) > 2):
+                    lines.append( l[:-2] )
+            #---------------------
+            if (lines != []):
+                try:
+                    self.ExtractFirmwareState( lines )
+                except cSDHErrorCommunication,e:
+                    self.dbg.PDM( "syncing: ignoring error from ExtractFirmwareState (%r)", e  )
+        finally:
+            self.lock.release()
+
+    #-----------------------------------------------------------------
+    def InvalidateShadow( self, command=None ):
+        '''
+        Forget the cached values of setting \a command (like "p"), or of
+        all settings if \a command is None. Does nothing if no shadowstate.cShadowState is used.
+        '''
+        if ( self.shadow is not None ):
+            self.shadow.Invalidate( command )
+
+    #-----------------------------------------------------------------
+    def _AxisRequest( self, command, axis=All, value=None ):
+        '''
+        Non public helper function for AxisCommand() and AxisCommands():
+        Return a tuple (s, re_obj, convert) with the command string \a s
+        to send for \a command, \a axis and \a value, the compiled regular
+        expression \a re_obj to match the reply with and the function
+        \a convert that converts the matched group to the value(s) to return.
+        See AxisCommand() for the meaning of the parameters.
+        '''
+        if (type(axis) == int):
+            self.CheckIndex( axis, self.NUMBER_OF_AXES, "axis" )
+            re_obj = self.reply_parser.GetPattern( command, axis )
+            if (value is None):
+                return ("%s(%d)" % (command,axis), re_obj, float)
+            if (type(value) == int):
+                return ("%s(%d)=%d" % (command,axis,value ), re_obj, float)
+            if (type(value) == float):
+                return ("%s(%d)=%f" % (command,axis,value ), re_obj, float)
+
+        if (axis == All):
+            re_obj = self.reply_parser.GetPattern( command )
+            if ( value is None):
+                # ParseNumbers will raise a ValueError exception if not enough data was read
+                return (command, re_obj, replyparser.ParseNumbers)
+
+            # if a single value was given for All axes then create a list of NUMBER_OF_AXES values first:
+            if (type(value) in [int, float]):
+                value = [ value  for ai in self.all_axes ]
+
+            if ( (type(value) in self.vector_types) and len(value) == self.NUMBER_OF_AXES):
+                return ("%s=%f,%f,%f,%f,%f,%f,%f" % ((command,)+tuple(value)), re_obj, replyparser.ParseNumbers)
+
+        raise cSDHErrorInvalidParameter( "Invalid parameter in call' %s(axis = %s, value = %s )'" % (command, repr(axis), repr(value) ) )
 
-            # append line l without trailing "\n\r" to lines list
-            if (len(l) > 2):
-                lines.append( l[:-2] )
-        #---------------------
-        if (lines != []):
-            try:
-                self.ExtractFirmwareState( lines )
-            except cSDHErrorCommunication,e:
-                self.dbg.PDM( "syncing: ignoring error from ExtractFirmwareState (%r)", e  )
 
     #-----------------------------------------------------------------
     def AxisCommand( self, command, axis=All, value=None ):
@@ -481,89 +799,97 @@ class cSDHSerial( cSDHBase ):
           is set for that axis and returned.
         - If axis is All and value is a NUMBER_OF_AXES-vector then all axes
           values are set accordingly, a NUMBER_OF_AXES-list is returned.
+
+        If a shadowstate.cShadowState is used then known settings are
+        returned without asking the SDH and writing a setting the SDH
+        already has is skipped.
         '''
-        #cutoff  = len( command ) + 1
-        #cutoff1 = len( command ) + 4
-        cmd_answer = command.upper()
+        (s, re_obj, convert) = self._AxisRequest( command, axis, value )
+        shadow = self.shadow
+        if ( shadow is not None ):
+            result = shadow.Lookup( command, axis, value )
+            if ( result is not None ):
+                return result
         retries = 3 # retry sending at most this many times
         while (retries > 0):
             try:
-
-                if (type(axis) == int):
-                    self.CheckIndex( axis, self.NUMBER_OF_AXES, "axis" )
-                    if (value is None):
-                        #reply = self.Send( "%s(%d)" % (command,axis) )
-                        #return float( reply[-1][cutoff1:] )
-                        answer = self.SendParse( "%s(%d)" % (command,axis), 
-                                                re.compile("%s\(%d\)=([-+]?(\d+(\.\d*)?|\.\d+)?)" % (cmd_answer,axis)) )
-                        return float( answer )
-                    if (type(value) == int):
-                        #reply = self.Send( "%s(%d)=%d" % (command,axis,value ) )
-                        #return float( reply[-1][cutoff1:] )
-                        answer = self.SendParse( "%s(%d)=%d" % (command,axis,value ),
-                                                 re.compile("%s\(%d\)=([-+]?(\d+(\.\d*)?|\.\d+)?)" % (cmd_answer,axis)) )
-                        return float( answer )
-                    if (type(value) == float):
-                        #reply = self.Send( "%s(%d)=%f" % (command,axis,value ) )
-                        #return float( reply[-1][cutoff1:] )
-                        answer = self.SendParse( "%s(%d)=%f" % (command,axis,value ),
-                                                 re.compile("%s\(%d\)=([-+]?(\d+(\.\d*)?|\.\d+)?)" % (cmd_answer,axis)) )       
-                        return float( answer )
-                
-                if (axis == All):
-                    if ( value is None):
-                        #reply = self.Send( command )
-                        #return eval( "[" + reply[-1][cutoff:] + "]" ) # this will raise an TypeError exception if not enough data was read
-                        answer = self.SendParse( command,
-                                                 re.compile("%s=(.*)" % (cmd_answer)) )
-                        return eval( "[" + answer + "]" ) # this will raise an TypeError exception if not enough data was read  
-                
-                    # if a single value was given for All axes then create a list of NUMBER_OF_AXES values first:
-                    if (type(value) in [int, float]):
-                        value = [ value  for ai in self.all_axes ]
-                
-                    if ( (type(value) in self.vector_types) and len(value) == self.NUMBER_OF_AXES):
-                        #reply = self.Send( "%s=%f,%f,%f,%f,%f,%f,%f" % ((command,)+tuple(value)) )
-                        #self.dbg.var( "command reply cutoff" )
-                        #return eval( "[" + reply[-1][cutoff:] + "]" )
-                        #self.dbg.var( "command reply cutoff" )
-                        #return eval( "[" + reply[-1][cutoff:] + "]" )
-                        answer = self.SendParse( "%s=%f,%f,%f,%f,%f,%f,%f" % ((command,)+tuple(value)),
-                                                 re.compile( "%s=(.*)" % (cmd_answer)) )
-                        self.dbg.var( "command answer cmd_answer" )
-                        return eval( "[" + answer + "]" )
-                
-                raise cSDHErrorInvalidParameter( "Invalid parameter in call' %s(axis = %s, value = %s )'" % (command, repr(axis), repr(value) ) )
+                answer = self.SendParse( s, re_obj )
+                result = convert( answer )
+                if ( shadow is not None ):
+                    shadow.Store( command, axis, value, result )
+                return result
             
     	    # end of try
-            except TypeError,e:
-                # these errors seem to happen on linux only (not cygwin) where a reply can be partly received:
+            except ValueError,e:
+                # these errors happen if a reply was received only partly
+                # (seen on linux and on windows if CAN is used):
         
                 # assume some communication error occured, so retry:
                 retries -= 1
                 if (retries > 0):
-                    self.dbg << "ignoring TypeError: " << e << "\n" # pylint: disable-msg=W0104
+                    self.dbg << "ignoring ValueError: " << e << "\n" # pylint: disable-msg=W0104
+                    if ( self.instrumentation is not None ):
+                        self.instrumentation.RecordRetry()
                 
                 # resync first:
                 self.Sync()
                 #now start over again
-            except SyntaxError,e:
-                # these errors happen on windows if CAN is used, so a reply can be partly received:
         
-                # assume some communication error occured, so retry:
+        
+            # end of except
+        
+        # end of while (retries > 0) 
+        
+        self.dbg << "Retried sending, but still got errors from SDH!\n" # pylint: disable-msg=W0104
+        # reraise e:
+        raise 
+
+
+    #-----------------------------------------------------------------
+    def AxisCommands( self, requests ):
+        '''
+        Pipelined version of AxisCommand(): \a requests is a list of tuples
+        (command, axis, value) with parameters like for AxisCommand().
+        All commands are sent to the SDH at once and the replies are matched
+        back in order, see SendParseMany(). So e.g. the actual angles,
+        velocities and states of all axes can be read with a single round
+        trip to the SDH:
+        \code
+          (angles, velocities, states) = self.AxisCommands( [ ("p", All, None), ("vel", All, None), ("state", All, None) ] )
+        \endcode
+
+        Return a list with the result of each request, like returned by AxisCommand().
+        '''
+        prepared = [ self._AxisRequest( command, axis, value ) for (command, axis, value) in requests ]
+        shadow = self.shadow
+        results = [ None ] * len( requests )
+        if ( shadow is not None ):
+            # only send the requests that cannot be answered from the cache:
+            for (i, (command, axis, value)) in enumerate( requests ):
+                results[i] = shadow.Lookup( command, axis, value )
+        to_send = [ i for (i, r) in enumerate( results ) if r is None ]
+        if ( not to_send ):
+            return results
+        retries = 3 # retry sending at most this many times
+        while (retries > 0):
+            try:
+                answers = self.SendParseMany( [ prepared[i][:2] for i in to_send ] )
+                for (i, answer) in zip( to_send, answers ):
+                    results[i] = prepared[i][2]( answer )
+                    if ( shadow is not None ):
+                        (command, axis, value) = requests[i]
+                        shadow.Store( command, axis, value, results[i] )
+                return results
+            except ValueError,e:
+                # a reply was only partly received (see AxisCommand()), so retry:
                 retries -= 1
                 if (retries > 0):
-                    self.dbg << "ignoring SyntaxError: " << e << "\n" # pylint: disable-msg=W0104
+                    self.dbg << "ignoring ValueError: " << e << "\n" # pylint: disable-msg=W0104
                 
                 # resync first:
                 self.Sync()
                 #now start over again
         
-        
-            # end of except
-        
-        # end of while (retries > 0) 
-        
         self.dbg << "Retried sending, but still got errors from SDH!\n" # pylint: disable-msg=W0104
         # reraise e:
         raise 
@@ -598,10 +924,10 @@ class cSDHSerial( cSDHBase ):
 
         if (p is None and i is None and d is None):
             reply = self.Send( "pid(%d)" % (axis) )
-            return eval( "[" + reply[0][7:] + "]" )
+            return replyparser.ParseNumbers( reply[0][7:] )
         if (type(p) in (int,float) and type(i) in (int,float) and type(d) in (int,float)):
             reply = self.Send( "pid(%d)=%f,%f,%f" % (axis,p,i,d) )
-            return eval( "[" + reply[0][7:] + "]" )
+            return replyparser.ParseNumbers( reply[0][7:] )
 
         raise cSDHErrorInvalidParameter( "Invalid parameter in call' pid(axis=%s, p=%s, i=%s, d=%s )'" % (repr(axis), repr(p),repr(i), repr(d)) )
 
@@ -904,6 +1230,8 @@ class cSDHSerial( cSDHBase ):
         elif (type( angle ) in self.vector_types):
             self.CheckRange( angle, self.min_angle_a, self.max_angle_a, "axis angle" )
             
+        if ( angle is not None ):
+            self.InvalidateShadow( "p" )
         return self.AxisCommand( "tpap", axis, angle )
 
     #-----------------------------------------------------------------
@@ -933,6 +1261,8 @@ class cSDHSerial( cSDHBase ):
         elif (type( velocity ) in self.vector_types):
             self.CheckRange( velocity, self.min_angular_velocity_a, self.max_angular_velocity_a, "axis velocity" )
             
+        if ( velocity is not None ):
+            self.InvalidateShadow( "v" )
         return self.AxisCommand( "tvav", axis, velocity )
 
     #-----------------------------------------------------------------
@@ -1023,6 +1353,8 @@ class cSDHSerial( cSDHBase ):
 
         Will NOT interrupt a previous "selgrip" or "grip" command, only an "m" command!
         '''
+        # the SDH firmware sets the actual angles as target angles:
+        self.InvalidateShadow( "p" )
         self.Send( "stop" )
 
     #-----------------------------------------------------------------
@@ -1036,14 +1368,23 @@ class cSDHSerial( cSDHBase ):
         '''
         if (type( velocity_profile  ) in (int, float)):
             self.CheckIndex( velocity_profile, len(self.eVelocityProfile), "velocity profile type" )
-            reply = self.Send( "vp=%d" % (velocity_profile) )
+            command = "vp=%d" % (velocity_profile)
             
         elif (velocity_profile is None):
-            reply = self.Send( "vp" )
+            command = "vp"
         else:
             raise cSDHErrorInvalidParameter( "Invalid paramter type %s for velocity_profile! (Not in [int, None])" % (type(velocity_profile)) )
-        
+
+        if ( self.shadow is not None ):
+            vp = self.shadow.LookupSetting( "vp", velocity_profile )
+            if ( vp is not None ):
+                self.actual_vp = vp
+                return vp
+
+        reply = self.Send( command )
         self.actual_vp = int( reply[-1][3:] )
+        if ( self.shadow is not None ):
+            self.shadow.StoreSetting( "vp", velocity_profile, self.actual_vp )
         
         return self.actual_vp
 
@@ -1059,14 +1400,26 @@ class cSDHSerial( cSDHBase ):
         '''
         if (type( controller  ) in (int, float)):
             self.CheckIndex( controller, len(self.eControllerType), "controller type" )
-            reply = self.Send( "con=%d" % (controller) )
+            command = "con=%d" % (controller)
             
         elif (controller is None):
-            reply = self.Send( "con" )
+            command = "con"
         else:
             raise cSDHErrorInvalidParameter( "Invalid paramter type %s for controller! (Not in [int, None])" % (type(controller)) )
-        
+
+        if ( self.shadow is not None ):
+            con = self.shadow.LookupSetting( "con", controller )
+            if ( con is not None ):
+                self.actual_con = con
+                return con
+            if ( controller is not None ):
+                # changing the controller type changes the meaning of the other settings
+                self.shadow.Invalidate()
+
+        reply = self.Send( command )
         self.actual_con = int( reply[-1][4:] )
+        if ( self.shadow is not None ):
+            self.shadow.StoreSetting( "con", controller, self.actual_con )
         
         return self.actual_con
 
@@ -1185,7 +1538,7 @@ class cSDHSerial( cSDHBase ):
         Returns a list of the actual controller and driver temperature in degrees celsius.
         '''
         reply = self.Send( "temp" )
-        return eval( "[" + reply[0][5:] + "]" )
+        return replyparser.ParseNumbers( reply[0][5:] )
 
     #-----------------------------------------------------------------
     def p_min( self, axis=All, angle=None ):
@@ -1403,6 +1756,9 @@ class cSDHSerial( cSDHBase ):
 
         self.CheckIndex( grip, self.NUMBER_OF_GRIPS, "grip" )
 
+        # the grip changes target angles, velocities and current limits:
+        self.InvalidateShadow()
+
         #---------------------
         # settings for sequ/non-sequ:
         nb_lines_total = 1
@@ -1451,6 +1807,9 @@ class cSDHSerial( cSDHBase ):
         self.CheckRange( close, 0.0, 1.0, "close ratio" )
         self.CheckRange( velocity, 0.0+self.eps, 100.0, "velocity" )
         
+        # the grip changes target angles, velocities and current limits:
+        self.InvalidateShadow()
+
         #---------------------
         # set velocity profile if wrong or unknown
         try:
@@ -0,0 +1,750 @@
+# -*- coding: latin-1 -*-
+#######################################################################
+#
+## \file
+#  \section sdhlibrary_python_sdhsim_py_general General file information
+#
+#  \brief
+#    Simulation of the SDH firmware, served via TCP.
+#
+#  \section sdhlibrary_python_sdhsim_py_copyright Copyright
+#
+#  Copyright (c) 2007 SCHUNK GmbH & Co. KG
+#
+#######################################################################
+
+
+#######################################################################
+## \anchor sdhlibrary_python_sdhsim_py_python_vars
+#  \name   Python specific variables
+#
+#  Some definitions that describe the module for python.
+#
+#  @{
+
+__doc__       = "Simulation of the SDH firmware, served via TCP."
+__url__       = "http://www.schunk.com"
+__copyright__ = "Copyright (c) 2007 SCHUNK GmbH & Co. KG"
+
+#  end of doxygen name group sdhlibrary_python_sdhsim_py_python_vars
+#  @}
+######################################################################
+
+#######################################################################
+## \package sdhsim
+#
+#  \brief
+#    A cSDHSimulator answers the ASCII commands of the SDH firmware
+#    like a real SDH connected via TCP, so cSDH (with the \c --tcp
+#    command line option) and all scripts can be used without a hand,
+#    e.g. to measure the communication and WaitAxis() reproducibly.
+#
+#    The simulated axes follow the commands with simple dynamics:
+#    - eCT_POSE: the \c m command moves all enabled axes synchronously
+#      to their target angles with the velocity profile set by \c vp,
+#      the duration is that of collision.MovementDuration().
+#    - eCT_VELOCITY: enabled axes move with their target velocity.
+#    - eCT_VELOCITY_ACCELERATION: enabled axes approach their target
+#      velocity with their target acceleration.
+#    Axes stop at their angle limits. The actual angles, velocities
+#    and states are computed from the elapsed time whenever they are
+#    requested, so no thread is needed for the simulation itself.
+#
+#    The transmission can be made more realistic with these options:
+#    - \c "latency" : delay in seconds of each reply line. Replies of
+#      pipelined commands are delayed concurrently, like by the network.
+#    - \c "jitter" : a random delay between 0 and jitter seconds added
+#      to the latency of each reply line.
+#    - \c "line_time" : time in seconds to process a command, the
+#      commands are processed one after the other like in the firmware.
+#    - \c "error_rate" : probability that a command is not executed but
+#      answered with the error reply of \c "error_code".
+#    - \c "drop_rate" : probability that a reply line is lost.
+#    - \c "seed" : seed of the random numbers for jitter and errors.
+#
+#    Example:
+#    \code
+#      simulator = sdh.sdhsim.cSDHSimulator( dict( latency=0.002 ) )
+#      (tcp_adr, tcp_port) = simulator.Start()
+#      hand = sdh.cSDH()
+#      hand.Open( dict( usetcp=True, tcp_adr=tcp_adr, tcp_port=tcp_port ) )
+#    \endcode
+#    or start the script demo-sdh-simulator.py and use the \c --tcp
+#    option of the other scripts.
+#
+#######################################################################
+
+import re
+import math
+import time
+import random
+import socket
+import threading
+import Queue
+import SocketServer
+
+from .sdhbase import cSDHBase
+from . import collision
+from . import release
+from . import utils
+
+
+#-----------------------------------------------------------------
+def _Profile( velocity_profile, tau, fraction ):
+    '''
+    Return a tuple (s, ds) with the fraction s of the path covered at time
+    fraction \a tau of a movement with \a velocity_profile and its derivative
+    ds with respect to \a tau. Scalar version of collision.PathFraction().
+    '''
+    tau = min( max( tau, 0.0 ), 1.0 )
+    if ( velocity_profile == collision.eVP_RAMP ):
+        f = min( max( fraction, 1e-9 ), 0.5 )
+        scale = 1.0 / (2.0 * f * (1.0 - f))
+        if ( tau < f ):
+            return ( tau * tau * scale, 2.0 * tau * scale )
+        if ( tau > 1.0 - f ):
+            return ( 1.0 - (1.0 - tau) * (1.0 - tau) * scale, 2.0 * (1.0 - tau) * scale )
+        return ( (tau - f / 2.0) / (1.0 - f), 1.0 / (1.0 - f) )
+    return ( tau - math.sin( 2.0 * math.pi * tau ) / (2.0 * math.pi), 1.0 - math.cos( 2.0 * math.pi * tau ) )
+
+
+#=====================================================================
+## \brief Simulation of the firmware of an SDH, see \ref sdhsim "the package description".
+#
+#  <hr>
+class cSDHSimulator( cSDHBase ):
+    '''
+    Simulation of the firmware of an SDH, answering the ASCII commands
+    of the SDH firmware via TCP. See html/pdf documentation for details.
+    '''
+    ## regular expression to split a command line into name, axis index and parameters
+    re_command = re.compile( r"^([a-z_]+)(?:\((\d+)\))?(?:=(.*))?$" )
+
+    ## the settings per axis that can be read and written
+    SETTINGS = ( "p", "v", "a", "p_min", "p_max", "p_offset", "power", "igrip", "ihold", "ilim", "kv" )
+
+    ## the settings that are integer flags
+    INT_SETTINGS = ( "power", "pos_save", "ref" )
+
+    #-----------------------------------------------------------------
+    ## Constructor of cSDHSimulator class
+    #
+    #  \param self    - reference to the object itself
+    #  \param options - a dictionary of additional settings:
+    #  - \c "tcp_adr", \c "tcp_port" : the address to listen at, the default
+    #    port 0 selects a free port, see Start()
+    #  - \c "latency", \c "jitter", \c "line_time", \c "error_rate",
+    #    \c "error_code", \c "drop_rate", \c "seed" : see \ref sdhsim "the package description"
+    #  - and the settings of cSDHBase
+    #
+    def __init__( self, options=None ):
+        '''
+        Constructor of cSDHSimulator class, see html/pdf documentation for details.
+        '''
+        default_options = dict( tcp_adr="127.0.0.1", tcp_port=0,
+                                latency=0.0, jitter=0.0, line_time=0.0,
+                                error_rate=0.0, error_code=None, drop_rate=0.0, seed=None )
+        if ( options ):   default_options.update( options )
+        cSDHBase.__init__( self, default_options )
+        if ( self.options[ "error_code" ] is None ):
+            self.options[ "error_code" ] = self.eErrorCode[ "E_CMD_FAILED" ]
+
+        ## random numbers for the jitter and the injected errors
+        self.random = random.Random( self.options[ "seed" ] )
+
+        ## the lock to serialize the commands of all connections
+        self.lock = threading.Lock()
+
+        self._server = None
+        self._thread = None
+
+        nb_axes = self.NUMBER_OF_AXES
+        ## the values of the settings per axis, see SETTINGS
+        self.settings = dict( p        = [ 0.0 ] * nb_axes,
+                              v        = [ 40.0 ] * nb_axes,
+                              a        = [ 100.0 ] * nb_axes,
+                              p_min    = list( self.min_angle_a ),
+                              p_max    = list( self.max_angle_a ),
+                              p_offset = [ 0.0 ] * nb_axes,
+                              power    = [ 0 ] * nb_axes,
+                              igrip    = [ 0.5 ] * nb_axes,
+                              ihold    = [ 0.1 ] * nb_axes,
+                              ilim     = [ 0.5 ] * nb_axes,
+                              kv       = [ 1.0 ] * nb_axes )
+        ## the PID controller parameters per axis
+        self.pid = [ [ 0.5, 0.0, 0.0 ] for ai in self.all_axes ]
+        ## the actual angles of the axes
+        self.actual_angles = [ 0.0 ] * nb_axes
+        ## the actual velocities of the axes
+        self.actual_velocities = [ 0.0 ] * nb_axes
+        ## the actual axis controller type
+        self.controller = self.eControllerType[ "eCT_POSE" ]
+        ## the actual velocity profile
+        self.velocity_profile = self.eVelocityProfile[ "eVP_SIN_SQUARE" ]
+        ## the values of the properties like \c "user_errors"
+        self.properties = dict( demo=0, user_errors=0, terminal=0, debug=0 )
+
+        ## the movement started by the last \c m command, None if no movement is running
+        self._movement = None
+        ## the axes that are stopped at an angle limit
+        self._limited = [ False ] * nb_axes
+        ## the time the actual angles and velocities were computed for
+        self._time = time.time()
+
+        ## the commands that are not axis settings
+        self._commands = dict( m=self._Move, get_duration=self._GetDuration, stop=self._Stop,
+                               vp=self._VelocityProfile, con=self._Controller, pid=self._PID,
+                               pos=self._ReadOnly, vel=self._ReadOnly, rvel=self._ReadOnly, state=self._ReadOnly,
+                               vlim=self._ReadOnly, alim=self._ReadOnly,
+                               tpap=self._SetGet, tvav=self._SetGet,
+                               pos_save=self._SetOnly, ref=self._SetOnly,
+                               temp=self._Info, ver=self._Info, ver_date=self._Info, id=self._Info,
+                               sn=self._Info, soc=self._Info, soc_date=self._Info, numaxis=self._Info,
+                               demo=self._Property, user_errors=self._Property, terminal=self._Property,
+                               debug=self._Property )
+
+    #-----------------------------------------------------------------
+    ## Start serving the simulated SDH via TCP in a background thread.
+    #
+    #  \return a tuple (tcp_adr, tcp_port) with the address to connect to
+    #
+    def Start( self ):
+        '''
+        Start serving the simulated SDH via TCP in a background thread.
+        Return a tuple (tcp_adr, tcp_port) with the address to connect to.
+        '''
+        address = self._CreateServer()
+        self._thread = threading.Thread( target=self._server.serve_forever, name="cSDHSimulator" )
+        self._thread.daemon = True
+        self._thread.start()
+        return address
+
+    #-----------------------------------------------------------------
+    ## Serve the simulated SDH via TCP until Stop() is called from another
+    #  thread or the process is interrupted.
+    #
+    def Serve( self ):
+        '''
+        Serve the simulated SDH via TCP until Stop() is called or the process is interrupted.
+        '''
+        self._CreateServer()
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    #-----------------------------------------------------------------
+    ## Stop serving, close the listening socket.
+    #
+    def Stop( self ):
+        '''
+        Stop serving, close the listening socket.
+        '''
+        if ( self._server is None ):
+            return
+        self._server.shutdown()
+        if ( self._thread is not None ):
+            self._thread.join()
+            self._server.server_close()
+            self._thread = None
+        self._server = None
+
+    #-----------------------------------------------------------------
+    def _CreateServer( self ):
+        '''
+        Non public helper function: create the TCP server and return its
+        address as tuple (tcp_adr, tcp_port).
+        '''
+        self._server = _cServer( (self.options[ "tcp_adr" ], self.options[ "tcp_port" ]), _cRequestHandler )
+        self._server.simulator = self
+        address = self._server.server_address
+        self.dbg << "SDH simulator listening at %s:%d\n" % address # pylint: disable-msg=W0104
+        return address
+
+    #-----------------------------------------------------------------
+    ## Execute the command \a line like the SDH firmware.
+    #
+    #  \param self - reference to the object itself
+    #  \param line - the command line without end of line characters, like "p(3)=10.0"
+    #  \return the list of reply lines. An empty \a line gives an empty list.
+    #
+    #  This method can be called from several threads. The injected errors
+    #  and the delays of the transmission are not applied here.
+    #
+    def Execute( self, line ):
+        '''
+        Execute the command \a line like the SDH firmware, return the list of reply lines.
+        '''
+        line = line.strip()
+        if ( line == "" ):
+            return []
+        mo = self.re_command.match( line )
+        if ( mo is None ):
+            return [ self._Error( "E_CMD_FORMAT_ERROR" ) ]
+        (command, axis, parameters) = mo.groups()
+        if ( axis is not None ):
+            axis = int( axis )
+            if ( axis >= self.NUMBER_OF_AXES ):
+                return [ self._Error( "E_INDEX_OUT_OF_BOUNDS" ) ]
+        if ( parameters is not None ):
+            try:
+                parameters = [ float( v ) for v in parameters.split( "," ) ]
+            except ValueError:
+                return [ self._Error( "E_CMD_FORMAT_ERROR" ) ]
+
+        with self.lock:
+            self._Update( time.time() )
+            if ( command in self.SETTINGS ):
+                return self._Setting( command, axis, parameters )
+            try:
+                handler = self._commands[ command ]
+            except KeyError:
+                return [ self._Error( "E_CMD_UNKNOWN" ) ]
+            return handler( command, axis, parameters )
+
+    #-----------------------------------------------------------------
+    def _Error( self, name ):
+        '''
+        Non public helper function: return the error reply for the error code \a name.
+        '''
+        return "E%d" % self.eErrorCode[ name ]
+
+    #-----------------------------------------------------------------
+    def _Reply( self, command, axis, values ):
+        '''
+        Non public helper function: return the reply line for axis
+        command \a command with the \a values of all axes.
+        '''
+        if ( command in self.INT_SETTINGS  or  command == "state" ):
+            text = [ "%d" % v for v in values ]
+        else:
+            text = [ "%.3f" % v for v in values ]
+        if ( axis is None ):
+            return "%s=%s" % (command.upper(), ",".join( text ))
+        return "%s(%d)=%s" % (command.upper(), axis, text[ axis ])
+
+    #-----------------------------------------------------------------
+    def _Store( self, command, axis, parameters ):
+        '''
+        Non public helper function: check and store \a parameters for
+        setting \a command of \a axis (None for all axes).
+        Return None on success or the error reply.
+        '''
+        values = self.settings[ command ]
+        if ( axis is None ):
+            if ( len( parameters ) != self.NUMBER_OF_AXES ):
+                return self._Error( "E_NOT_ENOUGH_PARAMS" )
+            axes = self.all_axes
+        else:
+            if ( len( parameters ) != 1 ):
+                return self._Error( "E_CMD_FORMAT_ERROR" )
+            axes = [ axis ]
+        for (ai, value) in zip( axes, parameters ):
+            (low, high) = self._Range( command, ai )
+            if ( value < low  or  value > high ):
+                return self._Error( "E_RANGE_ERROR" )
+        for (ai, value) in zip( axes, parameters ):
+            if ( command in self.INT_SETTINGS ):
+                value = int( value )
+            values[ ai ] = value
+            if ( command == "v" ):
+                self._limited[ ai ] = False
+        return None
+
+    #-----------------------------------------------------------------
+    def _Range( self, command, ai ):
+        '''
+        Non public helper function: return the tuple (low, high) of the
+        valid values for setting \a command of axis \a ai.
+        '''
+        if ( command == "p" ):
+            return ( self.settings[ "p_min" ][ ai ], self.settings[ "p_max" ][ ai ] )
+        if ( command == "v" ):
+            vlim = self.max_angular_velocity_a[ ai ]
+            if ( self.controller == self.eControllerType[ "eCT_POSE" ] ):
+                return ( 0.0, vlim )
+            return ( -vlim, vlim )
+        if ( command == "a" ):
+            return ( 0.0, self.max_angular_acceleration_a[ ai ] )
+        if ( command in ("p_min", "p_max") ):
+            return ( self.min_angle_a[ ai ], self.max_angle_a[ ai ] )
+        if ( command in ("power", "pos_save") ):
+            return ( 0, 1 )
+        if ( command == "ref" ):
+            return ( 0, 2 )
+        if ( command in ("igrip", "ihold", "ilim") ):
+            return ( 0.0, 1.0 )
+        return ( -1e9, 1e9 )
+
+    #-----------------------------------------------------------------
+    def _Setting( self, command, axis, parameters ):
+        '''
+        Non public helper function: get/set the axis setting \a command.
+        '''
+        if ( parameters is not None ):
+            error = self._Store( command, axis, parameters )
+            if ( error is not None ):
+                return [ error ]
+        return [ self._Reply( command, axis, self.settings[ command ] ) ]
+
+    #-----------------------------------------------------------------
+    def _ReadOnly( self, command, axis, parameters ):
+        '''
+        Non public helper function: get the actual values \a command of the axes.
+        '''
+        if ( parameters is not None ):
+            return [ self._Error( "E_NO_PARAMS_EXPECTED" ) ]
+        return [ self._Reply( command, axis, self._ActualValues( command ) ) ]
+
+    #-----------------------------------------------------------------
+    def _SetGet( self, command, axis, parameters ):
+        '''
+        Non public helper function: the combined commands \c tpap (set target
+        angle, get actual angle) and \c tvav (set target velocity, get actual velocity).
+        '''
+        (setting, actual) = dict( tpap=("p", "pos"), tvav=("v", "vel") )[ command ]
+        if ( parameters is not None ):
+            error = self._Store( setting, axis, parameters )
+            if ( error is not None ):
+                return [ error ]
+        return [ self._Reply( command, axis, self._ActualValues( actual ) ) ]
+
+    #-----------------------------------------------------------------
+    def _SetOnly( self, command, axis, parameters ):
+        '''
+        Non public helper function: the commands \c pos_save and \c ref
+        which have no effect in the simulation.
+        '''
+        if ( parameters is None ):
+            return [ self._Error( "E_NOT_ENOUGH_PARAMS" ) ]
+        if ( axis is None  and  len( parameters ) != self.NUMBER_OF_AXES ):
+            return [ self._Error( "E_NOT_ENOUGH_PARAMS" ) ]
+        for (i, value) in enumerate( parameters ):
+            (low, high) = self._Range( command, i if axis is None else axis )
+            if ( value < low  or  value > high ):
+                return [ self._Error( "E_RANGE_ERROR" ) ]
+        values = [ 0 ] * self.NUMBER_OF_AXES
+        if ( axis is None ):
+            values = parameters
+        else:
+            values[ axis ] = parameters[ 0 ]
+        return [ self._Reply( command, axis, values ) ]
+
+    #-----------------------------------------------------------------
+    def _ActualValues( self, command ):
+        '''
+        Non public helper function: return the list of actual values \a command of all axes.
+        '''
+        if ( command == "pos" ):
+            return self.actual_angles
+        if ( command in ("vel", "rvel") ):
+            return self.actual_velocities
+        if ( command == "vlim" ):
+            return self.max_angular_velocity_a
+        if ( command == "alim" ):
+            return self.max_angular_acceleration_a
+        return [ self._State( ai ) for ai in self.all_axes ]
+
+    #-----------------------------------------------------------------
+    def _State( self, ai ):
+        '''
+        Non public helper function: return the state of axis \a ai, see eAxisState.
+        '''
+        if ( not self.settings[ "power" ][ ai ] ):
+            return self.eAxisState[ "eAS_DISABLED" ]
+        if ( self._limited[ ai ] ):
+            return self.eAxisState[ "eAS_LIMITS_REACHED" ]
+        if ( self.controller == self.eControllerType[ "eCT_POSE" ] ):
+            if ( self._movement is not None  and  self._movement.delta[ ai ] != 0.0 ):
+                return self.eAxisState[ "eAS_POSITIONING" ]
+        elif ( self.actual_velocities[ ai ] != 0.0  or  self.settings[ "v" ][ ai ] != 0.0 ):
+            return self.eAxisState[ "eAS_SPEED_MODE" ]
+        return self.eAxisState[ "eAS_IDLE" ]
+
+    #-----------------------------------------------------------------
+    def _Duration( self ):
+        '''
+        Non public helper function: return a tuple (T, f, delta) with the duration
+        T and the acceleration fraction f of a movement of the enabled axes to
+        their target angles and the list of distances \a delta to move.
+        '''
+        delta = [ 0.0 ] * self.NUMBER_OF_AXES
+        for ai in self.all_axes:
+            if ( self.settings[ "power" ][ ai ] ):
+                delta[ ai ] = self.settings[ "p" ][ ai ] - self.actual_angles[ ai ]
+        (T, f) = collision.MovementDuration( self.velocity_profile, delta, self.settings[ "v" ], self.settings[ "a" ] )
+        return (T, f, delta)
+
+    #-----------------------------------------------------------------
+    def _Move( self, command, axis, parameters ):
+        '''
+        Non public helper function: the command \c m, start a movement of the
+        enabled axes to their target angles (in eCT_POSE only).
+        '''
+        if ( axis is not None  or  parameters is not None ):
+            return [ self._Error( "E_NO_PARAMS_EXPECTED" ) ]
+        if ( self.controller != self.eControllerType[ "eCT_POSE" ] ):
+            # in the velocity based controllers the axes follow their target velocities anyway
+            return [ "M=0.000" ]
+        (T, f, delta) = self._Duration()
+        if ( math.isinf( T ) ):
+            return [ self._Error( "E_INVALID_PARAMETER" ) ]
+        self._movement = None
+        if ( T > 0.0 ):
+            self._movement = utils.Struct( start=list( self.actual_angles ), delta=delta,
+                                           t0=self._time, T=T, fraction=f,
+                                           velocity_profile=self.velocity_profile )
+        return [ "M=%.3f" % T ]
+
+    #-----------------------------------------------------------------
+    def _GetDuration( self, command, axis, parameters ):
+        '''
+        Non public helper function: the command \c get_duration.
+        '''
+        if ( axis is not None  or  parameters is not None ):
+            return [ self._Error( "E_NO_PARAMS_EXPECTED" ) ]
+        (T, f, delta) = self._Duration() # pylint: disable-msg=W0612
+        if ( math.isinf( T ) ):
+            return [ self._Error( "E_INVALID_PARAMETER" ) ]
+        return [ "GET_DURATION=%.3f" % T ]
+
+    #-----------------------------------------------------------------
+    def _Stop( self, command, axis, parameters ):
+        '''
+        Non public helper function: the command \c stop. The actual angles
+        become the target angles, in the velocity based controllers the
+        target velocities are set to 0.
+        '''
+        if ( axis is not None  or  parameters is not None ):
+            return [ self._Error( "E_NO_PARAMS_EXPECTED" ) ]
+        self._Halt()
+        self.settings[ "p" ] = list( self.actual_angles )
+        return [ "STOP" ]
+
+    #-----------------------------------------------------------------
+    def _Halt( self ):
+        '''
+        Non public helper function: stop all axes immediately.
+        '''
+        self._movement = None
+        self.actual_velocities = [ 0.0 ] * self.NUMBER_OF_AXES
+        if ( self.controller != self.eControllerType[ "eCT_POSE" ] ):
+            self.settings[ "v" ] = [ 0.0 ] * self.NUMBER_OF_AXES
+
+    #-----------------------------------------------------------------
+    def _VelocityProfile( self, command, axis, parameters ):
+        '''
+        Non public helper function: get/set the velocity profile with \c vp.
+        '''
+        if ( axis is not None ):
+            return [ self._Error( "E_CMD_FORMAT_ERROR" ) ]
+        if ( parameters is not None ):
+            if ( len( parameters ) != 1  or  int( parameters[0] ) not in self.eVelocityProfile.values() ):
+                return [ self._Error( "E_RANGE_ERROR" ) ]
+            self.velocity_profile = int( parameters[0] )
+        return [ "VP=%d" % self.velocity_profile ]
+
+    #-----------------------------------------------------------------
+    def _Controller( self, command, axis, parameters ):
+        '''
+        Non public helper function: get/set the controller type with \c con.
+        Changing the controller type stops all axes.
+        '''
+        if ( axis is not None ):
+            return [ self._Error( "E_CMD_FORMAT_ERROR" ) ]
+        if ( parameters is not None ):
+            if ( len( parameters ) != 1  or  int( parameters[0] ) not in self.eControllerType.values() ):
+                return [ self._Error( "E_RANGE_ERROR" ) ]
+            controller = int( parameters[0] )
+            if ( controller != self.controller ):
+                self._Halt()
+                self.controller = controller
+                if ( controller != self.eControllerType[ "eCT_POSE" ] ):
+                    self.settings[ "v" ] = [ 0.0 ] * self.NUMBER_OF_AXES
+                self._limited = [ False ] * self.NUMBER_OF_AXES
+        return [ "CON=%d" % self.controller ]
+
+    #-----------------------------------------------------------------
+    def _PID( self, command, axis, parameters ):
+        '''
+        Non public helper function: get/set the PID controller parameters of an axis.
+        '''
+        if ( axis is None ):
+            return [ self._Error( "E_CMD_FORMAT_ERROR" ) ]
+        if ( parameters is not None ):
+            if ( len( parameters ) != 3 ):
+                return [ self._Error( "E_NOT_ENOUGH_PARAMS" ) ]
+            self.pid[ axis ] = parameters
+        return [ "PID(%d)=%s" % (axis, ",".join( [ "%.3f" % v for v in self.pid[ axis ] ] )) ]
+
+    #-----------------------------------------------------------------
+    def _Info( self, command, axis, parameters ):
+        '''
+        Non public helper function: the identification commands and \c temp.
+        '''
+        if ( axis is not None  or  parameters is not None ):
+            return [ self._Error( "E_NO_PARAMS_EXPECTED" ) ]
+        if ( command == "temp" ):
+            values = ",".join( [ "%.1f" % 38.0 ] * self.NUMBER_OF_TEMPERATURE_SENSORS )
+        elif ( command == "numaxis" ):
+            values = "%d" % self.NUMBER_OF_AXES
+        elif ( command in ("ver", "soc") ):
+            values = release.FIRMWARE_RELEASE_RECOMMENDED
+        elif ( command in ("ver_date", "soc_date") ):
+            values = "simulated"
+        else:
+            values = "0"
+        return [ "%s=%s" % (command.upper(), values) ]
+
+    #-----------------------------------------------------------------
+    def _Property( self, command, axis, parameters ):
+        '''
+        Non public helper function: the properties like \c demo or \c user_errors.
+        '''
+        if ( axis is not None  or  parameters is None  or  len( parameters ) != 1 ):
+            return [ self._Error( "E_CMD_FORMAT_ERROR" ) ]
+        self.properties[ command ] = int( parameters[0] )
+        return [ "%s=%d" % (command.upper(), self.properties[ command ]) ]
+
+    #-----------------------------------------------------------------
+    def _Update( self, now ):
+        '''
+        Non public helper function: compute the actual angles and velocities
+        of the axes at time \a now.
+        '''
+        dt = now - self._time
+        self._time = now
+        if ( dt <= 0.0 ):
+            return
+
+        if ( self.controller == self.eControllerType[ "eCT_POSE" ] ):
+            movement = self._movement
+            if ( movement is None ):
+                return
+            tau = (now - movement.t0) / movement.T
+            (s, ds) = _Profile( movement.velocity_profile, tau, movement.fraction )
+            for ai in self.all_axes:
+                d = movement.delta[ ai ]
+                if ( d != 0.0 ):
+                    self.actual_angles[ ai ] = movement.start[ ai ] + d * s
+                    self.actual_velocities[ ai ] = d * ds / movement.T
+            if ( tau >= 1.0 ):
+                self._movement = None
+                self.actual_velocities = [ 0.0 ] * self.NUMBER_OF_AXES
+            return
+
+        ramp = ( self.controller == self.eControllerType[ "eCT_VELOCITY_ACCELERATION" ] )
+        for ai in self.all_axes:
+            if ( not self.settings[ "power" ][ ai ]  or  self._limited[ ai ] ):
+                self.actual_velocities[ ai ] = 0.0
+                continue
+            v0 = self.actual_velocities[ ai ]
+            v1 = self.settings[ "v" ][ ai ]
+            t_ramp = 0.0
+            if ( ramp  and  v1 != v0 ):
+                a = self.settings[ "a" ][ ai ]
+                t_ramp = abs( v1 - v0 ) / a if ( a > 0.0 ) else float( "inf" )
+                if ( t_ramp > dt ):
+                    v1 = v0 + math.copysign( a * dt, v1 - v0 )
+                    t_ramp = dt
+            angle = self.actual_angles[ ai ] + (v0 + v1) / 2.0 * t_ramp + v1 * (dt - t_ramp)
+            low = self.settings[ "p_min" ][ ai ]
+            high = self.settings[ "p_max" ][ ai ]
+            if ( angle < low  or  angle > high ):
+                angle = min( max( angle, low ), high )
+                v1 = 0.0
+                self._limited[ ai ] = True
+            self.actual_angles[ ai ] = angle
+            self.actual_velocities[ ai ] = v1
+
+    #-----------------------------------------------------------------
+    def _Delay( self ):
+        '''
+        Non public helper function: return the delay of a reply line in seconds.
+        '''
+        delay = self.options[ "latency" ]
+        if ( self.options[ "jitter" ] > 0.0 ):
+            delay += self.random.uniform( 0.0, self.options[ "jitter" ] )
+        return delay
+
+# end of class cSDHSimulator
+#=====================================================================
+
+
+#=====================================================================
+class _cServer( SocketServer.ThreadingTCPServer ):
+    '''
+    Non public helper class: the TCP server of a cSDHSimulator, one thread per connection.
+    '''
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+#=====================================================================
+class _cRequestHandler( SocketServer.StreamRequestHandler ):
+    '''
+    Non public helper class: handle one connection to a cSDHSimulator.
+    The commands are executed when received, the reply lines are sent by
+    a second thread at the time given by the latency and jitter, in order.
+    '''
+    def setup( self ):
+        SocketServer.StreamRequestHandler.setup( self )
+        self.connection.setsockopt( socket.IPPROTO_TCP, socket.TCP_NODELAY, 1 )
+        self.replies = Queue.Queue()
+        self.sender = threading.Thread( target=self.Sender, name="cSDHSimulator sender" )
+        self.sender.daemon = True
+        self.sender.start()
+
+    def handle( self ):
+        simulator = self.server.simulator # pylint: disable-msg=E1101
+        options = simulator.options
+        send_time = 0.0
+        while True:
+            line = self.rfile.readline()
+            if ( line == "" ):
+                break
+            if ( options[ "line_time" ] > 0.0 ):
+                time.sleep( options[ "line_time" ] )
+            if ( options[ "error_rate" ] > 0.0  and  line.strip() != ""  and  simulator.random.random() < options[ "error_rate" ] ):
+                reply = [ "E%d" % options[ "error_code" ] ]
+            else:
+                reply = simulator.Execute( line )
+            for l in reply:
+                if ( options[ "drop_rate" ] > 0.0  and  simulator.random.random() < options[ "drop_rate" ] ):
+                    simulator.dbg << "dropping reply %r\n" % l # pylint: disable-msg=W0104
+                    continue
+                # the lines are sent in order, so a line is never sent before its predecessor:
+                send_time = max( send_time, time.time() + simulator._Delay() ) # pylint: disable-msg=W0212
+                self.replies.put( (send_time, l + "\r\n") )
+
+    def finish( self ):
+        self.replies.put( None )
+        self.sender.join()
+        SocketServer.StreamRequestHandler.finish( self )
+
+    def Sender( self ):
+        '''
+        Send the queued reply lines at their time.
+        '''
+        while True:
+            item = self.replies.get()
+            if ( item is None ):
+                return
+            (send_time, data) = item
+            delay = send_time - time.time()
+            if ( delay > 0.0 ):
+                time.sleep( delay )
+            try:
+                self.connection.sendall( data )
+            except socket.error:
+                return
+
+
+######################################################################
+# some usefull editing settings for emacs:
+#
+#;;; Local Variables: ***
+#;;; mode:python ***
+#;;; End: ***
+#
+######################################################################
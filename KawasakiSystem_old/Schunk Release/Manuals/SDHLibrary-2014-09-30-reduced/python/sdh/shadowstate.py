@@ -0,0 +1,235 @@
+# -*- coding: latin-1 -*-
+#######################################################################
+#
+## \file
+#  \section sdhlibrary_python_shadowstate_py_general General file information
+#
+#  \brief
+#    Write-through cache of the settings of the SDH firmware.
+#
+#  \section sdhlibrary_python_shadowstate_py_copyright Copyright
+#
+#  Copyright (c) 2007 SCHUNK GmbH & Co. KG
+#
+#######################################################################
+
+
+#######################################################################
+## \anchor sdhlibrary_python_shadowstate_py_python_vars
+#  \name   Python specific variables
+#
+#  Some definitions that describe the module for python.
+#
+#  @{
+
+__doc__       = "Write-through cache of the settings of the SDH firmware."
+__url__       = "http://www.schunk.com"
+__copyright__ = "Copyright (c) 2007 SCHUNK GmbH & Co. KG"
+
+#  end of doxygen name group sdhlibrary_python_shadowstate_py_python_vars
+#  @}
+######################################################################
+
+#######################################################################
+## \package shadowstate
+#
+#  \brief
+#    A cShadowState remembers the values of the settings of the SDH
+#    firmware that are read or written via a cSDHSerial object, like
+#    the target angles, velocities and accelerations or the velocity
+#    profile. These values change only when they are written by the
+#    PC, so reading them again can be answered from the cache and
+#    writing the same value again can be skipped, each saving a round
+#    trip to the SDH. Actual values like "pos" or "state" are never cached.
+#
+#    The cache is opt-in: it is used by a cSDHSerial object only if the
+#    option \c "shadow_state" is set (command line option \c --shadow_state,
+#    or cSDH.EnableShadowState()). It must only be used if no other program
+#    (or other object) changes the settings of the same SDH.
+#
+#    The cache is invalidated completely on any error reply of the SDH, on
+#    communication errors and on cSDHSerial.Sync(), and partly by commands
+#    that change settings as a side effect (like "tpap", "stop" or "grip").
+#    A reconnect creates a new cSDHSerial object and thus starts with an empty cache.
+#
+#######################################################################
+
+from . import utils
+
+
+#-----------------------------------------------------------------
+class cShadowState( object ):
+    '''
+    Write-through cache of the per axis settings and of the scalar
+    settings of the SDH firmware. See the package documentation of shadowstate.
+    '''
+    ## The axis commands whose values are cached. These values are changed by writing them only.
+    CACHED_AXIS_COMMANDS = ( "p", "v", "a", "p_min", "p_max", "p_offset", "vlim", "alim", "igrip", "ihold", "ilim" )
+
+    ## The scalar settings cached (commands without axis)
+    CACHED_SETTINGS = ( "vp", "con" )
+
+    def __init__( self, nb_axes ):
+        '''
+        Constructor of cShadowState for an SDH with \a nb_axes axes. The cache is empty.
+        '''
+        ## the number of axes of the SDH
+        self.nb_axes = nb_axes
+
+        # for each cached axis command: [ values, requested ] with the value of each axis
+        # as reported by the SDH and the value last requested for the axis (None if unknown)
+        self._axis_values = {}
+
+        # for each cached scalar setting: (requested, value), if known
+        self._settings = {}
+
+        self.ResetStats()
+
+    def ResetStats( self ):
+        '''
+        Reset the statistics of the cache, see GetStats().
+        '''
+        ## Counters of the cache, see GetStats()
+        self._stats = utils.Struct( reads_served = 0, writes_skipped = 0, round_trips = 0, invalidations = 0 )
+
+    def GetStats( self ):
+        '''
+        Return a snapshot of the statistics of the cache since construction
+        or the last ResetStats(). Members:
+        - \c reads_served: number of reads answered from the cache
+        - \c writes_skipped: number of writes skipped since the SDH already had the value
+        - \c saved: number of round trips to the SDH saved (reads_served + writes_skipped)
+        - \c round_trips: number of cacheable commands that were sent to the SDH
+        - \c invalidations: number of times the cache was invalidated completely
+        '''
+        st = self._stats
+        return utils.Struct( reads_served = st.reads_served, writes_skipped = st.writes_skipped,
+                             saved = st.reads_served + st.writes_skipped,
+                             round_trips = st.round_trips, invalidations = st.invalidations )
+
+    def Invalidate( self, command=None ):
+        '''
+        Forget the cached values of axis command or setting \a command,
+        or of all commands if \a command is None.
+        '''
+        if ( command is None ):
+            if ( self._axis_values  or  self._settings ):
+                self._stats.invalidations += 1
+            self._axis_values = {}
+            self._settings = {}
+        else:
+            self._axis_values.pop( command, None )
+            self._settings.pop( command, None )
+
+    def _Requested( self, axis, value ):
+        '''Non public helper function: return a list of (axis index, requested value) for
+        the \a axis and \a value given to cSDHSerial.AxisCommand().
+        '''
+        if ( type( axis ) == int ):
+            return [ (axis, float( value )) ]
+        if ( type( value ) in (int, float) ):
+            value = [ value ] * self.nb_axes
+        return [ (ai, float( v )) for (ai, v) in enumerate( value ) ]
+
+    def Lookup( self, command, axis, value ):
+        '''
+        Return the result of axis command \a command for \a axis and \a value
+        (see cSDHSerial.AxisCommand()) if it is known without asking the SDH, else None:
+        - for a read (\a value is None) the cached values, if all are known
+        - for a write the cached reply if the same values were requested for all axes before
+        '''
+        if ( command not in self.CACHED_AXIS_COMMANDS ):
+            return None
+        try:
+            (values, requested) = self._axis_values[ command ]
+        except KeyError:
+            return None
+
+        if ( value is None ):
+            if ( type( axis ) == int ):
+                result = values[ axis ]
+                if ( result is None ):
+                    return None
+            else:
+                if ( None in values ):
+                    return None
+                result = list( values )
+            self._stats.reads_served += 1
+            return result
+
+        for (ai, v) in self._Requested( axis, value ):
+            if ( requested[ ai ] != v ):
+                return None
+        if ( type( axis ) == int ):
+            result = values[ axis ]
+        else:
+            result = list( values )
+        self._stats.writes_skipped += 1
+        return result
+
+    def Store( self, command, axis, value, result ):
+        '''
+        Remember \a result, the values replied by the SDH to axis command \a command
+        for \a axis and \a value (see cSDHSerial.AxisCommand()).
+        '''
+        if ( command not in self.CACHED_AXIS_COMMANDS ):
+            return
+        self._stats.round_trips += 1
+        try:
+            (values, requested) = self._axis_values[ command ]
+        except KeyError:
+            (values, requested) = self._axis_values[ command ] = ( [ None ] * self.nb_axes, [ None ] * self.nb_axes )
+
+        if ( type( axis ) == int ):
+            values[ axis ] = result
+            if ( value is None ):
+                requested[ axis ] = result
+            else:
+                requested[ axis ] = float( value )
+        else:
+            values[:] = result
+            if ( value is None ):
+                requested[:] = result
+            else:
+                for (ai, v) in self._Requested( axis, value ):
+                    requested[ ai ] = v
+
+    def LookupSetting( self, name, value ):
+        '''
+        Return the value of scalar setting \a name (like "vp") if it is known
+        without asking the SDH, else None. For a read \a value is None, for a write
+        the cached value is returned if the same \a value was requested before.
+        '''
+        try:
+            (requested, result) = self._settings[ name ]
+        except KeyError:
+            return None
+        if ( value is None ):
+            self._stats.reads_served += 1
+            return result
+        if ( value == requested ):
+            self._stats.writes_skipped += 1
+            return result
+        return None
+
+    def StoreSetting( self, name, value, result ):
+        '''
+        Remember \a result, the value of scalar setting \a name replied by the SDH
+        to a read (\a value is None) or write of \a value.
+        '''
+        if ( name not in self.CACHED_SETTINGS ):
+            return
+        self._stats.round_trips += 1
+        if ( value is None ):
+            value = result
+        self._settings[ name ] = (value, result)
+
+
+######################################################################
+# some usefull editing settings for emacs:
+#
+#;;; Local Variables: ***
+#;;; mode:python ***
+#;;; End: ***
+#
+######################################################################
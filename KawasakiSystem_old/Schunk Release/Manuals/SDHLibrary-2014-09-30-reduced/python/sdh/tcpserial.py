@@ -28,8 +28,10 @@
 #######################################################################
 
 
-import time
 import socket
+import select
+
+from .linereader import tLineReader
 
 
 # example: http://wiki.python.org/moin/TcpCommunication#Client
@@ -52,10 +54,13 @@ import socket
 
 
 
-class tTCPSerial( object ):
+class tTCPSerial( tLineReader ):
     """Simple wrapper class to access a TCP port like a serial port as a file like object
     """
 
+    ## Maximum number of bytes to receive with a single recv_into()
+    CHUNK_SIZE = 4096
+
     def __init__( self, tcp_adr="192.168.1.1", tcp_port=23, timeout=2.0 ):
         """Create a tTCPSerial object for communicating via TCP/IP
         \param self - the instance of the class that this function operates on (the "object") 
@@ -66,6 +71,9 @@ class tTCPSerial( object ):
                timeout==0.0  => make read() / readline() return immediately with whatever is available
                timeout==else => use the given timeout for read() and readline()
         """
+        tLineReader.__init__( self )
+        self._chunk = bytearray( self.CHUNK_SIZE )
+        self._chunk_view = memoryview( self._chunk )
         self._tcp_adr = tcp_adr
         self._tcp_port = tcp_port
         self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -88,6 +96,9 @@ class tTCPSerial( object ):
         '''read \a length bytes from the TCP socket and return them as as string.
         The waiting time for that many bytes depends on the setting of timeout 
         '''
+        if ( self._line_buffer ):
+            # bytes already received by readline() come first
+            return self._TakeBuffered( length )
         return self._socket.recv( length )
         
 
@@ -97,6 +108,12 @@ class tTCPSerial( object ):
         self._socket.sendall(s)
            
 
+    def fileno( self ):
+        '''Return the file descriptor of the TCP socket, e.g. for select().
+        '''
+        return self._socket.fileno()
+
+
     def flush( self ):
         '''This is a no-op for now. Just for compatibility with the file like interface.
         '''
@@ -108,31 +125,17 @@ class tTCPSerial( object ):
         self._socket.close()
 
 
-    def _GetEndTime(self):
-        '''helper function to return an end time according to self.timeout
-        '''
-        to = self.GetTimeout()
-        if ( to is None):
-            # timeout was None (=> wait for ever)
-            # (use 24h)
-            end = time.time() + (24 * 60 * 60)
-        else:
-            end = time.time() + to
-        return end
-
-        
-    def readline( self, eol='\n' ):
-        '''read a complete line (terminated by the \a eol character sequence) from CAN and return it as string.
+    def _ReadChunk( self, timeout ):
+        '''Receive the bytes available from the TCP socket with a single recv_into(),
+        waiting at most \a timeout seconds (None == wait for ever) for them.
         '''
-        end = self._GetEndTime()
-        buffer = ""
-        goon = True
-        while ( goon ):
-            c = self.read(1)
-            buffer += c
-            goon = (c != eol) and  time.time() <= end
-            
-        return buffer
+        (readable, writable, exceptional) = select.select( [ self._socket ], [], [], timeout ) # pylint: disable-msg=W0612
+        if ( not readable ):
+            return ""
+        n = self._socket.recv_into( self._chunk )
+        if ( n == 0 ):
+            raise socket.error( "TCP connection to %s:%d closed by peer" % (self._tcp_adr, self._tcp_port) )
+        return self._chunk_view[:n]
 
     timeout = property(GetTimeout, SetTimeout, None, "The timeout for reading in seconds. None == Wait for ever, 0.0 == return immediately.")
 
@@ -0,0 +1,376 @@
+# -*- coding: latin-1 -*-
+#######################################################################
+#
+## \file
+#  \section sdhlibrary_python_telemetry_py_general General file information
+#
+#  \brief
+#    Background sampling of the joint state of the SDH into a ring buffer.
+#
+#  \section sdhlibrary_python_telemetry_py_copyright Copyright
+#
+#  Copyright (c) 2007 SCHUNK GmbH & Co. KG
+#
+#######################################################################
+
+
+#######################################################################
+## \anchor sdhlibrary_python_telemetry_py_python_vars
+#  \name   Python specific variables
+#
+#  Some definitions that describe the module for python.
+#
+#  @{
+
+__doc__       = "Background sampling of the joint state of the SDH into a ring buffer."
+__url__       = "http://www.schunk.com"
+__copyright__ = "Copyright (c) 2007 SCHUNK GmbH & Co. KG"
+
+#  end of doxygen name group sdhlibrary_python_telemetry_py_python_vars
+#  @}
+######################################################################
+
+#######################################################################
+## \package telemetry
+#
+#  \brief
+#    A cTelemetrySampler reads the actual angles, velocities and states
+#    (and optionally the motor currents and temperatures) of the axes of
+#    a cSDH in a background thread at a fixed rate and stores them with
+#    timestamps in a preallocated ring buffer. Any number of consumers
+#    can then get the latest sample (Latest()) or the samples of a time
+#    window (Window()) without communicating with the SDH.
+#
+#    All values of a sample are requested with a single pipelined round
+#    trip (see cSDHSerial.AxisCommands()). The sampler shares the
+#    communication line with the foreground commands of the application:
+#    cSDHSerial serializes the commands of all threads with a
+#    cSDHSerial.lock that is handed over in the order of arrival, so a
+#    sample waits for at most the command currently on the line, and
+#    commands sent in a loop by the application are interleaved with the
+#    samples instead of starving the sampler (or vice versa).
+#
+#    The values are stored in the internal units of the SDH and converted
+#    to the unit systems configured in the cSDH (like cSDH.uc_angle) when
+#    read, so changing the unit systems while sampling is fine.
+#
+#    This module requires numpy.
+#
+#    Example:
+#    \code
+#      hand.StartTelemetry( rate=50.0, temperature=True )
+#      ...
+#      sample = hand.GetTelemetry().Latest()
+#      print sample.time, sample.angles
+#      # the samples of the last second:
+#      now = time.time()
+#      window = hand.GetTelemetry().Window( now - 1.0, now )
+#      print window.angles.shape   # e.g. (50, 7)
+#    \endcode
+#
+#######################################################################
+
+import time
+import threading
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from sdhbase import *
+from . import utils
+
+
+#=====================================================================
+## \brief Background sampler of the joint state of an SDH,
+#  see \ref telemetry "the package description".
+#
+#  <hr>
+class cTelemetrySampler( object ):
+    '''
+    Background sampler of the joint state of an SDH into a ring buffer.
+    See the package documentation of telemetry.
+    '''
+    #-----------------------------------------------------------------
+    ## Constructor of cTelemetrySampler class, the sampling is not started yet.
+    #
+    #  \param self          - reference to the object itself
+    #  \param hand          - the opened cSDH object to sample
+    #  \param rate          - the number of samples per second
+    #  \param capacity      - the number of samples kept in the ring buffer,
+    #                         the default None means the samples of 60 seconds
+    #  \param motor_current - flag: if True then the motor currents are sampled too
+    #  \param temperature   - flag: if True then the temperatures are sampled too
+    #  \param motor_current_mode - the mode of the motor currents to sample, see cSDH.GetAxisMotorCurrent()
+    #
+    def __init__( self, hand, rate=50.0, capacity=None, motor_current=False, temperature=False, motor_current_mode=0 ):
+        '''
+        Constructor of cTelemetrySampler class, see html/pdf documentation for details.
+        '''
+        if ( numpy is None ):
+            raise ImportError( "cTelemetrySampler requires numpy" )
+        if ( rate <= 0.0 ):
+            raise cSDHErrorInvalidParameter( "Invalid sampling rate %r" % rate )
+        if ( capacity is None ):
+            capacity = int( rate * 60.0 )
+        capacity = max( int( capacity ), 1 )
+
+        ## the sampled cSDH object
+        self.hand = hand
+
+        ## the number of samples per second
+        self.rate = float( rate )
+
+        ## the number of samples kept in the ring buffer
+        self.capacity = capacity
+
+        ## the number of axes sampled (without the virtual axes of the hand)
+        self.nb_axes = hand.NUMBER_OF_AXES
+
+        # the axis commands requested with each sample, the reply to
+        # command i is stored in buffer self._buffers[i]
+        self._requests = [ ("pos", All, None), ("vel", All, None), ("state", All, None) ]
+        self._buffers = [ numpy.zeros( (capacity, self.nb_axes), dtype=float ),
+                          numpy.zeros( (capacity, self.nb_axes), dtype=float ),
+                          numpy.zeros( (capacity, self.nb_axes), dtype=numpy.int8 ) ]
+        self._motor_currents = None
+        if ( motor_current ):
+            command = hand._GetMotorCurrentModeFunction( motor_current_mode ).__name__
+            self._requests.append( (command, All, None) )
+            self._motor_currents = numpy.zeros( (capacity, self.nb_axes), dtype=float )
+            self._buffers.append( self._motor_currents )
+        self._temperatures = None
+        if ( temperature ):
+            self._requests.append( ("temp", All, None) )
+            self._temperatures = numpy.zeros( (capacity, hand.NUMBER_OF_TEMPERATURE_SENSORS), dtype=float )
+            self._buffers.append( self._temperatures )
+
+        # the time of each sample in seconds, as returned by time.time()
+        self._times = numpy.zeros( (capacity,), dtype=float )
+
+        # the total number of samples taken, the next sample goes to index self._count % capacity
+        self._count = 0
+
+        # protects the ring buffer while a sample is stored or copied
+        self._lock = threading.Lock()
+
+        self._sampler = None
+        self._sampler_stop = threading.Event()
+        self.ResetStats()
+
+    #-----------------------------------------------------------------
+    ## Start the background thread that takes rate samples per second.
+    #  Does nothing if the thread is already running.
+    #
+    def Start( self ):
+        '''
+        Start the background thread that takes rate samples per second.
+        '''
+        if ( self._sampler is not None ):
+            return
+        self._sampler_stop.clear()
+        self._sampler = threading.Thread( target=self._Sampler, name="cTelemetrySampler" )
+        self._sampler.daemon = True
+        self._sampler.start()
+
+    #-----------------------------------------------------------------
+    ## Stop the background thread started by Start() and wait for it.
+    #  The samples taken so far are kept.
+    #
+    def Stop( self ):
+        '''
+        Stop the background thread started by Start() and wait for it.
+        '''
+        if ( self._sampler is None ):
+            return
+        self._sampler_stop.set()
+        if ( self._sampler is not threading.currentThread() ):
+            self._sampler.join()
+        self._sampler = None
+
+    #-----------------------------------------------------------------
+    ## Return True if the background thread is running.
+    #
+    def IsRunning( self ):
+        '''
+        Return True if the background thread is running.
+        '''
+        return self._sampler is not None
+
+    #-----------------------------------------------------------------
+    ## Take a sample now and store it in the ring buffer.
+    #
+    #  This is called periodically by the background thread, but can
+    #  also be called by the application directly.
+    #
+    #  The time stored is the middle of the round trip to the SDH.
+    #
+    def Sample( self ):
+        '''
+        Take a sample now and store it in the ring buffer.
+        '''
+        t0 = time.time()
+        replies = self.hand.interface.AxisCommands( self._requests )
+        t = (t0 + time.time()) / 2.0
+        self._lock.acquire()
+        try:
+            i = self._count % self.capacity
+            self._times[i] = t
+            for (buffer, reply) in zip( self._buffers, replies ):
+                buffer[i] = reply[:buffer.shape[1]]
+            self._count += 1
+        finally:
+            self._lock.release()
+
+    #-----------------------------------------------------------------
+    ## Return the latest sample, or None if no sample was taken yet.
+    #
+    #  The sample is returned as structure with members:
+    #  - \c time : the time of the sample in seconds, as returned by time.time()
+    #  - \c angles, \c velocities, \c states : numpy arrays with the actual
+    #    angles, velocities and states of the axes
+    #  - \c motor_currents : numpy array with the motor currents, or None if not sampled
+    #  - \c temperatures : numpy array with the temperatures, or None if not sampled
+    #
+    #  The values are reported in the unit systems configured in the cSDH.
+    #  The SDH is not accessed.
+    #
+    def Latest( self ):
+        '''
+        Return the latest sample, or None if no sample was taken yet. See html/pdf documentation for details.
+        '''
+        self._lock.acquire()
+        try:
+            if ( self._count == 0 ):
+                return None
+            i = (self._count - 1) % self.capacity
+            times = self._times[i]
+            buffers = [ buffer[i].copy() for buffer in self._buffers ]
+        finally:
+            self._lock.release()
+        return self._ToExternal( times, buffers )
+
+    #-----------------------------------------------------------------
+    ## Return the samples taken from time \a t0 to time \a t1 (inclusive,
+    #  in seconds as returned by time.time()) that are still in the ring buffer.
+    #
+    #  \param self - reference to the object itself
+    #  \param t0   - the start of the window, None for the oldest sample
+    #  \param t1   - the end of the window, None for the latest sample
+    #
+    #  \return a structure like returned by Latest(), but with a numpy array
+    #           of the times of the samples as member \c time and with numpy
+    #           arrays with one row per sample (oldest first) for the other
+    #           members. The arrays are empty if there are no samples in the window.
+    #
+    #  The SDH is not accessed.
+    #
+    def Window( self, t0=None, t1=None ):
+        '''
+        Return the samples taken from time \a t0 to time \a t1 (inclusive). See html/pdf documentation for details.
+        '''
+        self._lock.acquire()
+        try:
+            n = min( self._count, self.capacity )
+            # the ring buffer in order of the samples, oldest first:
+            order = ( numpy.arange( n ) + (self._count - n) ) % self.capacity
+            times = self._times[ order ]
+            start = 0
+            end = n
+            if ( t0 is not None ):
+                start = int( numpy.searchsorted( times, t0, side="left" ) )
+            if ( t1 is not None ):
+                end = int( numpy.searchsorted( times, t1, side="right" ) )
+            order = order[ start:max( start, end ) ]
+            buffers = [ buffer[ order ] for buffer in self._buffers ]
+        finally:
+            self._lock.release()
+        return self._ToExternal( times[ start:max( start, end ) ], buffers )
+
+    #-----------------------------------------------------------------
+    def _ToExternal( self, times, buffers ):
+        '''
+        Non public helper function: return the structure for Latest() and Window()
+        for the \a times and the copies of the \a buffers (in internal units).
+        '''
+        hand = self.hand
+        sample = utils.Struct( time=times,
+                               angles=hand.uc_angle.ToExternal( buffers[0] ),
+                               velocities=hand.uc_angular_velocity.ToExternal( buffers[1] ),
+                               states=buffers[2],
+                               motor_currents=None, temperatures=None )
+        i = 3
+        if ( self._motor_currents is not None ):
+            sample.motor_currents = hand.uc_motor_current.ToExternal( buffers[i] )
+            i += 1
+        if ( self._temperatures is not None ):
+            sample.temperatures = hand.uc_temperature.ToExternal( buffers[i] )
+        return sample
+
+    #-----------------------------------------------------------------
+    ## Reset the statistics returned by GetStats().
+    #
+    def ResetStats( self ):
+        '''
+        Reset the statistics returned by GetStats().
+        '''
+        self._stats = utils.Struct( samples=0, errors=0, overruns=0, last_error=None )
+
+    #-----------------------------------------------------------------
+    ## Return a snapshot of the statistics of the background thread since
+    #  construction or the last ResetStats(). Members:
+    #  - \c samples : number of samples taken
+    #  - \c errors : number of samples that failed because of communication errors
+    #  - \c overruns : number of sampling periods skipped because a sample
+    #    (or the wait for the communication line) took too long
+    #  - \c last_error : the last exception ignored, or None
+    #
+    def GetStats( self ):
+        '''
+        Return a snapshot of the statistics of the background thread. See html/pdf documentation for details.
+        '''
+        return utils.Struct( **self._stats.__dict__ )
+
+    #-----------------------------------------------------------------
+    def _Sampler( self ):
+        '''
+        Non public helper function: run function of the sampler thread.
+
+        Communication errors (including errors of the underlying
+        transport like socket.error or serial.SerialException) are
+        counted in the statistics and the sampling continues. If a sample takes longer than a period then
+        the missed periods are skipped (and counted as overruns), so
+        that the samples stay on the grid of the sampling rate.
+        '''
+        period = 1.0 / self.rate
+        next_time = time.time()
+        while not self._sampler_stop.isSet():
+            try:
+                self.Sample()
+                self._stats.samples += 1
+            except (cSDHError, ValueError, EnvironmentError), e:
+                # EnvironmentError covers socket.error of the TCP transport
+                # and serial.SerialException of the RS232 transport
+                self._stats.errors += 1
+                self._stats.last_error = e
+            next_time += period
+            now = time.time()
+            if ( now > next_time ):
+                skipped = int( (now - next_time) / period ) + 1
+                self._stats.overruns += skipped
+                next_time += skipped * period
+            self._sampler_stop.wait( next_time - now )
+
+# end of class cTelemetrySampler
+#=====================================================================
+
+
+######################################################################
+# some usefull editing settings for emacs:
+#
+#;;; Local Variables: ***
+#;;; mode:python ***
+#;;; End: ***
+#
+######################################################################
@@ -0,0 +1,356 @@
+# -*- coding: latin-1 -*-
+#######################################################################
+#
+## \file
+#  \section sdhlibrary_python_workspace_py_general General file information
+#
+#  \brief
+#    Computation of the workspace of the finger tips of the SDH.
+#
+#  \section sdhlibrary_python_workspace_py_copyright Copyright
+#
+#  Copyright (c) 2007 SCHUNK GmbH & Co. KG
+#
+#######################################################################
+
+
+#######################################################################
+## \anchor sdhlibrary_python_workspace_py_python_vars
+#  \name   Python specific variables
+#
+#  Some definitions that describe the module for python.
+#
+#  @{
+
+__doc__       = "Computation of the workspace of the finger tips of the SDH."
+__url__       = "http://www.schunk.com"
+__copyright__ = "Copyright (c) 2007 SCHUNK GmbH & Co. KG"
+
+#  end of doxygen name group sdhlibrary_python_workspace_py_python_vars
+#  @}
+######################################################################
+
+#######################################################################
+## \package workspace
+#
+#  \brief
+#    Compute() computes the positions of the finger tips of all fingers
+#    for a grid of finger axis angles (a0, a1, a2) with a fixed step
+#    width, like demo-calc-workspace.py: finger 0 and 2 at angles
+#    (a0, a1, a2) and finger 1 at (0, a1, a2). The forward kinematics
+#    is evaluated with collision.cFingerHulls.Points() for a whole slab
+#    of the grid at once, the slabs are distributed on a pool of worker
+#    processes.
+#
+#    The results are written to a directory with these files:
+#    - \c grid.npz: the parameters of the computation
+#    - \c points.npy: the finger tip positions in mm, an array of shape
+#      (n2, n1, n0, 3, 3): index of a2, index of a1, index of a0, finger, xyz.
+#      (The order of the text output of demo-calc-workspace.py.)
+#    - \c done.npy: a flag for each slab (index of a2) that is complete
+#
+#    Both arrays are memory mapped, so grids much larger than the
+#    available memory can be computed. A computation that was interrupted
+#    is resumed by calling Compute() with the same parameters again:
+#    only the slabs not yet done are computed.
+#
+#    A cWorkspace gives access to a computed workspace: the points
+#    as memory mapped array, a voxel grid of the reachable space with
+#    Voxels() and the convex hull of the finger tip positions of each
+#    finger with ConvexHulls() (which requires scipy).
+#
+#    Example:
+#    \code
+#      ws = sdh.workspace.Compute( "ws-1deg", hand.l1, hand.l2, hand.offset,
+#                                  hand.f_min_angle_a[:3], hand.f_max_angle_a[:3], [ 1.0, 1.0, 1.0 ] )
+#      voxels = ws.Voxels( 2.0 )
+#      hulls = ws.ConvexHulls()
+#      print "volume of the convex hull of finger 0: %f mm^3" % hulls[0].volume
+#    \endcode
+#
+#    This module requires numpy.
+#
+#######################################################################
+
+import os
+
+# Try to import numpy: this module needs it
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Try to import scipy: only needed for cWorkspace.ConvexHulls()
+try:
+    import scipy.spatial
+except ImportError:
+    scipy = None
+
+from .auxiliary import DegToRad
+from . import collision
+from . import utils
+
+
+#-----------------------------------------------------------------
+def GridAngles( min_angle, max_angle, step ):
+    '''
+    Return a list of 3 arrays with the angles in degrees of the grid for the finger
+    axes 0, 1, 2 from \a min_angle to \a max_angle (both included, if reached) with
+    \a step (all lists of 3 values in degrees).
+    '''
+    return [ numpy.arange( float( min_angle[ fai ] ), max_angle[ fai ] + step[ fai ] * 1.0e-6, float( step[ fai ] ) )
+             for fai in range( 0, 3 ) ]
+
+
+#-----------------------------------------------------------------
+def _ComputeSlab( job ):
+    '''Non public helper function for Compute(), executed in a worker process:
+    compute the finger tip positions of the slab with index \a i2 of a2 and write them
+    to the memory mapped points file. Return \a i2.
+    '''
+    (directory, i2, l1, l2, offset, angles) = job
+    finger_hulls = collision.cFingerHulls( l1, l2, offset )
+    (a0, a1, a2) = angles
+
+    # the finger angles of all poses of the slab in the order of points.npy, shape (n1*n0, 3, 3):
+    (g1, g0) = numpy.meshgrid( DegToRad( a1 ), DegToRad( a0 ), indexing="ij" )
+    r_angles = numpy.empty( (g0.size, 3, 3) )
+    r_angles[ :, :, 0 ] = g0.reshape( -1, 1 )
+    r_angles[ :, 1, 0 ] = 0.0
+    r_angles[ :, :, 1 ] = g1.reshape( -1, 1 )
+    r_angles[ :, :, 2 ] = DegToRad( a2[ i2 ] )
+
+    tips = finger_hulls.Points( r_angles, [ l1 ], [ l2 ] )[ :, :, 0, : ]
+    points = numpy.load( os.path.join( directory, "points.npy" ), mmap_mode="r+" )
+    points[ i2 ] = tips.reshape( points.shape[1:] )
+    points.flush()
+    del points
+    return i2
+
+
+#-----------------------------------------------------------------
+def Compute( directory, l1, l2, offset, min_angle, max_angle, step, processes=None, progress=None, dtype="float32" ):
+    '''
+    Compute the workspace of the finger tips of fingers with the kinematic parameters
+    \a l1, \a l2 and \a offset (like cSDH.l1, cSDH.l2 and cSDH.offset) for the grid of
+    finger axis angles given by \a min_angle, \a max_angle and \a step (see GridAngles())
+    and write it to \a directory (see the package documentation of workspace).
+    Return a cWorkspace for the result.
+
+    If \a directory already contains a computation with the same parameters then only
+    the slabs not yet done are computed. The work is distributed on \a processes worker
+    processes (default: one per core, 1 means no worker processes). If given,
+    \a progress( done, total ) is called after each finished slab. \a dtype is the
+    data type of the points stored.
+    '''
+    if ( numpy is None ):
+        raise ImportError( "sdh.workspace.Compute() requires numpy" )
+
+    offset = [ [ float( v ) for v in o ] for o in offset ]
+    angles = GridAngles( min_angle, max_angle, step )
+    shape = ( len( angles[2] ), len( angles[1] ), len( angles[0] ), 3, 3 )
+    grid = dict( l1 = float( l1 ), l2 = float( l2 ), offset = offset,
+                 min_angle = [ float( v ) for v in min_angle ],
+                 max_angle = [ float( v ) for v in max_angle ],
+                 step = [ float( v ) for v in step ],
+                 dtype = numpy.dtype( dtype ).str )
+
+    if ( not os.path.isdir( directory ) ):
+        os.makedirs( directory )
+    grid_filename = os.path.join( directory, "grid.npz" )
+    points_filename = os.path.join( directory, "points.npy" )
+    done_filename = os.path.join( directory, "done.npy" )
+    if ( os.path.exists( grid_filename ) ):
+        # resume: the previous computation must have the same parameters
+        if ( _ReadGrid( grid_filename ) != grid ):
+            raise ValueError( "Workspace in %r was computed with other parameters" % directory )
+        done = numpy.load( done_filename, mmap_mode="r+" )
+    else:
+        numpy.lib.format.open_memmap( points_filename, mode="w+", dtype=dtype, shape=shape ).flush()
+        done = numpy.lib.format.open_memmap( done_filename, mode="w+", dtype=bool, shape=shape[:1] )
+        done.flush()
+        # the grid file is written last: its existence marks a consistent directory
+        f = open( grid_filename, "wb" )
+        try:
+            numpy.savez( f, **grid )
+        finally:
+            f.close()
+
+    jobs = [ (directory, i2, l1, l2, offset, angles) for i2 in range( 0, shape[0] ) if not done[ i2 ] ]
+    nb_done = shape[0] - len( jobs )
+    if ( progress is not None ):
+        progress( nb_done, shape[0] )
+
+    pool = None
+    if ( processes != 1  and  len( jobs ) > 1 ):
+        import multiprocessing
+        pool = multiprocessing.Pool( processes )
+        results = pool.imap_unordered( _ComputeSlab, jobs )
+    else:
+        results = ( _ComputeSlab( job ) for job in jobs )
+    try:
+        for i2 in results:
+            # the worker flushed the points of the slab before it returned
+            done[ i2 ] = True
+            done.flush()
+            nb_done += 1
+            if ( progress is not None ):
+                progress( nb_done, shape[0] )
+    finally:
+        if ( pool is not None ):
+            pool.terminate()
+        del done
+
+    return cWorkspace( directory )
+
+
+#-----------------------------------------------------------------
+def _ReadGrid( filename ):
+    '''Non public helper function: return the parameters stored in grid.npz file \a filename
+    as a dict like the one written by Compute().
+    '''
+    data = numpy.load( filename )
+    grid = dict( l1 = float( data[ "l1" ] ), l2 = float( data[ "l2" ] ), dtype = str( data[ "dtype" ] ) )
+    for name in ( "offset", "min_angle", "max_angle", "step" ):
+        grid[ name ] = data[ name ].tolist()
+    return grid
+
+
+#-----------------------------------------------------------------
+class cWorkspace( object ):
+    '''
+    The workspace of the finger tips of an SDH computed by Compute().
+    See the package documentation of workspace.
+    '''
+    def __init__( self, directory ):
+        '''
+        Constructor of cWorkspace: open the workspace computed in \a directory.
+        '''
+        if ( numpy is None ):
+            raise ImportError( "sdh.workspace.cWorkspace requires numpy" )
+
+        ## the directory of the workspace
+        self.directory = directory
+
+        ## the parameters of the computation, see Compute()
+        self.grid = _ReadGrid( os.path.join( directory, "grid.npz" ) )
+
+        ## list of 3 arrays with the angles in degrees of the grid for finger axis 0, 1, 2
+        self.angles = GridAngles( self.grid[ "min_angle" ], self.grid[ "max_angle" ], self.grid[ "step" ] )
+
+        ## the finger tip positions in mm, a read only memory mapped array, see the package documentation of workspace
+        self.points = numpy.load( os.path.join( directory, "points.npy" ), mmap_mode="r" )
+
+        ## flag for each slab (index of a2): True if the slab is complete
+        self.done = numpy.load( os.path.join( directory, "done.npy" ) )
+
+    def IsComplete( self ):
+        '''
+        Return True if all slabs of the workspace are computed.
+        '''
+        return bool( self.done.all() )
+
+    def _Slabs( self ):
+        '''Non public helper function: generate the finger tip positions of each complete slab
+        as an array of shape (n1*n0, 3, 3): pose, finger, xyz.
+        '''
+        for i2 in range( 0, len( self.done ) ):
+            if ( self.done[ i2 ] ):
+                yield numpy.asarray( self.points[ i2 ], dtype=float ).reshape( -1, 3, 3 )
+
+    def Bounds( self ):
+        '''
+        Return a tuple (lo, hi) of arrays of shape (3, 3): finger, xyz with the minimum and
+        maximum coordinates in mm of the finger tip positions of each finger.
+        '''
+        lo = numpy.empty( (3, 3) )
+        lo.fill( numpy.inf )
+        hi = - lo
+        for slab in self._Slabs():
+            lo = numpy.minimum( lo, slab.min( axis=0 ) )
+            hi = numpy.maximum( hi, slab.max( axis=0 ) )
+        if ( not numpy.isfinite( lo ).all() ):
+            raise ValueError( "Workspace in %r has no complete slab" % self.directory )
+        return ( lo, hi )
+
+    def Voxels( self, voxel_size ):
+        '''
+        Return a grid of voxels (cubes) with edges of \a voxel_size mm that tells which voxels
+        are reached by the finger tips of each finger, as a utils.Struct with members:
+        - \c origin: array with the xyz coordinates in mm of the lower corner of voxel (0,0,0)
+        - \c voxel_size: the edge length of a voxel in mm
+        - \c reached: bool array of shape (3, nx, ny, nz): finger, voxel index in x, y, z
+        - \c counts: int array of shape (3, nx, ny, nz) with the number of poses of the grid
+          with the finger tip in the voxel
+
+        The voxels are computed slab by slab, so the points need not fit into memory.
+        '''
+        voxel_size = float( voxel_size )
+        (lo, hi) = self.Bounds()
+        lo = lo.min( axis=0 )
+        hi = hi.max( axis=0 )
+
+        origin = numpy.floor( lo / voxel_size ) * voxel_size
+        shape = tuple( ( numpy.floor( ( hi - origin ) / voxel_size ) + 1 ).astype( int ) )
+        counts = numpy.zeros( (3,) + shape, dtype=numpy.int64 )
+        for slab in self._Slabs():
+            index = numpy.floor( ( slab - origin ) / voxel_size ).astype( int )
+            index = numpy.minimum( index, numpy.array( shape ) - 1 )
+            for fi in range( 0, 3 ):
+                flat = numpy.ravel_multi_index( index[ :, fi, : ].T, shape )
+                counts[ fi ] += numpy.bincount( flat, minlength=counts[ fi ].size ).reshape( shape )
+        return utils.Struct( origin = origin, voxel_size = voxel_size, reached = counts > 0, counts = counts )
+
+    def ConvexHulls( self ):
+        '''
+        Return a list with the convex hull of the finger tip positions of each finger as
+        scipy.spatial.ConvexHull objects (with members like \c points, \c vertices,
+        \c simplices and \c volume). The hulls are computed slab by slab from the vertices
+        of the hull so far and the points of the next slab. This requires scipy.
+
+        The finger tip of finger 1 moves in a plane (its base axis is fixed), so
+        its hull is 2 dimensional: For a finger whose finger tips have a constant
+        coordinate the hull is computed in the other coordinates only, \c points
+        then has 2 columns and \c volume is the area. The member \c dims of each
+        hull lists the coordinates used (0, 1, 2 for x, y, z).
+        '''
+        if ( scipy is None ):
+            raise ImportError( "sdh.workspace.cWorkspace.ConvexHulls() requires scipy" )
+
+        (lo, hi) = self.Bounds()
+        dims = [ [ c for c in range( 0, 3 ) if hi[ fi, c ] > lo[ fi, c ] ] for fi in range( 0, 3 ) ]
+        hulls = [ None, None, None ]
+        for slab in self._Slabs():
+            for fi in range( 0, 3 ):
+                points = slab[ :, fi, dims[ fi ] ]
+                if ( hulls[ fi ] is not None ):
+                    points = numpy.vstack( ( hulls[ fi ].points[ hulls[ fi ].vertices ], points ) )
+                try:
+                    hulls[ fi ] = scipy.spatial.ConvexHull( points )
+                except scipy.spatial.qhull.QhullError:
+                    # a degenerate slab (e.g. finger 1 in a slab where all points lie in a plane):
+                    # keep the points to compute the hull with the next slab
+                    hulls[ fi ] = _cPoints( points )
+        for fi in range( 0, 3 ):
+            hulls[ fi ].dims = dims[ fi ]
+        return hulls
+
+
+#-----------------------------------------------------------------
+class _cPoints( object ):
+    '''Non public helper class for cWorkspace.ConvexHulls(): a set of points that
+    has no (3 dimensional) convex hull yet, with the members used to compute the next hull.
+    '''
+    def __init__( self, points ):
+        self.points = points
+        self.vertices = numpy.arange( len( points ) )
+
+
+######################################################################
+# some usefull editing settings for emacs:
+#
+#;;; Local Variables: ***
+#;;; mode:python ***
+#;;; End: ***
+#
+######################################################################
@@ -111,6 +111,15 @@ For details see the included documentation in html- or pdf-format.
                              Pathify('demo', 'demo-temperature.py') +
                              Pathify('demo', 'demo-workspace.py') +
                              Pathify('demo', 'demo-benchmark.py') +
+                             Pathify('demo', 'demo-dsa-benchmark.py') +
+                             Pathify('demo', 'demo-dsa-replay.py') +
+                             Pathify('demo', 'demo-dsa-framelog.py') +
+                             Pathify('demo', 'demo-command-benchmark.py') +
+                             Pathify('demo', 'demo-collision-benchmark.py') +
+                             Pathify('demo', 'demo-collision-map.py') +
+                             Pathify('demo', 'demo-sdh-simulator.py') +
+                             Pathify('demo', 'demo-dsa-simulator.py') +
+                             Pathify('demo', 'demo-latency-benchmark.py') +
                              Pathify('demo', 'demo-velocity-acceleration.py') +
                              Pathify('demo', 'miniterm.py') +
                              #Pathify('demo', 'demo-collision.py') +
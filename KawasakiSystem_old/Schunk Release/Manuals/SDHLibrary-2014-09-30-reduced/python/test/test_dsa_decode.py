@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# -*- coding: latin-1 -*-
+#######################################################################
+## \file
+#  \section sdhlibrary_python_test_dsa_decode_py_general General file information
+#
+#    \brief
+#      Unit tests for the texel decoders of sdh.dsa: Random RLE encoded and
+#      raw frame payloads are decoded with sdh.dsa.DecodeTexelsNumPy(),
+#      sdh.dsa.DecodeTexelsArray() and the former per texel loop of
+#      cDSA._ParseFrame(), and the results are compared.
+#
+#      Run from the python directory with:
+#      > python -m unittest discover -s test
+#
+#######################################################################
+
+import os
+import sys
+import array
+import random
+import struct
+import unittest
+
+sys.path.insert( 0, os.path.join( os.path.dirname( os.path.abspath( __file__ ) ), ".." ) )
+
+from sdh import dsa
+
+# number of texels of a DSACON32m frame of the SDH (6 matrices)
+NB_TEXELS = 2*(14*6) + 4*(13*6)
+
+# offset of the texel data in the payload of a frame (timestamp + flags)
+OFFSET = 5
+
+# value that marks texels not written by a decoder
+UNTOUCHED = 0xffff
+
+
+def LegacyDecodeTexels( payload, i, do_RLE, data ):
+    '''The former per texel loop of cDSA._ParseFrame(), the reference for the tests.
+    '''
+    j = 0
+    size = len( payload )
+    if do_RLE:
+        while i+1 < size:
+            b = dsa.UIntFromBytes( payload[ i:i+2 ] )
+            v = b & 0x0fff
+            n = b >> 12
+            while n > 0:
+                data[ j ] = v
+                n -= 1
+                j += 1
+            i += 2
+    else:
+        while i+1 < size:
+            data[ j ] = dsa.UIntFromBytes( payload[ i:i+2 ] )
+            i += 2
+            j += 1
+    return j
+
+
+def MakePayload( rnd, nb_texels, do_RLE, odd=False ):
+    '''Return a random frame payload with \a nb_texels texels as bytearray.
+    If \a odd is true then a dangling byte is appended that all decoders must ignore.
+    '''
+    header = struct.pack( "<IB", rnd.randint( 0, 0xffffffff ), int( do_RLE ) )
+    words = []
+    if do_RLE:
+        left = nb_texels
+        while left > 0:
+            n = rnd.randint( 1, min( 15, left ) )
+            words.append( (n << 12) | rnd.randint( 0, 0x0fff ) )
+            left -= n
+            if rnd.random() < 0.05:
+                # a run of length 0 is legal and decodes to nothing
+                words.append( rnd.randint( 0, 0x0fff ) )
+    else:
+        words = [ rnd.randint( 0, 0xffff ) for t in xrange( nb_texels ) ] # pylint: disable-msg=W0612
+    payload = bytearray( header + struct.pack( "<%dH" % len( words ), *words ) )
+    if odd:
+        payload.append( rnd.randint( 0, 0xff ) )
+    return payload
+
+
+class TestDecodeTexels( unittest.TestCase ):
+    '''Compare the texel decoders of sdh.dsa with the former per texel loop.
+    '''
+
+    def setUp( self ):
+        self.rnd = random.Random( 4711 )
+
+    def Decode( self, payload, do_RLE ):
+        '''Decode \a payload with all decoders into fresh buffers prefilled with
+        UNTOUCHED and return a list of (name, number of texels, texels) tuples.
+        '''
+        results = []
+        decoders = [ ("legacy loop", LegacyDecodeTexels),
+                     ("DecodeTexelsArray", dsa.DecodeTexelsArray) ]
+        if dsa.numpy is not None:
+            decoders.append( ("DecodeTexelsNumPy", None) )
+        for (name, f) in decoders:
+            data = array.array( 'H', [ UNTOUCHED ] * NB_TEXELS )
+            if f is None:
+                # like cDSA._CreateFrame(): texels is a numpy view of data
+                n = dsa.DecodeTexelsNumPy( payload, OFFSET, do_RLE, dsa.numpy.frombuffer( data, dtype=dsa.numpy.uint16 ) )
+            else:
+                n = f( payload, OFFSET, do_RLE, data )
+            results.append( (name, n, data.tolist()) )
+        return results
+
+    def CheckEqual( self, payload, do_RLE, nb_texels ):
+        results = self.Decode( payload, do_RLE )
+        (ref_name, ref_n, ref_data) = results[0]
+        self.assertEqual( ref_n, nb_texels )
+        for (name, n, data) in results[1:]:
+            self.assertEqual( n, ref_n, "%s decoded %d texels, %s %d" % (name, n, ref_name, ref_n) )
+            self.assertEqual( data, ref_data, "%s and %s differ" % (name, ref_name) )
+
+    def CheckOversize( self, payload, do_RLE ):
+        data = array.array( 'H', [ UNTOUCHED ] * NB_TEXELS )
+        # the former loop ran past the end of the frame data
+        self.assertRaises( IndexError, LegacyDecodeTexels, payload, OFFSET, do_RLE, data )
+        data = array.array( 'H', [ UNTOUCHED ] * NB_TEXELS )
+        self.assertRaises( dsa.cDSAError, dsa.DecodeTexelsArray, payload, OFFSET, do_RLE, data )
+        self.assertEqual( data.tolist(), [ UNTOUCHED ] * NB_TEXELS )
+        if dsa.numpy is not None:
+            texels = dsa.numpy.frombuffer( data, dtype=dsa.numpy.uint16 )
+            self.assertRaises( dsa.cDSAError, dsa.DecodeTexelsNumPy, payload, OFFSET, do_RLE, texels )
+            self.assertEqual( data.tolist(), [ UNTOUCHED ] * NB_TEXELS )
+
+    def testFullFrames( self ):
+        for do_RLE in (True, False):
+            for k in xrange( 50 ): # pylint: disable-msg=W0612
+                self.CheckEqual( MakePayload( self.rnd, NB_TEXELS, do_RLE ), do_RLE, NB_TEXELS )
+
+    def testShortFrames( self ):
+        for do_RLE in (True, False):
+            for nb_texels in [ 0, 1, 2, 15, 16, 17, NB_TEXELS-1 ] + [ self.rnd.randint( 0, NB_TEXELS ) for k in xrange( 30 ) ]:
+                self.CheckEqual( MakePayload( self.rnd, nb_texels, do_RLE ), do_RLE, nb_texels )
+
+    def testDanglingByte( self ):
+        for do_RLE in (True, False):
+            for nb_texels in (0, 1, NB_TEXELS // 2, NB_TEXELS):
+                self.CheckEqual( MakePayload( self.rnd, nb_texels, do_RLE, odd=True ), do_RLE, nb_texels )
+
+    def testEmptyPayload( self ):
+        for do_RLE in (True, False):
+            self.CheckEqual( bytearray( OFFSET ), do_RLE, 0 )
+
+    def testOversizeFrames( self ):
+        for do_RLE in (True, False):
+            for nb_texels in [ NB_TEXELS+1, NB_TEXELS+15 ] + [ self.rnd.randint( NB_TEXELS+1, 2*NB_TEXELS ) for k in xrange( 10 ) ]:
+                self.CheckOversize( MakePayload( self.rnd, nb_texels, do_RLE ), do_RLE )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# -*- coding: latin-1 -*-
+#######################################################################
+## \file
+#  \section sdhlibrary_python_test_dsa_resync_py_general General file information
+#
+#    \brief
+#      Unit tests for the resynchronization of the packet decoder of
+#      sdh.dsa.cDSA after invalid packets: Byte streams with stray bytes
+#      and corrupted packets are decoded with cDSA._ReadNextResponse()
+#      and cDSA._ParseBufferedResponse() and no valid packet may be lost.
+#
+#      Run from the python directory with:
+#      > python -m unittest discover -s test
+#
+#######################################################################
+
+import os
+import sys
+import unittest
+
+sys.path.insert( 0, os.path.join( os.path.dirname( os.path.abspath( __file__ ) ), ".." ) )
+
+from sdh import dsa, dbg
+from sdh.dsasim import BuildPacket
+
+
+class tStreamCom( object ):
+    '''A minimal serial.Serial replacement that reads from a string.
+    '''
+    def __init__( self, stream ):
+        self.stream = stream
+        self.pos = 0
+        self.timeout = 0
+
+    def read( self, n ):
+        s = self.stream[ self.pos : self.pos + n ]
+        self.pos += len( s )
+        return s
+
+    def inWaiting( self ):
+        return len( self.stream ) - self.pos
+
+
+class cStreamDSA( dsa.cDSA ):
+    '''A cDSA object decoding a byte stream, only the packet decoding can be used.
+    '''
+    def __init__( self, stream ): # pylint: disable-msg=W0231
+        self._dbg = dbg.tDBG( False )
+        self.port = "stream"
+        self.com = tStreamCom( stream )
+        self.GetNbBytesReadable = self.GetNbBytesReadableRS232
+        self._InitReceiveState()
+
+
+def Packets( first, last ):
+    '''Return a list of the valid packets with ids \a first .. \a last, each with a payload of its id.
+    '''
+    return [ BuildPacket( i, chr( i ) * 4 ) for i in xrange( first, last + 1 ) ]
+
+
+class TestResync( unittest.TestCase ):
+    '''Check that invalid packets never swallow the valid packets following them.
+    '''
+
+    def ReadAll( self, stream ):
+        '''Return the ids of all packets read from \a stream with _ReadNextResponse() and the number of errors.
+        '''
+        ts = cStreamDSA( stream )
+        ids = []
+        nb_errors = 0
+        while ts.com.inWaiting() > 0  or  len( ts._rx_buffer ) > 0: # pylint: disable-msg=W0212
+            try:
+                ids.append( ts._ReadNextResponse().packet_id ) # pylint: disable-msg=W0212
+            except dsa.cDSAError:
+                nb_errors += 1
+        return (ids, nb_errors)
+
+    def ParseAll( self, stream ):
+        '''Return the ids of all packets parsed from \a stream with _ParseBufferedResponse() and the number of errors.
+        '''
+        ts = cStreamDSA( "" )
+        ts._rx_buffer.extend( stream ) # pylint: disable-msg=W0212
+        ids = []
+        nb_errors = 0
+        while True:
+            try:
+                response = ts._ParseBufferedResponse() # pylint: disable-msg=W0212
+            except dsa.cDSAError:
+                nb_errors += 1
+                continue
+            if response is None:
+                break
+            ids.append( response.packet_id )
+        return (ids, nb_errors)
+
+    def Check( self, stream, expected_ids ):
+        (ids, nb_errors) = self.ReadAll( stream )
+        self.assertEqual( ids, expected_ids, "ReadAll: got packets %r" % ids )
+        self.assertTrue( nb_errors > 0 )
+
+        # a garbled size field makes _ParseBufferedResponse() wait for more
+        # bytes (up to MAX_PAYLOAD_SIZE), so keep the stream going like a DSACON32m
+        # in push mode does with more packets
+        filler = Packets( 0x80, 0xff ) * 4
+        (ids, nb_errors) = self.ParseAll( stream + "".join( filler ) )
+        self.assertEqual( ids[ :len( expected_ids ) ], expected_ids, "ParseAll: got packets %r" % ids )
+        self.assertTrue( nb_errors > 0 )
+
+    def testStrayPreambleByte( self ):
+        # a single stray 0xaa makes the first packet look like a packet with a bad checksum
+        self.Check( "\xaa" + "".join( Packets( 0x00, 0x1f ) ), range( 0x00, 0x20 ) )
+
+    def testStrayPreambleBytes( self ):
+        for n in (2, 3, 4):
+            self.Check( "\xaa" * n + "".join( Packets( 0x00, 0x0f ) ), range( 0x00, 0x10 ) )
+
+    def testCorruptedPacket( self ):
+        packets = Packets( 0x00, 0x0f )
+        bad = packets[ 5 ][:-1] + chr( ord( packets[ 5 ][-1] ) ^ 0xff )
+        self.Check( "".join( packets[:5] ) + bad + "".join( packets[6:] ), range( 0x00, 0x05 ) + range( 0x06, 0x10 ) )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -56,17 +56,23 @@ def processForces():
     # ???? ?? ?????????? ?????
     while (not t2_stop.is_set()):
         # ???????? ??? ????????? ???????
+        (force, cog_x, cog_y, area) = ts.GetContactForces()
         for fi in range(0, 3):
             for part in range(0, 2):
-                (force, cog_x, cog_y, area) = ts.GetContactForce(fi, part)
-                forces[fi][part] = force
+                forces[fi][part] = force[fi][part]
         t2_stop.wait(0.5)
 # ????????? ???????? ?? TCP ????????? ??????? ? ????????? ????
 def writeStats():
     global forces
     try:
         # ???????? ??????? ????????? ???????
-        aaa = hand.GetAxisActualAngle(sdh.All)
+        sample = None
+        if hand.GetTelemetry() is not None:
+            sample = hand.GetTelemetry().Latest()
+        if sample is None:
+            aaa = hand.GetAxisActualAngle(sdh.All)
+        else:
+            aaa = sample.angles
         s = "1 %6.3f:%6.3f:%6.3f:%6.3f:%6.3f:%6.3f:%6.3f:%6.3f:%6.3f:%6.3f:%6.3f:%6.3f:%6.3f" % (
             forces[0][0], forces[0][1], forces[1][0], forces[1][1], forces[2][0], forces[2][1],
             aaa[0], aaa[1], aaa[2], aaa[3], aaa[4], aaa[5], aaa[6])
@@ -166,12 +172,18 @@ def prepareHand():
     hand = sdh.cSDH(options=options.__dict__)
     hand.Open()
     print "OK"
+    try:
+        hand.StartTelemetry(rate=20.0)
+    except ImportError:
+        print "numpy not available, joint angles are read on request"
     # ????????? ???? ? ????????? ??? ?????????
     GotoPose(hand, start_pose)
     # ???????????? ? ??????????? ???????
     print "Connecting to tactile sensor controller. This may take up to 8 seconds...",
-    ts = sdh.dsa.cDSA(port=options.dsaport, debug_level=options.dsa_debug_level, debug_output=options.dsa_debug_output)
+    ts = sdh.dsa.cDSA(port=options.dsaport, debug_level=options.dsa_debug_level, debug_output=options.dsa_debug_output, record=options.dsa_record)
     print "OK"
+    if options.dsa_frame_log:
+        ts.StartFrameLog(options.dsa_frame_log)
     ts.StartUpdater(framerate=options.framerate, do_RLE=True)
     # ????????? ??????????? ???????
     t2_stop = threading.Event()